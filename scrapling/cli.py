@@ -12,7 +12,7 @@ from scrapling.core._types import List, Optional, Dict, Tuple, Any, Callable
 from orjson import loads as json_loads, JSONDecodeError
 
 try:
-    from click import command, option, Choice, group, argument, version_option
+    from click import command, option, Choice, group, argument, version_option, UsageError
 except (ImportError, ModuleNotFoundError) as e:
     raise ModuleNotFoundError(
         "You need to install scrapling with any of the extras to enable Shell commands. See: https://scrapling.readthedocs.io/en/latest/#installation"
@@ -685,6 +685,96 @@ def stealthy_fetch(
     __Request_and_Save(StealthyFetcher.fetch, url, output_file, css_selector, ai_targeted=ai_targeted, **kwargs)
 
 
+def __default_storage_file() -> str:
+    from scrapling.parser import __DEFAULT_DB_FILE__
+
+    return __DEFAULT_DB_FILE__
+
+
+def __open_storage(storage_file: Optional[str]):
+    from scrapling.core.storage import SQLiteStorageSystem
+
+    path = storage_file or __default_storage_file()
+    if not Path(path).exists():
+        raise FileNotFoundError(f"The storage file '{path}' doesn't exist")
+    # The class is wrapped in `lru_cache`, the CLI opens its own instance instead of sharing the cached one
+    return SQLiteStorageSystem.__wrapped__(storage_file=path)  # type: ignore[attr-defined]
+
+
+def _storage_file_option(f):
+    """Apply the shared storage file option for the storage commands."""
+    return option(
+        "--file",
+        "storage_file",
+        type=str,
+        default=None,
+        help="Path to the adaptive storage database file (Default: the database shipped inside the package directory)",
+    )(f)
+
+
+@group(help="Inspect and maintain the adaptive feature's storage database.")
+def storage():
+    """Manage the adaptive storage database"""
+    pass
+
+
+@storage.command(help="Show statistics about the storage database.")
+@_storage_file_option
+def stats(storage_file):
+    from datetime import datetime
+
+    db = __open_storage(storage_file)
+    try:
+        info = db.stats()
+    finally:
+        db.close()
+
+    def _date(timestamp: Optional[float]) -> str:
+        return datetime.fromtimestamp(timestamp).isoformat(sep=" ", timespec="seconds") if timestamp else "-"
+
+    print(f"Storage file: {info['storage_file']}")
+    print(f"Elements: {info['rows']}")
+    print(f"Oldest usage: {_date(info['oldest_last_used'])}")
+    print(f"Newest usage: {_date(info['newest_last_used'])}")
+    print(f"Database size: {info['database_size']} bytes ({info['free_size']} bytes free)")
+    print(f"WAL size: {info['wal_size']} bytes")
+    for url, count in info["rows_per_url"].items():
+        print(f"  {url}: {count}")
+
+
+@storage.command(help="Remove stale elements from the storage database without taking it offline.")
+@_storage_file_option
+@option(
+    "--ttl",
+    type=float,
+    default=None,
+    help="Remove elements that weren't saved or retrieved in the last TTL seconds",
+)
+@option(
+    "--max-rows",
+    type=int,
+    default=None,
+    help="Keep only the most recently used MAX_ROWS elements",
+)
+@option(
+    "--vacuum",
+    is_flag=True,
+    default=False,
+    help="Rebuild the database file to reclaim all free space. This blocks other writers while it runs (Default: False)",
+)
+def prune(storage_file, ttl, max_rows, vacuum):
+    if ttl is None and max_rows is None and not vacuum:
+        raise UsageError("Nothing to do, pass `--ttl`, `--max-rows`, and/or `--vacuum`")
+
+    db = __open_storage(storage_file)
+    try:
+        removed = db.prune(ttl=ttl, max_rows=max_rows)
+        db.compact(full=vacuum)
+    finally:
+        db.close()
+    log.info(f"Removed {removed} elements from '{db.storage_file}'")
+
+
 @group()
 @version_option(version=__version__, prog_name="Scrapling")
 def main():
@@ -696,3 +786,4 @@ main.add_command(install)
 main.add_command(shell)
 main.add_command(extract)
 main.add_command(mcp)
+main.add_command(storage)
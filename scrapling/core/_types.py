@@ -22,11 +22,13 @@ from typing import (
     Pattern,
     Sequence,
     Tuple,
+    Type,
     TypeVar,
     Union,
     Match,
     Mapping,
     Awaitable,
+    BinaryIO,
     Protocol,
     Coroutine,
     SupportsIndex,
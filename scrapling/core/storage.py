@@ -1,4 +1,6 @@
+from time import time
 from hashlib import sha256
+from pathlib import Path
 from threading import RLock
 from functools import lru_cache
 from abc import ABC, abstractmethod
@@ -76,20 +78,44 @@ class SQLiteStorageSystem(StorageSystemMixin):
     Mainly built, so the library can run in threaded frameworks like scrapy or threaded tools
     > It's optimized for threaded applications, but running it without threads shouldn't make it slow."""
 
-    def __init__(self, storage_file: str, url: Optional[str] = None):
+    # How many elements `prune` deletes per transaction
+    prune_batch_size: int = 1000
+
+    def __init__(
+        self,
+        storage_file: str,
+        url: Optional[str] = None,
+        ttl: Optional[float] = None,
+        max_rows: Optional[int] = None,
+        maintenance_interval: int = 1000,
+    ):
         """
         :param storage_file: File to be used to store elements' data.
         :param url: URL of the website we are working on to separate it from other websites data
+        :param ttl: Remove elements that weren't saved or retrieved in the last ``ttl`` seconds. Disabled by default.
+        :param max_rows: Keep at most this number of elements in the database, evicting the least recently used ones first. Disabled by default.
+        :param maintenance_interval: Run the retention rules and checkpoint the WAL file automatically after this number of saves. Set it to 0 to disable it.
 
         """
         super().__init__(url)
         self.storage_file = storage_file
+        self.ttl = ttl
+        # Retrieving an element only writes its new usage time if the stored one is older than this, so reads don't
+        # turn into write transactions. It's precise enough for both retention rules.
+        self._touch_interval = min(ttl / 10, 60.0) if ttl else 60.0
+        self.max_rows = max_rows
+        self.maintenance_interval = maintenance_interval
+        self._saves_since_maintenance = 0
         self.lock = RLock()  # Better than Lock for reentrancy
         # >SQLite default mode in the earlier version is 1 not 2 (1=thread-safe 2=serialized)
         # `check_same_thread=False` to allow it to be used across different threads.
         self.connection = db_connect(self.storage_file, check_same_thread=False)
+        # Must be set before the table is created to take effect, so it only applies to new databases.
+        self.connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
         # WAL (Write-Ahead Logging) allows for better concurrency.
         self.connection.execute("PRAGMA journal_mode=WAL")
+        # Truncate the WAL file back to this size (in bytes) after each checkpoint instead of leaving it at its peak size
+        self.connection.execute("PRAGMA journal_size_limit=67108864")
         self.cursor = self.connection.cursor()
         self._setup_database()
         log.debug(f'Storage system loaded with arguments (storage_file="{storage_file}", url="{url}")')
@@ -101,9 +127,17 @@ class SQLiteStorageSystem(StorageSystemMixin):
                 url TEXT,
                 identifier TEXT,
                 element_data TEXT,
+                last_used REAL,
                 UNIQUE (url, identifier)
             )
         """)
+        # Databases created by older versions don't have the `last_used` column
+        columns = {row[1] for row in self.cursor.execute("PRAGMA table_info(storage)").fetchall()}
+        if "last_used" not in columns:
+            self.cursor.execute("ALTER TABLE storage ADD COLUMN last_used REAL")
+            # Consider old rows as used now, so they aren't evicted right after upgrading
+            self.cursor.execute("UPDATE storage SET last_used = ?", (time(),))
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS storage_last_used ON storage (last_used)")
         self.connection.commit()
 
     def save(self, element: HtmlElement, identifier: str) -> None:
@@ -118,13 +152,17 @@ class SQLiteStorageSystem(StorageSystemMixin):
         with self.lock:
             self.cursor.execute(
                 """
-                INSERT OR REPLACE INTO storage (url, identifier, element_data)
-                VALUES (?, ?, ?)
+                INSERT OR REPLACE INTO storage (url, identifier, element_data, last_used)
+                VALUES (?, ?, ?, ?)
             """,
-                (url, identifier, dumps(element_data)),
+                (url, identifier, dumps(element_data), time()),
             )
             self.connection.commit()
 
+            self._saves_since_maintenance += 1
+            if self.maintenance_interval and self._saves_since_maintenance >= self.maintenance_interval:
+                self.maintenance()
+
     def retrieve(self, identifier: str) -> Optional[Dict[str, Any]]:
         """Using the identifier, we search the storage and return the unique properties of the element
 
@@ -135,14 +173,128 @@ class SQLiteStorageSystem(StorageSystemMixin):
         url = self._get_base_url()
         with self.lock:
             self.cursor.execute(
-                "SELECT element_data FROM storage WHERE url = ? AND identifier = ?",
+                "SELECT id, element_data, last_used FROM storage WHERE url = ? AND identifier = ?",
                 (url, identifier),
             )
             result = self.cursor.fetchone()
             if result:
-                return loads(result[0])
+                now = time()
+                if result[2] is None or now - result[2] >= self._touch_interval:
+                    self.cursor.execute("UPDATE storage SET last_used = ? WHERE id = ?", (now, result[0]))
+                    self.connection.commit()
+                return loads(result[1])
             return None
 
+    def prune(self, ttl: Optional[float] = None, max_rows: Optional[int] = None) -> int:
+        """Remove stale elements from the storage. They're deleted in batches of ``prune_batch_size``, each in its own short transaction, so it's safe to run while other processes use the database.
+
+        :param ttl: Remove elements that weren't saved or retrieved in the last ``ttl`` seconds. Defaults to the value passed on initialization.
+        :param max_rows: Keep only the most recently used ``max_rows`` elements. Defaults to the value passed on initialization.
+        :return: The number of removed elements
+        """
+        ttl = self.ttl if ttl is None else ttl
+        max_rows = self.max_rows if max_rows is None else max_rows
+        removed = 0
+        if ttl is not None:
+            cutoff = time() - ttl
+            while True:
+                deleted = self._delete_batch(
+                    "SELECT id FROM storage WHERE last_used < ? LIMIT ?", (cutoff, self.prune_batch_size)
+                )
+                removed += deleted
+                if deleted < self.prune_batch_size:
+                    break
+
+        if max_rows is not None:
+            with self.lock:
+                excess = self.cursor.execute("SELECT COUNT(*) FROM storage").fetchone()[0] - max(max_rows, 0)
+            while excess > 0:
+                # Elements never retrieved since the upgrade that added `last_used` sort first, like the oldest ones
+                deleted = self._delete_batch(
+                    "SELECT id FROM storage ORDER BY last_used LIMIT ?", (min(excess, self.prune_batch_size),)
+                )
+                if not deleted:
+                    break
+                removed += deleted
+                excess -= deleted
+
+        if removed:
+            log.debug(f"Removed {removed} stale elements from the storage")
+        return removed
+
+    def _delete_batch(self, selection: str, parameters: tuple) -> int:
+        """Delete the elements whose ids the query selects in one transaction, returns how many were deleted."""
+        with self.lock:
+            deleted = self.cursor.execute(f"DELETE FROM storage WHERE id IN ({selection})", parameters).rowcount
+            self.connection.commit()
+            return deleted
+
+    def checkpoint(self, mode: str = "PASSIVE") -> None:
+        """Move the WAL file content into the database file.
+
+        :param mode: The SQLite checkpoint mode. `PASSIVE` never waits for readers or writers, while `TRUNCATE` waits for them then resets the WAL file to zero bytes.
+        """
+        mode = mode.upper()
+        if mode not in ("PASSIVE", "FULL", "RESTART", "TRUNCATE"):
+            raise ValueError(f"Invalid checkpoint mode '{mode}'")
+
+        with self.lock:
+            self.connection.commit()
+            self.cursor.execute(f"PRAGMA wal_checkpoint({mode})")
+            self.cursor.fetchall()
+
+    def compact(self, full: bool = False) -> None:
+        """Return the free pages left by removed elements to the filesystem, then truncate the WAL file.
+
+        :param full: Rebuild the whole database file with `VACUUM`, which blocks other writers while it runs. Otherwise, the free pages are released incrementally, which is only supported by databases created by this version or rebuilt once with `full=True`.
+        """
+        with self.lock:
+            self.connection.commit()
+            if full:
+                self.cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                self.cursor.execute("VACUUM")
+            elif self.cursor.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+                # `executescript` steps the statement to completion, while `execute` would free a single page only
+                self.cursor.executescript("PRAGMA incremental_vacuum;")
+            self.connection.commit()
+        self.checkpoint("TRUNCATE")
+
+    def maintenance(self) -> None:
+        """Apply the configured retention rules, then checkpoint the WAL file without blocking other connections."""
+        with self.lock:
+            self._saves_since_maintenance = 0
+            if self.ttl is not None or self.max_rows is not None:
+                self.prune()
+            self.checkpoint()
+
+    def stats(self) -> Dict[str, Any]:
+        """Collect statistics about the storage database.
+
+        :return: A dictionary with the number of elements in total and per website, the oldest and newest usage timestamps, and the file sizes.
+        """
+        with self.lock:
+            total, oldest, newest = self.cursor.execute(
+                "SELECT COUNT(*), MIN(last_used), MAX(last_used) FROM storage"
+            ).fetchone()
+            per_url = dict(
+                self.cursor.execute("SELECT url, COUNT(*) FROM storage GROUP BY url ORDER BY COUNT(*) DESC").fetchall()
+            )
+            page_size = self.cursor.execute("PRAGMA page_size").fetchone()[0]
+            page_count = self.cursor.execute("PRAGMA page_count").fetchone()[0]
+            freelist_count = self.cursor.execute("PRAGMA freelist_count").fetchone()[0]
+
+        wal_file = Path(f"{self.storage_file}-wal")
+        return {
+            "storage_file": self.storage_file,
+            "rows": total,
+            "rows_per_url": per_url,
+            "oldest_last_used": oldest,
+            "newest_last_used": newest,
+            "database_size": page_size * page_count,
+            "free_size": page_size * freelist_count,
+            "wal_size": wal_file.stat().st_size if wal_file.exists() else 0,
+        }
+
     def close(self):
         """Close all connections. It will be useful when with some things like scrapy Spider.closed() function/signal"""
         with self.lock:
@@ -3,6 +3,8 @@ Functions related to custom types or type checking
 """
 
 from functools import lru_cache
+from contextlib import contextmanager
+from contextvars import ContextVar
 
 from scrapling.core.utils import log
 from scrapling.core._types import (
@@ -14,6 +16,7 @@ from scrapling.core._types import (
     Union,
     Optional,
     Callable,
+    Iterator,
     Sequence,
     TYPE_CHECKING,
     AsyncGenerator,
@@ -24,6 +27,25 @@ from scrapling.parser import Selector, SQLiteStorageSystem
 if TYPE_CHECKING:
     from scrapling.spiders import Request
 
+# Set while creating responses whose pages are only parsed if they're used, see `deferred_parsing`
+_deferred_parsing: ContextVar[bool] = ContextVar("deferred_parsing", default=False)
+# The `_root` slot of `Selector`, that `Response._root` fills on first use when the parsing is deferred
+_root_slot = Selector.__dict__["_root"]
+_PARSING_KEYWORDS = ("huge_tree", "keep_comments", "keep_cdata")
+
+
+@contextmanager
+def deferred_parsing() -> Iterator[None]:
+    """Don't parse the pages of the responses created in this context until they're used.
+
+    For the spiders whose callbacks run in worker processes, which parse the pages themselves.
+    """
+    token = _deferred_parsing.set(True)
+    try:
+        yield
+    finally:
+        _deferred_parsing.reset(token)
+
 
 class Response(Selector):
     """This class is returned by all engines as a way to unify the response type between different libraries.
@@ -58,6 +80,10 @@ class Response(Selector):
             content = content.encode("utf-8")
 
         adaptive_domain: str = cast(str, selector_config.pop("adaptive_domain", ""))
+        # The parser's settings until the page is parsed, if it's deferred
+        self._unparsed: Optional[Dict[str, Any]] = None
+        if _deferred_parsing.get():
+            self._unparsed = {key: selector_config[key] for key in _PARSING_KEYWORDS if key in selector_config}
         self.status = status
         self.reason = reason
         self.cookies = cookies
@@ -65,11 +91,12 @@ class Response(Selector):
         self.request_headers = request_headers
         self.history = history or []
         super().__init__(
-            content=content,
+            content=content if self._unparsed is None else b"",
             url=adaptive_domain or url,
             encoding=encoding,
             **selector_config,
         )
+        self._raw_body = content
         # For easier debugging while working from a Python shell
         log.info(f"Fetched ({status}) <{method} {url}> (referer: {request_headers.get('referer')})")
 
@@ -80,6 +107,17 @@ class Response(Selector):
         self.request: Optional["Request"] = None  # Will be set by crawler
         self.captured_xhr: List["Response"] = []
 
+    @property  # type: ignore[override]
+    def _root(self) -> Any:
+        if self._unparsed is not None:
+            config, self._unparsed = self._unparsed, None
+            _root_slot.__set__(self, Selector(self.body, url=self.url, encoding=self.encoding, **config)._root)
+        return _root_slot.__get__(self, Response)
+
+    @_root.setter
+    def _root(self, value: Any) -> None:
+        _root_slot.__set__(self, value)
+
     @property
     def body(self) -> bytes:
         """Return the raw body of the response as bytes."""
@@ -140,6 +178,7 @@ class Response(Selector):
             priority=priority if priority is not None else self.request.priority,
             dont_filter=dont_filter,
             meta={**(self.meta or {}), **(meta or {})},
+            depth=self.request.depth + 1,
             **session_kwargs,
         )
 
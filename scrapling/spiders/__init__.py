@@ -1,10 +1,15 @@
 from .request import Request
 from .result import CrawlResult
 from .scheduler import Scheduler
+from .shared_scheduler import SharedScheduler
 from .engine import CrawlerEngine
+from .pipeline import ItemPipeline, ItemStage, JsonLinesSink, CsvSink, XmlSink
+from .columnar import ParquetSink
+from .sharding import ShardedCrawl
 from .session import SessionManager
 from .spider import Spider, SessionConfigurationError
 from .links import LinkExtractor
+from .pagination import Paginator
 from .templates import CrawlSpider, SitemapSpider, CrawlRule, ShopifySpider, XMLFeedSpider, CSVFeedSpider
 from scrapling.engines.toolbelt.custom import Response
 
@@ -14,10 +19,19 @@ __all__ = [
     "Request",
     "CrawlerEngine",
     "CrawlResult",
+    "ItemPipeline",
+    "ItemStage",
+    "JsonLinesSink",
+    "CsvSink",
+    "XmlSink",
+    "ParquetSink",
     "SessionManager",
     "Scheduler",
+    "SharedScheduler",
+    "ShardedCrawl",
     "Response",
     "LinkExtractor",
+    "Paginator",
     "CrawlSpider",
     "CrawlRule",
     "SitemapSpider",
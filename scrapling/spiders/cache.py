@@ -1,93 +1,253 @@
-from base64 import b64encode, b64decode
+import os
+import gzip
+from hashlib import blake2b
+from base64 import b64decode
+from struct import Struct
 from pathlib import Path
+from shutil import rmtree
 
 import orjson
 import anyio
-from anyio import Path as AsyncPath
+from msgspec import msgpack
 
 from scrapling.core.utils import log
-from scrapling.core._types import Dict, Optional, Any, Tuple
+from scrapling.core._types import Dict, Optional, Any, Tuple, Literal
 from scrapling.engines.toolbelt.custom import Response
 
+CacheCompression = Literal["gzip", "zstd"]
+
+# Every entry starts with the magic bytes, the format version, the body's compression, and the metadata's size, then
+# the msgpack-encoded metadata, then the body as it was received
+_MAGIC = b"SCRC"
+_VERSION = 1
+_PREFIX = Struct("<4sBBI")
+_CODECS: Dict[Optional[str], int] = {None: 0, "gzip": 1, "zstd": 2}
+_CODEC_NAMES = {code: name for name, code in _CODECS.items()}
+_HEX_DIGITS = set("0123456789abcdef")
+
+
+def _zstd() -> Any:
+    try:
+        from compression import zstd  # type: ignore  # Python 3.14+
+
+        return zstd
+    except ImportError:
+        pass
+    try:
+        import zstandard  # type: ignore
+    except ImportError:
+        raise ImportError(
+            "Compressing the cache with zstd needs Python 3.14 or the `zstandard` package: pip install zstandard"
+        ) from None
+    return zstandard
+
+
+def _compress(body: bytes, compression: Optional[str]) -> bytes:
+    if compression == "gzip":
+        return gzip.compress(body, compresslevel=6, mtime=0)
+    if compression == "zstd":
+        zstd = _zstd()
+        return zstd.compress(body) if hasattr(zstd, "compress") else zstd.ZstdCompressor().compress(body)
+    return body
+
+
+def _decompress(body: bytes, compression: Optional[str]) -> bytes:
+    if compression == "gzip":
+        return gzip.decompress(body)
+    if compression == "zstd":
+        zstd = _zstd()
+        return zstd.decompress(body) if hasattr(zstd, "decompress") else zstd.ZstdDecompressor().decompress(body)
+    return body
+
+
+def body_digest(body: bytes) -> bytes:
+    """A short hash of a response body, to tell whether a page changed since it was cached."""
+    return blake2b(body, digest_size=16).digest()
+
+
+def _header(headers: Dict[str, Any], name: str) -> Optional[str]:
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def conditional_headers(metadata: Dict[str, Any]) -> Dict[str, str]:
+    """The headers asking the server to only send the page again if it changed since the cached response."""
+    headers = {}
+    etag = _header(metadata["headers"], "etag")
+    if etag:
+        headers["If-None-Match"] = etag
+    last_modified = _header(metadata["headers"], "last-modified")
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+def _restore_cookies(cached_cookies: Any) -> Tuple[Dict[str, str], ...] | Dict[str, str]:
+    # Browser-engine cookies are cached as an array (see `_encode`) and come back as a `list`; restore the `tuple`
+    # shape `Response` expects. Static-engine cookies are cached as an object and come back as a `dict` already.
+    return tuple(cached_cookies) if isinstance(cached_cookies, list) else cached_cookies
+
 
 class ResponseCacheManager:
-    """Caches HTTP responses to disk for replay during spider development."""
+    """Caches HTTP responses to disk for replay during spider development.
+
+    Every response is one file, named after its fingerprint and spread over 256 subdirectories so none of them gets
+    too large. The file holds a small binary header, the metadata encoded with msgpack, and the raw body, optionally
+    compressed. Files written by older versions, one JSON file per response, are still read.
+    """
 
-    def __init__(self, cache_dir: str | Path):
-        self._cache_dir = AsyncPath(cache_dir)
+    def __init__(self, cache_dir: str | Path, compression: Optional[CacheCompression] = None):
+        """
+        :param cache_dir: The directory to keep the cached responses in.
+        :param compression: Compress the bodies with `gzip` or `zstd`. Entries are readable whatever this is set to.
+        """
+        if compression not in _CODECS:
+            raise ValueError(f"Unknown compression: {compression!r}")
+        if compression == "zstd":
+            _zstd()
+        self._cache_dir = Path(cache_dir)
+        self._compression = compression
 
-    def _cache_path(self, fingerprint: bytes) -> AsyncPath:
+    def _cache_path(self, fingerprint: bytes) -> Path:
+        name = fingerprint.hex()
+        return self._cache_dir / name[:2] / f"{name}.bin"
+
+    def _legacy_path(self, fingerprint: bytes) -> Path:
         return self._cache_dir / f"{fingerprint.hex()}.json"
 
-    async def get(self, fingerprint: bytes) -> Optional[Response]:
-        path = self._cache_path(fingerprint)
-        if not await path.exists():
+    def _encode(self, response: Response, method: str) -> bytes:
+        metadata = msgpack.encode(
+            {
+                "url": response.url,
+                "status": response.status,
+                "reason": response.reason,
+                "encoding": response.encoding,
+                # Browser-engine responses store cookies as a `tuple` of full cookie dicts; static-engine responses
+                # store a flat `dict`. Preserve whichever shape it is instead of collapsing non-dict cookies to `{}`,
+                # which was silently dropping every cookie from browser-engine responses.
+                "cookies": list(response.cookies) if isinstance(response.cookies, tuple) else dict(response.cookies),
+                "headers": dict(response.headers),
+                "request_headers": dict(response.request_headers),
+                "method": method,
+                "digest": body_digest(response.body),
+            }
+        )
+        body = _compress(response.body, self._compression)
+        return _PREFIX.pack(_MAGIC, _VERSION, _CODECS[self._compression], len(metadata)) + metadata + body
+
+    @staticmethod
+    def _decode(data: bytes) -> Tuple[Dict[str, Any], bytes]:
+        magic, version, codec, metadata_size = _PREFIX.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION or codec not in _CODEC_NAMES:
+            raise ValueError("Not a cached response")
+        start = _PREFIX.size + metadata_size
+        return msgpack.decode(data[_PREFIX.size : start]), _decompress(data[start:], _CODEC_NAMES[codec])
+
+    @staticmethod
+    def _decode_legacy(data: bytes) -> Tuple[Dict[str, Any], bytes]:
+        metadata: Dict[str, Any] = orjson.loads(data)
+        return metadata, b64decode(metadata.pop("content"))
+
+    def _load(self, fingerprint: bytes) -> Optional[Tuple[Dict[str, Any], bytes]]:
+        """Read an entry's metadata and body, or None if it isn't cached."""
+        # Opening the file straight away saves checking that it exists first, which is another system call per hit
+        try:
+            return self._decode(self._cache_path(fingerprint).read_bytes())
+        except FileNotFoundError:
+            pass
+        try:
+            return self._decode_legacy(self._legacy_path(fingerprint).read_bytes())
+        except FileNotFoundError:
             return None
 
+    def _load_metadata(self, fingerprint: bytes) -> Optional[Dict[str, Any]]:
+        """Read an entry's metadata without its body, or None if it isn't cached."""
         try:
-            async with await anyio.open_file(path, "rb") as f:
-                data: Dict[str, Any] = orjson.loads(await f.read())
-
-            # Browser-engine cookies are cached as a JSON array (see `put`) and come back
-            # as a `list`; restore the `tuple` shape `Response` expects. Static-engine
-            # cookies are cached as a JSON object and come back as a `dict` already.
-            cached_cookies = data["cookies"]
-            cookies: Tuple[Dict[str, str], ...] | Dict[str, str] = (
-                tuple(cached_cookies) if isinstance(cached_cookies, list) else cached_cookies
-            )
+            with open(self._cache_path(fingerprint), "rb") as file:
+                magic, version, codec, metadata_size = _PREFIX.unpack(file.read(_PREFIX.size))
+                if magic != _MAGIC or version != _VERSION or codec not in _CODEC_NAMES:
+                    raise ValueError("Not a cached response")
+                return msgpack.decode(file.read(metadata_size))
+        except FileNotFoundError:
+            pass
+        try:
+            return self._decode_legacy(self._legacy_path(fingerprint).read_bytes())[0]
+        except FileNotFoundError:
+            return None
 
+    def _write(self, fingerprint: bytes, response: Response, method: str) -> None:
+        path = self._cache_path(fingerprint)
+        temp_path = path.with_suffix(".tmp")
+        try:
+            data = self._encode(response, method)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path.write_bytes(data)
+            temp_path.replace(path)
+        except Exception:
+            temp_path.unlink(missing_ok=True)
+            raise
+
+    async def get(self, fingerprint: bytes) -> Optional[Response]:
+        try:
+            entry = await anyio.to_thread.run_sync(self._load, fingerprint)
+            if entry is None:
+                return None
+            metadata, body = entry
             return Response(
-                url=data["url"],
-                content=b64decode(data["content"]),
-                status=data["status"],
-                reason=data["reason"],
-                encoding=data["encoding"],
-                cookies=cookies,
-                headers=data["headers"],
-                request_headers=data["request_headers"],
-                method=data["method"],
+                url=metadata["url"],
+                content=body,
+                status=metadata["status"],
+                reason=metadata["reason"],
+                encoding=metadata["encoding"],
+                cookies=_restore_cookies(metadata["cookies"]),
+                headers=metadata["headers"],
+                request_headers=metadata["request_headers"],
+                method=metadata["method"],
             )
         except Exception as e:
             log.warning(f"Failed to read cached response for {fingerprint.hex()}: {e}")
             return None
 
-    async def put(self, fingerprint: bytes, response: Response, method: str = "GET") -> None:
-        await self._cache_dir.mkdir(parents=True, exist_ok=True)
-        temp_path = self._cache_path(fingerprint).with_suffix(".tmp")
-
+    async def get_metadata(self, fingerprint: bytes) -> Optional[Dict[str, Any]]:
+        """The metadata of a cached response, like its URL, status, and headers, without reading its body."""
         try:
-            serialized = orjson.dumps(
-                {
-                    "url": response.url,
-                    "content": b64encode(response.body).decode("ascii"),
-                    "status": response.status,
-                    "reason": response.reason,
-                    "encoding": response.encoding,
-                    # Browser-engine responses store cookies as a `tuple` of full cookie
-                    # dicts; static-engine responses store a flat `dict`. Preserve whichever
-                    # shape it is instead of collapsing non-dict cookies to `{}`, which was
-                    # silently dropping every cookie from browser-engine responses.
-                    "cookies": list(response.cookies)
-                    if isinstance(response.cookies, tuple)
-                    else dict(response.cookies),
-                    "headers": dict(response.headers),
-                    "request_headers": dict(response.request_headers),
-                    "method": method,
-                }
-            )
-            async with await anyio.open_file(temp_path, "wb") as f:
-                await f.write(serialized)
+            return await anyio.to_thread.run_sync(self._load_metadata, fingerprint)
+        except Exception as e:
+            log.warning(f"Failed to read cached response for {fingerprint.hex()}: {e}")
+            return None
 
-            await temp_path.replace(self._cache_path(fingerprint))
+    async def put(self, fingerprint: bytes, response: Response, method: str = "GET") -> None:
+        try:
+            await anyio.to_thread.run_sync(self._write, fingerprint, response, method)
         except Exception as e:
-            if await temp_path.exists():
-                await temp_path.unlink()
             log.warning(f"Failed to cache response for {fingerprint.hex()}: {e}")
 
+    def _forget(self, fingerprint: bytes) -> None:
+        self._cache_path(fingerprint).unlink(missing_ok=True)
+        self._legacy_path(fingerprint).unlink(missing_ok=True)
+
+    async def forget(self, fingerprint: bytes) -> bool:
+        """Remove a cached response, returns whether it's gone."""
+        try:
+            await anyio.to_thread.run_sync(self._forget, fingerprint)
+            return True
+        except OSError as e:
+            log.warning(f"Failed to remove cached response for {fingerprint.hex()}: {e}")
+            return False
+
+    def _clear(self) -> bool:
+        if not self._cache_dir.exists():
+            return False
+        with os.scandir(self._cache_dir) as entries:
+            for entry in entries:
+                if entry.is_dir() and len(entry.name) == 2 and set(entry.name) <= _HEX_DIGITS:
+                    rmtree(entry.path)
+                elif entry.name.endswith(".json"):
+                    os.unlink(entry.path)
+        return True
+
     async def clear(self) -> None:
-        if not await self._cache_dir.exists():
-            return
-        async for entry in self._cache_dir.iterdir():
-            if entry.suffix == ".json":
-                await entry.unlink()
-        log.info(f"Cleared response cache at {self._cache_dir}")
+        if await anyio.to_thread.run_sync(self._clear):
+            log.info(f"Cleared response cache at {self._cache_dir}")
@@ -1,15 +1,25 @@
+import os
 import pickle
+import struct
 from pathlib import Path
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 
 import anyio
 from anyio import Path as AsyncPath
 
 from scrapling.core.utils import log
-from scrapling.core._types import Set, List, Optional, TYPE_CHECKING
+from scrapling.core._types import List, Optional, Tuple, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from scrapling.spiders.request import Request
+    from scrapling.spiders.dedup import SeenSnapshot
+
+# ("enqueue", counter, request) when the scheduler accepts a request, ("complete", counter, None) when it's done, and
+# ("seen", -1, request) when a request is marked as seen without being queued. The engine adds
+# ("start_requests", consumed, None) with how many start requests were consumed so far, or -1 once all of them were.
+JournalEvent = Tuple[str, int, Optional["Request"]]
+
+_FRAME_HEADER = struct.Struct("<I")
 
 
 @dataclass
@@ -17,17 +27,36 @@ class CheckpointData:
     """Container for checkpoint state."""
 
     requests: List["Request"] = field(default_factory=list)
-    seen: Set[bytes] = field(default_factory=set)
+    seen: "SeenSnapshot" = field(default_factory=set)
+    # The generation of the scheduler's disk frontier when the checkpoint was taken
+    frontier_generation: int = 0
+    # The scheduler counter of each request, which the journal events refer to
+    counters: List[int] = field(default_factory=list)
+    # Which journal continues this checkpoint
+    epoch: int = 0
+    # The journal events recorded after the checkpoint, filled by `CheckpointManager.load()`
+    journal: List[JournalEvent] = field(default_factory=list)
+    # How many start requests were consumed, None once all of them were (and in checkpoints of older versions)
+    start_requests_consumed: Optional[int] = None
 
 
 class CheckpointManager:
-    """Manages saving and loading checkpoint state to/from disk."""
+    """Manages saving and loading checkpoint state to/from disk.
+
+    The state is kept as a base checkpoint and an append-only journal of the scheduler's events since then, so most
+    checkpoints only append the latest events. Once the journal grows bigger than the base, both are folded into a
+    new base. Files are written from a worker thread to keep the event loop free.
+    """
 
     CHECKPOINT_FILE = "checkpoint.pkl"
+    JOURNAL_FILE = "checkpoint.journal"
+    # The journal is folded into a new base only when it's bigger than both the base and this size
+    MIN_COMPACTION_SIZE = 1 << 20
 
     def __init__(self, crawldir: str | Path | AsyncPath, interval: float = 300.0):
         self.crawldir = AsyncPath(crawldir)
         self._checkpoint_path = self.crawldir / self.CHECKPOINT_FILE
+        self._journal_path = self.crawldir / self.JOURNAL_FILE
         self.interval = interval
         if not isinstance(interval, (int, float)):
             raise TypeError("Checkpoints interval must be integer or float.")
@@ -35,33 +64,138 @@ class CheckpointManager:
             if interval < 0:
                 raise ValueError("Checkpoints interval must be equal or greater than 0.")
 
+        self._epoch: int = 0
+        self._base_size: int = 0
+        # The size of the valid part of the journal, None when it has to be created for the current epoch
+        self._journal_size: Optional[int] = None
+
+    @property
+    def needs_compaction(self) -> bool:
+        """Whether the next checkpoint should be a new base instead of a journal append."""
+        if self._epoch == 0 or self._journal_size is None:
+            return True
+        return self._journal_size > max(self._base_size, self.MIN_COMPACTION_SIZE)
+
     async def has_checkpoint(self) -> bool:
         """Check if a checkpoint exists."""
         return await self._checkpoint_path.exists()
 
-    async def save(self, data: CheckpointData) -> None:
-        """Save checkpoint data to disk atomically."""
-        await self.crawldir.mkdir(parents=True, exist_ok=True)
+    @staticmethod
+    def _frame(payload: bytes) -> bytes:
+        return _FRAME_HEADER.pack(len(payload)) + payload
 
-        temp_path = self._checkpoint_path.with_suffix(".tmp")
+    def _write_base(self, data: CheckpointData) -> int:
+        """Write the base checkpoint atomically and start an empty journal for it. Runs in a worker thread."""
+        crawldir = Path(self.crawldir)
+        crawldir.mkdir(parents=True, exist_ok=True)
+        checkpoint_path = crawldir / self.CHECKPOINT_FILE
+        temp_path = checkpoint_path.with_suffix(".tmp")
 
+        serialized = pickle.dumps(replace(data, journal=[]), protocol=pickle.HIGHEST_PROTOCOL)
         try:
-            serialized = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
-            async with await anyio.open_file(temp_path, "wb") as f:
-                await f.write(serialized)
+            with open(temp_path, "wb") as f:
+                f.write(serialized)
+                f.flush()
+                os.fsync(f.fileno())
+            temp_path.replace(checkpoint_path)
+        except Exception:
+            # Clean up temp file if it exists
+            temp_path.unlink(missing_ok=True)
+            raise
 
-            await temp_path.replace(self._checkpoint_path)
+        # The previous journal belongs to the previous epoch, so it's ignored even if this isn't reached
+        header = self._frame(pickle.dumps(data.epoch))
+        with open(crawldir / self.JOURNAL_FILE, "wb") as f:
+            f.write(header)
+        self._journal_size = len(header)
+        return len(serialized)
 
+    async def save(self, data: CheckpointData) -> None:
+        """Save checkpoint data to disk atomically as a new base, starting a new journal."""
+        data.epoch = self._epoch + 1
+        try:
+            self._base_size = await anyio.to_thread.run_sync(self._write_base, data)
+            self._epoch = data.epoch
             log.info(f"Checkpoint saved: {len(data.requests)} requests, {len(data.seen)} seen URLs")
         except Exception as e:
-            # Clean up temp file if it exists
-            if await temp_path.exists():
-                await temp_path.unlink()
+            self._journal_size = None
             log.error(f"Failed to save checkpoint: {e}")
             raise
 
+    def _write_journal(self, events: List[JournalEvent]) -> None:
+        """Append a batch of events to the journal. Runs in a worker thread."""
+        record = self._frame(pickle.dumps(events, protocol=pickle.HIGHEST_PROTOCOL))
+        journal_path = Path(self._journal_path)
+        if self._journal_size is None:
+            with open(journal_path, "wb") as f:
+                f.write(self._frame(pickle.dumps(self._epoch)) + record)
+                f.flush()
+                os.fsync(f.fileno())
+                self._journal_size = f.tell()
+            return
+
+        with open(journal_path, "r+b") as f:
+            # Overwrites an incomplete write left by a crash, if any
+            f.seek(self._journal_size)
+            f.write(record)
+            f.truncate()
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_size += len(record)
+
+    async def append(self, events: List[JournalEvent]) -> None:
+        """Append the scheduler's events since the last checkpoint to the journal.
+
+        :param events: The events drained from the scheduler
+        """
+        if not events:
+            return
+        if self._epoch == 0:
+            raise RuntimeError("A base checkpoint must be saved before appending to the journal")
+
+        try:
+            await anyio.to_thread.run_sync(self._write_journal, events)
+            log.debug(f"Checkpoint journal appended: {len(events)} events")
+        except Exception as e:
+            log.error(f"Failed to append to the checkpoint journal: {e}")
+            raise
+
+    def _read_journal(self, epoch: int) -> Tuple[List[JournalEvent], Optional[int]]:
+        """Return the journal's events if it continues the given epoch, and the size of its valid part."""
+        try:
+            content = Path(self._journal_path).read_bytes()
+        except FileNotFoundError:
+            return [], None
+
+        events: List[JournalEvent] = []
+        offset, journal_epoch = 0, None
+        while offset + _FRAME_HEADER.size <= len(content):
+            (length,) = _FRAME_HEADER.unpack_from(content, offset)
+            end = offset + _FRAME_HEADER.size + length
+            if end > len(content):
+                break
+            try:
+                payload = pickle.loads(content[offset + _FRAME_HEADER.size : end])  # nosec B301
+            except Exception:
+                break
+
+            if journal_epoch is None:
+                journal_epoch = payload
+                if journal_epoch != epoch:
+                    log.debug("Checkpoint journal belongs to another checkpoint, ignoring it")
+                    return [], None
+            else:
+                events.extend(payload)
+            offset = end
+
+        if journal_epoch is None:
+            return [], None
+        if offset != len(content):
+            log.warning("Checkpoint journal ends with an incomplete write, the events in it are lost")
+        return events, offset
+
     async def load(self) -> Optional[CheckpointData]:
-        """Load checkpoint data from disk.
+        """Load checkpoint data from disk, along with the journal events recorded after it.
 
         Returns None if no checkpoint exists or if loading fails.
         """
@@ -73,7 +207,15 @@ class CheckpointManager:
                 content = await f.read()
                 data: CheckpointData = pickle.loads(content)
 
-            log.info(f"Checkpoint loaded: {len(data.requests)} requests, {len(data.seen)} seen URLs")
+            if data.epoch:
+                data.journal, self._journal_size = await anyio.to_thread.run_sync(self._read_journal, data.epoch)
+            self._epoch = data.epoch
+            self._base_size = len(content)
+
+            log.info(
+                f"Checkpoint loaded: {len(data.requests)} requests, {len(data.seen)} seen URLs, "
+                f"{len(data.journal)} journal events"
+            )
             return data
 
         except Exception as e:
@@ -81,10 +223,12 @@ class CheckpointManager:
             return None
 
     async def cleanup(self) -> None:
-        """Delete checkpoint file after successful completion."""
+        """Delete checkpoint files after successful completion."""
         try:
-            if await self._checkpoint_path.exists():
-                await self._checkpoint_path.unlink()
-            log.debug("Checkpoint file cleaned up")
+            for path in (self._checkpoint_path, self._journal_path):
+                if await path.exists():
+                    await path.unlink()
+            self._epoch, self._journal_size = 0, None
+            log.debug("Checkpoint files cleaned up")
         except Exception as e:
-            log.warning(f"Failed to cleanup checkpoint file: {e}")
+            log.warning(f"Failed to cleanup checkpoint files: {e}")
@@ -0,0 +1,214 @@
+"""Arrow and Parquet export of scraped items. It needs the optional `pyarrow` package."""
+
+from pathlib import Path
+from decimal import Decimal
+from datetime import date, datetime, time
+
+import anyio
+from msgspec import Struct, to_builtins
+
+from scrapling.core.utils import log
+from scrapling.spiders.pipeline import ItemStage
+from scrapling.spiders.result import Item, _stringify
+from scrapling.core._types import Any, Dict, Iterable, List, Optional, Sequence, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+# String columns whose sampled values are at most this unique are dictionary-encoded
+DICTIONARY_RATIO = 0.5
+# The types Arrow stores natively, so they're kept as they are when typed items are turned into dictionaries
+_ARROW_TYPES = (datetime, date, time, Decimal, bytes)
+
+
+def _pyarrow() -> Any:
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise ImportError(
+            'Exporting to Arrow or Parquet needs the `pyarrow` package: pip install "scrapling[parquet]"'
+        ) from None
+    return pyarrow
+
+
+def infer_schema(items: Sequence[Item]) -> "pa.Schema":
+    """Infer an Arrow schema from a sample of items.
+
+    The columns are every key found in the sample, in the order they appeared. A column whose values don't share one
+    type, or that is always empty in the sample, is stored as text, like `to_csv()` does with every value.
+    """
+    pa = _pyarrow()
+    items = _rows(items)
+    columns: Dict[str, None] = {key: None for item in items for key in item}
+    fields = []
+    for column in columns:
+        values = [item.get(column) for item in items]
+        try:
+            kind = pa.array(values).type
+        except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+            kind = pa.string()
+        if pa.types.is_null(kind):
+            kind = pa.string()
+        fields.append(pa.field(str(column), kind))
+    return pa.schema(fields)
+
+
+def dictionary_columns(items: Sequence[Item], schema: "pa.Schema") -> List[str]:
+    """Pick the text columns repeating the same values often enough to be worth dictionary-encoding."""
+    pa = _pyarrow()
+    items = _rows(items)
+    chosen = []
+    for field in schema:
+        if not pa.types.is_string(field.type):
+            continue
+        values = [item.get(field.name) for item in items if item.get(field.name) is not None]
+        if values and len(set(map(str, values))) <= len(values) * DICTIONARY_RATIO:
+            chosen.append(field.name)
+    return chosen
+
+
+def _column(values: List[Any], kind: "pa.DataType") -> "pa.Array":
+    pa = _pyarrow()
+    try:
+        return pa.array(values, type=kind)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+        pass
+
+    # Values that don't fit the schema are written as text in text columns, and left empty in the others
+    if pa.types.is_string(kind):
+        return pa.array([None if value is None else _stringify(value) for value in values], type=kind)
+    cells = []
+    for value in values:
+        try:
+            pa.array([value], type=kind)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+            value = None
+        cells.append(value)
+    return pa.array(cells, type=kind)
+
+
+def _rows(items: Sequence[Item]) -> Sequence[Dict[str, Any]]:
+    """Turn typed items into dictionaries, since Arrow only reads those."""
+    if not any(isinstance(item, Struct) for item in items):
+        return items  # type: ignore[return-value]
+    return [to_builtins(item, builtin_types=_ARROW_TYPES) if isinstance(item, Struct) else item for item in items]
+
+
+def to_record_batch(items: Sequence[Item], schema: "pa.Schema") -> "pa.RecordBatch":
+    """Convert items to a record batch following `schema`. Keys the schema doesn't have are left out."""
+    pa = _pyarrow()
+    items = _rows(items)
+    try:
+        return pa.RecordBatch.from_pylist(items, schema=schema)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+        # Some values don't fit the schema, so the columns are converted one by one to find them
+        arrays = [_column([item.get(field.name) for item in items], field.type) for field in schema]
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def to_table(items: Sequence[Item], schema_sample: int = 1000) -> "pa.Table":
+    """Convert items to an Arrow table, with a schema inferred from the first `schema_sample` items."""
+    pa = _pyarrow()
+    schema = infer_schema(items[:schema_sample])
+    return pa.Table.from_batches([to_record_batch(items, schema)], schema=schema)
+
+
+class ParquetSink(ItemStage):
+    """Writes the items to a Parquet file as the crawl runs, one row group at a time.
+
+    The schema is inferred from the first `schema_sample` items, so keys that only show up later are left out. Text
+    columns repeating the same values, like categories or brands, are dictionary-encoded unless `dictionary` says
+    otherwise. Row groups are written in a worker thread whenever `row_group_size` items are waiting.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        *,
+        schema_sample: int = 1000,
+        row_group_size: int = 10_000,
+        compression: Optional[str] = "zstd",
+        compression_level: Optional[int] = None,
+        dictionary: Optional[Iterable[str]] = None,
+    ):
+        """
+        :param path: Where to write the items.
+        :param schema_sample: How many items to infer the schema from.
+        :param row_group_size: How many items to write in each row group.
+        :param compression: The Parquet compression codec, like `zstd`, `snappy`, `gzip`, `lz4`, or `None`.
+        :param compression_level: The codec's compression level, defaulting to the codec's default.
+        :param dictionary: The columns to dictionary-encode, instead of picking them from the sample.
+        """
+        if schema_sample < 1 or row_group_size < 1:
+            raise ValueError("`schema_sample` and `row_group_size` must be at least 1")
+        _pyarrow()
+
+        self.path = Path(path)
+        self.schema_sample = schema_sample
+        self.row_group_size = row_group_size
+        self.compression = compression or "none"
+        self.compression_level = compression_level
+        self.dictionary: Optional[List[str]] = list(dictionary) if dictionary is not None else None
+        self.schema: Optional["pa.Schema"] = None
+        self.items_written: int = 0
+
+        self._pending: List[Item] = []
+        self._writer: Optional["pq.ParquetWriter"] = None
+
+    def _open_writer(self) -> None:
+        pa = _pyarrow()
+        sample = self._pending[: self.schema_sample]
+        self.schema = infer_schema(sample)
+        if self.dictionary is None:
+            self.dictionary = dictionary_columns(sample, self.schema)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._writer = pa.parquet.ParquetWriter(
+            self.path,
+            self.schema,
+            compression=self.compression,
+            compression_level=self.compression_level,
+            use_dictionary=self.dictionary,
+        )
+
+    def _flush(self, final: bool = False) -> None:
+        """Write every complete row group that's waiting, and the remaining items if it's the final flush."""
+        if self._writer is None:
+            if len(self._pending) < self.schema_sample and not final:
+                return
+            if not self._pending:
+                return
+            self._open_writer()
+
+        while len(self._pending) >= self.row_group_size or (final and self._pending):
+            rows, self._pending = self._pending[: self.row_group_size], self._pending[self.row_group_size :]
+            self._writer.write_batch(to_record_batch(rows, self.schema), row_group_size=self.row_group_size)  # type: ignore[union-attr, arg-type]
+            self.items_written += len(rows)
+
+    def _close(self) -> None:
+        self._flush(final=True)
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def write_all(self, items: Iterable[Item]) -> None:
+        """Write all the items at once and close the file, outside of a crawl.
+
+        The file is created even when there are no items, like the other exports.
+        """
+        self._pending.extend(items)
+        if self._writer is None:
+            self._open_writer()
+        self._close()
+
+    async def process(self, items: List[Item]) -> List[Item]:
+        self._pending.extend(items)
+        if len(self._pending) >= self.row_group_size:
+            await anyio.to_thread.run_sync(self._flush)
+        return items
+
+    async def close(self) -> None:
+        await anyio.to_thread.run_sync(self._close)
+        if self.items_written:
+            log.info("Saved %d items to %s", self.items_written, self.path)
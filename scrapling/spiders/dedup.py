@@ -0,0 +1,363 @@
+import copy
+import math
+import sqlite3
+from pathlib import Path
+from abc import ABC, abstractmethod
+from tempfile import TemporaryDirectory
+
+from scrapling.core.utils import log
+from scrapling.core._types import Iterator, List, Literal, Optional, Set, Union
+
+DedupBackend = Literal["memory", "compact", "bloom", "disk"]
+
+
+class SeenSet(ABC):
+    """Base class of the fingerprint sets the scheduler can deduplicate requests with, instead of a plain `set`.
+
+    The scheduler only relies on `add`, `in`, `len` and `copy`. The value `copy()` returns is what gets saved in
+    checkpoints, and calling `copy()` on the restored value gives back the set to resume with.
+    """
+
+    @abstractmethod
+    def add(self, fingerprint: bytes) -> None:
+        raise NotImplementedError("Seen sets must implement `add` method")
+
+    @abstractmethod
+    def __contains__(self, fingerprint: object) -> bool:
+        raise NotImplementedError("Seen sets must implement `__contains__` method")
+
+    @abstractmethod
+    def __len__(self) -> int:
+        raise NotImplementedError("Seen sets must implement `__len__` method")
+
+    @abstractmethod
+    def copy(self) -> "SeenSet":
+        raise NotImplementedError("Seen sets must implement `copy` method")
+
+    def close(self, delete: bool = True) -> None:
+        """Release the resources held by the set, if any."""
+
+
+class CompactSeenSet(SeenSet):
+    """An exact set of fixed-width fingerprints, stored back to back in a single open-addressing hash table.
+
+    It takes 30 to 55 bytes per fingerprint depending on how full the table is, against the ~95 bytes of a `set[bytes]`.
+    """
+
+    MAX_LOAD = 0.7
+
+    def __init__(self, width: int = 20, capacity: int = 1024):
+        """
+        :param width: The size of every fingerprint in bytes (20 for the SHA1 fingerprints of requests).
+        :param capacity: How many fingerprints to allocate room for initially. The table doubles when it fills up.
+        """
+        self._width = width
+        self._capacity = 1 << max(capacity - 1, 1).bit_length()
+        self._table = bytearray(self._capacity * width)
+        self._size = 0
+        # All zeros marks empty slots, so that fingerprint is tracked separately
+        self._empty = bytes(width)
+        self._has_empty = False
+
+    def _find(self, fingerprint: Union[bytes, memoryview]) -> tuple[int, bool]:
+        """Return the slot of the fingerprint and whether it's already there, or the free slot it goes in."""
+        if len(fingerprint) != self._width:
+            raise ValueError(f"Fingerprints must be {self._width} bytes, got {len(fingerprint)}")
+
+        # Slots are compared in place, without copying them out of the table
+        table, width, empty = memoryview(self._table), self._width, self._empty
+        mask = self._capacity - 1
+        slot = int.from_bytes(fingerprint[:8], "little") & mask
+        while True:
+            start = slot * width
+            current = table[start : start + width]
+            if current == fingerprint:
+                return slot, True
+            if current == empty:
+                return slot, False
+            slot = (slot + 1) & mask
+
+    def _grow(self) -> None:
+        # The fingerprints are moved slot by slot from the old table, so growing only needs room for both tables
+        old, width, empty = memoryview(self._table), self._width, self._empty
+        self._capacity *= 2
+        self._table = bytearray(self._capacity * width)
+        for start in range(0, len(old), width):
+            current = old[start : start + width]
+            if current != empty:
+                slot, _ = self._find(current)
+                self._table[slot * width : (slot + 1) * width] = current
+        old.release()
+
+    def _stored(self) -> Iterator[bytes]:
+        table, width, empty = memoryview(self._table), self._width, self._empty
+        for start in range(0, len(table), width):
+            current = table[start : start + width]
+            if current != empty:
+                yield current.tobytes()
+
+    def add(self, fingerprint: bytes) -> None:
+        if fingerprint == self._empty:
+            self._size += not self._has_empty
+            self._has_empty = True
+            return
+
+        slot, found = self._find(fingerprint)
+        if found:
+            return
+        self._table[slot * self._width : (slot + 1) * self._width] = fingerprint
+        self._size += 1
+        if self._size > self._capacity * self.MAX_LOAD:
+            self._grow()
+
+    def __contains__(self, fingerprint: object) -> bool:
+        if not isinstance(fingerprint, bytes):
+            return False
+        if fingerprint == self._empty:
+            return self._has_empty
+        return self._find(fingerprint)[1]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[bytes]:
+        if self._has_empty:
+            yield self._empty
+        yield from self._stored()
+
+    def copy(self) -> "CompactSeenSet":
+        new = copy.copy(self)
+        new._table = self._table[:]
+        return new
+
+
+class _BloomFilter:
+    """A single fixed-size Bloom filter. The bit positions are derived from the fingerprint itself (double hashing)."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.count = 0
+        self.bits_count = max(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.hashes_count = max(round(self.bits_count / capacity * math.log(2)), 1)
+        self.bits = bytearray((self.bits_count + 7) // 8)
+
+    def add(self, fingerprint: bytes) -> None:
+        bits, bits_count = self.bits, self.bits_count
+        first = int.from_bytes(fingerprint[:8], "little")
+        second = int.from_bytes(fingerprint[8:16], "little") | 1
+        for i in range(self.hashes_count):
+            position = (first + i * second) % bits_count
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, fingerprint: bytes) -> bool:
+        bits, bits_count = self.bits, self.bits_count
+        first = int.from_bytes(fingerprint[:8], "little")
+        second = int.from_bytes(fingerprint[8:16], "little") | 1
+        for i in range(self.hashes_count):
+            position = (first + i * second) % bits_count
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+class BloomSeenSet(SeenSet):
+    """A scalable Bloom filter: a new, larger and stricter filter is added whenever the last one fills up.
+
+    It takes a few bytes per fingerprint, but a small fraction of new requests (`error_rate` at most) are wrongly
+    considered seen and dropped.
+    """
+
+    GROWTH = 2
+    TIGHTENING = 0.5
+
+    def __init__(self, error_rate: float = 0.001, initial_capacity: int = 100_000):
+        """
+        :param error_rate: The maximum probability that a new fingerprint is reported as seen.
+        :param initial_capacity: How many fingerprints the first filter holds before a new one is added.
+        """
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1.")
+        self._error_rate = error_rate
+        self._initial_capacity = initial_capacity
+        self._filters: List[_BloomFilter] = []
+        self._size = 0
+
+    def add(self, fingerprint: bytes) -> None:
+        if fingerprint in self:
+            return
+
+        if not self._filters or self._filters[-1].count >= self._filters[-1].capacity:
+            index = len(self._filters)
+            # The error rates of the filters form a geometric series whose sum is `error_rate`
+            self._filters.append(
+                _BloomFilter(
+                    self._initial_capacity * self.GROWTH**index,
+                    self._error_rate * (1 - self.TIGHTENING) * self.TIGHTENING**index,
+                )
+            )
+        self._filters[-1].add(fingerprint)
+        self._size += 1
+
+    def __contains__(self, fingerprint: object) -> bool:
+        if not isinstance(fingerprint, bytes):
+            return False
+        return any(fingerprint in bloom_filter for bloom_filter in reversed(self._filters))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def copy(self) -> "BloomSeenSet":
+        new = BloomSeenSet(self._error_rate, self._initial_capacity)
+        for bloom_filter in self._filters:
+            copied = _BloomFilter.__new__(_BloomFilter)
+            copied.__dict__.update(bloom_filter.__dict__)
+            copied.bits = bloom_filter.bits[:]
+            new._filters.append(copied)
+        new._size = self._size
+        return new
+
+
+class DiskSeenSet(SeenSet):
+    """An exact set of fingerprints stored in a SQLite database, so memory use doesn't grow with the crawl.
+
+    Like the disk frontier, every fingerprint records the checkpoint generation it was added in. `copy()` only
+    returns a small reference to the current generation, and copying that reference back reopens the database
+    without the fingerprints added after it.
+    """
+
+    SEEN_FILE = "seen.db"
+    BATCH_SIZE = 1000
+
+    def __init__(self, directory: Optional[str | Path] = None, resume_generation: Optional[int] = None):
+        """
+        :param directory: The directory to keep the database file in. A temporary directory is used if it's not set.
+        :param resume_generation: Keep the fingerprints a previous run stored up to this generation instead of starting empty.
+        """
+        self._temp_dir: Optional[TemporaryDirectory] = None
+        if directory is None:
+            temp_dir = self._temp_dir = TemporaryDirectory(prefix="scrapling_seen_")
+            directory = temp_dir.name
+        self.path = Path(directory) / self.SEEN_FILE
+        self._resume_generation = resume_generation
+        self._generation = (resume_generation or 0) + 1
+        self._buffer: Set[bytes] = set()
+        self._stored = 0
+        # Opened on first use, so creating the set doesn't wipe a database that a checkpoint is about to resume
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = self._connection = sqlite3.connect(self.path)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS seen (fingerprint BLOB PRIMARY KEY, generation INTEGER NOT NULL) WITHOUT ROWID"
+            )
+            if self._resume_generation is not None:
+                connection.execute("DELETE FROM seen WHERE generation > ?", (self._resume_generation,))
+            else:
+                connection.execute("DELETE FROM seen")
+            connection.commit()
+            self._stored = connection.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+        return self._connection
+
+    def _flush(self) -> None:
+        if self._buffer:
+            connection = self._connect()
+            before = connection.total_changes
+            connection.executemany(
+                "INSERT OR IGNORE INTO seen (fingerprint, generation) VALUES (?, ?)",
+                [(fingerprint, self._generation) for fingerprint in self._buffer],
+            )
+            connection.commit()
+            self._stored += connection.total_changes - before
+            self._buffer.clear()
+
+    def add(self, fingerprint: bytes) -> None:
+        self._buffer.add(fingerprint)
+        if len(self._buffer) >= self.BATCH_SIZE:
+            self._flush()
+
+    def __contains__(self, fingerprint: object) -> bool:
+        if fingerprint in self._buffer:
+            return True
+        row = self._connect().execute("SELECT 1 FROM seen WHERE fingerprint = ?", (fingerprint,)).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        self._flush()
+        self._connect()
+        return self._stored
+
+    def __iter__(self) -> Iterator[bytes]:
+        self._flush()
+        for (fingerprint,) in self._connect().execute("SELECT fingerprint FROM seen"):
+            yield fingerprint
+
+    def copy(self) -> "DiskSeenSetReference":  # type: ignore[override]
+        """Flush the pending writes and start a new generation, returning a reference to the previous one for checkpoints."""
+        self._flush()
+        self._connect()
+        reference = DiskSeenSetReference(str(self.path.parent), self._generation, self._stored)
+        self._generation += 1
+        return reference
+
+    def close(self, delete: bool = True) -> None:
+        """Flush the pending writes and close the database.
+
+        :param delete: Remove the database files as well
+        """
+        if self._connection is not None:
+            self._flush()
+            self._connection.close()
+            self._connection = None
+        if delete or self._temp_dir is not None:
+            for suffix in ("", "-wal", "-shm"):
+                Path(f"{self.path}{suffix}").unlink(missing_ok=True)
+        if self._temp_dir is not None:
+            self._temp_dir.cleanup()
+            self._temp_dir = None
+
+
+class DiskSeenSetReference:
+    """What a checkpoint saves for a `DiskSeenSet`: where it is and which of its fingerprints the checkpoint covers."""
+
+    def __init__(self, directory: str, generation: int, size: int):
+        self.directory = directory
+        self.generation = generation
+        self._size = size
+
+    def __len__(self) -> int:
+        return self._size
+
+    def copy(self) -> DiskSeenSet:
+        """Reopen the set as it was when the reference was taken."""
+        return DiskSeenSet(self.directory, resume_generation=self.generation)
+
+
+# What the scheduler saves in checkpoints for each kind of set
+SeenSnapshot = Union[Set[bytes], SeenSet, DiskSeenSetReference]
+
+
+def create_seen_set(
+    backend: DedupBackend = "memory", directory: Optional[str | Path] = None, error_rate: float = 0.001
+) -> Union[Set[bytes], SeenSet]:
+    """Create the fingerprints set the scheduler deduplicates requests with.
+
+    :param backend: `memory` for a plain `set`, `compact` for `CompactSeenSet`, `bloom` for `BloomSeenSet`, or
+        `disk` for `DiskSeenSet`.
+    :param directory: Where the `disk` backend keeps its database, pass the crawl directory to resume from checkpoints.
+    :param error_rate: The false positive rate of the `bloom` backend.
+    """
+    if backend == "memory":
+        return set()
+    if backend == "compact":
+        return CompactSeenSet()
+    if backend == "bloom":
+        log.debug(f"Using a Bloom filter for deduplication, up to {error_rate:.4%} of new requests can be dropped")
+        return BloomSeenSet(error_rate)
+    if backend == "disk":
+        return DiskSeenSet(directory)
+    raise ValueError(f"Unknown dedup backend {backend!r}, choose one of: memory, compact, bloom, disk")
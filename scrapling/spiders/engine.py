@@ -1,27 +1,44 @@
 import json
+import math
+import asyncio
 import pprint
 from pathlib import Path
+from contextlib import nullcontext
 from urllib.parse import urlparse
 
 import anyio
+import msgspec
 from anyio import Path as AsyncPath
-from anyio import create_task_group, CapacityLimiter, create_memory_object_stream, EndOfStream
+from anyio import create_task_group, create_memory_object_stream, EndOfStream
 
 from scrapling.core.utils import log
-from scrapling.spiders.scheduler import Scheduler
+from scrapling.engines.toolbelt.custom import deferred_parsing
+from scrapling.spiders.scheduler import Scheduler, SchedulerBackend
+from scrapling.spiders.shared_scheduler import SharedScheduler
+from scrapling.spiders.dedup import create_seen_set
+from scrapling.spiders.workers import CallbackWorkerPool
+from scrapling.spiders.pipeline import ItemPipeline
 from scrapling.spiders.session import SessionManager
 from scrapling.spiders.request import Request, Response
 from scrapling.spiders.robotstxt import RobotsTxtManager
-from scrapling.spiders.result import CrawlStats, ItemList
+from scrapling.spiders.redirects import RedirectRules
+from scrapling.spiders.simhash import NearDuplicateIndex, page_simhash
+from scrapling.spiders.traps import UrlPatterns, url_template
+from scrapling.spiders.prioritizer import YieldPrioritizer, callback_name
+from scrapling.spiders.result import CrawlStats, Item, ItemList
 from scrapling.spiders.throttle import AutoThrottle, parse_retry_after
-from scrapling.spiders.cache import ResponseCacheManager
-from scrapling.spiders.checkpoint import CheckpointManager, CheckpointData
-from scrapling.core._types import Dict, Union, Optional, TYPE_CHECKING, Any, AsyncGenerator
+from scrapling.spiders.cache import ResponseCacheManager, body_digest, conditional_headers
+from scrapling.spiders.checkpoint import CheckpointManager
+from scrapling.core._types import Dict, Union, Optional, Tuple, TYPE_CHECKING, Any, AsyncGenerator, Callable
 
 if TYPE_CHECKING:
     from scrapling.spiders.spider import Spider
 
 
+# Requests of unproductive URL patterns are queued behind everything else
+_THROTTLED_PRIORITY = -(2**31)
+
+
 def _dump(obj: Dict) -> str:
     return json.dumps(obj, indent=4)
 
@@ -29,6 +46,9 @@ def _dump(obj: Dict) -> str:
 class CrawlerEngine:
     """Orchestrates the crawling process."""
 
+    # How often the crawl loop re-checks its state while a pause or stop is pending, in case a wake-up was missed
+    PAUSE_CHECK_INTERVAL: float = 0.5
+
     def __init__(
         self,
         spider: "Spider",
@@ -38,12 +58,47 @@ class CrawlerEngine:
     ):
         self.spider = spider
         self.session_manager = session_manager
-        self.scheduler = Scheduler(
-            include_kwargs=spider.fp_include_kwargs,
-            include_headers=spider.fp_include_headers,
-            keep_fragments=spider.fp_keep_fragments,
-        )
+        # The spilled requests and the on-disk seen set are kept next to the checkpoint so a paused crawl resumes with them
+        state_dir = Path(crawldir) if crawldir else None
+        if spider.scheduler_backend == "sqlite":
+            if not spider.scheduler_path:
+                raise ValueError("`scheduler_path` must be set to use the `sqlite` scheduler backend.")
+            self.scheduler: SchedulerBackend = SharedScheduler(
+                spider.scheduler_path,
+                include_kwargs=spider.fp_include_kwargs,
+                include_headers=spider.fp_include_headers,
+                keep_fragments=spider.fp_keep_fragments,
+                on_enqueue=self._wake,
+                domain_slots=spider.concurrent_requests_per_domain,
+                delay_for=self._dispatch_delay,
+                on_load=self._restore_request_callback,
+                lease_timeout=spider.scheduler_lease_timeout,
+                crawl_order=spider.crawl_order,
+            )
+            if crawldir:
+                # The shared database is the checkpoint already
+                log.warning("The `sqlite` scheduler backend keeps the crawl's state itself, so `crawldir` is ignored")
+                crawldir = None
+        elif spider.scheduler_backend == "memory":
+            self.scheduler = Scheduler(
+                include_kwargs=spider.fp_include_kwargs,
+                include_headers=spider.fp_include_headers,
+                keep_fragments=spider.fp_keep_fragments,
+                on_enqueue=self._wake,
+                domain_slots=spider.concurrent_requests_per_domain,
+                delay_for=self._dispatch_delay,
+                max_memory_requests=spider.max_memory_requests,
+                spill_dir=state_dir,
+                on_load=self._restore_request_callback,
+                seen=create_seen_set(spider.dedup_backend, state_dir, spider.dedup_error_rate),
+                journal=bool(crawldir),
+                crawl_order=spider.crawl_order,
+            )
+        else:
+            raise ValueError(f"Unknown scheduler backend: {spider.scheduler_backend!r}")
         self.stats = CrawlStats()
+        if spider.max_depth is not None and spider.max_depth < 0:
+            raise ValueError(f"`max_depth` must be at least 0, got {spider.max_depth}")
 
         if self.spider.robots_txt_obey:
 
@@ -56,11 +111,36 @@ class CrawlerEngine:
 
         if self.spider.development_mode:
             cache_dir = self.spider.development_cache_dir or f".scrapling_cache/{self.spider.name}"
-            self._cache_manager: Optional[ResponseCacheManager] = ResponseCacheManager(cache_dir)
+            self._cache_manager: Optional[ResponseCacheManager] = ResponseCacheManager(
+                cache_dir, self.spider.development_cache_compression
+            )
             log.warning("Development mode enabled -- responses will be cached to disk and replayed on subsequent runs")
         else:
             self._cache_manager = None
 
+        if self.spider.recrawl_cache_dir:
+            self._recrawl_cache: Optional[ResponseCacheManager] = ResponseCacheManager(
+                self.spider.recrawl_cache_dir, self.spider.recrawl_cache_compression
+            )
+        else:
+            self._recrawl_cache = None
+
+        self._redirect_rules: Optional[RedirectRules] = RedirectRules() if self.spider.learn_redirects else None
+        if self.spider.near_duplicates not in (None, "skip", "no_follow"):
+            raise ValueError(f"Unknown `near_duplicates` action: {self.spider.near_duplicates!r}")
+        # The fingerprints of the pages crawled so far, by domain
+        self._page_fingerprints: Dict[str, NearDuplicateIndex] = {}
+        if self.spider.url_pattern_max_requests or self.spider.url_pattern_unproductive_after:
+            self._url_patterns: Optional[UrlPatterns] = UrlPatterns(
+                self.spider.url_pattern_max_requests, self.spider.url_pattern_unproductive_after
+            )
+        else:
+            self._url_patterns = None
+        if self.spider.adaptive_priority:
+            self._prioritizer: Optional[YieldPrioritizer] = YieldPrioritizer(self.spider.adaptive_priority_weight)
+        else:
+            self._prioritizer = None
+
         if self.spider.autothrottle_enabled:
             self._autothrottle: Optional[AutoThrottle] = AutoThrottle(
                 start_delay=self.spider.autothrottle_start_delay,
@@ -73,17 +153,31 @@ class CrawlerEngine:
         else:
             self._autothrottle = None
 
-        self._global_limiter = CapacityLimiter(spider.concurrent_requests)
-        self._domain_limiters: dict[str, CapacityLimiter] = {}
+        if self.spider.parse_workers:
+            self._callback_pool: Optional[CallbackWorkerPool] = CallbackWorkerPool(spider, spider.parse_workers)
+        else:
+            self._callback_pool = None
+
         self._allowed_domains: set[str] = spider.allowed_domains or set()
 
         if self.spider.robots_txt_obey:
             self._domain_delays: dict[str, float] = {}
 
         self._active_tasks: int = 0
+        # Set whenever the crawl loop might be able to make progress, so it never has to poll.
+        # It's created inside `crawl()` because events are bound to the running event loop.
+        self._wakeup: Optional[anyio.Event] = None
+        # Schedules a call in the crawl's event loop, so pause requests from signal handlers can wake it up
+        self._call_soon: Optional[Callable[[Callable[[], None]], Any]] = None
         self._running: bool = False
         self._items: ItemList = ItemList()
         self._item_stream: Any = None
+        self._pipeline: Optional[ItemPipeline] = None
+
+        # The start requests not consumed yet, and how many were, None once all of them were
+        self._start_requests: Optional[AsyncGenerator[Request, None]] = None
+        self._start_requests_consumed: Optional[int] = 0
+        self._checkpointed_start_requests: Optional[int] = 0
 
         self._checkpoint_system_enabled = bool(crawldir)
         self._checkpoint_manager = CheckpointManager(crawldir or "", interval)
@@ -97,11 +191,14 @@ class CrawlerEngine:
         if not self._allowed_domains:
             return True
 
+        # Looking up the domain and every parent domain of it in the set is as fast with thousands of allowed domains
         domain = request.domain
-        for allowed in self._allowed_domains:
-            if domain == allowed or domain.endswith("." + allowed):
-                return True
-        return False
+        while domain not in self._allowed_domains:
+            dot = domain.find(".")
+            if dot < 0:
+                return False
+            domain = domain[dot + 1 :]
+        return True
 
     async def _get_domain_delay(self, request: Request) -> float:
         """Resolve the effective download delay for a domain.
@@ -133,60 +230,199 @@ class CrawlerEngine:
             delay = max(delay, c_delay)
 
         self._domain_delays[domain] = delay
+        if delay > self.spider.download_delay:
+            # The domain's first request was dispatched before its robots.txt delay was known
+            self.scheduler.delay_domain(domain, delay)
         return delay
 
-    def _rate_limiter(self, domain: str) -> CapacityLimiter:
-        """Get or create a per-domain concurrency limiter if enabled, otherwise use the global limiter."""
-        if self.spider.concurrent_requests_per_domain:
-            self._domain_limiters.setdefault(domain, CapacityLimiter(self.spider.concurrent_requests_per_domain))
-            return self._domain_limiters[domain]
-        return self._global_limiter
+    def _dispatch_delay(self, domain: str) -> float:
+        """Return the minimum number of seconds between two requests to a domain. The scheduler calls it on every dispatch."""
+        floor = self.spider.download_delay
+        if self._robots_manager is not None:
+            floor = self._domain_delays.get(domain, floor)
+        if self._autothrottle is not None:
+            return self._autothrottle.delay_for(domain, floor)
+        return floor
 
     def _normalize_request(self, request: Request) -> None:
         """Normalize request fields before enqueueing.
 
         Resolves empty sid to the session manager's default session ID.
         This ensures consistent fingerprinting for requests using the same session.
+        With `learn_redirects`, URLs the website is known to redirect are rewritten to where they would end up.
         """
         if not request.sid:
             request.sid = self.session_manager.default_session_id
+        if self._redirect_rules is not None:
+            url = self._redirect_rules.rewrite(request.url)
+            if url != request.url:
+                log.debug(f"Rewrote {request.url} to {url}, which it redirects to")
+                request.url = url
+                request.__dict__.pop("domain", None)  # Cached from the old URL
+                self.stats.redirects_rewritten += 1
+
+    def _is_near_duplicate(self, request: Request, response: Response) -> bool:
+        """Whether an HTML page's text is nearly the same as a page of the same domain crawled before."""
+        content_type = next((value for key, value in response.headers.items() if key.lower() == "content-type"), "")
+        if content_type and "html" not in content_type.lower():
+            return False
+        fingerprint = page_simhash(response._root)
+        if fingerprint is None:
+            return False
+        index = self._page_fingerprints.get(request.domain)
+        if index is None:
+            index = self._page_fingerprints[request.domain] = NearDuplicateIndex(self.spider.near_duplicate_distance)
+        return index.add(fingerprint)
 
     async def _run_callbacks(self, request: Request, response: Response) -> None:
         """Dispatch response to the request's callback and process yielded items/requests."""
-        callback = request.callback if request.callback else self.spider.parse
+        follow = True
+        if self.spider.near_duplicates and self._is_near_duplicate(request, response):
+            self.stats.near_duplicates += 1
+            if self.spider.near_duplicates == "skip":
+                log.debug(f"Near duplicate of a page crawled before, skipping callbacks: {request.url}")
+                return
+            log.debug(f"Near duplicate of a page crawled before, not following its links: {request.url}")
+            follow = False
+
+        if self._callback_pool:
+            results = self._callback_pool.results(request, response)
+        else:
+            callback = request.callback if request.callback else self.spider.parse
+            results = callback(response)
+        # The pages' URL templates are only needed to learn from them
+        learning = self._url_patterns is not None or self._prioritizer is not None
+        template = url_template(request.url) if learning else ""
+        items = leads = 0
+        lead_value = 0.0
         try:
-            async for result in callback(response):
-                if isinstance(result, Request):
-                    if self._is_domain_allowed(result):
-                        self._normalize_request(result)
-                        await self.scheduler.enqueue(result)
-                    else:
-                        self.stats.offsite_requests_count += 1
-                        log.debug(f"Filtered offsite request to: {result.url}")
-                elif isinstance(result, dict):
-                    processed_result = await self.spider.on_scraped_item(result)
+            async for result in results:
+                if isinstance(result, (Request, list, tuple)):
+                    # Callbacks can yield a list of requests, e.g. all the links of a listing, to queue them at once
+                    batch = result if isinstance(result, (list, tuple)) else (result,)
+                    followed = [new for new in batch if self._should_follow(request, new, follow)]
+                    if not followed:
+                        continue
+                    if not learning:
+                        if isinstance(result, Request):
+                            await self.scheduler.enqueue(result)
+                        else:
+                            await self.scheduler.enqueue_many(followed)
+                        continue
+                    for new in followed:
+                        target = url_template(new.url)
+                        arm = (callback_name(new), target)
+                        if self._prioritizer is not None:
+                            new.priority += self._prioritizer.boost(arm)
+                        if await self._enqueue_by_pattern(new, target):
+                            leads += target != template
+                            if self._prioritizer is not None:
+                                lead_value = max(lead_value, self._prioritizer.value(arm))
+                elif isinstance(result, (dict, msgspec.Struct)):
+                    item = self._typed_item(result, request)
+                    if item is None:
+                        self.stats.items_dropped += 1
+                        continue
+                    items += 1
+                    processed_result = await self.spider.on_scraped_item(item)
                     if processed_result:
-                        self.stats.items_scraped += 1
                         log.debug(f"Scraped from {str(response)}\n{pprint.pformat(processed_result)}")
-                        if self._item_stream:
-                            await self._item_stream.send(processed_result)
+                        if self._pipeline:
+                            await self._pipeline.put(processed_result)
                         else:
-                            self._items.append(processed_result)
+                            await self._collect_item(processed_result)
                     else:
                         self.stats.items_dropped += 1
                         log.warning(f"Dropped from {str(response)}\n{processed_result}")
                 elif result is not None:
-                    log.error(f"Spider must return Request, dict or None, got '{type(result)}' in {request}")
+                    log.error(
+                        f"Spider must return Request, list of Request, dict, Struct or None, got '{type(result)}' in {request}"
+                    )
         except Exception as e:
             msg = f"Spider error processing {request}:\n {e}"
             log.error(msg, exc_info=e)
             await self.spider.on_error(request, e)
+        if self._url_patterns is not None:
+            self._url_patterns.record_fetch(template, items, leads)
+        if self._prioritizer is not None:
+            self._prioritizer.record((callback_name(request), template), items, lead_value)
+
+    def _should_follow(self, request: Request, new: Any, follow: bool) -> bool:
+        """Whether a request yielded by the callbacks of `request` should be queued, normalizing it if so."""
+        if not isinstance(new, Request):
+            log.error(f"Spider must yield lists of Request only, got '{type(new)}' in {request}")
+            return False
+        new.depth = max(new.depth, request.depth + 1)
+        if not follow:
+            self.stats.near_duplicate_requests_dropped += 1
+            return False
+        if self.spider.max_depth is not None and new.depth > self.spider.max_depth:
+            self.stats.depth_limited_count += 1
+            log.debug(f"Dropped request deeper than max_depth ({new.depth}): {new.url}")
+            return False
+        if not self._is_domain_allowed(new):
+            self.stats.offsite_requests_count += 1
+            log.debug(f"Filtered offsite request to: {new.url}")
+            return False
+        self._normalize_request(new)
+        return True
+
+    async def _enqueue_by_pattern(self, request: Request, template: str) -> bool:
+        """Queue a request unless its URL pattern used up its budget, behind everything else if the pattern is
+        unproductive. Returns whether it was queued, or handed to the sharded worker that owns its domain."""
+        patterns = self._url_patterns
+        if patterns is None:
+            return await self.scheduler.enqueue(request) is not False
+        if patterns.is_over_budget(template):
+            self.stats.url_pattern_requests_blocked += 1
+            log.debug(f"Dropped request of a URL pattern over its budget ({template}): {request.url}")
+            return False
+        throttled = patterns.is_unproductive(template)
+        if throttled:
+            request.priority = min(request.priority, _THROTTLED_PRIORITY)
+        # A request handed to the sharded worker that owns its domain counts as queued, that worker drops duplicates
+        if await self.scheduler.enqueue(request) is False:
+            return False
+        patterns.record_request(template, throttled)
+        self.stats.url_pattern_requests_throttled += throttled
+        return True
+
+    def _typed_item(self, item: Item, request: Request) -> Optional[Item]:
+        """Validate a yielded item into the spider's `item_type`, if it has one. Invalid items are dropped."""
+        item_type = self.spider.item_type
+        if item_type is None or type(item) is item_type:
+            return item
+        try:
+            return msgspec.convert(item, item_type, from_attributes=isinstance(item, msgspec.Struct))
+        except msgspec.ValidationError as e:
+            log.warning(f"Dropped invalid item from {request}: {e}")
+            return None
+
+    async def _collect_item(self, item: Item) -> None:
+        """Count an item that made it through `on_scraped_item()` and the pipeline, then stream or keep it."""
+        self.stats.items_scraped += 1
+        if self._item_stream:
+            await self._item_stream.send(item)
+        elif self.spider.keep_items:
+            self._items.append(item)
+
+    def _build_pipeline(self) -> Optional[ItemPipeline]:
+        stages = self.spider.configure_pipeline()
+        if not stages:
+            return None
+        return ItemPipeline(
+            stages,
+            self._collect_item,
+            batch_size=self.spider.item_batch_size,
+            queue_size=self.spider.item_queue_size,
+        )
 
     async def _process_request(self, request: Request) -> None:
         """Download and process a single request."""
         if self._robots_manager:
             can_fetch = await self._robots_manager.can_fetch(request.url, request.sid)
             if not can_fetch:
+                self.scheduler.cancel_delay(request)
                 self.stats.robots_disallowed_count += 1
                 log.info(f"Request disallowed by robots.txt: {request.url}")
                 return
@@ -194,53 +430,79 @@ class CrawlerEngine:
         else:
             floor = self.spider.download_delay
 
-        delay = floor
-
         if self._cache_manager and request._fp is not None:
             cached = await self._cache_manager.get(request._fp)
             if cached is not None:
+                # Replaying from the cache doesn't touch the website, so it shouldn't delay the domain's next request
+                self.scheduler.cancel_delay(request)
                 cached.request = request
                 self.stats.cache_hits += 1
                 self.stats.increment_requests_count(request.sid or self.session_manager.default_session_id)
                 self.stats.increment_response_bytes(request.domain, len(cached.body))
                 self.stats.increment_status(cached.status)
+                self.stats.increment_depth(request.depth)
                 log.debug(f"Cache hit: {request.url}")
                 await self._run_callbacks(request, cached)
                 return
 
-        async with self._rate_limiter(request.domain):
-            if self._autothrottle:
-                delay = self._autothrottle.delay_for(request.domain, floor)
-
-            if delay:
-                await anyio.sleep(delay)
-
-            if request._session_kwargs.get("proxy"):
-                self.stats.proxies.append(request._session_kwargs["proxy"])
-            if request._session_kwargs.get("proxies"):
-                self.stats.proxies.append(dict(request._session_kwargs["proxies"]))
-            try:
-                started_at = anyio.current_time()
-                response = await self.session_manager.fetch(request)
-                latency = anyio.current_time() - started_at
-                self.stats.increment_requests_count(request.sid or self.session_manager.default_session_id)
-                self.stats.increment_response_bytes(request.domain, len(response.body))
-                self.stats.increment_status(response.status)
+        # The scheduler only dispatched this request once its domain had a free slot and its delay elapsed
+        if request._session_kwargs.get("proxy"):
+            self.stats.proxies.append(request._session_kwargs["proxy"])
+        if request._session_kwargs.get("proxies"):
+            self.stats.proxies.append(dict(request._session_kwargs["proxies"]))
+        fetched_request, previous = await self._conditional_request(request)
+        try:
+            started_at = anyio.current_time()
+            response = await self.session_manager.fetch(fetched_request)
+            latency = anyio.current_time() - started_at
+            self.stats.increment_requests_count(request.sid or self.session_manager.default_session_id)
+            self.stats.increment_response_bytes(request.domain, len(response.body))
+            self.stats.increment_status(response.status)
+            self.stats.increment_depth(request.depth)
 
-            except Exception as e:
-                self.stats.failed_requests_count += 1
-                await self.spider.on_error(request, e)
-                return
+        except Exception as e:
+            self.stats.failed_requests_count += 1
+            await self.spider.on_error(request, e)
+            return
 
         if self._cache_manager and request._fp is not None:
             self.stats.cache_misses += 1
             await self._cache_manager.put(request._fp, response, request._session_kwargs.get("method", "GET"))
 
+        unchanged = False
+        if previous is not None:
+            response.request = request
+            if response.status == 304:
+                cached = await self._recrawl_cache.get(request._fp)  # type: ignore[union-attr, arg-type]
+                if cached is None:
+                    # The cached copy was removed or can't be read since it was revalidated, so a 304 has no page
+                    # to give the callbacks. Without the entry, the request is fetched again unconditionally.
+                    if await self._recrawl_cache.forget(request._fp):  # type: ignore[union-attr, arg-type]
+                        retry_request = request.copy()
+                        retry_request.dont_filter = True
+                        await self.scheduler.enqueue(retry_request)
+                        log.warning(f"Lost the cached copy of a not modified page, fetching it again: {request.url}")
+                    else:
+                        log.warning(f"Lost the cached copy of a not modified page, dropping it: {request.url}")
+                    return
+                self.stats.recrawl_not_modified += 1
+                self.stats.recrawl_bytes_saved += len(cached.body)
+                cached.request = request
+                cached.meta = {**request.meta, **cached.meta}
+                response = cached
+                unchanged = True
+            elif previous.get("digest") == body_digest(response.body):
+                self.stats.recrawl_unchanged += 1
+                unchanged = True
+
         blocked = await self.spider.is_blocked(response)
         if self._autothrottle:
             ok = 200 <= response.status < 300 and not blocked
             retry_after = None if ok else parse_retry_after(response.headers)
-            self._autothrottle.record(request.domain, latency, ok, floor, retry_after)
+            new_delay = self._autothrottle.record(request.domain, latency, ok, floor, retry_after)
+            if not ok:
+                # Back off from now on, instead of from when this request was dispatched
+                self.scheduler.delay_domain(request.domain, new_delay)
 
         if blocked:
             self.stats.blocked_requests_count += 1
@@ -262,15 +524,104 @@ class CrawlerEngine:
                 log.warning(f"Max retries exceeded for blocked request: {request.url}")
             return
 
+        if self._redirect_rules is not None:
+            self._redirect_rules.learn(fetched_request.url, response.url)
+        if request._fp is not None and response.url != request.url:
+            final = self._final_request(request, response)
+            # Only count the URLs that are another page, not just another way to write the requested one
+            if final._fp != request._fp:
+                self.stats.redirects_followed += 1
+                if self.spider.dedup_redirects and self.scheduler.mark_seen(final):
+                    self.stats.redirect_duplicates += 1
+                    log.debug(f"Redirected to an already seen URL, skipping callbacks: {request.url} -> {response.url}")
+                    return
+
+        if self._recrawl_cache and request._fp is not None and not unchanged and 200 <= response.status < 300:
+            await self._recrawl_cache.put(request._fp, response, request._session_kwargs.get("method", "GET"))
+        if unchanged and self.spider.recrawl_skip_unchanged:
+            log.debug(f"Unchanged since the last crawl, skipping callbacks: {request.url}")
+            return
+
         await self._run_callbacks(request, response)
 
+    def _final_request(self, request: Request, response: Response) -> Request:
+        """The request for the URL the response ended up at, with its fingerprint."""
+        final = request.copy()
+        final.url = response.url
+        final.update_fingerprint(
+            self.spider.fp_include_kwargs, self.spider.fp_include_headers, self.spider.fp_keep_fragments
+        )
+        return final
+
+    async def _conditional_request(self, request: Request) -> Tuple[Request, Optional[Dict[str, Any]]]:
+        """Turn a request into a conditional one if the recrawl cache has its last response.
+
+        Returns the request to fetch and the cached response's metadata, or the request itself and None when
+        there's nothing to revalidate.
+        """
+        if self._recrawl_cache is None or request._fp is None:
+            return request, None
+        if not self.session_manager.is_http_session(request.sid or self.session_manager.default_session_id):
+            # Browsers handle caching themselves
+            return request, None
+        previous = await self._recrawl_cache.get_metadata(request._fp)
+        if previous is None:
+            return request, None
+
+        headers = conditional_headers(previous)
+        if not headers:
+            # The server gave no validators last time, but an unchanged body can still be told apart by its digest
+            return request, previous
+        self.stats.recrawl_revalidations += 1
+        conditional = request.copy()
+        conditional._fp = request._fp
+        conditional._session_kwargs["headers"] = {**(request._session_kwargs.get("headers") or {}), **headers}
+        return conditional, previous
+
     async def _task_wrapper(self, request: Request) -> None:
         """Wrapper to track active task count."""
         try:
-            await self._process_request(request)
+            # Parse workers parse the pages themselves, so they're only parsed here if the engine needs them
+            with deferred_parsing() if self._callback_pool else nullcontext():
+                await self._process_request(request)
         finally:
             self.scheduler.complete(request)
             self._active_tasks -= 1
+            self._wake()
+
+    def _wake(self) -> None:
+        """Wake the crawl loop up to re-check its state (a freed slot, a new request, or a pause request)."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _wake_soon(self) -> None:
+        """Like `_wake()`, but safe to call from signal handlers and other threads.
+
+        Setting the event from a signal handler doesn't interrupt the event loop while it waits for I/O, scheduling
+        the call does.
+        """
+        if self._call_soon is None or not self._running:
+            self._wake()
+            return
+        self._call_soon(self._wake)
+
+    async def _wait_for_wakeup(self, timeout: Optional[float] = None) -> None:
+        """Sleep until `_wake()` is called, `timeout` seconds pass, or the next periodic checkpoint is due."""
+        timeout = math.inf if timeout is None else timeout
+        if self._checkpoint_system_enabled and self._checkpoint_manager.interval:
+            next_checkpoint = self._last_checkpoint_time + self._checkpoint_manager.interval
+            timeout = min(timeout, max(next_checkpoint - anyio.current_time(), 0.0))
+        if self._pause_requested:
+            timeout = min(timeout, self.PAUSE_CHECK_INTERVAL)
+
+        if self._wakeup is None:
+            self._wakeup = anyio.Event()
+
+        with anyio.move_on_after(timeout):
+            await self._wakeup.wait()
+        # Events can't be cleared, and nothing else runs between here and the loop re-checking its state,
+        # so a wake-up that happens after this line is never missed.
+        self._wakeup = anyio.Event()
 
     def request_pause(self) -> None:
         """Request a graceful pause of the crawl.
@@ -283,19 +634,41 @@ class CrawlerEngine:
 
         if self._pause_requested:
             # Second Ctrl+C - force stop
-            self._force_stop = True
-            log.warning("Force stop requested, cancelling immediately...")
-        else:
-            self._pause_requested = True
-            log.info(
-                "Pause requested, waiting for in-flight requests to complete (press Ctrl+C again to force stop)..."
-            )
+            self.force_stop()
+            return
+
+        self._pause_requested = True
+        log.info("Pause requested, waiting for in-flight requests to complete (press Ctrl+C again to force stop)...")
+        self._wake_soon()
+
+    def force_stop(self) -> None:
+        """Stop the crawl right away, cancelling the in-flight requests."""
+        if self._force_stop:
+            return
+
+        self._pause_requested = True
+        self._force_stop = True
+        log.warning("Force stop requested, cancelling immediately...")
+        self._wake_soon()
 
     async def _save_checkpoint(self) -> None:
-        """Save current state to checkpoint files."""
-        requests, seen = self.scheduler.snapshot()
-        data = CheckpointData(requests=requests, seen=seen)
-        await self._checkpoint_manager.save(data)
+        """Save current state to checkpoint files.
+
+        Usually it only appends the scheduler's latest events to the journal. A full checkpoint is only written when
+        there's none yet or the journal has grown bigger than it.
+        """
+        consumed = self._start_requests_consumed
+        if self._checkpoint_manager.needs_compaction:
+            data = self.scheduler.checkpoint_data()
+            data.start_requests_consumed = consumed
+            await self._checkpoint_manager.save(data)
+            self.scheduler.checkpointed()
+        else:
+            events = self.scheduler.drain_journal()
+            if consumed != self._checkpointed_start_requests:
+                events.append(("start_requests", -1 if consumed is None else consumed, None))
+            await self._checkpoint_manager.append(events)
+        self._checkpointed_start_requests = consumed
         self._last_checkpoint_time = anyio.current_time()
 
     def _is_checkpoint_time(self) -> bool:
@@ -321,13 +694,55 @@ class CrawlerEngine:
         if data is None:
             return False
 
+        consumed = data.start_requests_consumed
+        journal = []
+        for event in data.journal:
+            if event[0] == "start_requests":
+                consumed = None if event[1] < 0 else event[1]
+            else:
+                journal.append(event)
+        data.journal = journal
+        self._start_requests_consumed = self._checkpointed_start_requests = consumed
+
+        # Callbacks are restored from the spider through `_restore_request_callback`
         self.scheduler.restore(data)
+        return True
 
-        # Restore callbacks from spider after scheduler restore
-        for request in data.requests:
-            request._restore_callback(self.spider)
+    async def _resume_start_requests(self, consumed: int) -> AsyncGenerator[Request, None]:
+        """The start requests, without the ones consumed before the checkpoint."""
+        start_requests = self.spider.start_requests()
+        for _ in range(consumed):
+            if await anext(start_requests, None) is None:
+                break
+        return start_requests
 
-        return True
+    async def _feed_start_requests(self) -> None:
+        """Queue start requests until the frontier holds `start_requests_low_water` requests or they run out.
+
+        Pulling them lazily keeps a huge list of start URLs from being fingerprinted and queued all at once, before
+        the first one is even fetched.
+        """
+        low_water = self.spider.start_requests_low_water
+        while self._start_requests is not None:
+            # Counting the queued requests can be a database query, so it's done once per batch of start requests
+            missing = None if low_water is None else low_water - len(self.scheduler)
+            if missing is not None and missing <= 0:
+                return
+            while missing is None or missing > 0:
+                request = await anext(self._start_requests, None)
+                if request is None:
+                    self._start_requests = None
+                    self._start_requests_consumed = None
+                    return
+                self._start_requests_consumed += 1  # type: ignore[operator]
+                self._normalize_request(request)
+                await self.scheduler.enqueue(request)
+                if missing is not None:
+                    missing -= 1
+
+    def _restore_request_callback(self, request: Request) -> None:
+        """Point an unpickled request's callback back to the spider's method."""
+        request._restore_callback(self.spider)
 
     async def _prefetch_robots_txt(self) -> None:
         """Pre-warm the robots.txt cache before the crawl loop starts.
@@ -355,8 +770,13 @@ class CrawlerEngine:
         self.paused = False
         self._pause_requested = False
         self._force_stop = False
+        self._wakeup = anyio.Event()
+        loop: Any = anyio.lowlevel.current_token().native_token
+        self._call_soon = (
+            loop.call_soon_threadsafe if isinstance(loop, asyncio.AbstractEventLoop) else loop.run_sync_soon
+        )
         self.stats = CrawlStats(start_time=anyio.current_time())
-        self._domain_limiters.clear()
+        self._pipeline = self._build_pipeline()
         if self._robots_manager:
             self._domain_delays.clear()
         if self._autothrottle:
@@ -376,62 +796,83 @@ class CrawlerEngine:
             await self._prefetch_robots_txt()
 
             try:
-                if not resuming:
-                    async for request in self.spider.start_requests():
-                        self._normalize_request(request)
-                        await self.scheduler.enqueue(request)
-                else:
-                    log.info("Resuming from checkpoint, skipping start_requests()")
-
-                # Process queue
-                async with create_task_group() as tg:
-                    while self._running:
-                        if self._pause_requested:
-                            if self._active_tasks == 0 or self._force_stop:
-                                # Save checkpoint before canceling to avoid data loss
-                                if self._checkpoint_system_enabled:
-                                    await self._save_checkpoint()
-                                    self.paused = True
-                                    log.info("Spider paused, checkpoint saved")
-                                else:
-                                    log.info("Spider stopped gracefully")
-
-                                if self._force_stop:
-                                    log.warning(f"Force stopping with {self._active_tasks} active tasks")
-                                    tg.cancel_scope.cancel()
-
-                                self._running = False
-                                break
-
-                            # Wait briefly and check again
-                            await anyio.sleep(0.05)
-                            continue
-
-                        if self._checkpoint_system_enabled and self._is_checkpoint_time():
-                            await self._save_checkpoint()
-
-                        if self.scheduler.is_empty:
-                            # Empty queue + no active tasks = done
-                            if self._active_tasks == 0:
-                                self._running = False
-                                log.debug("Spider idle")
-                                break
-
-                            # Brief wait for callbacks to enqueue new requests
-                            await anyio.sleep(0.05)
-                            continue
-
-                        # Only spawn tasks up to concurrent_requests limit
-                        # This prevents spawning thousands of waiting tasks
-                        if self._active_tasks >= self.spider.concurrent_requests:
-                            await anyio.sleep(0.01)
-                            continue
-
-                        request = await self.scheduler.dequeue()
-                        self._active_tasks += 1
-                        tg.start_soon(self._task_wrapper, request)
+                # Items still in the pipeline are written before the crawl ends, even when it's paused or stopped
+                async with self._pipeline or nullcontext():
+                    if not resuming:
+                        self._start_requests_consumed = self._checkpointed_start_requests = 0
+                        self._start_requests = self.spider.start_requests()
+                    elif self._start_requests_consumed is not None:
+                        log.info(
+                            f"Resuming from checkpoint, skipping the {self._start_requests_consumed} start requests "
+                            "consumed already"
+                        )
+                        self._start_requests = await self._resume_start_requests(self._start_requests_consumed)
+                    else:
+                        log.info("Resuming from checkpoint, skipping start_requests()")
+
+                    # Process queue
+                    async with create_task_group() as tg:
+                        while self._running:
+                            if self._pause_requested:
+                                if self._active_tasks == 0 or self._force_stop:
+                                    # Save checkpoint before canceling to avoid data loss
+                                    if self._checkpoint_system_enabled:
+                                        await self._save_checkpoint()
+                                        self.paused = True
+                                        log.info("Spider paused, checkpoint saved")
+                                    else:
+                                        log.info("Spider stopped gracefully")
+
+                                    if self._force_stop:
+                                        log.warning(f"Force stopping with {self._active_tasks} active tasks")
+                                        tg.cancel_scope.cancel()
+
+                                    self._running = False
+                                    break
+
+                                # Wait for the in-flight tasks to finish or a force stop
+                                await self._wait_for_wakeup()
+                                continue
+
+                            if self._checkpoint_system_enabled and self._is_checkpoint_time():
+                                await self._save_checkpoint()
+
+                            await self._feed_start_requests()
+
+                            if self.scheduler.is_empty:
+                                # Empty queue + no active tasks = done
+                                if self._active_tasks == 0:
+                                    self._running = False
+                                    log.debug("Spider idle")
+                                    break
+
+                                # Wait for callbacks to enqueue new requests or for the active tasks to finish
+                                await self._wait_for_wakeup()
+                                continue
+
+                            # Only spawn tasks up to concurrent_requests limit
+                            # This prevents spawning thousands of waiting tasks
+                            if self._active_tasks >= self.spider.concurrent_requests:
+                                await self._wait_for_wakeup()
+                                continue
+
+                            # Every queued domain is either at its concurrency limit or waiting out its delay
+                            if not self.scheduler.has_ready:
+                                await self._wait_for_wakeup(self.scheduler.next_ready_in())
+                                continue
+
+                            request = await self.scheduler.dequeue()
+                            self._active_tasks += 1
+                            tg.start_soon(self._task_wrapper, request)
 
             finally:
+                if self._start_requests is not None:
+                    await self._start_requests.aclose()
+                    self._start_requests = None
+                # Keep the spilled requests of a paused crawl for its checkpoint
+                self.scheduler.close(delete=not self.paused)
+                if self._callback_pool:
+                    self._callback_pool.close()
                 await self.spider.on_close()
                 # Clean up checkpoint files on successful completion (not paused)
                 if not self.paused and self._checkpoint_system_enabled:
@@ -439,6 +880,21 @@ class CrawlerEngine:
 
         if self._autothrottle:
             self.stats.autothrottle_delays = dict(self._autothrottle.delays)
+        if self._prioritizer is not None:
+            self.stats.yield_scores = self._prioritizer.report()
+        if self._url_patterns is not None:
+            self.stats.url_patterns = self._url_patterns.report()
+            if self.stats.url_patterns:
+                log.warning(
+                    "URL patterns that looked like crawler traps:\n"
+                    + "\n".join(
+                        f"  {template}: {report['status']}, {report['requests']} queued, {report['blocked']} blocked, "
+                        f"{report['items_per_fetch']} items per fetch"
+                        for template, report in self.stats.url_patterns.items()
+                    )
+                )
+        if self._pipeline:
+            self.stats.items_dropped += self._pipeline.dropped
 
         self.stats.log_levels_counter = self.spider._log_counter.get_counts()
         self.stats.end_time = anyio.current_time()
@@ -450,12 +906,12 @@ class CrawlerEngine:
         """Access scraped items."""
         return self._items
 
-    def __aiter__(self) -> AsyncGenerator[dict, None]:
+    def __aiter__(self) -> AsyncGenerator[Item, None]:
         return self._stream()
 
-    async def _stream(self) -> AsyncGenerator[dict, None]:
+    async def _stream(self) -> AsyncGenerator[Item, None]:
         """Async generator that runs crawl and yields items."""
-        send, recv = create_memory_object_stream[dict](100)
+        send, recv = create_memory_object_stream[Item](100)
         self._item_stream = send
 
         async def run():
@@ -0,0 +1,156 @@
+import pickle
+import sqlite3
+from pathlib import Path
+
+from scrapling.core.utils import log
+from scrapling.core._types import List, Optional, Set, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from scrapling.spiders.request import Request
+
+QueueItem = Tuple[int, int, "Request"]
+
+
+class DiskFrontier:
+    """Stores the pending requests that don't fit in the scheduler's memory window in a SQLite database.
+
+    Requests are read back in the scheduler's order (priority, then FIFO). When `durable` is enabled, every row
+    remembers the generation it was added and loaded back in. A checkpoint records the generation it was taken in,
+    so resuming from it keeps exactly the rows it doesn't cover: the ones added before it and not loaded back yet.
+    """
+
+    FRONTIER_FILE = "frontier.db"
+    BATCH_SIZE = 1000
+
+    def __init__(self, directory: str | Path, durable: bool = False, resume_generation: Optional[int] = None):
+        """
+        :param directory: The directory to keep the database file in.
+        :param durable: Keep the loaded rows until `commit()` is called with a generation covering them.
+        :param resume_generation: Keep the requests a previous run stored up to this generation instead of starting empty.
+        """
+        self.path = Path(directory) / self.FRONTIER_FILE
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._durable = durable
+        self._buffer: List[Tuple[int, int, bytes, int]] = []
+        # Rows loaded back into memory are tagged with the current generation, which `mark()` moves forward
+        self._generation = (resume_generation or 0) + 1
+
+        self._connection = sqlite3.connect(self.path)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS frontier (
+                id INTEGER PRIMARY KEY,
+                neg_priority INTEGER NOT NULL,
+                counter INTEGER NOT NULL,
+                data BLOB NOT NULL,
+                added INTEGER NOT NULL,
+                loaded INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS frontier_order ON frontier (loaded, neg_priority, counter)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS frontier_counter ON frontier (counter)")
+        if resume_generation is not None:
+            # Rows added after the checkpoint will be found again, and rows loaded before it are saved in it.
+            # The ones loaded after it aren't part of it, so they are pending again.
+            self._connection.execute(
+                "DELETE FROM frontier WHERE added > ? OR loaded BETWEEN 1 AND ?", (resume_generation, resume_generation)
+            )
+            self._connection.execute("UPDATE frontier SET loaded = 0")
+        else:
+            self._connection.execute("DELETE FROM frontier")
+        self._connection.commit()
+
+        self._count = self._connection.execute("SELECT COUNT(*) FROM frontier").fetchone()[0]
+        if self._count:
+            log.info(f"Disk frontier resumed with {self._count} requests")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def counter_bounds(self) -> Optional[Tuple[int, int]]:
+        """The lowest and highest scheduler counters stored, so a resumed scheduler can number its requests around them."""
+        self._flush()
+        lowest, highest = self._connection.execute("SELECT MIN(counter), MAX(counter) FROM frontier").fetchone()
+        return None if lowest is None else (lowest, highest)
+
+    def push(self, item: QueueItem) -> None:
+        """Store a scheduler queue item. Writes are batched, so it's cheap to call for every request."""
+        neg_priority, counter, request = item
+        self._buffer.append(
+            (neg_priority, counter, pickle.dumps(request, protocol=pickle.HIGHEST_PROTOCOL), self._generation)
+        )
+        self._count += 1
+        if len(self._buffer) >= self.BATCH_SIZE:
+            self._flush()
+
+    def pop(self, limit: int) -> List[QueueItem]:
+        """Load up to `limit` items back in the scheduler's order.
+
+        :param limit: The maximum number of items to load
+        """
+        self._flush()
+        rows = self._connection.execute(
+            "SELECT id, neg_priority, counter, data FROM frontier WHERE loaded = 0 ORDER BY neg_priority, counter LIMIT ?",
+            (limit,),
+        ).fetchall()
+        if not rows:
+            return []
+
+        ids = [row[0] for row in rows]
+        if self._durable:
+            self._connection.executemany(
+                "UPDATE frontier SET loaded = ? WHERE id = ?", [(self._generation, row_id) for row_id in ids]
+            )
+        else:
+            self._connection.executemany("DELETE FROM frontier WHERE id = ?", [(row_id,) for row_id in ids])
+        self._connection.commit()
+
+        self._count -= len(rows)
+        return [(neg_priority, counter, pickle.loads(data)) for _, neg_priority, counter, data in rows]  # nosec B301
+
+    def discard(self, counters: Set[int]) -> None:
+        """Delete the stored requests with these counters, like the ones a resumed checkpoint knows are done.
+
+        :param counters: The scheduler counters of the requests to delete
+        """
+        if not counters:
+            return
+        self._flush()
+        before = self._connection.total_changes
+        self._connection.executemany("DELETE FROM frontier WHERE counter = ?", [(counter,) for counter in counters])
+        self._connection.commit()
+        self._count -= self._connection.total_changes - before
+
+    def mark(self) -> int:
+        """Start a new generation and return the previous one, which a checkpoint taken now covers."""
+        self._flush()
+        generation = self._generation
+        self._generation += 1
+        return generation
+
+    def commit(self, generation: int) -> None:
+        """Delete the rows loaded into memory up to `generation`, since the checkpoint saved for it covers them."""
+        self._connection.execute("DELETE FROM frontier WHERE loaded BETWEEN 1 AND ?", (generation,))
+        self._connection.commit()
+
+    def _flush(self) -> None:
+        if self._buffer:
+            self._connection.executemany(
+                "INSERT INTO frontier (neg_priority, counter, data, added) VALUES (?, ?, ?, ?)", self._buffer
+            )
+            self._connection.commit()
+            self._buffer.clear()
+
+    def close(self, delete: bool = False) -> None:
+        """Flush the pending writes and close the database.
+
+        :param delete: Remove the database files as well
+        """
+        self._flush()
+        self._connection.close()
+        if delete:
+            for suffix in ("", "-wal", "-shm"):
+                Path(f"{self.path}{suffix}").unlink(missing_ok=True)
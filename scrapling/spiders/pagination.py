@@ -0,0 +1,80 @@
+from scrapling.core._types import Any, Callable, Dict, List
+
+from scrapling.spiders.request import Request
+
+PageRequest = Callable[[int], Request]
+
+
+class Paginator:
+    """Keeps the next pages of page-numbered listings requested ahead of the ones being parsed.
+
+    A listing that's only paged through one page at a time is a serial chain of round-trips, whatever the spider's
+    concurrency is. With `ahead` set above 1, the pages after the one being parsed are requested right away, so up
+    to `ahead` pages of every listing are fetched concurrently. Once a page comes back empty, no page after it is
+    requested anymore. The pages already requested past the end still come back, empty, so a listing costs at most
+    `ahead - 1` extra requests.
+
+    Every listing is told apart by a key of your choice, like a category's name, and `page_request` builds the
+    request for a page number of it:
+
+        paginator = Paginator(ahead=4)
+
+        async def start_requests(self):
+            for request in paginator.start("shoes", self.shoes_page):
+                yield request
+
+        async def parse(self, response):
+            products = response.css(".product")
+            ...
+            for request in paginator.follow("shoes", response.meta["page"], bool(products), self.shoes_page):
+                yield request
+    """
+
+    def __init__(self, ahead: int = 1):
+        """
+        :param ahead: How many pages of a listing to keep requested ahead of the one being parsed. The default, 1,
+            requests a page only after the previous one came back with results.
+        """
+        if ahead < 1:
+            raise ValueError(f"`ahead` must be at least 1, got {ahead}")
+        self.ahead = ahead
+        self._requested: Dict[Any, int] = {}  # The highest page requested of every listing
+        self._end: Dict[Any, int] = {}  # The first empty page of every listing that has one
+
+    def start(self, key: Any, page_request: PageRequest, first_page: int = 1) -> List[Request]:
+        """The requests for the first pages of a listing.
+
+        :param key: The listing's key.
+        :param page_request: Builds the request for a page number.
+        :param first_page: The number of the listing's first page.
+        """
+        self._requested[key] = first_page - 1
+        self._end.pop(key, None)
+        return self._fill(key, first_page, page_request)
+
+    def follow(self, key: Any, page: int, has_results: bool, page_request: PageRequest) -> List[Request]:
+        """Record that a page of a listing came back, and return the requests for the pages to fetch next.
+
+        :param key: The listing's key.
+        :param page: The number of the page that came back.
+        :param has_results: Whether the page had any results. An empty page ends the listing.
+        :param page_request: Builds the request for a page number.
+        """
+        if not has_results:
+            self._end[key] = min(self._end.get(key, page), page)
+            return []
+        return self._fill(key, page + 1, page_request)
+
+    def is_finished(self, key: Any, page: int) -> bool:
+        """Whether a page is past the listing's end, so its response is only one of the extra ones."""
+        return key in self._end and page > self._end[key]
+
+    def _fill(self, key: Any, first: int, page_request: PageRequest) -> List[Request]:
+        last = first + self.ahead - 1
+        if key in self._end:
+            last = min(last, self._end[key] - 1)
+        first = max(first, self._requested.get(key, first - 1) + 1)
+        if first > last:
+            return []
+        self._requested[key] = last
+        return [page_request(page) for page in range(first, last + 1)]
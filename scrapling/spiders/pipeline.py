@@ -0,0 +1,347 @@
+import io
+import csv
+import gzip
+from pathlib import Path
+from xml.etree.ElementTree import tostring  # nosec B405 - we only serialize items, nothing here parses XML
+
+import anyio
+from anyio import create_task_group, create_memory_object_stream, EndOfStream, WouldBlock
+
+from scrapling.core.utils import log
+from scrapling.spiders.result import Item, _item_element, _item_json, _item_keys, _item_row
+from scrapling.core._types import Any, Awaitable, BinaryIO, Callable, Dict, Iterable, List, Literal, Optional, Union
+
+Compression = Literal["gzip", "zstd"]
+_COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+
+def _open_zstd(path: Path) -> BinaryIO:
+    try:
+        from compression import zstd  # type: ignore  # Python 3.14+
+
+        return zstd.open(path, "wb")  # type: ignore[return-value]
+    except ImportError:
+        pass
+    try:
+        import zstandard  # type: ignore
+    except ImportError:
+        raise ImportError(
+            "Writing zstd-compressed files needs Python 3.14 or the `zstandard` package: pip install zstandard"
+        ) from None
+    return zstandard.ZstdCompressor().stream_writer(open(path, "wb"))  # type: ignore[return-value]
+
+
+class ItemStage:
+    """A step of the item pipeline.
+
+    Stages receive the items in batches, in the order they were scraped, and return the items to pass to the next
+    stage. Return fewer items to drop some, or change them on the way. Only one batch is processed at a time by
+    each stage, so stages don't need any locking.
+    """
+
+    async def open(self) -> None:
+        """Called once before the first batch."""
+
+    async def process(self, items: List[Item]) -> List[Item]:
+        """Process a batch of items and return the ones to keep."""
+        return items
+
+    async def close(self) -> None:
+        """Called once after the last batch, even if the crawl failed."""
+
+
+class FileSink(ItemStage):
+    """Base of the stages writing the items to files as they come, instead of at the end of the crawl.
+
+    The blocking work happens in a worker thread so the crawl keeps running meanwhile. With `max_items` or
+    `max_bytes`, a new file is started whenever the current one is full, and each file is complete on its own.
+    Rotated files are named after `path` with the file's number before the extension (`items-00001.jsonl`),
+    or in the `{index}` placeholder if `path` has one.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        *,
+        max_items: int = 0,
+        max_bytes: int = 0,
+        compression: Optional[Compression] = None,
+    ):
+        """
+        :param path: Where to write the items.
+        :param max_items: Start a new file once this many items are written to the current one, 0 to never rotate.
+        :param max_bytes: Start a new file once this many bytes, before compression, are written to the current one.
+        :param compression: Compress the files with `gzip` or `zstd`. The matching extension is added if missing.
+        """
+        if compression is not None and compression not in _COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unknown compression: {compression!r}")
+        if max_items < 0 or max_bytes < 0:
+            raise ValueError("`max_items` and `max_bytes` can't be negative")
+
+        self.path = str(path)
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.compression = compression
+        self.files: List[Path] = []
+        self.items_written: int = 0
+
+        self._file: Optional[BinaryIO] = None
+        self._file_items: int = 0
+        self._file_bytes: int = 0
+
+    def _file_path(self, index: int) -> Path:
+        path = self.path
+        if "{index}" in path:
+            path = path.format(index=index)
+        elif self.max_items or self.max_bytes:
+            file = Path(path)
+            stem, dot, suffixes = file.name.partition(".")
+            path = str(file.with_name(f"{stem}-{index:05d}{dot}{suffixes}"))
+
+        if self.compression and not path.endswith(_COMPRESSION_SUFFIXES[self.compression]):
+            path += _COMPRESSION_SUFFIXES[self.compression]
+        return Path(path)
+
+    def _open_file(self) -> None:
+        file = self._file_path(len(self.files))
+        file.parent.mkdir(parents=True, exist_ok=True)
+        if self.compression == "gzip":
+            self._file = gzip.open(file, "wb", compresslevel=6)  # type: ignore[assignment]
+        elif self.compression == "zstd":
+            self._file = _open_zstd(file)
+        else:
+            self._file = open(file, "wb")
+        self.files.append(file)
+        self._file_items = self._file_bytes = 0
+        self._write(self._header())
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._write(self._footer())
+            self._file.close()
+            self._file = None
+
+    def _write(self, data: bytes) -> None:
+        if data:
+            self._file.write(data)  # type: ignore[union-attr]
+            self._file_bytes += len(data)
+
+    def _is_full(self) -> bool:
+        return bool(
+            (self.max_items and self._file_items >= self.max_items)
+            or (self.max_bytes and self._file_bytes >= self.max_bytes)
+        )
+
+    def _write_items(self, items: List[Item]) -> None:
+        for item in items:
+            if self._file is None:
+                self._open_file()
+            self._write(self._serialize(item))
+            self._file_items += 1
+            self.items_written += 1
+            if self._is_full():
+                self._close_file()
+
+    def _header(self) -> bytes:
+        """Written at the start of every file."""
+        return b""
+
+    def _footer(self) -> bytes:
+        """Written at the end of every file."""
+        return b""
+
+    def _serialize(self, item: Item) -> bytes:
+        raise NotImplementedError
+
+    async def process(self, items: List[Item]) -> List[Item]:
+        await anyio.to_thread.run_sync(self._write_items, items)
+        return items
+
+    async def close(self) -> None:
+        await anyio.to_thread.run_sync(self._close_file)
+        if self.files:
+            log.info(
+                "Saved %d items to %d file(s) starting with %s", self.items_written, len(self.files), self.files[0]
+            )
+
+
+class JsonLinesSink(FileSink):
+    """Writes the items as JSON Lines (one JSON object per line)."""
+
+    def _serialize(self, item: Item) -> bytes:
+        return _item_json(item) + b"\n"
+
+
+class CsvSink(FileSink):
+    """Writes the items as CSV, with a header row in every file.
+
+    Unless `fields` is given, the columns are the keys found in the first batch of items, in the order they appeared.
+    Keys that only show up later are left out, since the header is already written by then.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        *,
+        fields: Optional[Iterable[str]] = None,
+        delimiter: str = ",",
+        max_items: int = 0,
+        max_bytes: int = 0,
+        compression: Optional[Compression] = None,
+    ):
+        """
+        :param path: Where to write the items.
+        :param fields: The columns to write.
+        :param delimiter: The character separating the columns.
+        :param max_items: Start a new file once this many items are written to the current one, 0 to never rotate.
+        :param max_bytes: Start a new file once this many bytes, before compression, are written to the current one.
+        :param compression: Compress the files with `gzip` or `zstd`. The matching extension is added if missing.
+        """
+        super().__init__(path, max_items=max_items, max_bytes=max_bytes, compression=compression)
+        self.fields: Optional[List[str]] = list(fields) if fields is not None else None
+        self.delimiter = delimiter
+
+    def _row(self, values: Iterable[str]) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer, delimiter=self.delimiter).writerow(values)
+        return buffer.getvalue().encode()
+
+    def _header(self) -> bytes:
+        return self._row(self.fields or [])
+
+    def _serialize(self, item: Item) -> bytes:
+        return self._row(_item_row(item, self.fields or []))
+
+    def _write_items(self, items: List[Item]) -> None:
+        if self.fields is None:
+            self.fields = list({key: None for item in items for key in _item_keys(item)})
+        super()._write_items(items)
+
+
+class XmlSink(FileSink):
+    """Writes the items as XML, each item an element wrapped in a root element, like `ItemList.to_xml()` does."""
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        *,
+        root_tag: str = "items",
+        item_tag: str = "item",
+        max_items: int = 0,
+        max_bytes: int = 0,
+        compression: Optional[Compression] = None,
+    ):
+        """
+        :param path: Where to write the items.
+        :param root_tag: The name of the element wrapping all the items.
+        :param item_tag: The name of the element wrapping every item.
+        :param max_items: Start a new file once this many items are written to the current one, 0 to never rotate.
+        :param max_bytes: Start a new file once this many bytes, before compression, are written to the current one.
+        :param compression: Compress the files with `gzip` or `zstd`. The matching extension is added if missing.
+        """
+        super().__init__(path, max_items=max_items, max_bytes=max_bytes, compression=compression)
+        self.root_tag = root_tag
+        self.item_tag = item_tag
+
+    def _header(self) -> bytes:
+        return f"<?xml version='1.0' encoding='utf-8'?>\n<{self.root_tag}>\n".encode()
+
+    def _footer(self) -> bytes:
+        return f"</{self.root_tag}>\n".encode()
+
+    def _serialize(self, item: Item) -> bytes:
+        return b"  " + tostring(_item_element(item, self.item_tag), encoding="utf-8", xml_declaration=False) + b"\n"
+
+
+class ItemPipeline:
+    """Runs the scraped items through a chain of stages, each in its own task, connected by bounded queues.
+
+    Every stage takes as many items as are waiting for it, up to `batch_size`, so batches grow under load without
+    delaying items when the crawl is slow. When a stage falls behind, its queue fills up and `put()` waits, which
+    slows the callbacks producing the items down instead of letting them pile up in memory.
+    """
+
+    def __init__(
+        self,
+        stages: Iterable[ItemStage],
+        on_output: Callable[[Item], Awaitable[None]],
+        batch_size: int = 100,
+        queue_size: int = 1000,
+    ):
+        """
+        :param stages: The stages, in the order the items go through them.
+        :param on_output: Called with every item that made it through all the stages.
+        :param batch_size: The most items a stage processes at once.
+        :param queue_size: The most items waiting in front of each stage.
+        """
+        if batch_size < 1:
+            raise ValueError("`batch_size` must be at least 1")
+        if queue_size < 0:
+            raise ValueError("`queue_size` can't be negative")
+        self.stages = list(stages)
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.dropped: int = 0
+        self._on_output = on_output
+        self._task_group: Any = None
+        self._send: Any = None
+
+    async def __aenter__(self) -> "ItemPipeline":
+        self.dropped = 0
+        for stage in self.stages:
+            await stage.open()
+
+        self._task_group = create_task_group()
+        await self._task_group.__aenter__()
+        self._send, receive = create_memory_object_stream[Item](self.queue_size)
+        for stage in self.stages:
+            send, next_receive = create_memory_object_stream[Item](self.queue_size)
+            self._task_group.start_soon(self._run_stage, stage, receive, send)
+            receive = next_receive
+        self._task_group.start_soon(self._run_output, receive)
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> Optional[bool]:
+        # Closing the first queue lets every stage finish the items it has left, then stop
+        await self._send.aclose()
+        try:
+            return await self._task_group.__aexit__(*exc_info)
+        finally:
+            for stage in self.stages:
+                try:
+                    await stage.close()
+                except Exception as e:
+                    log.error(f"Error closing item stage {stage!r}: {e}", exc_info=e)
+
+    async def put(self, item: Item) -> None:
+        """Send an item through the stages, waiting while the first one is full."""
+        await self._send.send(item)
+
+    async def _run_stage(self, stage: ItemStage, receive: Any, send: Any) -> None:
+        async with receive, send:
+            while True:
+                try:
+                    batch = [await receive.receive()]
+                except EndOfStream:
+                    return
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(receive.receive_nowait())
+                    except (WouldBlock, EndOfStream):
+                        break
+
+                try:
+                    results = await stage.process(batch)
+                except Exception as e:
+                    log.error(f"Item stage {stage!r} failed, dropping {len(batch)} items: {e}", exc_info=e)
+                    self.dropped += len(batch)
+                    continue
+
+                self.dropped += max(len(batch) - len(results), 0)
+                for item in results:
+                    await send.send(item)
+
+    async def _run_output(self, receive: Any) -> None:
+        async with receive:
+            async for item in receive:
+                await self._on_output(item)
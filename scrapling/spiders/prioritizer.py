@@ -0,0 +1,104 @@
+from scrapling.core._types import Dict, Optional, Tuple
+
+from scrapling.spiders.request import Request
+
+# A kind of page: the callback parsing it and its URL's template
+Arm = Tuple[str, str]
+
+
+def callback_name(request: Request) -> str:
+    """The name of the callback that will parse a request's response."""
+    return getattr(request.callback, "__name__", None) or "parse"
+
+
+def _directory(arm: Arm) -> Arm:
+    callback, template = arm
+    return callback, template.split("?", 1)[0].rsplit("/", 1)[0]
+
+
+class _Score:
+    __slots__ = ("value", "fetched")
+
+    def __init__(self):
+        self.value = 0.0
+        self.fetched = 0
+
+
+class YieldPrioritizer:
+    """Learns which kinds of pages lead to items, so the requests for the most valuable ones are fetched first.
+
+    A kind of page is the callback parsing it and its URL's template, see `url_template`. Its value is a moving
+    average of what its pages were worth when they were parsed: the items they yielded, plus a share of the value of
+    the most valuable kind of page they linked to. So listing pages are worth something as soon as the pages they link
+    to are, even though they don't yield items themselves.
+
+    Kinds of pages that were never parsed are valued like the pages parsed by the same callback in the same directory,
+    so the product pages of `/products/<name>` are valued together even though every name is its own template. If
+    there are none either, they're valued like the most valuable kind known, so they're tried early, then settle on
+    what they're actually worth.
+    """
+
+    def __init__(self, weight: int = 10, discount: float = 0.5, window: int = 20):
+        """
+        :param weight: The priority added to the requests of the most valuable kind of page. The others get a share
+            of it, relative to their value.
+        :param discount: How much of the value of the pages a page links to counts toward its own.
+        :param window: How many of its last pages a kind of page's value mostly reflects.
+        """
+        if weight < 1:
+            raise ValueError(f"`weight` must be at least 1, got {weight}")
+        if not 0 <= discount < 1:
+            raise ValueError(f"`discount` must be between 0 and 1, got {discount}")
+        if window < 1:
+            raise ValueError(f"`window` must be at least 1, got {window}")
+        self.weight = weight
+        self.discount = discount
+        self.window = window
+        self._scores: Dict[Arm, _Score] = {}
+        self._directories: Dict[Arm, _Score] = {}
+        self._best = 0.0
+        self._best_arm: Optional[Arm] = None
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def value(self, arm: Arm) -> float:
+        """The value of a kind of page, optimistic if none of its pages was parsed yet."""
+        score = self._scores.get(arm) or self._directories.get(_directory(arm))
+        if score is None:
+            return self._best
+        return score.value
+
+    def boost(self, arm: Arm) -> int:
+        """The priority to add to a request for a kind of page."""
+        if self._best <= 0:
+            return 0
+        return round(self.weight * min(self.value(arm) / self._best, 1.0))
+
+    def record(self, arm: Arm, items: int, lead_value: float) -> None:
+        """Learn from a page whose callbacks ran.
+
+        :param arm: The page's kind.
+        :param items: How many items its callbacks yielded.
+        :param lead_value: The value of the most valuable kind of page among the new requests its callbacks yielded.
+        """
+        reward = items + self.discount * lead_value
+        for scores, key in ((self._scores, arm), (self._directories, _directory(arm))):
+            score = scores.get(key)
+            if score is None:
+                score = scores[key] = _Score()
+            score.fetched += 1
+            score.value += (reward - score.value) / min(score.fetched, self.window)
+
+        value = self._scores[arm].value
+        if value >= self._best:
+            self._best, self._best_arm = value, arm
+        elif arm == self._best_arm:
+            # The best kind of page got worse, so another one may be the best now
+            self._best_arm, best = max(self._scores.items(), key=lambda entry: entry[1].value)
+            self._best = best.value
+
+    def report(self, limit: int = 20) -> Dict[str, float]:
+        """The values of the most valuable kinds of pages, as `callback template`."""
+        ranked = sorted(self._scores.items(), key=lambda entry: entry[1].value, reverse=True)[:limit]
+        return {f"{callback} {template}": round(score.value, 2) for (callback, template), score in ranked}
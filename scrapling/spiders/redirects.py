@@ -0,0 +1,137 @@
+from urllib.parse import SplitResult, urlsplit, urlunsplit, parse_qsl, urlencode
+
+from scrapling.core._types import Dict, Optional, Set, Tuple
+
+_PatternKey = Tuple[str, str, str]
+
+
+def _pattern_key(scheme: str, netloc: str, path: str) -> _PatternKey:
+    """URLs of the same host and first path segment are expected to redirect the same way."""
+    return scheme, netloc, path.lstrip("/").split("/", 1)[0]
+
+
+class _Pattern:
+    """How the URLs of one pattern redirect, and how many redirects agreed on it."""
+
+    __slots__ = ("scheme", "netloc", "slash", "dropped", "kept", "hits", "conflicted")
+
+    def __init__(self, scheme: Optional[str], netloc: Optional[str], slash: Optional[bool]):
+        self.scheme = scheme
+        self.netloc = netloc
+        self.slash = slash
+        self.dropped: Set[str] = set()
+        self.kept: Set[str] = set()
+        self.hits = 0
+        self.conflicted = False
+
+
+class RedirectRules:
+    """Learns how a website redirects its URLs, so the next URLs of the same pattern are rewritten before they're
+    fetched instead of paying the redirect's round-trip every time.
+
+    Only the redirects a rule can reproduce are learned: switching the scheme, adding or removing `www.`, adding or
+    removing the trailing slash, and dropping query parameters, like tracking ones. A pattern is a scheme, a host,
+    and a first path segment, and its rule is only applied once `min_hits` redirects agreed on it. A pattern stops
+    being rewritten for good as soon as a redirect or a response disagrees with its rule.
+    """
+
+    def __init__(self, min_hits: int = 3):
+        """
+        :param min_hits: How many redirects of a pattern have to agree before its URLs are rewritten.
+        """
+        if min_hits < 1:
+            raise ValueError(f"`min_hits` must be at least 1, got {min_hits}")
+        self.min_hits = min_hits
+        self._patterns: Dict[_PatternKey, _Pattern] = {}
+
+    def __len__(self) -> int:
+        """The number of patterns whose URLs are rewritten."""
+        return sum(1 for pattern in self._patterns.values() if self._applies(pattern))
+
+    def _applies(self, pattern: _Pattern) -> bool:
+        return pattern.hits >= self.min_hits and not pattern.conflicted
+
+    @staticmethod
+    def _observe(url: str, final_url: str) -> Optional[Tuple[_Pattern, Set[str], Set[str]]]:
+        """The rule explaining a redirect, with the query parameters it dropped and kept, or None if none can."""
+        source, target = urlsplit(url), urlsplit(final_url)
+        scheme = target.scheme if target.scheme != source.scheme else None
+        netloc = None
+        if target.netloc != source.netloc:
+            if target.netloc.removeprefix("www.") != source.netloc.removeprefix("www."):
+                return None
+            netloc = target.netloc
+
+        if target.path == source.path:
+            slash = None
+        elif target.path == source.path + "/":
+            slash = True
+        elif source.path == target.path + "/":
+            slash = False
+        else:
+            return None
+
+        params = parse_qsl(source.query, keep_blank_values=True)
+        target_params = parse_qsl(target.query, keep_blank_values=True)
+        kept = {name for name, _ in target_params}
+        dropped = {name for name, _ in params} - kept
+        if [param for param in params if param[0] not in dropped] != target_params:
+            return None
+        if scheme is None and netloc is None and slash is None and not dropped:
+            return None
+        return _Pattern(scheme, netloc, slash), dropped, kept
+
+    def learn(self, url: str, final_url: str) -> None:
+        """Learn from a response, whether it was redirected or not.
+
+        :param url: The URL that was requested.
+        :param final_url: The response's URL, after the redirects.
+        """
+        parts = urlsplit(url)
+        key = _pattern_key(parts.scheme, parts.netloc, parts.path)
+        pattern = self._patterns.get(key)
+        if url == final_url:
+            # A URL the rule would have rewritten wasn't redirected
+            if pattern is not None and not pattern.conflicted and self._apply(pattern, parts) is not None:
+                pattern.conflicted = True
+            return
+
+        observed = self._observe(url, final_url)
+        if observed is None:
+            return
+        rule, dropped, kept = observed
+        if pattern is None:
+            pattern = self._patterns[key] = rule
+        elif (pattern.scheme, pattern.netloc, pattern.slash) != (rule.scheme, rule.netloc, rule.slash):
+            pattern.conflicted = True
+        pattern.dropped |= dropped
+        pattern.kept |= kept
+        if pattern.dropped & pattern.kept:
+            pattern.conflicted = True
+        pattern.hits += 1
+
+    def rewrite(self, url: str) -> str:
+        """The URL a learned rule expects the website to redirect `url` to, or `url` itself."""
+        parts = urlsplit(url)
+        pattern = self._patterns.get(_pattern_key(parts.scheme, parts.netloc, parts.path))
+        if pattern is None or not self._applies(pattern):
+            return url
+        return self._apply(pattern, parts) or url
+
+    @staticmethod
+    def _apply(pattern: _Pattern, parts: SplitResult) -> Optional[str]:
+        """The URL rewritten by the pattern's rule, or None if the rule doesn't change it."""
+        scheme, netloc, path, query, fragment = parts
+        if pattern.slash is True and not path.endswith("/"):
+            path += "/"
+        elif pattern.slash is False and path.endswith("/") and path != "/":
+            path = path[:-1]
+        if query and pattern.dropped:
+            params = parse_qsl(query, keep_blank_values=True)
+            kept = [param for param in params if param[0] not in pattern.dropped]
+            if len(kept) != len(params):
+                query = urlencode(kept)
+        rewritten = (pattern.scheme or scheme, pattern.netloc or netloc, path, query, fragment)
+        if rewritten == tuple(parts):
+            return None
+        return urlunsplit(rewritten)
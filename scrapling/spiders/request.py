@@ -7,7 +7,8 @@ import orjson
 from w3lib.url import canonicalize_url
 
 from scrapling.engines.toolbelt.custom import Response
-from scrapling.core._types import Any, AsyncGenerator, Callable, Dict, Optional, Union, Tuple, TYPE_CHECKING
+from scrapling.spiders.result import Item
+from scrapling.core._types import Any, AsyncGenerator, Callable, Dict, Iterable, Optional, Union, Tuple, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from scrapling.spiders.spider import Spider
@@ -29,15 +30,33 @@ def _stable_value_repr(value: Any) -> str:
         return repr(value)
 
 
+def update_fingerprints(
+    requests: Iterable["Request"],
+    include_kwargs: bool = False,
+    include_headers: bool = False,
+    keep_fragments: bool = False,
+) -> None:
+    """Fingerprint a batch of requests, canonicalizing every URL repeated among them once."""
+    canonical_urls: Dict[str, str] = {}
+    for request in requests:
+        if request._fp is not None:
+            continue
+        canonical_url = canonical_urls.get(request.url)
+        if canonical_url is None:
+            canonical_url = canonical_urls[request.url] = canonicalize_url(request.url, keep_fragments=keep_fragments)
+        request.update_fingerprint(include_kwargs, include_headers, keep_fragments, canonical_url)
+
+
 class Request:
     def __init__(
         self,
         url: str,
         sid: str = "",
-        callback: Callable[[Response], AsyncGenerator[Union[Dict[str, Any], "Request", None], None]] | None = None,
+        callback: Callable[[Response], AsyncGenerator[Union[Item, "Request", None], None]] | None = None,
         priority: int = 0,
         dont_filter: bool = False,
         meta: dict[str, Any] | None = None,
+        depth: int = 0,
         _retry_count: int = 0,
         **kwargs: Any,
     ) -> None:
@@ -47,9 +66,13 @@ class Request:
         self.priority: int = priority
         self.dont_filter: bool = dont_filter
         self.meta: dict[str, Any] = meta if meta else {}
+        # How many links away from a start request it is, set by the engine for the requests yielded by callbacks
+        self.depth: int = depth
         self._retry_count: int = _retry_count
         self._session_kwargs = kwargs if kwargs else {}
         self._fp: Optional[bytes] = None
+        # The sharded crawl worker that sent the request to the one owning its domain, until it's dequeued there
+        self._routed_from: Optional[int] = None
 
     def copy(self) -> "Request":
         """Create a copy of this request."""
@@ -60,6 +83,7 @@ class Request:
             priority=self.priority,
             dont_filter=self.dont_filter,
             meta=self.meta.copy(),
+            depth=self.depth,
             _retry_count=self._retry_count,
             **self._session_kwargs,
         )
@@ -73,10 +97,13 @@ class Request:
         include_kwargs: bool = False,
         include_headers: bool = False,
         keep_fragments: bool = False,
+        canonical_url: Optional[str] = None,
     ) -> bytes:
         """Generate a unique fingerprint for deduplication.
 
         Caches the result in self._fp after first computation.
+
+        :param canonical_url: The request's URL canonicalized already, see `update_fingerprints`.
         """
         if self._fp is not None:
             return self._fp
@@ -100,7 +127,7 @@ class Request:
             "sid": self.sid,
             "body": body.hex(),
             "method": self._session_kwargs.get("method", "GET"),
-            "url": canonicalize_url(self.url, keep_fragments=keep_fragments),
+            "url": canonical_url or canonicalize_url(self.url, keep_fragments=keep_fragments),
         }
 
         if include_kwargs:
@@ -160,6 +187,8 @@ class Request:
     def __setstate__(self, state: dict[str, Any]) -> None:
         """Restore state from pickle - callback restored later via _restore_callback()."""
         self._callback_name: str | None = state.pop("_callback_name", None)
+        state.setdefault("depth", 0)  # Pickled by older versions
+        state.setdefault("_routed_from", None)
         self.__dict__.update(state)
 
     def _restore_callback(self, spider: "Spider") -> None:
@@ -10,9 +10,19 @@ from xml.etree.ElementTree import (  # nosec B405 - we only serialize items, not
 )
 
 import orjson
+from msgspec import Struct, json as msgspec_json, msgpack, to_builtins
+from msgspec.structs import astuple
 
 from scrapling.core.utils import log
-from scrapling.core._types import Any, Iterable, Iterator, Dict, List, Optional, Tuple, Union
+from scrapling.core._types import Any, Iterable, Iterator, Dict, List, Optional, Tuple, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+# Items are dictionaries, or instances of the `msgspec.Struct` classes spiders declare as their `item_type`
+Item = Union[Dict[str, Any], Struct]
+_JSON_ENCODER = msgspec_json.Encoder()
+_JSONL_CHUNK = 1000
 
 # Anything outside these ranges can't be represented in XML, and scraped pages are full of control characters
 _XML_FORBIDDEN_CHARS = re.compile(r"[^\x09\x0a\x0d\x20-퟿-�\U00010000-\U0010ffff]")
@@ -21,19 +31,65 @@ _XML_FORBIDDEN_TAG_CHARS = re.compile(r"[^\w.-]", re.UNICODE)
 
 def _stringify(value: Any) -> str:
     """Turn an item's value into text, serializing containers to JSON so no data is silently dropped."""
+    if type(value) is str:
+        return value
     if value is None:
         return ""
-    if isinstance(value, (dict, list, tuple)):
-        return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    if isinstance(value, (dict, list, tuple, Struct)):
+        return orjson.dumps(value, default=to_builtins, option=orjson.OPT_SERIALIZE_NUMPY).decode()
     return str(value)
 
 
+def _item_keys(item: Item) -> Iterable[str]:
+    return item.__struct_fields__ if isinstance(item, Struct) else item.keys()
+
+
+def _item_get(item: Item, key: str) -> Any:
+    return getattr(item, key, None) if isinstance(item, Struct) else item.get(key)
+
+
+def _item_pairs(item: Item) -> Iterable[Tuple[str, Any]]:
+    if isinstance(item, Struct):
+        return ((name, getattr(item, name)) for name in item.__struct_fields__)
+    return item.items()
+
+
+def _item_row(item: Item, columns: List[str]) -> List[str]:
+    """The CSV cells of an item. Typed items with exactly these columns skip looking their fields up by name."""
+    if isinstance(item, Struct) and item.__struct_fields__ == tuple(columns):
+        return [_stringify(value) for value in astuple(item)]
+    return [_stringify(_item_get(item, column)) for column in columns]
+
+
+def _item_json(item: Item) -> bytes:
+    """Serialize an item to JSON, typed items straight from their fields without building a dictionary first."""
+    if isinstance(item, Struct):
+        return _JSON_ENCODER.encode(item)
+    return orjson.dumps(item, default=to_builtins, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
 def _xml_tag(key: Any) -> str:
     """Turn an item's key into a usable XML tag name."""
     tag = _XML_FORBIDDEN_TAG_CHARS.sub("_", str(key))
     return tag if tag and (tag[0].isalpha() or tag[0] == "_") else f"_{tag}"
 
 
+def _item_element(item: Item, item_tag: str) -> Element:
+    """Build an item's XML element, with a child named after each of its keys."""
+    element = Element(item_tag)
+    for key, value in _item_pairs(item):
+        tag = _xml_tag(key)
+        child = SubElement(element, tag)
+        if tag != str(key):
+            child.set("name", _XML_FORBIDDEN_CHARS.sub("", str(key)))
+        child.text = _XML_FORBIDDEN_CHARS.sub("", _stringify(value))
+    return element
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
 class ItemList(list):
     """A list of scraped items with export capabilities."""
 
@@ -49,7 +105,7 @@ class ItemList(list):
 
         file = Path(path)
         file.parent.mkdir(parents=True, exist_ok=True)
-        file.write_bytes(orjson.dumps(list(self), option=options))
+        file.write_bytes(orjson.dumps(list(self), default=to_builtins, option=options))
         log.info("Saved %d items to %s", len(self), path)
 
     def to_jsonl(self, path: Union[str, Path]):
@@ -59,9 +115,13 @@ class ItemList(list):
         """
         Path(path).parent.mkdir(parents=True, exist_ok=True)
         with open(path, "wb") as f:
-            for item in self:
-                f.write(orjson.dumps(item, option=orjson.OPT_SERIALIZE_NUMPY))
-                f.write(b"\n")
+            for start in range(0, len(self), _JSONL_CHUNK):
+                chunk = self[start : start + _JSONL_CHUNK]
+                if all(isinstance(item, Struct) for item in chunk):
+                    # Typed items are encoded a whole chunk at a time
+                    f.write(_JSON_ENCODER.encode_lines(chunk))
+                else:
+                    f.writelines(_item_json(item) + b"\n" for item in chunk)
         log.info("Saved %d items to %s", len(self), path)
 
     def to_csv(self, path: Union[str, Path], *, fields: Optional[Iterable[str]] = None, delimiter: str = ","):
@@ -74,15 +134,14 @@ class ItemList(list):
         :param fields: The columns to write, defaulting to every key found in the items, in the order they appeared
         :param delimiter: The character separating the columns
         """
-        columns = list(fields) if fields is not None else list({key: None for item in self for key in item})
+        columns = list(fields) if fields is not None else list({key: None for item in self for key in _item_keys(item)})
 
         file = Path(path)
         file.parent.mkdir(parents=True, exist_ok=True)
         with open(file, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=columns, delimiter=delimiter, extrasaction="ignore")
-            writer.writeheader()
-            for item in self:
-                writer.writerow({column: _stringify(item.get(column)) for column in columns})
+            writer = csv.writer(f, delimiter=delimiter)
+            writer.writerow(columns)
+            writer.writerows(_item_row(item, columns) for item in self)
 
         log.info("Saved %d items to %s", len(self), path)
 
@@ -99,14 +158,7 @@ class ItemList(list):
         :param indent: Pretty-print the file instead of writing it on a single line
         """
         root = Element(root_tag)
-        for item in self:
-            element = SubElement(root, item_tag)
-            for key, value in item.items():
-                tag = _xml_tag(key)
-                child = SubElement(element, tag)
-                if tag != str(key):
-                    child.set("name", _XML_FORBIDDEN_CHARS.sub("", str(key)))
-                child.text = _XML_FORBIDDEN_CHARS.sub("", _stringify(value))
+        root.extend(_item_element(item, item_tag) for item in self)
 
         tree = ElementTree(root)
         if indent:
@@ -117,6 +169,63 @@ class ItemList(list):
         tree.write(file, encoding="utf-8", xml_declaration=True)
         log.info("Saved %d items to %s", len(self), path)
 
+    def to_msgpack(self, path: Union[str, Path]):
+        """Export items to a MessagePack file holding an array of all the items.
+
+        Typed items are encoded straight from their fields, and the file can be decoded back into them with
+        `msgspec.msgpack.decode(data, type=list[MyItem])`.
+
+        :param path: Path to the output file
+        """
+        file = Path(path)
+        file.parent.mkdir(parents=True, exist_ok=True)
+        file.write_bytes(msgpack.encode(list(self)))
+        log.info("Saved %d items to %s", len(self), path)
+
+    def to_arrow(self, *, schema_sample: int = 1000) -> "pa.Table":
+        """Convert the items to an Arrow table. Needs the `pyarrow` package.
+
+        The schema is inferred from the first `schema_sample` items, and keys that only show up later are left out.
+        Columns whose values don't share one type in the sample are stored as text.
+
+        :param schema_sample: How many items to infer the schema from
+        """
+        from scrapling.spiders.columnar import to_table
+
+        return to_table(self, schema_sample)
+
+    def to_parquet(
+        self,
+        path: Union[str, Path],
+        *,
+        schema_sample: int = 1000,
+        row_group_size: int = 10_000,
+        compression: Optional[str] = "zstd",
+        dictionary: Optional[Iterable[str]] = None,
+    ):
+        """Export items to a Parquet file. Needs the `pyarrow` package.
+
+        The schema is inferred like `to_arrow()` does, and text columns repeating the same values, like categories
+        or brands, are dictionary-encoded.
+
+        :param path: Path to the output file
+        :param schema_sample: How many items to infer the schema from
+        :param row_group_size: How many items to write in each row group
+        :param compression: The Parquet compression codec, like `zstd`, `snappy`, `gzip`, `lz4`, or `None`
+        :param dictionary: The columns to dictionary-encode, instead of picking them from the sample
+        """
+        from scrapling.spiders.columnar import ParquetSink
+
+        sink = ParquetSink(
+            path,
+            schema_sample=schema_sample,
+            row_group_size=row_group_size,
+            compression=compression,
+            dictionary=dictionary,
+        )
+        sink.write_all(self)
+        log.info("Saved %d items to %s", len(self), path)
+
 
 @dataclass
 class CrawlStats:
@@ -130,6 +239,18 @@ class CrawlStats:
     robots_disallowed_count: int = 0
     cache_hits: int = 0
     cache_misses: int = 0
+    recrawl_revalidations: int = 0
+    recrawl_not_modified: int = 0
+    recrawl_unchanged: int = 0
+    recrawl_bytes_saved: int = 0
+    redirects_followed: int = 0
+    redirect_duplicates: int = 0
+    redirects_rewritten: int = 0
+    near_duplicates: int = 0
+    near_duplicate_requests_dropped: int = 0
+    depth_limited_count: int = 0
+    url_pattern_requests_blocked: int = 0
+    url_pattern_requests_throttled: int = 0
     response_bytes: int = 0
     items_scraped: int = 0
     items_dropped: int = 0
@@ -141,10 +262,13 @@ class CrawlStats:
     autothrottle_delays: Dict = field(default_factory=dict)
     custom_stats: Dict = field(default_factory=dict)
     response_status_count: Dict = field(default_factory=dict)
+    depth_requests_count: Dict = field(default_factory=dict)
     domains_response_bytes: Dict = field(default_factory=dict)
     sessions_requests_count: Dict = field(default_factory=dict)
     proxies: List[str | Dict | Tuple] = field(default_factory=list)
     log_levels_counter: Dict = field(default_factory=dict)
+    url_patterns: Dict = field(default_factory=dict)
+    yield_scores: Dict = field(default_factory=dict)
 
     @property
     def elapsed_seconds(self) -> float:
@@ -159,6 +283,9 @@ class CrawlStats:
     def increment_status(self, status: int) -> None:
         self.response_status_count[f"status_{status}"] = self.response_status_count.get(f"status_{status}", 0) + 1
 
+    def increment_depth(self, depth: int) -> None:
+        self.depth_requests_count[f"depth_{depth}"] = self.depth_requests_count.get(f"depth_{depth}", 0) + 1
+
     def increment_response_bytes(self, domain: str, count: int) -> None:
         self.response_bytes += count
         self.domains_response_bytes[domain] = self.domains_response_bytes.get(domain, 0) + count
@@ -167,6 +294,84 @@ class CrawlStats:
         self.requests_count += 1
         self.sessions_requests_count[sid] = self.sessions_requests_count.get(sid, 0) + 1
 
+    @classmethod
+    def merge(cls, stats: Iterable["CrawlStats"]) -> "CrawlStats":
+        """Combine the stats of crawls that ran side by side, like the workers of one crawl.
+
+        Counters are summed, the timing covers all of them, and the concurrency limits are added up since every
+        crawl had its own. Custom stats are summed when they are numbers, otherwise the last value is kept. The reports
+        of the URL patterns are summed by template.
+        """
+        merged = cls()
+        stats = list(stats)
+        if not stats:
+            return merged
+
+        merged.start_time = min(entry.start_time for entry in stats)
+        merged.end_time = max(entry.end_time for entry in stats)
+        merged.download_delay = stats[0].download_delay
+        merged.concurrent_requests_per_domain = stats[0].concurrent_requests_per_domain
+        merged.autothrottle_enabled = stats[0].autothrottle_enabled
+        for entry in stats:
+            for name in (
+                "requests_count",
+                "concurrent_requests",
+                "failed_requests_count",
+                "offsite_requests_count",
+                "robots_disallowed_count",
+                "cache_hits",
+                "cache_misses",
+                "recrawl_revalidations",
+                "recrawl_not_modified",
+                "recrawl_unchanged",
+                "recrawl_bytes_saved",
+                "redirects_followed",
+                "redirect_duplicates",
+                "redirects_rewritten",
+                "near_duplicates",
+                "near_duplicate_requests_dropped",
+                "depth_limited_count",
+                "url_pattern_requests_blocked",
+                "url_pattern_requests_throttled",
+                "response_bytes",
+                "items_scraped",
+                "items_dropped",
+                "blocked_requests_count",
+            ):
+                setattr(merged, name, getattr(merged, name) + getattr(entry, name))
+            for name in (
+                "response_status_count",
+                "depth_requests_count",
+                "domains_response_bytes",
+                "sessions_requests_count",
+                "log_levels_counter",
+            ):
+                counter = getattr(merged, name)
+                for key, value in getattr(entry, name).items():
+                    counter[key] = counter.get(key, 0) + value
+            for key, value in entry.custom_stats.items():
+                current = merged.custom_stats.get(key)
+                if _is_number(value) and _is_number(current):
+                    merged.custom_stats[key] = current + value
+                else:
+                    merged.custom_stats[key] = value
+            merged.autothrottle_delays.update(entry.autothrottle_delays)
+            merged.yield_scores.update(entry.yield_scores)
+            for template, report in entry.url_patterns.items():
+                current = merged.url_patterns.get(template)
+                if current is None:
+                    merged.url_patterns[template] = dict(report)
+                    continue
+                for key in ("requests", "blocked", "throttled", "fetched", "items"):
+                    current[key] += report[key]
+                if report["status"] == "blocked":
+                    current["status"] = "blocked"
+                current["items_per_fetch"] = (
+                    round(current["items"] / current["fetched"], 2) if current["fetched"] else 0.0
+                )
+            merged.proxies.extend(entry.proxies)
+        return merged
+
     def to_dict(self) -> dict[str, Any]:
         return {
             "items_scraped": self.items_scraped,
@@ -185,8 +390,23 @@ class CrawlStats:
             "robots_disallowed_count": self.robots_disallowed_count,
             "cache_hits": self.cache_hits,
             "cache_misses": self.cache_misses,
+            "recrawl_revalidations": self.recrawl_revalidations,
+            "recrawl_not_modified": self.recrawl_not_modified,
+            "recrawl_unchanged": self.recrawl_unchanged,
+            "recrawl_bytes_saved": self.recrawl_bytes_saved,
+            "redirects_followed": self.redirects_followed,
+            "redirect_duplicates": self.redirect_duplicates,
+            "redirects_rewritten": self.redirects_rewritten,
+            "near_duplicates": self.near_duplicates,
+            "near_duplicate_requests_dropped": self.near_duplicate_requests_dropped,
+            "url_pattern_requests_blocked": self.url_pattern_requests_blocked,
+            "url_pattern_requests_throttled": self.url_pattern_requests_throttled,
+            "url_patterns": self.url_patterns,
+            "yield_scores": self.yield_scores,
             "blocked_requests_count": self.blocked_requests_count,
             "response_status_count": self.response_status_count,
+            "depth_requests_count": self.depth_requests_count,
+            "depth_limited_count": self.depth_limited_count,
             "response_bytes": self.response_bytes,
             "domains_response_bytes": self.domains_response_bytes,
             "proxies": self.proxies,
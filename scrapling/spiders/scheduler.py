@@ -1,32 +1,385 @@
-import asyncio
+from heapq import heapify, heappush, heappop
+from pathlib import Path
 from itertools import count
+from time import monotonic
+from tempfile import TemporaryDirectory
+
+import anyio
 
 from scrapling.core.utils import log
-from scrapling.spiders.request import Request
-from scrapling.core._types import List, Set, Tuple, TYPE_CHECKING
+from scrapling.spiders.request import Request, update_fingerprints
+from scrapling.spiders.frontier import DiskFrontier
+from scrapling.spiders.dedup import SeenSet, SeenSnapshot
+from scrapling.spiders.checkpoint import CheckpointData, JournalEvent
+from scrapling.core._types import Callable, Dict, Iterable, List, Literal, Optional, Protocol, Set, Tuple, Union
+
+_QueueItem = Tuple[int, int, Request]
+
+# `memory` is the `Scheduler`, `sqlite` is the `SharedScheduler` that several processes or hosts can crawl together
+SchedulerBackendName = Literal["memory", "sqlite"]
+
+# The order of the requests of the same priority: the order they were queued in, the shallowest first, or the deepest
+# first
+CrawlOrder = Literal["priority", "bfs", "dfs"]
+_CRAWL_ORDERS = ("priority", "bfs", "dfs")
+# Every priority spans this many sort keys, one per depth, so the key stays a single integer the disk frontier and
+# the shared database can sort on
+_DEPTHS = 1 << 16
+
+
+def order_key(request: Request, crawl_order: CrawlOrder = "priority") -> int:
+    """The key requests are dispatched by, the lowest first."""
+    if crawl_order == "priority":
+        return -request.priority
+    depth = min(request.depth, _DEPTHS - 1)
+    if crawl_order == "dfs":
+        depth = _DEPTHS - 1 - depth
+    return -request.priority * _DEPTHS + depth
+
+
+def check_crawl_order(crawl_order: str) -> None:
+    if crawl_order not in _CRAWL_ORDERS:
+        raise ValueError(f"Unknown crawl order: {crawl_order!r}")
+
+
+class SchedulerBackend(Protocol):
+    """What the engine needs from a scheduler.
+
+    `enqueue()` drops the requests already seen, and `dequeue()` leases a request to the caller until it calls
+    `complete()` with it. A backend shared between processes has to give a lease back to the other processes once
+    its holder stops renewing it, so the requests of a crashed process aren't lost.
+    """
+
+    async def enqueue(self, request: Request) -> Optional[bool]:
+        """Queue the request unless it's a duplicate, returns whether it was queued.
+
+        It's None when another process decides, like a sharded crawl worker sending the request to the one owning
+        its domain.
+        """
+        ...
+
+    async def enqueue_many(self, requests: Iterable[Request]) -> int:
+        """Queue the requests that aren't duplicates, returns how many were queued."""
+        ...
+
+    async def dequeue(self) -> Request:
+        """Lease the next request to process, waiting until one can be dispatched."""
+        ...
+
+    def mark_seen(self, request: Request) -> bool:
+        """Record the request as seen without queueing it, returns whether it was seen already."""
+        ...
+
+    def complete(self, request: Request) -> None:
+        """Release the lease of a dequeued request, because it's done."""
+        ...
+
+    def delay_domain(self, domain: str, seconds: float) -> None:
+        """Don't dispatch requests of the domain in less than `seconds` from now."""
+        ...
+
+    def cancel_delay(self, request: Request) -> None:
+        """Give back the delay charged to the request's domain when it was dispatched."""
+        ...
+
+    def next_ready_in(self) -> Optional[float]:
+        """Seconds until a request can be dispatched, `None` if it waits for a running one to complete."""
+        ...
+
+    @property
+    def has_ready(self) -> bool:
+        """Whether a request can be dispatched right now."""
+        ...
+
+    @property
+    def is_empty(self) -> bool:
+        """Whether there's no request left, whether queued or leased."""
+        ...
+
+    def __len__(self) -> int: ...
+
+    def snapshot(self) -> Tuple[List[Request], SeenSnapshot]:
+        """The pending requests and the seen fingerprints."""
+        ...
+
+    def checkpoint_data(self) -> CheckpointData:
+        """A base checkpoint of the current state."""
+        ...
+
+    def drain_journal(self) -> List[JournalEvent]:
+        """The events recorded since the last call or checkpoint."""
+        ...
+
+    def restore(self, data: CheckpointData) -> None:
+        """Restore the state of a checkpoint."""
+        ...
+
+    def checkpointed(self) -> None:
+        """Called once the checkpoint from `checkpoint_data()` is saved."""
+        ...
 
-if TYPE_CHECKING:
-    from scrapling.spiders.checkpoint import CheckpointData
+    def close(self, delete: bool = True) -> None:
+        """Release the backend's resources, and its files if `delete` is set."""
+        ...
+
+
+class _DomainQueue:
+    """The pending requests of one domain, along with its dispatch state."""
+
+    __slots__ = ("queue", "active", "ready_at", "served", "version", "undo")
+
+    def __init__(self, served: int):
+        self.queue: List[_QueueItem] = []
+        self.active: int = 0
+        self.ready_at: float = 0.0
+        self.served: int = served
+        # Bumped whenever the domain is (re)scheduled, so outdated heap entries can be skipped lazily
+        self.version: int = 0
+        # The `id` of the last dispatched request and the `ready_at` value before it, for `cancel_delay`
+        self.undo: Tuple[int, float] = (0, 0.0)
 
 
 class Scheduler:
     """
-    Priority queue with URL deduplication. (heapq)
+    Per-domain priority queues with URL deduplication. (heapq)
 
-    Higher priority requests are processed first.
+    A request is only dispatched when its domain has a free concurrency slot and its download delay
+    has elapsed, so a throttled domain never holds the slots that other domains could use.
+    Higher priority requests are processed first within each domain, then in the `crawl_order`, and ready domains
+    are served by the priority of their next request, then the least recently served one first.
     Duplicate URLs are filtered unless dont_filter=True.
+
+    With `max_memory_requests`, only the best requests are kept in memory and the rest spill over to a
+    `DiskFrontier`, which refills memory in priority order once it's half empty.
     """
 
-    def __init__(self, include_kwargs: bool = False, include_headers: bool = False, keep_fragments: bool = False):
-        self._queue: asyncio.PriorityQueue[tuple[int, int, Request]] = asyncio.PriorityQueue()
-        self._seen: set[bytes] = set()
+    def __init__(
+        self,
+        include_kwargs: bool = False,
+        include_headers: bool = False,
+        keep_fragments: bool = False,
+        on_enqueue: Optional[Callable[[], None]] = None,
+        domain_slots: int = 0,
+        delay_for: Optional[Callable[[str], float]] = None,
+        max_memory_requests: int = 0,
+        spill_dir: Optional[str | Path] = None,
+        on_load: Optional[Callable[[Request], None]] = None,
+        seen: Optional[Union[Set[bytes], SeenSet]] = None,
+        journal: bool = False,
+        crawl_order: CrawlOrder = "priority",
+    ):
+        """
+        :param include_kwargs: Include the request's session arguments in its fingerprint.
+        :param include_headers: Include the request's headers in its fingerprint.
+        :param keep_fragments: Keep the URL's fragment in the fingerprint.
+        :param on_enqueue: Called after every accepted request, so the engine can wake up instead of polling the queue.
+        :param domain_slots: How many requests of the same domain can be in flight at once, 0 means unlimited.
+        :param delay_for: Returns the minimum number of seconds between two dispatches to a domain.
+        :param max_memory_requests: How many queued requests to keep in memory before spilling to disk, 0 means unlimited.
+        :param spill_dir: The directory of the disk frontier. It's kept consistent with the checkpoints, so pass the
+            crawl directory here. A temporary directory is used if it's not set.
+        :param on_load: Called on every request loaded back from disk, so its callback can be restored.
+        :param seen: The set of fingerprints to deduplicate requests with, a plain `set` by default. See `create_seen_set`.
+        :param journal: Record every accepted and completed request, for the checkpoints to append with `drain_journal()`.
+        :param crawl_order: How requests of the same priority are ordered: in the order they were queued with
+            `priority`, the shallowest first with `bfs`, or the deepest first with `dfs`.
+        """
+        if max_memory_requests < 0:
+            raise ValueError("max_memory_requests must be equal or greater than 0.")
+        check_crawl_order(crawl_order)
+
+        self._seen: Union[Set[bytes], SeenSet] = seen if seen is not None else set()
         self._counter = count()
+        self._served_counter = count(1)
+        self._domains: Dict[str, _DomainQueue] = {}
+        # (-head priority, last served, domain, version) for domains that can be dispatched now
+        self._ready: List[Tuple[int, int, str, int]] = []
+        # (ready time, domain, version) for domains that wait for their delay to elapse
+        self._waiting: List[Tuple[float, str, int]] = []
+        # Same as above, but for idle domains that are only kept around until their delay elapses
+        self._expiring: List[Tuple[float, str, int]] = []
+        self._size: int = 0
         # Mirror dict for snapshot without draining queue
-        self._pending: dict[int, tuple[int, int, Request]] = {}
+        self._pending: dict[int, _QueueItem] = {}
         self._inflight: dict[int, list[int]] = {}
         self._include_kwargs = include_kwargs
         self._include_headers = include_headers
         self._keep_fragments = keep_fragments
+        self._on_enqueue = on_enqueue
+        self._domain_slots = domain_slots
+        self._delay_for = delay_for
+        self._max_memory = max_memory_requests
+        self._spill_dir = spill_dir
+        self._on_load = on_load
+        self._frontier: Optional[DiskFrontier] = None
+        self._temp_dir: Optional[TemporaryDirectory] = None
+        # The checkpoint generation of the disk frontier, recorded by `snapshot()`
+        self.snapshot_generation: int = 0
+        # `id` of the items queued in memory, and of the ones moved to disk but still in a domain's heap.
+        # Items are tracked by identity because a request loaded back from disk gets a new item with the same counter.
+        self._queued: Set[int] = set()
+        self._evicted: Set[int] = set()
+        # (priority, -counter, item) so the request that would be dispatched last is on top
+        self._worst: List[Tuple[int, int, _QueueItem]] = []
+        self._journal: Optional[List[JournalEvent]] = [] if journal else None
+        self._crawl_order: CrawlOrder = crawl_order
+
+    def _schedule(self, domain: str, state: _DomainQueue, now: float) -> None:
+        """Place the domain in the heap matching its state, invalidating any previous entry it has."""
+        state.version += 1
+        if not state.queue:
+            if not state.active and state.ready_at > now:
+                # Nothing to dispatch, but the domain is kept until its delay elapses to be honored
+                heappush(self._expiring, (state.ready_at, domain, state.version))
+            return
+
+        if self._domain_slots and state.active >= self._domain_slots:
+            # Waiting for `complete()` to free a slot
+            return
+
+        if state.ready_at > now:
+            heappush(self._waiting, (state.ready_at, domain, state.version))
+        else:
+            heappush(self._ready, (state.queue[0][0], state.served, domain, state.version))
+
+    def _promote(self, now: float) -> None:
+        """Move the domains whose delay has elapsed to the ready heap, and forget the idle ones."""
+        while self._waiting and self._waiting[0][0] <= now:
+            _, domain, version = heappop(self._waiting)
+            state = self._domains.get(domain)
+            if state is not None and state.version == version:
+                self._schedule(domain, state, now)
+
+        while self._expiring and self._expiring[0][0] <= now:
+            _, domain, version = heappop(self._expiring)
+            state = self._domains.get(domain)
+            if state is not None and state.version == version:
+                del self._domains[domain]
+
+    def _next_ready_domain(self) -> Optional[str]:
+        """Return the domain that should be served next without removing it, dropping outdated entries on the way."""
+        self._refill()
+        self._promote(monotonic())
+        while self._ready:
+            _, _, domain, version = self._ready[0]
+            state = self._domains.get(domain)
+            if state is not None and state.version == version:
+                return domain
+            heappop(self._ready)
+        return None
+
+    def _discard_if_idle(self, domain: str, state: _DomainQueue, now: float) -> None:
+        """Forget a domain that has nothing queued or in flight, unless it still has a delay to honor."""
+        if not state.queue and not state.active and state.ready_at <= now:
+            del self._domains[domain]
+
+    def _push(self, item: _QueueItem) -> None:
+        request = item[2]
+        domain = request.domain
+        state = self._domains.get(domain)
+        if state is None:
+            state = self._domains[domain] = _DomainQueue(next(self._served_counter))
+
+        self._pending[item[1]] = item
+        heappush(state.queue, item)
+        self._size += 1
+        if self._max_memory:
+            self._queued.add(id(item))
+            heappush(self._worst, (-item[0], -item[1], item))
+            if len(self._worst) > 2 * self._size + 1024:
+                # Most entries belong to dispatched requests, rebuild instead of letting it grow
+                self._worst = [entry for entry in self._worst if id(entry[2]) in self._queued]
+                heapify(self._worst)
+        if state.queue[0] is item:
+            # The domain's next request changed, so its position among the other domains changes too
+            self._schedule(domain, state, monotonic())
+
+    def _push_many(self, items: List[_QueueItem]) -> None:
+        """Queue items in memory, rebuilding the heap of every domain once instead of pushing them one by one."""
+        by_domain: Dict[str, List[_QueueItem]] = {}
+        for item in items:
+            self._pending[item[1]] = item
+            by_domain.setdefault(item[2].domain, []).append(item)
+
+        now = monotonic()
+        for domain, new in by_domain.items():
+            state = self._domains.get(domain)
+            if state is None:
+                state = self._domains[domain] = _DomainQueue(next(self._served_counter))
+            head = state.queue[0] if state.queue else None
+            if len(new) > len(state.queue):
+                state.queue.extend(new)
+                heapify(state.queue)
+            else:
+                for item in new:
+                    heappush(state.queue, item)
+            self._size += len(new)
+            if state.queue[0] is not head:
+                self._schedule(domain, state, now)
+
+    def _admit(self, item: _QueueItem) -> None:
+        """Queue an item in memory, spilling it or the worst request in memory to disk if memory is full."""
+        if self._max_memory and self._size >= self._max_memory:
+            worst = self._worst_in_memory()
+            if worst is None or item[:2] > worst[:2]:
+                self._spill(item)
+                return
+            self._evict(worst)
+        self._push(item)
+
+    def _worst_in_memory(self) -> Optional[_QueueItem]:
+        while self._worst:
+            item = self._worst[0][2]
+            if id(item) in self._queued:
+                return item
+            heappop(self._worst)
+        return None
+
+    def _frontier_store(self) -> DiskFrontier:
+        if self._frontier is None:
+            if self._spill_dir is None:
+                self._temp_dir = TemporaryDirectory(prefix="scrapling_frontier_")
+                self._frontier = DiskFrontier(self._temp_dir.name)
+            else:
+                self._frontier = DiskFrontier(self._spill_dir, durable=True)
+        return self._frontier
+
+    def _spill(self, item: _QueueItem) -> None:
+        self._pending.pop(item[1], None)
+        self._frontier_store().push(item)
+
+    def _evict(self, item: _QueueItem) -> None:
+        """Move a queued request from memory to disk. It's removed from its domain's heap lazily."""
+        self._queued.discard(id(item))
+        self._evicted.add(id(item))
+        self._size -= 1
+        self._spill(item)
+
+        domain = item[2].domain
+        state = self._domains[domain]
+        if state.queue[0] is item:
+            now = monotonic()
+            self._drop_evicted(state)
+            self._schedule(domain, state, now)
+            self._discard_if_idle(domain, state, now)
+
+    def _drop_evicted(self, state: _DomainQueue) -> None:
+        """Pop the requests moved to disk off the top of the domain's heap, so its head is always a queued request."""
+        while self._evicted and state.queue and id(state.queue[0]) in self._evicted:
+            self._evicted.discard(id(heappop(state.queue)))
+
+    def _refill(self) -> None:
+        """Load the best requests from disk once memory is half empty."""
+        if self._frontier is None or not len(self._frontier):
+            return
+        if self._max_memory and self._size > self._max_memory // 2:
+            return
+
+        limit = self._max_memory - self._size if self._max_memory else len(self._frontier)
+        for item in self._frontier.pop(limit):
+            if self._on_load is not None:
+                self._on_load(item[2])
+            self._push(item)
 
     async def enqueue(self, request: Request) -> bool:
         """Add a request to the queue."""
@@ -40,19 +393,91 @@ class Scheduler:
 
         # Negative priority so higher priority = dequeued first
         counter = next(self._counter)
-        item = (-request.priority, counter, request)
-        self._pending[counter] = item
-        await self._queue.put(item)
+        self._admit((order_key(request, self._crawl_order), counter, request))
+        if self._journal is not None:
+            self._journal.append(("enqueue", counter, request))
+        if self._on_enqueue is not None:
+            self._on_enqueue()
         return True
 
+    async def enqueue_many(self, requests: Iterable[Request]) -> int:
+        """Add a batch of requests to the queue, returns how many were queued.
+
+        Same as enqueuing them one by one, but a URL repeated in the batch is only canonicalized once, and without
+        `max_memory_requests` every domain's heap takes the batch at once.
+        """
+        requests = list(requests)
+        update_fingerprints(requests, self._include_kwargs, self._include_headers, self._keep_fragments)
+
+        items: List[_QueueItem] = []
+        for request in requests:
+            fingerprint = request._fp
+            if not request.dont_filter and fingerprint in self._seen:
+                log.debug("Dropped duplicate request: %s", request)
+                continue
+            self._seen.add(fingerprint)  # type: ignore[arg-type]
+            counter = next(self._counter)
+            items.append((order_key(request, self._crawl_order), counter, request))
+            if self._journal is not None:
+                self._journal.append(("enqueue", counter, request))
+
+        if self._max_memory:
+            for item in items:
+                self._admit(item)
+        else:
+            self._push_many(items)
+        if items and self._on_enqueue is not None:
+            self._on_enqueue()
+        return len(items)
+
+    def mark_seen(self, request: Request) -> bool:
+        """Record the request's fingerprint as seen without queueing it, so it's dropped if it's enqueued later.
+
+        Returns whether it was seen already.
+        """
+        fingerprint = request.update_fingerprint(self._include_kwargs, self._include_headers, self._keep_fragments)
+        if fingerprint in self._seen:
+            return True
+        self._seen.add(fingerprint)
+        if self._journal is not None:
+            self._journal.append(("seen", -1, request))
+        return False
+
     async def dequeue(self) -> Request:
-        """Get the next request to process (stays tracked until complete())."""
-        _, counter, request = await self._queue.get()
+        """Get the next request to process (stays tracked until complete()).
+
+        Waits for the earliest domain delay to elapse if no domain is ready yet.
+        """
+        while (domain := self._next_ready_domain()) is None:
+            wait = self.next_ready_in()
+            if wait is None:
+                raise RuntimeError(
+                    "No request can be dequeued until a queued request is added or a running one completes"
+                )
+            await anyio.sleep(wait)
+
+        heappop(self._ready)
+        now = monotonic()
+        state = self._domains[domain]
+        item = heappop(state.queue)
+        _, counter, request = item
+        self._size -= 1
+        if self._max_memory:
+            self._queued.discard(id(item))
+            self._drop_evicted(state)
+
+        state.active += 1
+        state.served = next(self._served_counter)
+        state.undo = (id(request), state.ready_at)
+        if self._delay_for is not None:
+            state.ready_at = now + self._delay_for(domain)
+        self._schedule(domain, state, now)
+
         self._inflight.setdefault(id(request), []).append(counter)
         return request
 
     def complete(self, request: Request) -> None:
-        """Mark a request as finished so it stops being tracked for checkpoints."""
+        """Mark a request as finished so it stops being tracked for checkpoints and frees its domain's slot."""
         counters = self._inflight.get(id(request))
         if not counters:
             return
@@ -60,32 +485,169 @@ class Scheduler:
         if not counters:
             del self._inflight[id(request)]
         self._pending.pop(counter, None)
+        if self._journal is not None:
+            self._journal.append(("complete", counter, None))
+
+        domain = request.domain
+        state = self._domains.get(domain)
+        if state is not None:
+            now = monotonic()
+            state.active -= 1
+            self._schedule(domain, state, now)
+            self._discard_if_idle(domain, state, now)
+
+    def delay_domain(self, domain: str, seconds: float) -> None:
+        """Make sure the domain's next request isn't dispatched in less than `seconds` from now.
+
+        :param domain: The domain to delay
+        :param seconds: The minimum number of seconds to wait
+        """
+        now = monotonic()
+        state = self._domains.get(domain)
+        if state is None:
+            state = self._domains[domain] = _DomainQueue(next(self._served_counter))
+
+        if now + seconds > state.ready_at:
+            state.ready_at = now + seconds
+            self._schedule(domain, state, now)
+
+    def cancel_delay(self, request: Request) -> None:
+        """Give back the delay charged to the domain when this request was dispatched, because it didn't reach the website (like a cache hit).
+
+        It has no effect if another request from the same domain was dispatched after it.
+        """
+        domain = request.domain
+        state = self._domains.get(domain)
+        if state is None or state.undo[0] != id(request):
+            return
+
+        state.ready_at = state.undo[1]
+        state.undo = (0, 0.0)
+        self._schedule(domain, state, monotonic())
+
+    def next_ready_in(self) -> Optional[float]:
+        """Return the number of seconds until a queued request can be dispatched.
+
+        It's 0 if one can be dispatched now, and `None` if every queued request waits for a running one to complete.
+        """
+        if self._next_ready_domain() is not None:
+            return 0.0
+
+        while self._waiting:
+            ready_at, domain, version = self._waiting[0]
+            state = self._domains.get(domain)
+            if state is not None and state.version == version:
+                return max(ready_at - monotonic(), 0.0)
+            heappop(self._waiting)
+        return None
+
+    @property
+    def has_ready(self) -> bool:
+        """Whether a queued request can be dispatched right now."""
+        return self._next_ready_domain() is not None
 
     def __len__(self) -> int:
-        return self._queue.qsize()
+        return self._size + (len(self._frontier) if self._frontier is not None else 0)
 
     @property
     def is_empty(self) -> bool:
-        return self._queue.empty()
+        return len(self) == 0
 
-    def snapshot(self) -> Tuple[List[Request], Set[bytes]]:
+    def snapshot(self) -> Tuple[List[Request], SeenSnapshot]:
         """Create a snapshot of the current state for checkpoints."""
+        data = self.checkpoint_data()
+        return data.requests, data.seen
+
+    def checkpoint_data(self) -> CheckpointData:
+        """Create a base checkpoint of the current state. The journal events recorded so far are covered by it, so they are dropped.
+
+        The requests on disk aren't included, the frontier's generation is recorded instead.
+        """
+        if self._frontier is not None:
+            self.snapshot_generation = self._frontier.mark()
+        if self._journal is not None:
+            self._journal.clear()
         sorted_items = sorted(self._pending.values(), key=lambda x: (x[0], x[1]))  # Maintain queue order
-        requests = [item[2] for item in sorted_items]
-        return requests, self._seen.copy()
+        return CheckpointData(
+            requests=[item[2] for item in sorted_items],
+            seen=self._seen.copy(),
+            frontier_generation=self.snapshot_generation,
+            counters=[item[1] for item in sorted_items],
+        )
 
-    def restore(self, data: "CheckpointData") -> None:
-        """Restore scheduler state from checkpoint data.
+    def drain_journal(self) -> List[JournalEvent]:
+        """Return the events recorded since the last call or checkpoint, and forget them."""
+        if not self._journal:
+            return []
+        events, self._journal = self._journal, []
+        return events
+
+    def restore(self, data: CheckpointData) -> None:
+        """Restore scheduler state from checkpoint data, replaying its journal events on top of it.
 
         :param data: CheckpointData containing requests and seen set
         """
+        if isinstance(self._seen, SeenSet):
+            self._seen.close(delete=False)
+        # The checkpoint keeps the kind of set it was taken with
         self._seen = data.seen.copy()
 
-        # Restore pending requests in order (they're already sorted by priority)
-        for request in data.requests:
-            counter = next(self._counter)
-            item = (-request.priority, counter, request)
-            self._pending[counter] = item
-            self._queue.put_nowait(item)
+        pending: Dict[int, Request] = dict(zip(data.counters, data.requests))
+        completed: Set[int] = set()
+        for kind, counter, request in data.journal:
+            if kind == "enqueue" and request is not None:
+                pending[counter] = request
+                self._seen.add(
+                    request.update_fingerprint(self._include_kwargs, self._include_headers, self._keep_fragments)
+                )
+            elif kind == "seen" and request is not None:
+                self._seen.add(
+                    request.update_fingerprint(self._include_kwargs, self._include_headers, self._keep_fragments)
+                )
+            elif pending.pop(counter, None) is None:
+                # Completed after being loaded back from the disk frontier
+                completed.add(counter)
+
+        bounds = None
+        if self._spill_dir is not None and (
+            self._max_memory or (Path(self._spill_dir) / DiskFrontier.FRONTIER_FILE).exists()
+        ):
+            self._frontier = DiskFrontier(self._spill_dir, durable=True, resume_generation=data.frontier_generation)
+            self._frontier.discard(completed)
+            bounds = self._frontier.counter_bounds()
 
-        log.info(f"Scheduler restored: {len(data.requests)} requests, {len(data.seen)} seen")
+        if data.requests and not data.counters:
+            # Checkpoints of older versions don't have counters. Their requests come before the ones on disk.
+            first = bounds[0] - len(data.requests) if bounds is not None else next(self._counter)
+            pending = {first + i: request for i, request in enumerate(data.requests)}
+        highest = max([*pending, bounds[1] if bounds is not None else -1], default=-1)
+        self._counter = count(max(highest + 1, next(self._counter)))
+
+        items = sorted(
+            (order_key(request, self._crawl_order), counter, request) for counter, request in pending.items()
+        )
+        for item in items:
+            if self._on_load is not None:
+                self._on_load(item[2])
+            self._admit(item)
+
+        log.info(f"Scheduler restored: {len(self)} requests, {len(self._seen)} seen")
+
+    def checkpointed(self) -> None:
+        """Let the disk frontier drop the rows covered by the checkpoint just saved from `checkpoint_data()`."""
+        if self._frontier is not None and self.snapshot_generation:
+            self._frontier.commit(self.snapshot_generation)
+
+    def close(self, delete: bool = True) -> None:
+        """Close the disk frontier and the seen set if they use files.
+
+        :param delete: Remove its files as well, keep them to resume from a checkpoint later
+        """
+        if self._frontier is not None:
+            self._frontier.close(delete=delete or self._temp_dir is not None)
+            self._frontier = None
+        if self._temp_dir is not None:
+            self._temp_dir.cleanup()
+            self._temp_dir = None
+        if isinstance(self._seen, SeenSet):
+            self._seen.close(delete=delete)
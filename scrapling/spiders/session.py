@@ -80,6 +80,10 @@ class SessionManager:
             raise KeyError(f"Session '{session_id}' not found. Available: {available}")
         return self._sessions[session_id]
 
+    def is_http_session(self, session_id: str) -> bool:
+        """Whether the session makes plain HTTP requests, so requests can set their headers through `headers`."""
+        return isinstance(self.get(session_id), FetcherSession)
+
     async def start(self) -> None:
         """Start all sessions that aren't already alive."""
         if self._started:
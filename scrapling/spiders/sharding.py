@@ -0,0 +1,571 @@
+import pickle
+import signal
+import asyncio
+import hashlib
+import threading
+import traceback
+import multiprocessing
+from queue import Empty
+from pathlib import Path
+from collections import deque
+from time import monotonic
+
+import anyio
+from anyio import create_task_group
+
+from scrapling.core.utils import log, set_logger, reset_logger
+from scrapling.spiders.request import Request
+from scrapling.spiders.engine import CrawlerEngine
+from scrapling.spiders.session import SessionManager
+from scrapling.spiders.scheduler import SchedulerBackend
+from scrapling.spiders.result import CrawlResult, CrawlStats, Item, ItemList
+from scrapling.spiders.checkpoint import CheckpointData, JournalEvent
+from scrapling.core._types import (
+    Any,
+    AsyncGenerator,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TYPE_CHECKING,
+)
+
+if TYPE_CHECKING:
+    from multiprocessing.queues import Queue
+
+    from scrapling.spiders.spider import Spider
+    from scrapling.spiders.dedup import SeenSnapshot
+
+# (idle, routed requests sent, routed requests received) of a worker
+WorkerState = Tuple[bool, int, int]
+
+
+def shard_for(domain: str, shards: int) -> int:
+    """Return the worker that owns a domain. It's stable across processes, unlike `hash()`."""
+    digest = hashlib.blake2b(domain.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % shards
+
+
+class ShardRouter:
+    """Wraps a worker's scheduler so the requests of the domains other workers own are sent to them instead.
+
+    Messages from the other processes are read by a thread into a mailbox, which `run_mailbox()` processes in the
+    crawl's event loop: routed requests are enqueued like any other, and the coordinator's messages are answered.
+    The scheduler never looks empty to the engine until the coordinator says every worker is done, because another
+    worker could still send requests to this one.
+    """
+
+    def __init__(
+        self,
+        scheduler: SchedulerBackend,
+        shard: int,
+        inboxes: List["Queue"],
+        control: "Queue",
+        on_load: Callable[[Request], None],
+        on_wake: Callable[[], None],
+        on_pause: Callable[[], None],
+        on_force_stop: Callable[[], None],
+    ):
+        """
+        :param scheduler: The worker's own scheduler.
+        :param shard: The index of this worker.
+        :param inboxes: The message queue of every worker.
+        :param control: The coordinator's message queue.
+        :param on_load: Called on every routed request, so its callback can be restored.
+        :param on_wake: Wakes the crawl loop up.
+        :param on_pause: Pauses the crawl, or forces it to stop if it's already pausing.
+        :param on_force_stop: Stops the crawl right away, cancelling its in-flight requests.
+        """
+        self._scheduler = scheduler
+        self._shard = shard
+        self._inboxes = inboxes
+        self._control = control
+        self._on_load = on_load
+        self._on_wake = on_wake
+        self._on_pause = on_pause
+        self._on_force_stop = on_force_stop
+        self._sent: int = 0
+        self._received: int = 0
+        # The requests sent to other workers that they haven't dequeued or dropped yet
+        self._forwarded: int = 0
+        self._active: int = 0
+        self._stopped: bool = False
+        self._reported: Optional[WorkerState] = None
+        self._mailbox: deque = deque()
+        self._new_mail: Optional[anyio.Event] = None
+        self._reader: Optional[threading.Thread] = None
+        self._reading: bool = False
+
+    @property
+    def _idle(self) -> bool:
+        return self._active == 0 and self._scheduler.is_empty and not self._mailbox
+
+    def _report(self) -> None:
+        """Tell the coordinator whenever this worker runs out of work, with its routing counters."""
+        if not self._idle:
+            self._reported = None
+            return
+        state = (True, self._sent, self._received)
+        if state != self._reported:
+            self._reported = state
+            self._control.put(("state", self._shard, state))
+
+    def _read(self, loop: asyncio.AbstractEventLoop) -> None:
+        inbox = self._inboxes[self._shard]
+        while self._reading:
+            try:
+                message = inbox.get(timeout=0.1)
+            except Empty:
+                continue
+            self._mailbox.append(message)
+            loop.call_soon_threadsafe(self._notify)
+
+    def _notify(self) -> None:
+        if self._new_mail is not None:
+            self._new_mail.set()
+
+    async def run_mailbox(self) -> None:
+        """Process the messages of the other processes until cancelled."""
+        self._new_mail = anyio.Event()
+        self._reading = True
+        self._reader = threading.Thread(target=self._read, args=(asyncio.get_running_loop(),), daemon=True)
+        self._reader.start()
+        while True:
+            await self._new_mail.wait()
+            self._new_mail = anyio.Event()
+            while self._mailbox:
+                kind, value = self._mailbox.popleft()
+                if kind == "request":
+                    self._received += 1
+                    self._on_load(value)
+                    if not await self._scheduler.enqueue(value):
+                        self._acknowledge(value)
+                elif kind == "forwarded_done":
+                    self._forwarded = max(self._forwarded - 1, 0)
+                elif kind == "seen":
+                    self._scheduler.mark_seen(value)
+                elif kind == "probe":
+                    idle = self._idle
+                    if not idle:
+                        # The coordinator forgets the last report of a busy worker, so the next one must be sent
+                        self._reported = None
+                    self._control.put(("probe", self._shard, (value, idle, self._sent, self._received)))
+                elif kind == "pause":
+                    self._on_pause()
+                elif kind == "force_stop":
+                    self._on_force_stop()
+                elif kind == "stop":
+                    self._stopped = True
+            self._on_wake()
+
+    def stop_reading(self) -> List[Request]:
+        """Stop reading messages and return the routed requests that were received but not enqueued."""
+        self._reading = False
+        if self._reader is not None:
+            self._reader.join()
+        return [value for kind, value in self._mailbox if kind == "request"]
+
+    def _forward(self, request: Request, owner: int) -> None:
+        request._routed_from = self._shard
+        self._inboxes[owner].put(("request", request))
+        self._sent += 1
+        self._forwarded += 1
+
+    def _acknowledge(self, request: Request) -> None:
+        """Tell the worker that sent a routed request it's no longer waiting here."""
+        if request._routed_from is not None:
+            self._inboxes[request._routed_from].put(("forwarded_done", None))
+            request._routed_from = None
+
+    async def enqueue(self, request: Request) -> Optional[bool]:
+        """Queue the request if this worker owns its domain, otherwise send it to the worker that does.
+
+        Returns None for the requests sent to another worker, since only that worker knows if they're duplicates.
+        """
+        owner = shard_for(request.domain, len(self._inboxes))
+        if owner == self._shard:
+            return await self._scheduler.enqueue(request)
+        self._forward(request, owner)
+        return None
+
+    async def enqueue_many(self, requests: Iterable[Request]) -> int:
+        """Queue the requests of the domains this worker owns in one batch, and send the others to their workers.
+
+        Only the requests queued by this worker are counted, the others workers drop their duplicates themselves.
+        """
+        owned = []
+        for request in requests:
+            owner = shard_for(request.domain, len(self._inboxes))
+            if owner == self._shard:
+                owned.append(request)
+            else:
+                self._forward(request, owner)
+        return await self._scheduler.enqueue_many(owned)
+
+    def mark_seen(self, request: Request) -> bool:
+        """Record the request as seen by the worker that owns its domain.
+
+        Whether another worker had seen it already can't be known without waiting for it, so it's reported as unseen.
+        """
+        owner = shard_for(request.domain, len(self._inboxes))
+        if owner == self._shard:
+            return self._scheduler.mark_seen(request)
+        self._inboxes[owner].put(("seen", request))
+        return False
+
+    async def dequeue(self) -> Request:
+        request = await self._scheduler.dequeue()
+        self._acknowledge(request)
+        self._active += 1
+        return request
+
+    def complete(self, request: Request) -> None:
+        self._scheduler.complete(request)
+        self._active -= 1
+
+    def delay_domain(self, domain: str, seconds: float) -> None:
+        self._scheduler.delay_domain(domain, seconds)
+
+    def cancel_delay(self, request: Request) -> None:
+        self._scheduler.cancel_delay(request)
+
+    def next_ready_in(self) -> Optional[float]:
+        return self._scheduler.next_ready_in()
+
+    @property
+    def has_ready(self) -> bool:
+        return self._scheduler.has_ready
+
+    @property
+    def is_empty(self) -> bool:
+        """Only true once the coordinator found every worker out of work with no routed request in transit."""
+        if self._stopped:
+            return True
+        self._report()
+        return False
+
+    def __len__(self) -> int:
+        """The requests queued here, and the ones sent to other workers that are still waiting there."""
+        return len(self._scheduler) + self._forwarded
+
+    def snapshot(self) -> Tuple[List[Request], "SeenSnapshot"]:
+        return self._scheduler.snapshot()
+
+    def checkpoint_data(self) -> CheckpointData:
+        return self._scheduler.checkpoint_data()
+
+    def drain_journal(self) -> List[JournalEvent]:
+        return self._scheduler.drain_journal()
+
+    def restore(self, data: CheckpointData) -> None:
+        self._scheduler.restore(data)
+
+    def checkpointed(self) -> None:
+        self._scheduler.checkpointed()
+
+    def close(self, delete: bool = True) -> None:
+        self._scheduler.close(delete=delete)
+
+
+async def _no_start_requests() -> AsyncGenerator[Request, None]:
+    return
+    yield  # Make this a generator for type checkers
+
+
+async def _crawl_shard(
+    spider: "Spider",
+    shard: int,
+    inboxes: List["Queue"],
+    control: "Queue",
+    crawldir: Optional[Path],
+    interval: float,
+) -> None:
+    # Sessions aren't pickled with the spider, so each worker opens its own
+    spider._session_manager = SessionManager()
+    spider.configure_sessions(spider._session_manager)
+    if shard:
+        # Only the first worker runs `start_requests()`, the others get their share of it routed to them
+        spider.start_requests = _no_start_requests  # type: ignore[method-assign]
+
+    token = set_logger(spider.logger)
+    try:
+        engine = CrawlerEngine(spider, spider._session_manager, crawldir, interval)
+        router = ShardRouter(
+            engine.scheduler,
+            shard,
+            inboxes,
+            control,
+            on_load=engine._restore_request_callback,
+            on_wake=engine._wake,
+            on_pause=engine.request_pause,
+            on_force_stop=engine.force_stop,
+        )
+        engine.scheduler = router
+        spider._engine = engine
+
+        async with create_task_group() as tg:
+            tg.start_soon(router.run_mailbox)
+            stats = await engine.crawl()
+            tg.cancel_scope.cancel()
+
+        leftovers = router.stop_reading()
+        control.put(("done", shard, (stats, list(engine.items), engine.paused, leftovers)))
+    finally:
+        spider._engine = None
+        reset_logger(token)
+
+
+def _run_shard(
+    spider: "Spider",
+    shard: int,
+    inboxes: List["Queue"],
+    control: "Queue",
+    crawldir: Optional[Path],
+    interval: float,
+    backend_options: Dict[str, Any],
+) -> None:
+    """The entry point of a worker process."""
+    # The coordinator forwards Ctrl+C to the workers, so they pause together
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        anyio.run(
+            _crawl_shard,
+            spider,
+            shard,
+            inboxes,
+            control,
+            crawldir,
+            interval,
+            backend="asyncio",
+            backend_options=backend_options,
+        )
+    except BaseException:
+        control.put(("error", shard, traceback.format_exc()))
+
+
+class ShardedCrawl:
+    """Runs a spider in several worker processes, each one owning the domains that hash to it.
+
+    A domain's requests are always crawled by the same worker, so its concurrency limit, delay, AutoThrottle state,
+    and deduplication stay local to that worker. Requests found for a domain another worker owns are sent to it.
+    The crawl ends once every worker ran out of work and no routed request is in transit, which this coordinator
+    confirms by asking every worker for its counters twice, then the results of the workers are merged.
+
+    With a `crawldir`, each worker keeps its checkpoint in a `shard-<index>` directory inside it, and the routed
+    requests that were in transit when the crawl paused are saved by the coordinator to be sent again on resume.
+    """
+
+    ROUTED_FILE = "routed_requests.pkl"
+
+    def __init__(
+        self,
+        spider: "Spider",
+        workers: int,
+        crawldir: Optional[Path] = None,
+        interval: float = 300.0,
+        backend_options: Optional[Dict[str, Any]] = None,
+    ):
+        if workers < 2:
+            raise ValueError("A sharded crawl needs at least 2 workers.")
+        self.spider = spider
+        self.workers = workers
+        self.crawldir = crawldir
+        self.interval = interval
+        self.backend_options = backend_options or {}
+
+        self._states: Dict[int, WorkerState] = {}
+        self._wave: int = 0
+        # The states the current wave of probes started from, and the replies to it
+        self._probed: Optional[Dict[int, WorkerState]] = None
+        self._replies: Dict[int, WorkerState] = {}
+        self._injected: int = 0
+        self._results: Dict[int, Tuple[CrawlStats, List[Item], bool, List[Request]]] = {}
+        self._errors: Dict[int, str] = {}
+        self._leftovers: List[Request] = []
+        self._interrupts: int = 0
+        self._stopping: bool = False
+
+    def _routed_path(self) -> Optional[Path]:
+        return self.crawldir / self.ROUTED_FILE if self.crawldir else None
+
+    def _load_routed(self) -> List[Request]:
+        path = self._routed_path()
+        if path is None or not path.exists():
+            return []
+        data = pickle.loads(path.read_bytes())  # nosec B301
+        if data["workers"] != self.workers:
+            raise ValueError(
+                f"This crawl was paused with {data['workers']} workers, so it has to be resumed with as many workers."
+            )
+        return data["requests"]
+
+    def _save_routed(self, paused: bool) -> None:
+        path = self._routed_path()
+        if path is None:
+            return
+        if paused:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            data = {"workers": self.workers, "requests": self._leftovers}
+            path.write_bytes(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+        else:
+            path.unlink(missing_ok=True)
+            for shard in range(self.workers):
+                try:
+                    (self.crawldir / f"shard-{shard}").rmdir()  # type: ignore[operator]
+                except OSError:
+                    pass
+
+    def _broadcast(self, inboxes: List["Queue"], message: Tuple[str, Any]) -> None:
+        for shard, inbox in enumerate(inboxes):
+            if shard not in self._results:
+                inbox.put(message)
+
+    def _check_termination(self, inboxes: List["Queue"]) -> None:
+        """Stop the workers once two consecutive looks at their counters agree that no work is left anywhere."""
+        if self._stopping:
+            return
+        if self._probed is not None:
+            if len(self._replies) < self.workers:
+                return
+            replies, self._probed, probed = self._replies, None, self._probed
+            self._states.update(replies)
+            if replies == probed and self._balanced(replies):
+                self._stopping = True
+                self._broadcast(inboxes, ("stop", None))
+                return
+
+        if len(self._states) == self.workers and self._balanced(self._states):
+            self._wave += 1
+            self._probed, self._replies = dict(self._states), {}
+            self._broadcast(inboxes, ("probe", self._wave))
+
+    def _balanced(self, states: Dict[int, WorkerState]) -> bool:
+        idle = all(state[0] for state in states.values())
+        sent = sum(state[1] for state in states.values()) + self._injected
+        return idle and sent == sum(state[2] for state in states.values())
+
+    def _handle(self, inboxes: List["Queue"], kind: str, shard: int, value: Any) -> None:
+        if kind == "state":
+            self._states[shard] = value
+        elif kind == "probe":
+            wave, *state = value
+            if self._probed is not None and wave == self._wave:
+                self._replies[shard] = tuple(state)  # type: ignore[assignment]
+            if not state[0]:
+                self._states.pop(shard, None)
+        elif kind == "done":
+            self._results[shard] = value
+            if not self._stopping:
+                # A worker only finishes early when its crawl was paused or stopped, so the whole crawl follows it
+                self._stopping = True
+                self._broadcast(inboxes, ("pause", None))
+        elif kind == "error":
+            log.error(f"Crawl worker {shard} failed:\n{value}")
+            self._errors[shard] = value
+            # Nothing would be left to crawl the failed worker's domains, so the others are stopped right away
+            self._stopping = True
+            self._broadcast(inboxes, ("force_stop", None))
+        self._check_termination(inboxes)
+
+    def _drain(self, inbox: "Queue") -> None:
+        """Collect the routed requests sent to a worker that already finished."""
+        while True:
+            try:
+                kind, value = inbox.get_nowait()
+            except Empty:
+                return
+            if kind == "request":
+                self._leftovers.append(value)
+
+    def _interrupt(self, _signum: int, _frame: Any) -> None:
+        self._interrupts += 1
+
+    def run(self) -> CrawlResult:
+        """Run the workers until the crawl ends and return their merged results."""
+        context = multiprocessing.get_context("spawn")
+        inboxes: List["Queue"] = [context.Queue() for _ in range(self.workers)]
+        control: "Queue" = context.Queue()
+
+        routed = self._load_routed()
+        for request in routed:
+            inboxes[shard_for(request.domain, self.workers)].put(("request", request))
+        self._injected = len(routed)
+
+        started_at = monotonic()
+        processes = [
+            context.Process(
+                target=_run_shard,
+                args=(
+                    self.spider,
+                    shard,
+                    inboxes,
+                    control,
+                    self.crawldir / f"shard-{shard}" if self.crawldir else None,
+                    self.interval,
+                    self.backend_options,
+                ),
+                name=f"scrapling-crawl-worker-{shard}",
+            )
+            for shard in range(self.workers)
+        ]
+        for process in processes:
+            process.start()
+        log.info(f"Started {self.workers} crawl workers")
+
+        try:
+            original_handler: Any = signal.signal(signal.SIGINT, self._interrupt)
+        except ValueError:
+            original_handler = None
+
+        forwarded = 0
+        finished: Set[int] = set()
+        try:
+            while len(finished) < self.workers:
+                while forwarded < self._interrupts:
+                    forwarded += 1
+                    self._stopping = True
+                    self._broadcast(inboxes, ("pause", None))
+                try:
+                    kind, shard, value = control.get(timeout=0.2)
+                    self._handle(inboxes, kind, shard, value)
+                except Empty:
+                    pass
+
+                for shard, process in enumerate(processes):
+                    if shard in finished:
+                        continue
+                    if shard in self._results or shard in self._errors:
+                        finished.add(shard)
+                    elif not process.is_alive() and control.empty():
+                        self._handle(inboxes, "error", shard, f"exited with code {process.exitcode}")
+                        finished.add(shard)
+                for shard in finished:
+                    self._drain(inboxes[shard])
+        finally:
+            if original_handler is not None:
+                signal.signal(signal.SIGINT, original_handler)
+
+        for process in processes:
+            process.join()
+        for shard in range(self.workers):
+            self._drain(inboxes[shard])
+
+        if self._errors:
+            shard, error = next(iter(self._errors.items()))
+            raise RuntimeError(f"Crawl worker {shard} failed:\n{error}")
+
+        results = [self._results[shard] for shard in range(self.workers)]
+        paused = any(result[2] for result in results)
+        for result in results:
+            self._leftovers.extend(result[3])
+        if self._leftovers and not paused:
+            log.warning(f"{len(self._leftovers)} routed requests were never crawled")
+        self._save_routed(paused)
+
+        stats = CrawlStats.merge(result[0] for result in results)
+        stats.start_time, stats.end_time = started_at, monotonic()
+        items = ItemList(item for result in results for item in result[1])
+        return CrawlResult(stats=stats, items=items, paused=paused)
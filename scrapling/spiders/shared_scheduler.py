@@ -0,0 +1,422 @@
+import os
+import pickle
+import socket
+import threading
+import sqlite3
+from uuid import uuid4
+from pathlib import Path
+from time import monotonic, time
+
+import anyio
+
+from scrapling.core.utils import log
+from scrapling.spiders.request import Request, update_fingerprints
+from scrapling.spiders.dedup import DiskSeenSet, DiskSeenSetReference, SeenSnapshot
+from scrapling.spiders.scheduler import CrawlOrder, check_crawl_order, order_key
+from scrapling.spiders.checkpoint import CheckpointData, JournalEvent
+from scrapling.core._types import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+
+class _DomainState:
+    """The dispatch state of one domain in this process."""
+
+    __slots__ = ("active", "ready_at", "undo")
+
+    def __init__(self):
+        self.active: int = 0
+        self.ready_at: float = 0.0
+        # The `id` of the last dispatched request and the `ready_at` value before it, for `cancel_delay`
+        self.undo: Tuple[int, float] = (0, 0.0)
+
+
+class SharedScheduler:
+    """A scheduler whose queue and seen fingerprints live in a SQLite database, so several processes (or hosts, over
+    a shared filesystem that supports SQLite's locking) can crawl the same frontier.
+
+    Dequeuing a request leases it to this process until `complete()` deletes it. A background thread renews the
+    leases until the scheduler is closed, even while all of the process's requests are slow, so only the requests of
+    a process that crashed are given back to the others once their lease expires. Requests are served by priority, then in the `crawl_order`, across all processes.
+    The domains' concurrency slots and delays are only enforced within each process.
+
+    The database is kept when the crawl finishes, so running the spider again with it resumes the crawl.
+    """
+
+    # How long to wait before checking the database again when all the pending requests are out of reach
+    POLL_INTERVAL = 1.0
+
+    def __init__(
+        self,
+        path: str | Path,
+        include_kwargs: bool = False,
+        include_headers: bool = False,
+        keep_fragments: bool = False,
+        on_enqueue: Optional[Callable[[], None]] = None,
+        domain_slots: int = 0,
+        delay_for: Optional[Callable[[str], float]] = None,
+        on_load: Optional[Callable[[Request], None]] = None,
+        lease_timeout: float = 600.0,
+        crawl_order: CrawlOrder = "priority",
+    ):
+        """
+        :param path: The database file shared by every process of the crawl.
+        :param include_kwargs: Include the request's session arguments in its fingerprint.
+        :param include_headers: Include the request's headers in its fingerprint.
+        :param keep_fragments: Keep the URL's fragment in the fingerprint.
+        :param on_enqueue: Called after every accepted request, so the engine can wake up instead of polling the queue.
+        :param domain_slots: How many requests of the same domain this process can have in flight at once, 0 means unlimited.
+        :param delay_for: Returns the minimum number of seconds between two dispatches to a domain.
+        :param on_load: Called on every leased request, so its callback can be restored.
+        :param lease_timeout: Seconds after which the leases of a process that stopped renewing them are given back.
+        :param crawl_order: How requests of the same priority are ordered, see `Scheduler`. Every process of the crawl
+            should use the same one.
+        """
+        if lease_timeout <= 0:
+            raise ValueError("lease_timeout must be greater than 0.")
+        check_crawl_order(crawl_order)
+
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self._include_kwargs = include_kwargs
+        self._include_headers = include_headers
+        self._keep_fragments = keep_fragments
+        self._on_enqueue = on_enqueue
+        self._domain_slots = domain_slots
+        self._delay_for = delay_for
+        self._on_load = on_load
+        self._lease_timeout = lease_timeout
+        self._crawl_order: CrawlOrder = crawl_order
+        self._domains: Dict[str, _DomainState] = {}
+        # The leased requests, by `id`, with their row in the database
+        self._leases: Dict[int, int] = {}
+        self._closed: bool = False
+        # Renews the leases of this process with its own connection, started with the first lease
+        self._renewer: Optional[threading.Thread] = None
+        self._stop_renewing = threading.Event()
+
+        self._connection = sqlite3.connect(self.path, timeout=60.0, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS requests (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                neg_priority INTEGER NOT NULL,
+                domain TEXT NOT NULL,
+                data BLOB NOT NULL,
+                lease_owner TEXT,
+                lease_expires REAL
+            )
+        """)
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS requests_order ON requests (lease_owner, neg_priority, id)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS requests_leases ON requests (lease_expires) WHERE lease_owner IS NOT NULL"
+        )
+        self._connection.execute("CREATE TABLE IF NOT EXISTS seen (fingerprint BLOB PRIMARY KEY) WITHOUT ROWID")
+        self._connection.execute("CREATE TEMP TABLE IF NOT EXISTS blocked (domain TEXT PRIMARY KEY)")
+
+    def _fingerprint(self, request: Request) -> bytes:
+        return request.update_fingerprint(self._include_kwargs, self._include_headers, self._keep_fragments)
+
+    def _insert(self, request: Request, force: bool = False) -> bool:
+        """Add the request to the database unless it's a duplicate. Must run in a transaction."""
+        seen = self._connection.execute("INSERT OR IGNORE INTO seen VALUES (?)", (self._fingerprint(request),))
+        if not seen.rowcount and not (request.dont_filter or force):
+            return False
+        self._connection.execute(
+            "INSERT INTO requests (neg_priority, domain, data) VALUES (?, ?, ?)",
+            (
+                order_key(request, self._crawl_order),
+                request.domain,
+                pickle.dumps(request, protocol=pickle.HIGHEST_PROTOCOL),
+            ),
+        )
+        return True
+
+    async def enqueue(self, request: Request) -> bool:
+        """Add a request to the queue, unless another process already added it."""
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            added = self._insert(request)
+            self._connection.execute("COMMIT")
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+
+        if not added:
+            log.debug("Dropped duplicate request: %s", request)
+            return False
+        if self._on_enqueue is not None:
+            self._on_enqueue()
+        return True
+
+    async def enqueue_many(self, requests: Iterable[Request]) -> int:
+        """Add a batch of requests to the queue in one transaction, returns how many were queued."""
+        requests = list(requests)
+        update_fingerprints(requests, self._include_kwargs, self._include_headers, self._keep_fragments)
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            added = sum(self._insert(request) for request in requests)
+            self._connection.execute("COMMIT")
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+
+        if added < len(requests):
+            log.debug(f"Dropped {len(requests) - added} duplicate requests")
+        if added and self._on_enqueue is not None:
+            self._on_enqueue()
+        return added
+
+    def mark_seen(self, request: Request) -> bool:
+        """Record the request's fingerprint as seen by every process without queueing it, returns whether it was seen
+        already."""
+        added = self._connection.execute("INSERT OR IGNORE INTO seen VALUES (?)", (self._fingerprint(request),))
+        return not added.rowcount
+
+    def _blocked_domains(self, now: float) -> List[str]:
+        return [
+            domain
+            for domain, state in self._domains.items()
+            if state.ready_at > now or (self._domain_slots and state.active >= self._domain_slots)
+        ]
+
+    def _fill_blocked(self) -> None:
+        """Record the domains this process can't dispatch now in `temp.blocked`, for the queries to skip them."""
+        blocked = self._blocked_domains(monotonic())
+        self._connection.execute("DELETE FROM temp.blocked")
+        if blocked:
+            self._connection.executemany("INSERT INTO temp.blocked VALUES (?)", ((domain,) for domain in blocked))
+
+    def _renew_leases(self) -> None:
+        """Push back the expiry of this process's leases every quarter of `lease_timeout`, until it's closed."""
+        connection = sqlite3.connect(self.path, timeout=60.0, isolation_level=None)
+        try:
+            while not self._stop_renewing.wait(self._lease_timeout / 4):
+                try:
+                    connection.execute(
+                        "UPDATE requests SET lease_expires = ? WHERE lease_owner = ?",
+                        (time() + self._lease_timeout, self.owner),
+                    )
+                except sqlite3.Error as e:
+                    log.warning(f"Couldn't renew the leases of this crawl process: {e}")
+        finally:
+            connection.close()
+
+    def _reclaim_leases(self, now: float) -> None:
+        """Give back the expired leases of the processes that stopped renewing them."""
+        reclaimed = self._connection.execute(
+            "UPDATE requests SET lease_owner = NULL, lease_expires = NULL "
+            "WHERE lease_owner IS NOT NULL AND lease_expires < ?",
+            (now,),
+        ).rowcount
+        if reclaimed:
+            log.info(f"Reclaimed {reclaimed} requests leased by crawl processes that stopped")
+
+    def lease(self) -> Optional[Request]:
+        """Lease the best pending request of a domain this process can dispatch now, or return None if there's none.
+
+        The request stays leased to this process until `complete()` is called with it.
+        """
+        now = time()
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            self._reclaim_leases(now)
+            self._fill_blocked()
+            row = self._connection.execute(
+                "SELECT id, data FROM requests WHERE lease_owner IS NULL "
+                "AND domain NOT IN (SELECT domain FROM temp.blocked) ORDER BY neg_priority, id LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                self._connection.execute(
+                    "UPDATE requests SET lease_owner = ?, lease_expires = ? WHERE id = ?",
+                    (self.owner, now + self._lease_timeout, row[0]),
+                )
+            self._connection.execute("COMMIT")
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+
+        if row is None:
+            return None
+        request: Request = pickle.loads(row[1])  # nosec B301
+        if self._on_load is not None:
+            self._on_load(request)
+        self._leases[id(request)] = row[0]
+        if self._renewer is None:
+            self._renewer = threading.Thread(target=self._renew_leases, name="scrapling-lease-renewer", daemon=True)
+            self._renewer.start()
+
+        now_monotonic = monotonic()
+        state = self._domains.get(request.domain)
+        if state is None:
+            state = self._domains[request.domain] = _DomainState()
+        state.active += 1
+        state.undo = (id(request), state.ready_at)
+        if self._delay_for is not None:
+            state.ready_at = now_monotonic + self._delay_for(request.domain)
+        return request
+
+    @property
+    def has_ready(self) -> bool:
+        """Whether a queued request, or one whose lease expired, can be dispatched right now.
+
+        It only reads the database, another process can still lease the request before this one does.
+        """
+        self._fill_blocked()
+        return bool(
+            self._connection.execute(
+                "SELECT EXISTS (SELECT 1 FROM requests WHERE (lease_owner IS NULL OR lease_expires < ?) "
+                "AND domain NOT IN (SELECT domain FROM temp.blocked))",
+                (time(),),
+            ).fetchone()[0]
+        )
+
+    def next_ready_in(self) -> Optional[float]:
+        """Return the number of seconds until a queued request might be dispatched.
+
+        It's 0 if one can be dispatched now. The other processes can add requests or give leases back at any time,
+        so it's never more than `POLL_INTERVAL` while the database has requests, and `None` when it has none.
+        """
+        if self.has_ready:
+            return 0.0
+        if not self._connection.execute("SELECT EXISTS (SELECT 1 FROM requests)").fetchone()[0]:
+            return None
+
+        now = monotonic()
+        waits = [state.ready_at - now for state in self._domains.values() if state.ready_at > now]
+        return min([*waits, self.POLL_INTERVAL])
+
+    async def dequeue(self) -> Request:
+        """Lease the next request to process (it stays leased until complete()).
+
+        Waits until a request can be dispatched, whether it's queued by this process or another one.
+        """
+        while (request := self.lease()) is None:
+            wait = self.next_ready_in()
+            if wait is None:
+                raise RuntimeError("No request can be dequeued until a queued request is added")
+            # Another process may have leased the request `has_ready` found
+            await anyio.sleep(wait or self.POLL_INTERVAL / 10)
+        return request
+
+    def complete(self, request: Request) -> None:
+        """Delete a finished request from the database, and free its domain's slot."""
+        row_id = self._leases.pop(id(request), None)
+        if row_id is None:
+            return
+        deleted = self._connection.execute(
+            "DELETE FROM requests WHERE id = ? AND lease_owner = ?", (row_id, self.owner)
+        ).rowcount
+        if not deleted:
+            log.debug(f"The lease of {request} expired before it completed, another process may crawl it again")
+
+        now = monotonic()
+        state = self._domains.get(request.domain)
+        if state is not None:
+            state.active -= 1
+            if not state.active and state.ready_at <= now:
+                del self._domains[request.domain]
+
+    def delay_domain(self, domain: str, seconds: float) -> None:
+        """Make sure this process doesn't dispatch the domain's next request in less than `seconds` from now.
+
+        :param domain: The domain to delay
+        :param seconds: The minimum number of seconds to wait
+        """
+        state = self._domains.get(domain)
+        if state is None:
+            state = self._domains[domain] = _DomainState()
+        state.ready_at = max(state.ready_at, monotonic() + seconds)
+
+    def cancel_delay(self, request: Request) -> None:
+        """Give back the delay charged to the domain when this request was dispatched, because it didn't reach the website (like a cache hit).
+
+        It has no effect if another request from the same domain was dispatched after it.
+        """
+        state = self._domains.get(request.domain)
+        if state is None or state.undo[0] != id(request):
+            return
+        state.ready_at = state.undo[1]
+        state.undo = (0, 0.0)
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM requests").fetchone()[0]
+
+    @property
+    def is_empty(self) -> bool:
+        """Whether no process has a request queued or leased."""
+        return not self._connection.execute("SELECT EXISTS (SELECT 1 FROM requests)").fetchone()[0]
+
+    def snapshot(self) -> Tuple[List[Request], SeenSnapshot]:
+        """Create a snapshot of the requests of every process, whether they are queued or leased."""
+        data = self.checkpoint_data()
+        return data.requests, data.seen
+
+    def checkpoint_data(self) -> CheckpointData:
+        """Export the whole state. It's already kept in the database, so it's only needed to move a crawl elsewhere."""
+        rows = self._connection.execute("SELECT data FROM requests ORDER BY neg_priority, id").fetchall()
+        seen: Set[bytes] = {row[0] for row in self._connection.execute("SELECT fingerprint FROM seen")}
+        return CheckpointData(requests=[pickle.loads(row[0]) for row in rows], seen=seen)  # nosec B301
+
+    def drain_journal(self) -> List[JournalEvent]:
+        """Every change is already saved in the database, so there's nothing to journal."""
+        return []
+
+    def restore(self, data: CheckpointData) -> None:
+        """Add the state of a checkpoint to the database, replaying its journal events on top of it.
+
+        :param data: CheckpointData containing requests and seen set
+        """
+        checkpoint_seen = data.seen.copy() if isinstance(data.seen, DiskSeenSetReference) else data.seen
+        if not isinstance(checkpoint_seen, Iterable):
+            raise ValueError(
+                f"A checkpoint deduplicated with {type(checkpoint_seen).__name__} can't be restored into a shared "
+                "scheduler, its fingerprints can't be listed"
+            )
+
+        pending: Dict[int, Request] = dict(zip(data.counters or range(len(data.requests)), data.requests))
+        seen = [self._fingerprint(request) for kind, _, request in data.journal if kind == "seen" and request]
+        for kind, counter, request in data.journal:
+            if kind == "enqueue" and request is not None:
+                pending[counter] = request
+            elif kind == "complete":
+                pending.pop(counter, None)
+
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            self._connection.executemany("INSERT OR IGNORE INTO seen VALUES (?)", ((fp,) for fp in checkpoint_seen))
+            self._connection.executemany("INSERT OR IGNORE INTO seen VALUES (?)", ((fp,) for fp in seen))
+            # The checkpoint's seen fingerprints include its pending requests
+            for _, request in sorted(pending.items()):
+                self._insert(request, force=True)
+            self._connection.execute("COMMIT")
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        finally:
+            if isinstance(checkpoint_seen, DiskSeenSet):
+                checkpoint_seen.close(delete=False)
+
+        log.info(f"Scheduler restored: {len(self)} requests")
+
+    def checkpointed(self) -> None:
+        """Nothing to do, the database is always up to date."""
+
+    def close(self, delete: bool = True) -> None:
+        """Give the requests this process leased back to the others and close the database.
+
+        :param delete: Ignored, the database is shared, so it's never removed by one of its processes
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._stop_renewing.set()
+        if self._renewer is not None:
+            self._renewer.join()
+        self._connection.execute(
+            "UPDATE requests SET lease_owner = NULL, lease_expires = NULL WHERE lease_owner = ?", (self.owner,)
+        )
+        self._connection.close()
+        self._leases.clear()
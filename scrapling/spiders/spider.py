@@ -5,13 +5,20 @@ from abc import ABC, abstractmethod
 
 import anyio
 from anyio import Path as AsyncPath
+from msgspec import Struct
 
 from scrapling.spiders.request import Request
+from scrapling.spiders.pipeline import ItemStage
+from scrapling.spiders.dedup import DedupBackend
+from scrapling.spiders.cache import CacheCompression
+from scrapling.spiders.simhash import NearDuplicateAction
+from scrapling.spiders.scheduler import CrawlOrder, SchedulerBackendName
 from scrapling.spiders.engine import CrawlerEngine
+from scrapling.spiders.sharding import ShardedCrawl
 from scrapling.spiders.session import SessionManager
 from scrapling.core.utils import set_logger, reset_logger
-from scrapling.spiders.result import CrawlResult, CrawlStats
-from scrapling.core._types import Set, Any, Dict, Optional, Union, TYPE_CHECKING, AsyncGenerator
+from scrapling.spiders.result import CrawlResult, CrawlStats, Item
+from scrapling.core._types import Set, Any, Dict, List, Optional, Type, Union, TYPE_CHECKING, AsyncGenerator
 
 BLOCKED_CODES = {401, 403, 407, 429, 444, 500, 502, 503, 504}
 if TYPE_CHECKING:
@@ -78,12 +85,32 @@ class Spider(ABC):
     # Development mode
     development_mode: bool = False
     development_cache_dir: Optional[str] = None
+    development_cache_compression: Optional[CacheCompression] = None
+
+    # Incremental recrawl
+    recrawl_cache_dir: Optional[str] = None
+    recrawl_cache_compression: Optional[CacheCompression] = None
+    recrawl_skip_unchanged: bool = False
 
     # Concurrency settings
     concurrent_requests: int = 4
     concurrent_requests_per_domain: int = 0
     download_delay: float = 0.0
     max_blocked_retries: int = 3
+    parse_workers: int = 0
+
+    # Frontier settings
+    max_memory_requests: int = 0
+    scheduler_backend: SchedulerBackendName = "memory"
+    scheduler_path: Optional[str] = None
+    scheduler_lease_timeout: float = 600.0
+    crawl_order: CrawlOrder = "priority"
+    start_requests_low_water: Optional[int] = 1000
+    max_depth: Optional[int] = None
+    url_pattern_max_requests: Optional[int] = None
+    url_pattern_unproductive_after: Optional[int] = None
+    adaptive_priority: bool = False
+    adaptive_priority_weight: int = 10
 
     # AutoThrottle settings
     autothrottle_enabled: bool = False
@@ -97,6 +124,20 @@ class Spider(ABC):
     fp_keep_fragments: bool = False
     fp_include_headers: bool = False
 
+    # Item settings
+    item_type: Optional[Type[Struct]] = None
+    item_batch_size: int = 100
+    item_queue_size: int = 1000
+    keep_items: bool = True
+
+    # Deduplication settings
+    dedup_backend: DedupBackend = "memory"
+    dedup_error_rate: float = 0.001
+    dedup_redirects: bool = False
+    learn_redirects: bool = False
+    near_duplicates: Optional[NearDuplicateAction] = None
+    near_duplicate_distance: int = 3
+
     # Logging settings
     logging_level: int = logging.DEBUG
     logging_format: str = "[%(asctime)s]:({spider_name}) %(levelname)s: %(message)s"
@@ -112,6 +153,27 @@ class Spider(ABC):
         if self.name is None:
             raise ValueError(f"{self.__class__.__name__} must have a name.")
 
+        self._setup_logger()
+
+        self.crawldir: Optional[Path] = Path(crawldir) if crawldir else None
+        self._interval = interval
+        self._engine: Optional[CrawlerEngine] = None
+        self._original_sigint_handler: Any = None
+
+        self._session_manager = SessionManager()
+
+        try:
+            self.configure_sessions(self._session_manager)
+        except Exception as e:
+            raise SessionConfigurationError(f"Error in {self.__class__.__name__}.configure_sessions(): {e}") from e
+
+        if len(self._session_manager) == 0:
+            raise SessionConfigurationError(f"{self.__class__.__name__}.configure_sessions() did not add any sessions")
+
+        self.logger.info("Spider initialized")
+
+    def _setup_logger(self) -> None:
+        """Set up the spider's logger with its console, file, and log counter handlers."""
         self.logger = logging.getLogger(f"scrapling.spiders.{self.name}")
         self.logger.setLevel(self.logging_level)
         self.logger.handlers.clear()
@@ -135,23 +197,21 @@ class Spider(ABC):
             file_handler.setFormatter(formatter)
             self.logger.addHandler(file_handler)
 
-        self.crawldir: Optional[Path] = Path(crawldir) if crawldir else None
-        self._interval = interval
-        self._engine: Optional[CrawlerEngine] = None
-        self._original_sigint_handler: Any = None
-
+    def __getstate__(self) -> Dict[str, Any]:
+        """Leave out the state bound to the running process, so the spider can be sent to parse workers."""
+        state = self.__dict__.copy()
+        for key in ("logger", "_log_counter", "_engine", "_session_manager", "_original_sigint_handler"):
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        vars(self).update(state)
+        self._setup_logger()
+        self._engine = None
+        self._original_sigint_handler = None
+        # Sessions aren't used outside the engine's process
         self._session_manager = SessionManager()
 
-        try:
-            self.configure_sessions(self._session_manager)
-        except Exception as e:
-            raise SessionConfigurationError(f"Error in {self.__class__.__name__}.configure_sessions(): {e}") from e
-
-        if len(self._session_manager) == 0:
-            raise SessionConfigurationError(f"{self.__class__.__name__}.configure_sessions() did not add any sessions")
-
-        self.logger.info("Spider initialized")
-
     async def start_requests(self) -> AsyncGenerator[Request, None]:
         """Generate initial requests to start the crawl.
 
@@ -170,7 +230,7 @@ class Spider(ABC):
             yield Request(url, sid=self._session_manager.default_session_id)
 
     @abstractmethod
-    async def parse(self, response: "Response") -> AsyncGenerator[Dict[str, Any] | Request | None, None]:
+    async def parse(self, response: "Response") -> AsyncGenerator[Item | Request | None, None]:
         """Default callback for processing responses"""
         raise NotImplementedError(f"{self.__class__.__name__} must implement parse() method")
         yield  # Make this a generator for type checkers
@@ -197,7 +257,7 @@ class Spider(ABC):
         """
         pass
 
-    async def on_scraped_item(self, item: Dict[str, Any]) -> Dict[str, Any] | None:
+    async def on_scraped_item(self, item: Item) -> Item | None:
         """A hook to be overridden by users to do some processing on scraped items, return `None` to drop the item silently."""
         return item
 
@@ -229,6 +289,14 @@ class Spider(ABC):
 
         manager.add("default", FetcherSession())
 
+    def configure_pipeline(self) -> List[ItemStage]:
+        """Return the stages every scraped item goes through after `on_scraped_item()`, in order.
+
+        Override this method to stream items to files as they're scraped, or to process them in batches.
+        It's called at the start of every crawl, so each crawl gets new stages. The default has no stages.
+        """
+        return []
+
     def pause(self):
         """Request graceful shutdown of the crawling process."""
         if self._engine:
@@ -275,7 +343,7 @@ class Spider(ABC):
                     if isinstance(handler, logging.FileHandler):
                         handler.close()
 
-    def start(self, use_uvloop: bool = False, **backend_options: Any) -> CrawlResult:
+    def start(self, use_uvloop: bool = False, workers: int = 1, **backend_options: Any) -> CrawlResult:
         """Run the spider and return results.
 
         This is the main entry point for running a spider.
@@ -288,12 +356,17 @@ class Spider(ABC):
         allowing you to resume the crawl later by running the spider again.
 
         :param use_uvloop: Whether to use the faster uvloop/winloop event loop implementation, if available.
+        :param workers: The number of processes to crawl with. With more than one, each process owns the domains
+            that hash to it, and the results of all processes are merged. See `ShardedCrawl` for details.
         :param backend_options: Asyncio backend options to be used with `anyio.run`
         """
         backend_options = backend_options or {}
         if use_uvloop:
             backend_options.update({"use_uvloop": True})
 
+        if workers > 1:
+            return ShardedCrawl(self, workers, self.crawldir, self._interval, backend_options).run()
+
         # Set up SIGINT handler for graceful shutdown
         self._setup_signal_handler()
         try:
@@ -301,7 +374,7 @@ class Spider(ABC):
         finally:
             self._restore_signal_handler()
 
-    async def stream(self) -> AsyncGenerator[Dict[str, Any], None]:
+    async def stream(self) -> AsyncGenerator[Item, None]:
         """Stream items as they're scraped. Ideal for long-running spiders or building applications on top of the spiders.
 
         Must be called from an async context. Yields items one by one as they are scraped.
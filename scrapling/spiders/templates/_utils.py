@@ -1,24 +1,77 @@
 """Shared helpers for template spiders."""
 
-from gzip import GzipFile
-from io import BytesIO
+import io
+import zlib
 
-from scrapling.core._types import Optional
+from scrapling.core._types import Iterator, Optional
 
-__all__ = ["_decompress"]
+__all__ = ["_ChunkReader", "_decompress", "_iter_decompressed"]
 
 _GZIP_MAGIC = b"\x1f\x8b"
 _GUNZIP_MAX_SIZE = 64 * 1024 * 1024  # 64 MiB cap, defends against gzip bombs
+_CHUNK_SIZE = 64 * 1024
+
+
+def _iter_decompressed(body: bytes, content_type: Optional[str], chunk_size: int = _CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield `body` in chunks, gunzipping it on the way when the content-type or the magic bytes say it's gzipped.
+
+    Only one chunk of the decompressed output exists at a time, and the whole output is capped against gzip bombs.
+    """
+    if not ((content_type and ("gzip" in content_type.lower())) or (body[:2] == _GZIP_MAGIC)):
+        for start in range(0, len(body), chunk_size):
+            yield body[start : start + chunk_size]
+        return
+
+    decompressor = zlib.decompressobj(wbits=31)
+    data = body
+    total = 0
+    while True:
+        try:
+            chunk = decompressor.decompress(data, chunk_size)
+        except zlib.error as e:
+            raise OSError(f"Invalid gzip data: {e}") from None
+        total += len(chunk)
+        if total > _GUNZIP_MAX_SIZE:
+            raise OSError(f"gzip output exceeds {_GUNZIP_MAX_SIZE} bytes")
+        if chunk:
+            yield chunk
+
+        if decompressor.eof:
+            # A gzip file can be several members back to back
+            data = decompressor.unused_data
+            if data[:2] != _GZIP_MAGIC:
+                return
+            decompressor = zlib.decompressobj(wbits=31)
+        else:
+            data = decompressor.unconsumed_tail
+            if not data and not chunk:
+                raise OSError("Compressed file ended before the end-of-stream marker was reached")
 
 
 def _decompress(body: bytes, content_type: Optional[str]) -> bytes:
     """Gunzip `body` when the content-type or the magic bytes say it's gzipped, capped against gzip bombs."""
-    if (content_type and ("gzip" in content_type.lower())) or (body[:2] == _GZIP_MAGIC):
-        out = bytearray()
-        with GzipFile(fileobj=BytesIO(body)) as f:
-            while chunk := f.read1(8192):
-                out.extend(chunk)
-                if len(out) > _GUNZIP_MAX_SIZE:
-                    raise OSError(f"gzip output exceeds {_GUNZIP_MAX_SIZE} bytes")
-        return bytes(out)
-    return body
+    if not ((content_type and ("gzip" in content_type.lower())) or (body[:2] == _GZIP_MAGIC)):
+        return body
+    return b"".join(_iter_decompressed(body, content_type))
+
+
+class _ChunkReader(io.RawIOBase):
+    """A read-only binary stream over an iterator of chunks, to read them through `io.TextIOWrapper` as they come."""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:  # type: ignore[override]
+        while not self._pending:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._pending = chunk
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
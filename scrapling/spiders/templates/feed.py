@@ -2,7 +2,7 @@
 
 from copy import deepcopy
 from csv import DictReader
-from io import StringIO
+from io import BufferedReader, TextIOWrapper
 
 from lxml import etree
 from lxml.etree import _Element
@@ -20,7 +20,7 @@ from scrapling.core._types import (
 )
 from scrapling.spiders.request import Request
 from scrapling.spiders.spider import Spider
-from scrapling.spiders.templates._utils import _decompress
+from scrapling.spiders.templates._utils import _ChunkReader, _iter_decompressed
 
 if TYPE_CHECKING:
     from scrapling.engines.toolbelt.custom import Response
@@ -48,19 +48,7 @@ class XMLFeedSpider(Spider):
     async def parse(self, response: "Response") -> AsyncGenerator[Union[Dict[str, Any], Request, None], None]:
         """Iterate over the feed's `itertag` nodes and dispatch each one to `parse_node`."""
         content_type = response.headers.get("content-type") if response.headers else None
-        try:
-            body = _decompress(response.body, content_type)
-        except OSError as e:
-            self.logger.warning(f"Failed to decompress feed: {e}")
-            return
-
-        try:
-            root = etree.fromstring(body)
-        except etree.XMLSyntaxError as e:
-            self.logger.warning(f"Failed to parse XML feed from {response.url}: {e}")
-            return
-
-        for node in self._iter_nodes(root):
+        for node in self._iter_nodes(response.body, content_type, response.url):
             async for result in self.parse_node(response, node):
                 yield result
 
@@ -81,24 +69,53 @@ class XMLFeedSpider(Spider):
             raise ValueError(f"`itertag` prefix {prefix!r} is not defined in `namespaces`")
         return uri, name
 
-    def _iter_nodes(self, root: _Element) -> Iterator[_Element]:
+    def _iter_nodes(self, body: bytes, content_type: Optional[str], url: str) -> Iterator[_Element]:
+        """Parse the feed as it's decompressed, yielding every `itertag` node as soon as its closing tag is read.
+
+        Nodes are taken out of the tree once yielded, along with everything parsed before them, so the memory used
+        stays the same however large the feed is. Nodes parsed before a decompression or syntax error are still
+        yielded.
+        """
         uri, name = self._wanted_tag()
-        for el in root.iter():
-            if isinstance(el.tag, str):
-                qname = etree.QName(el.tag)
-                if qname.localname == name and (uri is None or qname.namespace == uri):
-                    yield self._strip_namespaces(el)
+        tag = f"{{{uri}}}{name}" if uri else f"{{*}}{name}"
+        parser = etree.XMLPullParser(events=("end",), tag=tag, resolve_entities=False, no_network=True)
+        try:
+            for chunk in _iter_decompressed(body, content_type):
+                try:
+                    parser.feed(chunk)
+                except etree.XMLSyntaxError:
+                    # The nodes that were complete before the error are still there to read
+                    yield from self._take_nodes(parser, tag)
+                    raise
+                yield from self._take_nodes(parser, tag)
+            parser.close()
+        except OSError as e:
+            self.logger.warning(f"Failed to decompress feed: {e}")
+        except etree.XMLSyntaxError as e:
+            self.logger.warning(f"Failed to parse XML feed from {url}: {e}")
+
+    def _take_nodes(self, parser: etree.XMLPullParser, tag: str) -> Iterator[_Element]:
+        for _, node in parser.read_events():
+            if next(node.iterancestors(tag), None) is not None:
+                # A node inside another one stays in place, since it's part of the outer node too
+                yield self._strip_namespaces(deepcopy(node))
+                continue
+            parent = node.getparent()
+            if parent is not None:
+                while node.getprevious() is not None:
+                    del parent[0]
+                parent.remove(node)
+            yield self._strip_namespaces(node)
 
     @staticmethod
     def _strip_namespaces(node: _Element) -> _Element:
-        """Return a copy of `node` with namespaces removed from every tag and attribute."""
-        node = deepcopy(node)
+        """Remove the namespaces from every tag and attribute of `node`, which must not be part of a tree anymore."""
         for el in node.iter():
-            if isinstance(el.tag, str):
-                el.tag = etree.QName(el.tag).localname
-            for key in list(el.attrib):
-                if isinstance(key, str) and key.startswith("{"):
-                    el.attrib[etree.QName(key).localname] = el.attrib.pop(key)
+            tag = el.tag
+            if isinstance(tag, str) and tag[0] == "{":
+                el.tag = tag[tag.rfind("}") + 1 :]
+            for key in [key for key in el.attrib if key[0] == "{"]:
+                el.attrib[key[key.rfind("}") + 1 :]] = el.attrib.pop(key)
         etree.cleanup_namespaces(node)
         return node
 
@@ -120,15 +137,23 @@ class CSVFeedSpider(Spider):
     async def parse(self, response: "Response") -> AsyncGenerator[Union[Dict[str, Any], Request, None], None]:
         """Read the feed's rows and dispatch each one to `parse_row`."""
         content_type = response.headers.get("content-type") if response.headers else None
-        try:
-            body = _decompress(response.body, content_type)
-        except OSError as e:
-            self.logger.warning(f"Failed to decompress feed: {e}")
-            return
-
-        text = body.decode(response.encoding or "utf-8", errors="replace")
-        reader = DictReader(StringIO(text), fieldnames=self.headers, delimiter=self.delimiter, quotechar=self.quotechar)
-        for row in reader:
+        # The rows are decoded and read as the body is decompressed, instead of decoding the whole feed first
+        text = TextIOWrapper(
+            BufferedReader(_ChunkReader(_iter_decompressed(response.body, content_type))),
+            encoding=response.encoding or "utf-8",
+            errors="replace",
+            newline="",
+        )
+        reader = DictReader(text, fieldnames=self.headers, delimiter=self.delimiter, quotechar=self.quotechar)
+        while True:
+            # Only reading the rows can fail to decompress, the errors of `parse_row` are left to the caller
+            try:
+                row = next(reader, None)
+            except OSError as e:
+                self.logger.warning(f"Failed to decompress feed: {e}")
+                return
+            if row is None:
+                return
             async for result in self.parse_row(response, dict(row)):
                 yield result
 
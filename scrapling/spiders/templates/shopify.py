@@ -6,10 +6,12 @@ from w3lib.html import remove_tags
 
 from scrapling.spiders.request import Request
 from scrapling.spiders.spider import Spider
+from scrapling.spiders.pagination import Paginator
 from scrapling.core._types import (
     TYPE_CHECKING,
     Any,
     AsyncGenerator,
+    Callable,
     Dict,
     Generator,
     Set,
@@ -28,6 +30,10 @@ class ShopifySpider(Spider):
     Set `target_website` to the store's domain (or set `start_urls`/`allowed_domains` instead), and the
     spider walks the store's `/collections.json` pages, then each collection's `products.json` pages,
     yielding one item per product variant without touching the website's HTML.
+
+    :cvar pages_ahead: How many pages of every listing to request ahead of the one being parsed. The default, 1,
+        requests each page after the previous one came back; higher values fetch a collection's pages concurrently,
+        at the cost of up to `pages_ahead - 1` extra requests past its last page.
     """
 
     name = "shopify"
@@ -35,6 +41,7 @@ class ShopifySpider(Spider):
     collections_url = "https://{website}/collections.json?page={page}&limit=250"
     products_url = "https://{website}/collections/{handle}/products.json?page={page}&limit=250"
     product_url = "https://{website}/collections/{handle}/products/{product_handle}"
+    pages_ahead: int = 1
 
     def __init__(self, *args: Any, **kwargs: Any):
         super().__init__(*args, **kwargs)
@@ -43,31 +50,40 @@ class ShopifySpider(Spider):
             raise ValueError(f"{self.__class__.__name__} must set `target_website`, `start_urls`, or `allowed_domains`")
         self.target_website = urlparse(source if "://" in source else f"https://{source}").netloc
         self.collected_ids: Set[int] = set()
+        self.paginator = Paginator(self.pages_ahead)
 
-    async def start_requests(self) -> AsyncGenerator[Request, None]:
-        yield Request(
-            self.collections_url.format(website=self.target_website, page=1),
+    def _collections_page(self, page: int) -> Request:
+        return Request(
+            self.collections_url.format(website=self.target_website, page=page),
             callback=self.parse,
-            meta={"page": 1},
+            meta={"page": page},
         )
 
+    def _products_page(self, handle: str) -> Callable[[int], Request]:
+        def page_request(page: int) -> Request:
+            return Request(
+                self.products_url.format(website=self.target_website, handle=handle, page=page),
+                callback=self.parse_collection,
+                meta={"handle": handle, "page": page},
+            )
+
+        return page_request
+
+    async def start_requests(self) -> AsyncGenerator[Request, None]:
+        for request in self.paginator.start(None, self._collections_page):
+            yield request
+
     async def parse(self, response: "Response") -> AsyncGenerator[Union[Dict[str, Any], Request, None], None]:
         collections = response.json()["collections"]
-        if collections:
-            for collection in collections:
-                if collection["products_count"]:
-                    yield Request(
-                        self.products_url.format(website=self.target_website, handle=collection["handle"], page=1),
-                        callback=self.parse_collection,
-                        meta={"handle": collection["handle"], "page": 1},
-                    )
-
-            next_page = response.meta.get("page", 1) + 1
-            yield Request(
-                self.collections_url.format(website=self.target_website, page=next_page),
-                callback=self.parse,
-                meta={"page": next_page},
-            )
+        for collection in collections:
+            if collection["products_count"]:
+                for request in self.paginator.start(collection["handle"], self._products_page(collection["handle"])):
+                    yield request
+
+        for request in self.paginator.follow(
+            None, response.meta.get("page", 1), bool(collections), self._collections_page
+        ):
+            yield request
 
     def _process_product(self, product: Dict, collection_handle: str) -> Generator[Dict[str, Any], None, None]:
         for variant in product["variants"]:
@@ -98,15 +114,13 @@ class ShopifySpider(Spider):
     ) -> AsyncGenerator[Union[Dict[str, Any], Request, None], None]:
         collection_handle, current_page = response.meta["handle"], response.meta.get("page", 1)
         products = response.json()["products"]
-        if products:
-            for product in products:
-                for item in self._process_product(product, collection_handle):
-                    yield item
+        for product in products:
+            for item in self._process_product(product, collection_handle):
+                yield item
 
-            yield Request(
-                self.products_url.format(website=self.target_website, handle=collection_handle, page=current_page + 1),
-                callback=self.parse_collection,
-                meta={"handle": collection_handle, "page": current_page + 1},
-            )
-        else:
+        if not products and not self.paginator.is_finished(collection_handle, current_page):
             self.logger.debug(f"Extracted all products from collection {collection_handle}")
+        for request in self.paginator.follow(
+            collection_handle, current_page, bool(products), self._products_page(collection_handle)
+        ):
+            yield request
@@ -1,5 +1,10 @@
 """Sitemap template spider."""
 
+import re
+import time
+import sqlite3
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
 from dataclasses import dataclass, field
 from urllib.parse import urlsplit
 
@@ -11,15 +16,18 @@ from scrapling.core._types import (
     Any,
     AsyncGenerator,
     Dict,
+    Iterable,
+    Iterator,
     List,
     Optional,
+    Tuple,
     Union,
 )
 from scrapling.spiders.links import LinkExtractor
 from scrapling.spiders.request import Request
 from scrapling.spiders.spider import Spider
 from scrapling.spiders.templates.crawler import CrawlRule
-from scrapling.spiders.templates._utils import _decompress
+from scrapling.spiders.templates._utils import _iter_decompressed
 
 if TYPE_CHECKING:
     from scrapling.engines.toolbelt.custom import Response
@@ -28,16 +36,147 @@ if TYPE_CHECKING:
 __all__ = ["SitemapSpider"]
 
 
+_SITEMAP_ROOTS = ("urlset", "sitemapindex")
+# How many sitemap entries are checked against the lastmod store at once
+_LASTMOD_BATCH_SIZE = 500
+# How long a page is assumed to stay the same for every `<changefreq>` value, when its sitemap entry has no `<lastmod>`
+CHANGEFREQ_SECONDS = {
+    "always": 0.0,
+    "hourly": 3600.0,
+    "daily": 86400.0,
+    "weekly": 7 * 86400.0,
+    "monthly": 30 * 86400.0,
+    "yearly": 365 * 86400.0,
+    "never": float("inf"),
+}
+# The W3C datetime forms: a year, a month, a day, then a time in minutes, seconds or fractions of seconds. The time
+# zone is required by the spec, but a missing one is read as UTC.
+_W3C_DATETIME = re.compile(
+    r"(\d{4})(?:-(\d{2})(?:-(\d{2})"
+    r"(?:T(\d{2}):(\d{2})(?::(\d{2})(?:\.(\d+))?)?(Z|[+-]\d{2}:\d{2})?)?)?)?"
+)
+
+
+def _parse_lastmod(text: str) -> Optional[float]:
+    """Parse a W3C datetime like `2026-01-15`, `2026-01-15T10:30Z` or `2026-01-15T10:30:00.5+02:00` into a UTC
+    timestamp."""
+    match = _W3C_DATETIME.fullmatch(text.strip())
+    if match is None:
+        return None
+    year, month, day, hour, minute, second, fraction, zone = match.groups()
+    if zone is None or zone == "Z":
+        tz = timezone.utc
+    else:
+        offset = timedelta(hours=int(zone[1:3]), minutes=int(zone[4:6]))
+        tz = timezone(-offset if zone[0] == "-" else offset)
+    try:
+        value = datetime(
+            int(year),
+            int(month or 1),
+            int(day or 1),
+            int(hour or 0),
+            int(minute or 0),
+            int(second or 0),
+            int((fraction or "0")[:6].ljust(6, "0")),
+            tzinfo=tz,
+        )
+    except ValueError:
+        return None
+    return value.timestamp()
+
+
+def _parse_priority(text: str) -> Optional[float]:
+    try:
+        priority = float(text)
+    except ValueError:
+        return None
+    return priority if 0.0 <= priority <= 1.0 else None
+
+
+@dataclass
+class SitemapEntry:
+    """A `<url>` of a `<urlset>`, with the optional hints the site gave about it."""
+
+    loc: str
+    lastmod: Optional[float] = None
+    changefreq: Optional[str] = None
+    priority: Optional[float] = None
+    alternates: List[str] = field(default_factory=list)
+
+
 @dataclass
 class SitemapResult:
     """Parsed sitemap body.
 
-    `urls` holds the entries from a `<urlset>`; `sitemaps` holds child sitemap
+    `entries` holds the `<url>` elements of a `<urlset>`, and `urls` their URLs; `sitemaps` holds child sitemap
     URLs from a `<sitemapindex>` (each of which is fetched recursively).
     """
 
     urls: List[str] = field(default_factory=list)
     sitemaps: List[str] = field(default_factory=list)
+    entries: List[SitemapEntry] = field(default_factory=list)
+
+
+class SitemapLastmodStore:
+    """Remembers when every sitemap URL was last crawled, and its `<lastmod>` back then, in a SQLite file.
+
+    The file outlives the crawl, so the next crawl can only schedule the URLs that changed since.
+    """
+
+    # SQLite's default limit of variables in a single query is 999 on older versions
+    _CHUNK = 900
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=30.0, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, lastmod REAL, crawled_at REAL)")
+
+    def crawled(self, urls: Iterable[str]) -> Dict[str, Tuple[Optional[float], float]]:
+        """The `(lastmod, crawled_at)` of the given URLs that were crawled before."""
+        urls = list(urls)
+        found: Dict[str, Tuple[Optional[float], float]] = {}
+        for start in range(0, len(urls), self._CHUNK):
+            chunk = urls[start : start + self._CHUNK]
+            rows = self._db.execute(
+                f"SELECT url, lastmod, crawled_at FROM urls WHERE url IN ({','.join('?' * len(chunk))})",  # nosec B608
+                chunk,
+            )
+            for url, lastmod, crawled_at in rows:
+                found[url] = (lastmod, crawled_at)
+        return found
+
+    def mark(self, url: str, lastmod: Optional[float], crawled_at: Optional[float] = None) -> None:
+        """Record that `url` was crawled, when its sitemap said it was last modified at `lastmod`."""
+        self._db.execute(
+            "INSERT OR REPLACE INTO urls (url, lastmod, crawled_at) VALUES (?, ?, ?)",
+            (url, lastmod, time.time() if crawled_at is None else crawled_at),
+        )
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM urls").fetchone()[0]
+
+
+def _entry_urls(entry: SitemapEntry) -> List[str]:
+    return [entry.loc, *entry.alternates] if entry.loc else entry.alternates
+
+
+def _is_due(entry: SitemapEntry, previous: Optional[Tuple[Optional[float], float]], now: float) -> bool:
+    """Whether a sitemap entry needs crawling again, given when it was crawled last and its `<lastmod>` back then."""
+    if previous is None:
+        return True
+    lastmod, crawled_at = previous
+    if entry.lastmod is not None:
+        return lastmod is None or entry.lastmod > lastmod
+    if entry.changefreq in CHANGEFREQ_SECONDS:
+        return now - crawled_at >= CHANGEFREQ_SECONDS[entry.changefreq]
+    # Without any hint, the page may have changed
+    return True
 
 
 class SitemapSpider(Spider):
@@ -52,11 +191,37 @@ class SitemapSpider(Spider):
         `<sitemapindex>` to descend into. ``None`` means descend into all.
     :cvar sitemap_alternate_links: When enabled, alternate-language URLs are also
         routed through `rules()`.
+    :cvar sitemap_lastmod_store: Path of a SQLite file remembering when every URL was
+        crawled. When set, only the URLs whose `<lastmod>` is newer than at their last
+        crawl are scheduled, or whose `<changefreq>` says they're due without a `<lastmod>`.
+    :cvar sitemap_use_priority: When enabled, the sitemap's `<priority>` (0.0 to 1.0,
+        0.5 by default) sets the requests' priority, from -5 to 5, unless their rule has one.
     """
 
     sitemap_urls: List[str] = []
     sitemap_follow: Optional[LinkExtractor] = None
     sitemap_alternate_links: bool = False
+    sitemap_lastmod_store: Optional[str] = None
+    sitemap_use_priority: bool = False
+
+    _lastmod_store: Optional[SitemapLastmodStore] = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = super().__getstate__()
+        # Every process opens the store file itself
+        state.pop("_lastmod_store", None)
+        return state
+
+    def _get_lastmod_store(self) -> Optional[SitemapLastmodStore]:
+        if self.sitemap_lastmod_store and self._lastmod_store is None:
+            self._lastmod_store = SitemapLastmodStore(self.sitemap_lastmod_store)
+        return self._lastmod_store
+
+    async def on_close(self) -> None:
+        if self._lastmod_store is not None:
+            self._lastmod_store.close()
+            self._lastmod_store = None
+        await super().on_close()
 
     def rules(self) -> List[CrawlRule]:
         """Override to define dispatch rules for sitemap URLs."""
@@ -85,55 +250,100 @@ class SitemapSpider(Spider):
             return []
         return list(parser.sitemaps)
 
-    def _extract_urls(self, root: Any) -> List[str]:
-        urls: List[str] = []
-        for url_el in root:
-            if self._get_type(url_el) != "url":
-                continue
+    def _entry(self, url_el: Any) -> Optional[SitemapEntry]:
+        """Read a `<url>` element, or return None if it has no URL."""
+        entry = SitemapEntry(loc="")
+        for child in url_el:
+            if not isinstance(child.tag, str):
+                continue  # Comments and processing instructions
+            name = self._get_type(child)
+            if name == "loc" and child.text:
+                entry.loc = child.text.strip()
+            elif name == "lastmod" and child.text:
+                entry.lastmod = _parse_lastmod(child.text)
+            elif name == "changefreq" and child.text:
+                entry.changefreq = child.text.strip().lower()
+            elif name == "priority" and child.text:
+                entry.priority = _parse_priority(child.text)
+            elif self.sitemap_alternate_links and name == "link":
+                href = child.get("href")
+                if href:
+                    entry.alternates.append(href.strip())
+        return entry if entry.loc or entry.alternates else None
+
+    def _extract_entries(self, root: Any) -> List[SitemapEntry]:
+        entries = (
+            self._entry(url_el) for url_el in root if isinstance(url_el.tag, str) and self._get_type(url_el) == "url"
+        )
+        return [entry for entry in entries if entry is not None]
 
-            for child in url_el:
-                name = self._get_type(child)
-                if name == "loc" and child.text:
-                    urls.append(child.text.strip())
-                elif self.sitemap_alternate_links and name == "link":
-                    href = child.get("href")
-                    if href:
-                        urls.append(href.strip())
-        return urls
+    def _extract_urls(self, root: Any) -> List[str]:
+        return [url for entry in self._extract_entries(root) for url in _entry_urls(entry)]
 
     @staticmethod
     def _get_type(el: Any) -> str:
-        return etree.QName(el.tag).localname
-
-    def _sm_body(self, body: bytes, content_type: Optional[str] = None) -> SitemapResult:
-        """Parse a sitemap body and return its URLs and any child sitemaps."""
+        # The tag without its namespace, like `etree.QName(el.tag).localname` but quicker
+        tag = el.tag
+        return tag[tag.rfind("}") + 1 :]
+
+    def _iter_sitemap(self, body: bytes, content_type: Optional[str] = None) -> Iterator[Union[SitemapEntry, str]]:
+        """Parse a sitemap body as it's decompressed, yielding each `<url>` entry as soon as its element is complete,
+        or each child sitemap URL if it's a `<sitemapindex>`.
+
+        Parsed elements are dropped right away, so the memory used stays the same however large the sitemap is.
+        Whatever was parsed before a decompression or syntax error is still yielded.
+        """
+        # Only the elements holding entries are reported, their content is read from them directly
+        parser = etree.XMLPullParser(
+            events=("end",), tag=("{*}url", "{*}sitemap"), resolve_entities=False, no_network=True
+        )
+        root_name: Optional[str] = None
         try:
-            body = _decompress(body, content_type)
+            for chunk in _iter_decompressed(body, content_type):
+                parser.feed(chunk)
+                for _, element in parser.read_events():
+                    parent = element.getparent()
+                    if parent is None or parent.getparent() is not None:
+                        continue
+                    if root_name is None:
+                        root_name = self._get_type(parent)
+                        if root_name not in _SITEMAP_ROOTS:
+                            self.logger.warning(f"Unknown sitemap root element: {root_name!r}")
+                            return
+
+                    name = self._get_type(element)
+                    if root_name == "urlset" and name == "url":
+                        entry = self._entry(element)
+                        if entry is not None:
+                            yield entry
+                    elif root_name == "sitemapindex" and name == "sitemap":
+                        for child in element:
+                            if isinstance(child.tag, str) and self._get_type(child) == "loc" and child.text:
+                                yield child.text.strip()
+                                break
+
+                    # Drop what's parsed so far, so the tree never grows beyond one entry
+                    element.clear()
+                    while element.getprevious() is not None:
+                        del parent[0]
+            root = parser.close()
+            if root_name is None and self._get_type(root) not in _SITEMAP_ROOTS:
+                self.logger.warning(f"Unknown sitemap root element: {self._get_type(root)!r}")
         except OSError as e:
             self.logger.warning(f"Failed to decompress sitemap: {e}")
-            return SitemapResult()
-
-        try:
-            root = etree.fromstring(body)
         except etree.XMLSyntaxError as e:
             self.logger.warning(f"Failed to parse sitemap XML: {e}")
-            return SitemapResult()
-
-        root_name = self._get_type(root)
-        if root_name == "sitemapindex":
-            locs = []
-            for sm_el in root:
-                if self._get_type(sm_el) == "sitemap":
-                    for child in sm_el:
-                        if self._get_type(child) == "loc" and child.text:
-                            locs.append(child.text.strip())
-                            break
-            return SitemapResult(sitemaps=locs)
-        if root_name == "urlset":
-            return SitemapResult(urls=self._extract_urls(root))
-
-        self.logger.warning(f"Unknown sitemap root element: {root_name!r}")
-        return SitemapResult()
+
+    def _sm_body(self, body: bytes, content_type: Optional[str] = None) -> SitemapResult:
+        """Parse a sitemap body and return its URLs and any child sitemaps."""
+        result = SitemapResult()
+        for parsed in self._iter_sitemap(body, content_type):
+            if isinstance(parsed, SitemapEntry):
+                result.entries.append(parsed)
+                result.urls.extend(_entry_urls(parsed))
+            else:
+                result.sitemaps.append(parsed)
+        return result
 
     async def _parse_sitemap(self, response: "Response") -> AsyncGenerator[Union[Dict[str, Any], Request, None], None]:
         if urlsplit(response.url).path.endswith("/robots.txt"):
@@ -146,28 +356,99 @@ class SitemapSpider(Spider):
             return
 
         content_type = response.headers.get("content-type") if response.headers else None
-        result = self._sm_body(response.body, content_type=content_type)
+        rules = self.rules()
+        store = self._get_lastmod_store()
+        # With a lastmod store, entries are checked against it in batches instead of one query each
+        batch: List[SitemapEntry] = []
+        skipped = 0
+
+        for parsed in self._iter_sitemap(response.body, content_type):
+            if isinstance(parsed, str):
+                # Descend into child sitemaps (apply sitemap_follow filter if present)
+                if self.sitemap_follow is None or self.sitemap_follow.matches(parsed):
+                    yield response.follow(parsed, callback=self._parse_sitemap)
+                continue
 
-        # Descend into child sitemaps (apply sitemap_follow filter if present)
-        for child_url in result.sitemaps:
-            if self.sitemap_follow is not None and not self.sitemap_follow.matches(child_url):
+            if store is None:
+                for request in self._entry_requests(response, parsed, rules, None):
+                    yield request
                 continue
-            yield response.follow(child_url, callback=self._parse_sitemap)
 
-        # Dispatch each URL through rules() (first match wins; unmatched drop unless rules empty)
-        rules = self.rules()
-        for url in result.urls:
-            req = self._dispatch(response, url, rules)
-            if req is not None:
-                yield req
+            batch.append(parsed)
+            if len(batch) >= _LASTMOD_BATCH_SIZE:
+                changed = self._changed_entries(store, batch)
+                skipped += len(batch) - len(changed)
+                batch = []
+                for entry in changed:
+                    for request in self._entry_requests(response, entry, rules, store):
+                        yield request
+
+        if batch:
+            changed = self._changed_entries(store, batch)  # type: ignore[arg-type]
+            skipped += len(batch) - len(changed)
+            for entry in changed:
+                for request in self._entry_requests(response, entry, rules, store):
+                    yield request
+        if skipped:
+            self.logger.info(f"Skipped {skipped} unchanged URLs from {response.url}")
+
+    def _entry_requests(
+        self,
+        response: "Response",
+        entry: SitemapEntry,
+        rules: List[CrawlRule],
+        store: Optional[SitemapLastmodStore],
+    ) -> Iterator[Request]:
+        """Dispatch the URLs of an entry through rules() (first match wins; unmatched drop unless rules empty)."""
+        priority = None
+        if self.sitemap_use_priority and entry.priority is not None:
+            priority = round((entry.priority - 0.5) * 10)
+        for url in _entry_urls(entry):
+            req = self._dispatch(response, url, rules, priority)
+            if req is None:
+                continue
+            if store is not None:
+                req = self._track_lastmod(req, entry, store)
+            yield req
+
+    @staticmethod
+    def _changed_entries(store: SitemapLastmodStore, entries: List[SitemapEntry]) -> List[SitemapEntry]:
+        """The entries that changed since they were last crawled, or were never crawled."""
+        crawled = store.crawled(entry.loc or entry.alternates[0] for entry in entries)
+        now = time.time()
+        return [entry for entry in entries if _is_due(entry, crawled.get(entry.loc or entry.alternates[0]), now)]
+
+    def _track_lastmod(self, request: Request, entry: SitemapEntry, store: SitemapLastmodStore) -> Request:
+        """Route the request through `_parse_sitemap_page`, which records the crawl in the store once it's parsed."""
+        callback_name = getattr(request.callback, "__name__", None) if request.callback is not None else "parse"
+        if callback_name is None or getattr(self, callback_name, None) != (request.callback or self.parse):
+            # Only the spider's own methods survive checkpoints, so other callbacks are recorded right away
+            store.mark(entry.loc or request.url, entry.lastmod)
+            return request
+        request.meta["_sitemap_callback"] = callback_name
+        request.meta["_sitemap_entry"] = (entry.loc or entry.alternates[0], entry.lastmod)
+        request.callback = self._parse_sitemap_page
+        return request
+
+    async def _parse_sitemap_page(
+        self, response: "Response"
+    ) -> AsyncGenerator[Union[Dict[str, Any], Request, None], None]:
+        async for result in getattr(self, response.meta["_sitemap_callback"])(response):
+            yield result
+        # Only pages whose callback went through are crawled as far as the next crawl is concerned
+        store = self._get_lastmod_store()
+        if store is not None:
+            store.mark(*response.meta["_sitemap_entry"])
 
     @staticmethod
-    def _dispatch(response: "Response", url: str, rules: List[CrawlRule]) -> Optional[Request]:
+    def _dispatch(
+        response: "Response", url: str, rules: List[CrawlRule], priority: Optional[int] = None
+    ) -> Optional[Request]:
         if not rules:
-            return response.follow(url)
+            return response.follow(url, priority=priority)
         for rule in rules:
             if rule.link_extractor.matches(url):
-                req = response.follow(url, callback=rule.callback)
+                req = response.follow(url, callback=rule.callback, priority=priority)
                 if rule.priority is not None:
                     req.priority = rule.priority
                 if rule.process_request is not None:
@@ -0,0 +1,125 @@
+import re
+from urllib.parse import urlsplit, parse_qsl
+
+from scrapling.core._types import Any, Dict, Optional
+
+_NUMBER = re.compile(r"\d+")
+_HEX = re.compile(r"[0-9a-f]{8,}|[0-9a-f]{8}(?:-[0-9a-f]{4}){3}-[0-9a-f]{12}", re.IGNORECASE)
+
+
+def url_template(url: str) -> str:
+    """The template of a URL, shared by the URLs that only differ by the values in it.
+
+    Numbers become `{n}`, hex strings and UUIDs become `{hex}`, path parameters like `;jsessionid=...` are dropped,
+    and the query only keeps its parameters' names, sorted, so `/events/2024/05?view=week&sort=asc` and
+    `/events/1999/12?sort=desc&view=day` are both `/events/{n}/{n}?sort&view`.
+    """
+    parts = urlsplit(url)
+    segments = []
+    for segment in parts.path.split("/"):
+        segment = segment.split(";", 1)[0]
+        if not segment.isdigit() and not segment.isalpha() and _HEX.fullmatch(segment):
+            segments.append("{hex}")
+        else:
+            segments.append(_NUMBER.sub("{n}", segment))
+    template = parts.netloc.lower() + "/".join(segments)
+    query = "&".join(sorted({name for name, _ in parse_qsl(parts.query, keep_blank_values=True)}))
+    return f"{template}?{query}" if query else template
+
+
+class _Pattern:
+    """The counters of one URL template."""
+
+    __slots__ = ("requests", "fetched", "items", "productive", "blocked", "throttled")
+
+    def __init__(self):
+        self.requests = 0  # Queued
+        self.fetched = 0  # Whose callbacks ran
+        self.items = 0
+        self.productive = 0  # Fetched and yielded an item, or a new URL of another template
+        self.blocked = 0
+        self.throttled = 0
+
+
+class UrlPatterns:
+    """Groups the URLs of a crawl by template, to find the infinite URL spaces that would fill the frontier with
+    useless requests otherwise: calendars, every combination of sorting and filtering options, session IDs in paths...
+
+    A template that was queued `max_requests` times gets no more requests. A template whose pages were fetched
+    `unproductive_after` times without yielding a single item or a link to another template gets its next requests
+    queued behind everything else, until one of its pages yields something.
+    """
+
+    def __init__(self, max_requests: Optional[int] = None, unproductive_after: Optional[int] = None):
+        """
+        :param max_requests: How many requests of a template can be queued, or None for no limit.
+        :param unproductive_after: How many pages of a template can be fetched without yielding anything before its
+            requests are queued last, or None to never do it.
+        """
+        if max_requests is not None and max_requests < 1:
+            raise ValueError(f"`max_requests` must be at least 1, got {max_requests}")
+        if unproductive_after is not None and unproductive_after < 1:
+            raise ValueError(f"`unproductive_after` must be at least 1, got {unproductive_after}")
+        self.max_requests = max_requests
+        self.unproductive_after = unproductive_after
+        self._patterns: Dict[str, _Pattern] = {}
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def _pattern(self, template: str) -> _Pattern:
+        pattern = self._patterns.get(template)
+        if pattern is None:
+            pattern = self._patterns[template] = _Pattern()
+        return pattern
+
+    def is_over_budget(self, template: str) -> bool:
+        """Whether a template was queued `max_requests` times already. Counts the request as blocked if it was."""
+        pattern = self._pattern(template)
+        if self.max_requests is None or pattern.requests < self.max_requests:
+            return False
+        pattern.blocked += 1
+        return True
+
+    def is_unproductive(self, template: str) -> bool:
+        """Whether a template's pages were fetched `unproductive_after` times without yielding anything."""
+        pattern = self._pattern(template)
+        return (
+            self.unproductive_after is not None
+            and pattern.fetched >= self.unproductive_after
+            and pattern.productive == 0
+        )
+
+    def record_request(self, template: str, throttled: bool = False) -> None:
+        """Count a queued request of a template."""
+        pattern = self._pattern(template)
+        pattern.requests += 1
+        pattern.throttled += throttled
+
+    def record_fetch(self, template: str, items: int, leads: int) -> None:
+        """Count a page of a template whose callbacks ran.
+
+        :param template: The page's template.
+        :param items: How many items its callbacks yielded.
+        :param leads: How many new requests of other templates its callbacks yielded.
+        """
+        pattern = self._pattern(template)
+        pattern.fetched += 1
+        pattern.items += items
+        pattern.productive += bool(items or leads)
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """The counters of the templates that were blocked or throttled, by template."""
+        return {
+            template: {
+                "status": "blocked" if pattern.blocked else "throttled",
+                "requests": pattern.requests,
+                "blocked": pattern.blocked,
+                "throttled": pattern.throttled,
+                "fetched": pattern.fetched,
+                "items": pattern.items,
+                "items_per_fetch": round(pattern.items / pattern.fetched, 2) if pattern.fetched else 0.0,
+            }
+            for template, pattern in self._patterns.items()
+            if pattern.blocked or pattern.throttled
+        }
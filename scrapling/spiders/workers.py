@@ -0,0 +1,180 @@
+import pickle
+import asyncio
+import logging
+import traceback
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import anyio
+
+from scrapling.spiders.request import Request, Response
+from scrapling.core.utils import set_logger, reset_logger
+from scrapling.core._types import Any, AsyncGenerator, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from scrapling.spiders.spider import Spider
+
+# The results of one callback: what it yielded in order, the error that stopped it with its formatted traceback if
+# any, and how many messages it logged per level
+CallbackResults = Tuple[List[Any], Optional[BaseException], str, Dict[int, int]]
+
+# State of the worker process, set by `_init_worker`
+_spider: Optional["Spider"] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+# The engine already logged the fetch, so rebuilding the response in the worker shouldn't log it again
+_quiet_logger = logging.getLogger("scrapling.spiders.workers")
+_quiet_logger.disabled = True
+
+
+def _init_worker(spider: "Spider") -> None:
+    global _spider, _loop
+    _spider = spider
+    _loop = asyncio.new_event_loop()
+    set_logger(spider.logger)
+
+
+def _picklable_error(error: BaseException) -> BaseException:
+    """Return the error itself if it can be sent back to the engine, or a `RuntimeError` describing it."""
+    try:
+        pickle.loads(pickle.dumps(error))
+        return error
+    except Exception:
+        return RuntimeError(f"{type(error).__name__}: {error}")
+
+
+def _run_callback(request: Request, payload: Dict[str, Any]) -> CallbackResults:
+    """Rebuild the response in the worker and run the request's callback on it."""
+    assert _spider is not None and _loop is not None
+    counts_before = dict(_spider._log_counter.counts)
+    request._restore_callback(_spider)
+    callback = request.callback if request.callback else _spider.parse
+
+    token = set_logger(_quiet_logger)
+    try:
+        response = _rebuild_response(payload)
+    finally:
+        reset_logger(token)
+    response.request = request
+
+    results: List[Any] = []
+
+    async def collect() -> None:
+        async for result in callback(response):
+            results.append(result)
+
+    error: Optional[BaseException] = None
+    formatted_traceback = ""
+    try:
+        _loop.run_until_complete(collect())
+    except Exception as e:
+        error = _picklable_error(e)
+        formatted_traceback = traceback.format_exc()
+
+    counts = {level: count - counts_before[level] for level, count in _spider._log_counter.counts.items()}
+    return results, error, formatted_traceback, counts
+
+
+def _call_in_worker(executor: ProcessPoolExecutor, request: Request, payload: Dict[str, Any]) -> CallbackResults:
+    """Run the callback in a worker, blocking the calling thread until it's done."""
+    return executor.submit(_run_callback, request, payload).result()
+
+
+def _rebuild_response(payload: Dict[str, Any]) -> Response:
+    """Rebuild a response sent by `_response_payload`, with its redirects and captured XHR responses."""
+    fields = dict(payload)
+    history = [_rebuild_response(redirect) for redirect in fields.pop("history")]
+    captured_xhr = [_rebuild_response(xhr) for xhr in fields.pop("captured_xhr")]
+    response = Response(**fields, history=history)
+    response.captured_xhr = captured_xhr
+    return response
+
+
+def _response_payload(request: Optional[Request], response: Response) -> Dict[str, Any]:
+    """The fields the worker rebuilds the response from, since responses can't be pickled once they're parsed."""
+    return {
+        "url": response.url,
+        "content": response.body,
+        "status": response.status,
+        "reason": response.reason,
+        "cookies": response.cookies,
+        "headers": dict(response.headers),
+        "request_headers": dict(response.request_headers),
+        "encoding": response.encoding,
+        "method": request._session_kwargs.get("method", "GET") if request is not None else "GET",
+        "meta": response.meta,
+        "history": [_response_payload(None, redirect) for redirect in response.history],
+        "captured_xhr": [_response_payload(None, xhr) for xhr in response.captured_xhr],
+    }
+
+
+class CallbackWorkerPool:
+    """Runs the spider's callbacks in a pool of worker processes, so parsing doesn't compete with the crawl loop.
+
+    Each worker gets its own copy of the spider. The engine sends it the raw response, and the worker rebuilds it,
+    runs the callback, then sends back everything it yielded in order for the engine to process as usual. The engine
+    creates the responses with `deferred_parsing()`, so the pages are only parsed in the workers, unless the engine
+    needs them too, like for `near_duplicates`.
+    """
+
+    def __init__(self, spider: "Spider", workers: int):
+        if workers < 1:
+            raise ValueError("The number of parse workers must be at least 1.")
+        self.spider = spider
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # One thread waits on every busy worker, so only as many callbacks as there are workers are submitted at once
+        self._limiter: Optional[anyio.CapacityLimiter] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Forking a process that runs an event loop and threads isn't safe, so workers are always spawned
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.spider,),
+            )
+        return self._executor
+
+    async def results(self, request: Request, response: Response) -> AsyncGenerator[Any, None]:
+        """Run the request's callback in a worker and yield its results, then raise its error if it failed.
+
+        :param request: The request the response belongs to
+        :param response: The response to pass to the callback
+        """
+        if self._limiter is None:
+            self._limiter = anyio.CapacityLimiter(self.workers)
+        results, error, formatted_traceback, counts = await anyio.to_thread.run_sync(
+            _call_in_worker,
+            self._get_executor(),
+            request,
+            _response_payload(request, response),
+            limiter=self._limiter,
+            abandon_on_cancel=True,
+        )
+
+        for level, count in counts.items():
+            self.spider._log_counter.counts[level] += count
+
+        for result in results:
+            if isinstance(result, Request):
+                result._restore_callback(self.spider)
+            elif isinstance(result, (list, tuple)):
+                for request in result:
+                    if isinstance(request, Request):
+                        request._restore_callback(self.spider)
+            yield result
+
+        if error is not None:
+            # Python 3.10 doesn't have exception notes, the error is still reported without the worker's traceback
+            add_note = getattr(error, "add_note", None)
+            if formatted_traceback and add_note is not None:
+                add_note(formatted_traceback)
+            raise error
+
+    def close(self) -> None:
+        """Stop the worker processes, dropping the callbacks that haven't started yet."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
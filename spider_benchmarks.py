@@ -0,0 +1,445 @@
+"""Benchmarks for the spiders' engine internals, run against a local mock server.
+
+Usage: python spider_benchmarks.py
+"""
+
+import copy
+import gzip
+import time
+import base64
+import hashlib
+import logging
+import resource
+import tempfile
+import threading
+import multiprocessing
+import tracemalloc
+from pathlib import Path
+from statistics import mean
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import anyio
+import orjson
+import msgspec
+from lxml import etree
+
+from scrapling.parser import Selector
+from scrapling.spiders import Spider, Request, SitemapSpider, XMLFeedSpider
+from scrapling.spiders.dedup import create_seen_set
+from scrapling.spiders.cache import ResponseCacheManager
+from scrapling.engines.toolbelt.custom import Response
+from scrapling.spiders.result import ItemList
+
+RESPONSE_BODY = b"<html><body><p>ok</p></body></html>"
+# What the parse-heavy callback of `benchmark_parse_workers` parses for every response
+HEAVY_PAGE = "<html><body>" + "".join(f"<div><p class='item'>{i}</p></div>" for i in range(5000)) + "</body></html>"
+
+# A product listing page, about 60 KB, for the response cache benchmark
+PRODUCT_PAGE = (
+    "<html><head><title>Products</title></head><body><ul>"
+    + "".join(
+        f"<li class='product'><a href='/products/{i}'>Product {i}</a><span class='price'>${i % 90 + 9}.99</span>"
+        f"<p class='description'>A very nice product in category {i % 12}.</p></li>"
+        for i in range(400)
+    )
+    + "</ul></body></html>"
+)
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    # Seconds to wait before answering, set through the `?sleep=` query parameter
+    def do_GET(self):
+        if "sleep=" in self.path:
+            time.sleep(float(self.path.rsplit("sleep=", 1)[1]))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(RESPONSE_BODY)))
+        self.end_headers()
+        self.wfile.write(RESPONSE_BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def make_spider(urls, concurrency: int) -> Spider:
+    class BenchmarkSpider(Spider):
+        name = "benchmark"
+        concurrent_requests = concurrency
+        logging_level = logging.ERROR
+
+        async def start_requests(self):
+            for url in urls:
+                yield Request(url, sid=self._session_manager.default_session_id)
+
+        async def parse(self, response):
+            yield {"url": response.url}
+
+    return BenchmarkSpider()
+
+
+def record_timeline(spider: Spider) -> list:
+    """Wrap the spider's session manager so every fetch's start and end times are recorded."""
+    timeline = []
+    fetch = spider._session_manager.fetch
+
+    async def timed_fetch(request):
+        started_at = time.perf_counter()
+        response = await fetch(request)
+        timeline.append((started_at, time.perf_counter()))
+        return response
+
+    spider._session_manager.fetch = timed_fetch
+    return timeline
+
+
+def benchmark_dispatch_latency(base_url: str, requests_count: int = 200):
+    """Average time between a request finishing and the next one starting, with a single slot."""
+    spider = make_spider([f"{base_url}/{i}" for i in range(requests_count)], concurrency=1)
+    timeline = record_timeline(spider)
+    spider.start()
+
+    timeline.sort()
+    gaps = [timeline[i + 1][0] - timeline[i][1] for i in range(len(timeline) - 1)]
+    print(f"-> dispatch latency: average {mean(gaps) * 1000:.3f} ms, worst {max(gaps) * 1000:.3f} ms")
+
+
+def benchmark_idle_cpu(base_url: str, requests_count: int = 8, server_delay: float = 1.0):
+    """CPU time spent by the crawler while all its slots wait on a slow server."""
+    spider = make_spider([f"{base_url}/{i}?sleep={server_delay}" for i in range(requests_count)], concurrency=4)
+    wall_started, cpu_started = time.perf_counter(), time.process_time()
+    spider.start()
+    wall, cpu = time.perf_counter() - wall_started, time.process_time() - cpu_started
+    print(f"-> idle CPU use: {cpu * 1000:.1f} ms of CPU time over {wall:.2f} s ({cpu / wall:.2%})")
+
+
+class ParseHeavySpider(Spider):
+    # Defined at module level so the parse workers can import it
+    name = "parse_heavy_benchmark"
+    concurrent_requests = 8
+    logging_level = logging.ERROR
+    urls: list = []
+
+    async def start_requests(self):
+        for url in self.urls:
+            yield Request(url, sid=self._session_manager.default_session_id)
+
+    async def parse(self, response):
+        yield {"items": len(Selector(HEAVY_PAGE).css("p.item::text").getall())}
+
+
+def benchmark_parse_workers(base_url: str, requests_count: int = 200):
+    """Crawl time of a spider with a CPU-heavy callback, run in the crawl's process and in parse workers."""
+    for workers in (0, 2, 4):
+        spider = ParseHeavySpider()
+        spider.urls = [f"{base_url}/{i}" for i in range(requests_count)]
+        spider.parse_workers = workers
+        started = time.perf_counter()
+        spider.start()
+        elapsed = time.perf_counter() - started
+        print(f"-> {workers} parse workers: {elapsed:.2f} s ({requests_count / elapsed:.0f} responses/s)")
+
+
+def _fill_seen_set(backend: str, directory: str, fingerprints):
+    seen = create_seen_set(backend, directory)
+    for fingerprint in fingerprints:
+        if fingerprint not in seen:
+            seen.add(fingerprint)
+    return seen
+
+
+def benchmark_dedup_backends(fingerprints_count: int = 200_000):
+    """Memory used per fingerprint and add/lookup throughput of every deduplication backend."""
+    fingerprints = [hashlib.sha1(str(i).encode()).digest() for i in range(fingerprints_count)]
+    for backend in ("memory", "compact", "bloom", "disk"):
+        with tempfile.TemporaryDirectory() as directory:
+            # Fingerprints are created on the fly here, so the ones a backend keeps alive are counted against it
+            tracemalloc.start()
+            seen = _fill_seen_set(
+                backend, directory, (hashlib.sha1(str(i).encode()).digest() for i in range(fingerprints_count))
+            )
+            memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            if backend == "disk":
+                len(seen)  # Flushes the pending writes
+                memory += sum(path.stat().st_size for path in seen.path.parent.iterdir())  # type: ignore[attr-defined]
+            if hasattr(seen, "close"):
+                seen.close()
+
+        with tempfile.TemporaryDirectory() as directory:
+            started = time.perf_counter()
+            seen = _fill_seen_set(backend, directory, fingerprints)
+            added = time.perf_counter() - started
+
+            started = time.perf_counter()
+            for fingerprint in fingerprints:
+                _ = fingerprint in seen
+            looked_up = time.perf_counter() - started
+            if hasattr(seen, "close"):
+                seen.close()
+
+        print(
+            f"-> {backend}: {memory / fingerprints_count:.1f} bytes per fingerprint{' on disk' if backend == 'disk' else ''}, "
+            f"{fingerprints_count / added:,.0f} adds/s, {fingerprints_count / looked_up:,.0f} lookups/s"
+        )
+
+
+def _product(i: int) -> dict:
+    return {
+        "url": f"https://shop.example.com/products/{i}",
+        "name": f"Product number {i}",
+        "price": round(5 + (i * 7919) % 50_000 / 100, 2),
+        "in_stock": i % 7 != 0,
+        "category": ("Shoes", "Shirts", "Hats", "Bags", "Socks")[i % 5],
+        "brand": f"Brand {i % 40}",
+        "rating": (i * 31) % 50 / 10,
+    }
+
+
+class Product(msgspec.Struct, gc=False):
+    url: str
+    name: str
+    price: float
+    in_stock: bool
+    category: str
+    brand: str
+    rating: float
+
+
+def benchmark_typed_items(items_count: int = 200_000):
+    """Memory per item and JSON Lines/CSV export throughput of dictionaries compared to typed items."""
+    for kind, make in (("dict", _product), ("msgspec.Struct", lambda i: Product(**_product(i)))):
+        tracemalloc.start()
+        items = ItemList(make(i) for i in range(items_count))
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        timings = []
+        with tempfile.TemporaryDirectory() as directory:
+            for export in (items.to_jsonl, items.to_csv):
+                started = time.perf_counter()
+                export(Path(directory) / "items")
+                timings.append(items_count / (time.perf_counter() - started))
+        print(
+            f"-> {kind}: {memory / items_count:.0f} bytes per item, "
+            f"to_jsonl {timings[0]:,.0f} items/s, to_csv {timings[1]:,.0f} items/s"
+        )
+
+
+def benchmark_item_exports(items_count: int = 200_000):
+    """File size and write throughput of the columnar exports compared to JSON Lines."""
+    items = ItemList(_product(i) for i in range(items_count))
+    exports = [("to_jsonl", lambda path: items.to_jsonl(path))]
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        print("-> pyarrow isn't installed, only benchmarking to_jsonl")
+    else:
+        for codec in ("zstd", "snappy", None):
+            exports.append(
+                (f"to_parquet({codec})", lambda path, codec=codec: items.to_parquet(path, compression=codec))
+            )
+
+    for name, export in exports:
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "items"
+            started = time.perf_counter()
+            export(path)
+            elapsed = time.perf_counter() - started
+            size = path.stat().st_size
+        print(f"-> {name}: {size / 1024 / 1024:.1f} MB, {items_count / elapsed:,.0f} items/s")
+
+
+def _write_legacy_cache_entry(directory: Path, fingerprint: bytes, body: bytes) -> None:
+    """An entry in the one-JSON-file-per-response format the cache used to write, with the body base64-encoded."""
+    entry = {
+        "url": "https://shop.example.com/products/1",
+        "content": base64.b64encode(body).decode("ascii"),
+        "status": 200,
+        "reason": "OK",
+        "encoding": "utf-8",
+        "cookies": {},
+        "headers": {"content-type": "text/html"},
+        "request_headers": {"user-agent": "benchmark"},
+        "method": "GET",
+    }
+    (directory / f"{fingerprint.hex()}.json").write_bytes(orjson.dumps(entry))
+
+
+def benchmark_response_cache(responses_count: int = 5000):
+    """Disk size and load throughput of the development-mode response cache compared to its old JSON format.
+
+    Only reading and decoding the entries is timed, since building the `Response` parses the page the same way
+    whatever format it was stored in.
+    """
+    body = PRODUCT_PAGE.encode()
+    fingerprints = [hashlib.sha1(str(i).encode()).digest() for i in range(responses_count)]
+    response = Response(
+        url="https://shop.example.com/products/1",
+        content=body,
+        status=200,
+        reason="OK",
+        encoding="utf-8",
+        cookies={},
+        headers={"content-type": "text/html"},
+        request_headers={"user-agent": "benchmark"},
+        method="GET",
+    )
+
+    def load(cache: ResponseCacheManager) -> float:
+        started = time.perf_counter()
+        for fingerprint in fingerprints:
+            assert cache._load(fingerprint) is not None
+        return responses_count / (time.perf_counter() - started)
+
+    async def fill(cache: ResponseCacheManager) -> None:
+        for fingerprint in fingerprints:
+            await cache.put(fingerprint, response)
+
+    for name, compression in (("old JSON", None), ("binary", None), ("binary + gzip", "gzip")):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ResponseCacheManager(directory, compression)
+            if name == "old JSON":
+                for fingerprint in fingerprints:
+                    _write_legacy_cache_entry(Path(directory), fingerprint, body)
+            else:
+                anyio.run(fill, cache)
+            size = sum(file.stat().st_size for file in Path(directory).rglob("*") if file.is_file())
+            rate = load(cache)
+        print(f"-> {name}: {size / responses_count / 1024:.1f} KB per response, {rate:,.0f} loads/s")
+
+
+def _sitemap_body(urls_count: int) -> bytes:
+    """A gzipped sitemap of the protocol's maximum size, 50,000 URLs."""
+    entries = b"".join(
+        b"<url><loc>https://shop.example.com/products/%d</loc><lastmod>2026-01-%02dT10:00:00+00:00</lastmod>"
+        b"<changefreq>weekly</changefreq><priority>0.6</priority></url>" % (i, i % 28 + 1)
+        for i in range(urls_count)
+    )
+    return gzip.compress(b'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">' + entries + b"</urlset>")
+
+
+def _parse_sitemap_in_process(body: bytes, streaming: bool) -> tuple:
+    """Parse a sitemap, and return the seconds to the first URL, the total seconds, and the process's peak memory."""
+
+    class BenchmarkSitemap(SitemapSpider):
+        name = "benchmark"
+        sitemap_urls = ["https://shop.example.com/sitemap.xml"]
+        logging_level = logging.WARNING
+
+    spider = BenchmarkSitemap()
+    started = time.perf_counter()
+    first = None
+    if streaming:
+        for _ in spider._iter_sitemap(body):
+            first = first or time.perf_counter() - started
+    else:
+        # What `_sm_body` did before: decompress it all, parse it all, then build the list of URLs
+        root = etree.fromstring(gzip.decompress(body))
+        urls = spider._extract_urls(root)
+        first = time.perf_counter() - started
+        del urls, root
+    return first, time.perf_counter() - started, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def benchmark_sitemap_parsing(urls_count: int = 50_000):
+    """Time to the first URL, total time, and peak memory of parsing a large sitemap at once or as a stream."""
+    body = _sitemap_body(urls_count)
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        # The memory of an empty process to compare with
+        _, _, baseline = pool.apply(_parse_sitemap_in_process, (b"<urlset/>", True))
+    for name, streaming in (("whole document", False), ("streaming", True)):
+        # A fresh process for each, so the peak memory of one doesn't hide the other's
+        with context.Pool(1) as pool:
+            first, total, peak = pool.apply(_parse_sitemap_in_process, (body, streaming))
+        print(
+            f"-> {name}: first URL after {first * 1000:.0f} ms, all {urls_count:,} URLs in {total * 1000:.0f} ms, "
+            f"{(peak - baseline) / 1024:.0f} MB peak memory above an idle process"
+        )
+
+
+def _feed_body(items_count: int) -> bytes:
+    """A gzipped product feed in the Google Merchant format, with namespaced fields."""
+    items = b"".join(
+        b"<item><g:id>%d</g:id><title>Product %d</title><link>https://shop.example.com/products/%d</link>"
+        b"<g:price>%d.99 USD</g:price><g:availability>in stock</g:availability></item>" % (i, i, i, i % 90 + 9)
+        for i in range(items_count)
+    )
+    return gzip.compress(
+        b'<rss version="2.0" xmlns:g="http://base.google.com/ns/1.0"><channel>' + items + b"</channel></rss>"
+    )
+
+
+def _parse_feed_in_process(body: bytes, streaming: bool) -> tuple:
+    """Parse a feed, and return the seconds to the first node, the total seconds, and the process's peak memory."""
+
+    class BenchmarkFeed(XMLFeedSpider):
+        name = "benchmark"
+        logging_level = logging.WARNING
+
+    spider = BenchmarkFeed()
+    started = time.perf_counter()
+    first = None
+    if streaming:
+        for _ in spider._iter_nodes(body, None, "https://shop.example.com/feed.xml"):
+            first = first or time.perf_counter() - started
+    else:
+        # What `parse` did before: decompress it all, parse it all, then strip a copy of every node
+        root = etree.fromstring(gzip.decompress(body))
+        for el in root.iter("item"):
+            node = copy.deepcopy(el)
+            for child in node.iter():
+                child.tag = etree.QName(child.tag).localname
+            etree.cleanup_namespaces(node)
+            first = first or time.perf_counter() - started
+        del root
+    return first, time.perf_counter() - started, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def benchmark_feed_parsing(items_count: int = 200_000):
+    """Time to the first node, total time, and peak memory of parsing a large XML feed at once or as a stream."""
+    body = _feed_body(items_count)
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        _, _, baseline = pool.apply(_parse_feed_in_process, (gzip.compress(b"<rss/>"), True))
+    for name, streaming in (("whole document", False), ("streaming", True)):
+        with context.Pool(1) as pool:
+            first, total, peak = pool.apply(_parse_feed_in_process, (body, streaming))
+        print(
+            f"-> {name}: first node after {first * 1000:.0f} ms, all {items_count:,} nodes in {total * 1000:.0f} ms, "
+            f"{(peak - baseline) / 1024:.0f} MB peak memory above an idle process"
+        )
+
+
+if __name__ == "__main__":
+    mock_server = start_server()
+    url = f"http://127.0.0.1:{mock_server.server_address[1]}"
+    print(" Benchmark: Crawl loop dispatch latency and CPU use \n")
+    benchmark_dispatch_latency(url)
+    benchmark_idle_cpu(url)
+
+    print("\n Benchmark: Parse workers \n")
+    benchmark_parse_workers(url)
+    mock_server.shutdown()
+
+    print("\n Benchmark: Deduplication backends \n")
+    benchmark_dedup_backends()
+
+    print("\n Benchmark: Item exports \n")
+    benchmark_item_exports()
+    benchmark_typed_items()
+
+    print("\n Benchmark: Development-mode response cache \n")
+    benchmark_response_cache()
+
+    print("\n Benchmark: Sitemap parsing \n")
+    benchmark_sitemap_parsing()
+
+    print("\n Benchmark: XML feed parsing \n")
+    benchmark_feed_parsing()
@@ -4,8 +4,9 @@ from unittest.mock import patch, MagicMock
 import pytest_httpbin
 
 from scrapling.parser import Selector
+from scrapling.core.storage import SQLiteStorageSystem
 from scrapling import __version__
-from scrapling.cli import main, shell, mcp, get, post, put, delete, fetch, stealthy_fetch
+from scrapling.cli import main, shell, mcp, get, post, put, delete, fetch, stealthy_fetch, stats, prune
 
 
 @pytest_httpbin.use_class_based_httpbin
@@ -290,3 +291,57 @@ class TestCLI:
             call_kwargs = mock_get.call_args[1]
             assert isinstance(call_kwargs["impersonate"], str)
             assert call_kwargs["impersonate"] == "chrome"
+
+
+class TestStorageCommands:
+    """Test the storage maintenance commands"""
+
+    @pytest.fixture
+    def runner(self):
+        return CliRunner()
+
+    @pytest.fixture
+    def storage_file(self, tmp_path):
+        from lxml.html import fromstring
+
+        db_path = str(tmp_path / "storage.db")
+        SQLiteStorageSystem.cache_clear()
+        storage = SQLiteStorageSystem(storage_file=db_path, url="https://example.com")
+        element = fromstring("<div><p>Hello</p></div>").cssselect("p")[0]
+        for i in range(5):
+            storage.save(element, f"element-{i}")
+        storage.cursor.execute("UPDATE storage SET last_used = last_used - 1000 WHERE identifier = 'element-0'")
+        storage.connection.commit()
+        storage.close()
+        SQLiteStorageSystem.cache_clear()
+        return db_path
+
+    def test_stats_command(self, runner, storage_file):
+        result = runner.invoke(stats, ["--file", storage_file])
+        assert result.exit_code == 0
+        assert "Elements: 5" in result.output
+        assert "example.com: 5" in result.output
+
+    def test_stats_missing_file(self, runner, tmp_path):
+        result = runner.invoke(stats, ["--file", str(tmp_path / "missing.db")])
+        assert result.exit_code != 0
+        assert isinstance(result.exception, FileNotFoundError)
+
+    def test_prune_by_ttl(self, runner, storage_file):
+        result = runner.invoke(prune, ["--file", storage_file, "--ttl", "500"])
+        assert result.exit_code == 0
+
+        result = runner.invoke(stats, ["--file", storage_file])
+        assert "Elements: 4" in result.output
+
+    def test_prune_by_max_rows_with_vacuum(self, runner, storage_file):
+        result = runner.invoke(prune, ["--file", storage_file, "--max-rows", "2", "--vacuum"])
+        assert result.exit_code == 0
+
+        result = runner.invoke(stats, ["--file", storage_file])
+        assert "Elements: 2" in result.output
+
+    def test_prune_without_rules(self, runner, storage_file):
+        result = runner.invoke(prune, ["--file", storage_file])
+        assert result.exit_code == 2
+        assert "Nothing to do" in result.output
@@ -1,7 +1,10 @@
 import tempfile
 import os
+import sqlite3
 import threading
 
+import pytest
+
 from lxml.html import fromstring
 
 from scrapling.core.storage import SQLiteStorageSystem, StorageSystemMixin
@@ -74,7 +77,7 @@ class TestSQLiteStorageSystem:
 
     def test_sqlite_storage_with_file(self):
         """Test SQLite storage with an actual file"""
-        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as tmp_file:
+        with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as tmp_file:
             db_path = tmp_file.name
 
         storage = None
@@ -90,10 +93,7 @@ class TestSQLiteStorageSystem:
 
     def test_sqlite_storage_initialization_args(self):
         """Test SQLite storage with various initialization arguments"""
-        storage = SQLiteStorageSystem(
-            storage_file=":memory:",
-            url="https://example.com"
-        )
+        storage = SQLiteStorageSystem(storage_file=":memory:", url="https://example.com")
         assert storage is not None
         assert storage.url == "https://example.com"
 
@@ -145,7 +145,7 @@ class TestSaveRetrieveRoundTrip:
         StorageSystemMixin._get_base_url.cache_clear()
 
         # Use file-based storage so both instances share the same DB
-        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as tmp:
+        with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as tmp:
             db_path = tmp.name
 
         try:
@@ -198,7 +198,7 @@ class TestStorageThreadSafety:
         SQLiteStorageSystem.cache_clear()
         StorageSystemMixin._get_base_url.cache_clear()
 
-        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as tmp:
+        with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as tmp:
             db_path = tmp.name
 
         storage = SQLiteStorageSystem(storage_file=db_path, url="https://example.com")
@@ -231,6 +231,153 @@ class TestStorageThreadSafety:
             os.unlink(db_path)
 
 
+class TestStorageRetention:
+    """Test the retention, maintenance, and statistics of SQLiteStorageSystem."""
+
+    def _make_storage(self, **kwargs):
+        StorageSystemMixin._get_base_url.cache_clear()
+        SQLiteStorageSystem.cache_clear()
+        return SQLiteStorageSystem(storage_file=":memory:", url="https://example.com", **kwargs)
+
+    def _save(self, storage, count, prefix="element"):
+        element = fromstring("<div><p id='target'>Hello</p></div>").cssselect("p")[0]
+        for i in range(count):
+            storage.save(element, f"{prefix}-{i}")
+
+    def _age(self, storage, identifier, seconds):
+        storage.cursor.execute(
+            "UPDATE storage SET last_used = last_used - ? WHERE identifier = ?", (seconds, identifier)
+        )
+        storage.connection.commit()
+
+    def test_save_sets_last_used(self):
+        storage = self._make_storage()
+        self._save(storage, 1)
+        last_used = storage.cursor.execute("SELECT last_used FROM storage").fetchone()[0]
+        assert last_used is not None
+
+    def test_retrieve_refreshes_last_used(self):
+        storage = self._make_storage()
+        self._save(storage, 1)
+        self._age(storage, "element-0", 1000)
+        before = storage.cursor.execute("SELECT last_used FROM storage").fetchone()[0]
+
+        assert storage.retrieve("element-0") is not None
+        after = storage.cursor.execute("SELECT last_used FROM storage").fetchone()[0]
+        assert after > before
+
+    def test_recent_retrieve_does_not_write(self):
+        storage = self._make_storage()
+        self._save(storage, 1)
+        self._age(storage, "element-0", 10)
+        before = storage.cursor.execute("SELECT last_used FROM storage").fetchone()[0]
+
+        assert storage.retrieve("element-0") is not None
+        assert storage.cursor.execute("SELECT last_used FROM storage").fetchone()[0] == before
+
+    def test_prune_in_batches(self):
+        storage = self._make_storage()
+        storage.prune_batch_size = 2
+        self._save(storage, 7)
+        for i in range(5):
+            self._age(storage, f"element-{i}", 1000 + i)
+
+        assert storage.prune(ttl=500) == 5
+        self._save(storage, 5, prefix="new")
+        assert storage.prune(max_rows=3) == 4
+        assert storage.stats()["rows"] == 3
+
+    def test_prune_by_ttl(self):
+        storage = self._make_storage()
+        self._save(storage, 3)
+        self._age(storage, "element-0", 1000)
+
+        assert storage.prune(ttl=500) == 1
+        assert storage.retrieve("element-0") is None
+        assert storage.retrieve("element-1") is not None
+
+    def test_prune_by_max_rows_keeps_most_recent(self):
+        storage = self._make_storage()
+        self._save(storage, 5)
+        for i in range(5):
+            self._age(storage, f"element-{i}", 100 - i)
+
+        assert storage.prune(max_rows=2) == 3
+        assert storage.stats()["rows"] == 2
+        assert storage.retrieve("element-4") is not None
+        assert storage.retrieve("element-3") is not None
+        assert storage.retrieve("element-0") is None
+
+    def test_prune_without_limits_is_noop(self):
+        storage = self._make_storage()
+        self._save(storage, 3)
+        assert storage.prune() == 0
+        assert storage.stats()["rows"] == 3
+
+    def test_automatic_maintenance_applies_max_rows(self):
+        storage = self._make_storage(max_rows=3, maintenance_interval=5)
+        self._save(storage, 5)
+        assert storage.stats()["rows"] == 3
+
+    def test_automatic_maintenance_disabled(self):
+        storage = self._make_storage(max_rows=3, maintenance_interval=0)
+        self._save(storage, 5)
+        assert storage.stats()["rows"] == 5
+
+    def test_stats(self):
+        storage = self._make_storage()
+        self._save(storage, 4)
+        info = storage.stats()
+        assert info["rows"] == 4
+        assert info["rows_per_url"] == {"example.com": 4}
+        assert info["oldest_last_used"] <= info["newest_last_used"]
+        assert info["database_size"] > 0
+
+    def test_invalid_checkpoint_mode(self):
+        storage = self._make_storage()
+        with pytest.raises(ValueError):
+            storage.checkpoint("invalid")
+
+    def test_compact_and_checkpoint_on_file(self, tmp_path):
+        StorageSystemMixin._get_base_url.cache_clear()
+        SQLiteStorageSystem.cache_clear()
+        db_path = str(tmp_path / "storage.db")
+        storage = SQLiteStorageSystem(storage_file=db_path, url="https://example.com")
+        try:
+            self._save(storage, 200)
+            storage.prune(max_rows=0)
+            storage.compact()
+            info = storage.stats()
+            assert info["rows"] == 0
+            assert info["wal_size"] == 0
+            assert info["free_size"] == 0
+        finally:
+            storage.close()
+
+    def test_migrates_old_schema(self, tmp_path):
+        db_path = str(tmp_path / "old.db")
+        connection = sqlite3.connect(db_path)
+        connection.execute(
+            "CREATE TABLE storage (id INTEGER PRIMARY KEY, url TEXT, identifier TEXT, element_data TEXT, UNIQUE (url, identifier))"
+        )
+        connection.execute(
+            "INSERT INTO storage (url, identifier, element_data) VALUES ('example.com', 'old', '{\"tag\": \"p\"}')"
+        )
+        connection.commit()
+        connection.close()
+
+        StorageSystemMixin._get_base_url.cache_clear()
+        SQLiteStorageSystem.cache_clear()
+        storage = SQLiteStorageSystem(storage_file=db_path, url="https://example.com")
+        try:
+            assert storage.retrieve("old") == {"tag": "p"}
+            assert storage.stats()["oldest_last_used"] is not None
+            # Old rows are considered fresh after the upgrade
+            assert storage.prune(ttl=60) == 0
+        finally:
+            storage.close()
+
+
 class TestStorageToolsElementToDict:
     """Test _StorageTools.element_to_dict() directly."""
 
@@ -279,4 +426,8 @@ class TestStorageToolsGetElementPath:
     def test_root_element_path(self):
         tree = fromstring("<div>Root</div>")
         path = _StorageTools._get_element_path(tree)
-        assert path == ('html', 'body', 'div',)
+        assert path == (
+            "html",
+            "body",
+            "div",
+        )
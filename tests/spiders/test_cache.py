@@ -1,9 +1,11 @@
-"""Tests for the ResponseCacheManager and development_mode integration."""
+"""Tests for the ResponseCacheManager, development_mode, and incremental recrawl integration."""
 
 import tempfile
+from base64 import b64encode
 from pathlib import Path
 
 import anyio
+import orjson
 import pytest
 
 from scrapling.spiders.cache import ResponseCacheManager
@@ -34,7 +36,6 @@ def _make_response(
 
 
 class TestResponseCacheManager:
-
     @pytest.mark.anyio
     async def test_put_get_roundtrip(self):
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -190,6 +191,71 @@ class TestResponseCacheManager:
             assert restored is not None
             assert restored.body == binary_body
 
+    @pytest.mark.anyio
+    async def test_entries_are_sharded_binary_files(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = ResponseCacheManager(tmpdir)
+            fp = b"\xab" * 20
+            await cache.put(fp, _make_response(body=b"<html>raw</html>"), "GET")
+
+            path = Path(tmpdir) / "ab" / f"{fp.hex()}.bin"
+            data = path.read_bytes()
+            assert data.startswith(b"SCRC")
+            # The body is stored as it is, without base64
+            assert data.endswith(b"<html>raw</html>")
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize("compression", ["gzip", "zstd"])
+    async def test_compression(self, compression):
+        if compression == "zstd":
+            try:
+                from compression import zstd  # noqa: F401
+            except ImportError:
+                pytest.importorskip("zstandard")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fp = b"\x06" * 20
+            body = b"<html>" + b"<p>repeated</p>" * 1000 + b"</html>"
+            await ResponseCacheManager(tmpdir, compression).put(fp, _make_response(body=body), "GET")
+
+            assert (Path(tmpdir) / "06" / f"{fp.hex()}.bin").stat().st_size < len(body) // 10
+            # Entries record their compression, so any manager reads them
+            restored = await ResponseCacheManager(tmpdir).get(fp)
+            assert restored is not None
+            assert restored.body == body
+
+    def test_invalid_compression(self):
+        with pytest.raises(ValueError):
+            ResponseCacheManager("unused", "brotli")  # type: ignore[arg-type]
+
+    @pytest.mark.anyio
+    async def test_reads_legacy_json_entries(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fp = b"\x07" * 20
+            (Path(tmpdir) / f"{fp.hex()}.json").write_bytes(
+                orjson.dumps(
+                    {
+                        "url": "https://example.com",
+                        "content": b64encode(b"<html>old</html>").decode("ascii"),
+                        "status": 200,
+                        "reason": "OK",
+                        "encoding": "utf-8",
+                        "cookies": [{"name": "sid", "value": "1"}],
+                        "headers": {},
+                        "request_headers": {},
+                        "method": "GET",
+                    }
+                )
+            )
+            cache = ResponseCacheManager(tmpdir)
+
+            restored = await cache.get(fp)
+            assert restored is not None
+            assert restored.body == b"<html>old</html>"
+            assert restored.cookies == ({"name": "sid", "value": "1"},)
+
+            await cache.clear()
+            assert await cache.get(fp) is None
+
 
 # ---------------------------------------------------------------------------
 # Integration tests
@@ -224,6 +290,17 @@ class MockSpider:
         self.concurrent_requests_per_domain = 0
         self.download_delay = 0.0
         self.max_blocked_retries = 3
+        self.max_memory_requests = 0
+        self.scheduler_backend = "memory"
+        self.scheduler_path = None
+        self.scheduler_lease_timeout = 600.0
+        self.dedup_backend = "memory"
+        self.dedup_error_rate = 0.001
+        self.parse_workers = 0
+        self.keep_items = True
+        self.item_type = None
+        self.item_batch_size = 100
+        self.item_queue_size = 1000
         self.autothrottle_enabled = False
         self.autothrottle_start_delay = 5.0
         self.autothrottle_max_delay = 60.0
@@ -236,6 +313,21 @@ class MockSpider:
         self.robots_txt_obey = False
         self.development_mode = True
         self.development_cache_dir = cache_dir
+        self.development_cache_compression = None
+        self.recrawl_cache_dir = None
+        self.recrawl_cache_compression = None
+        self.recrawl_skip_unchanged = False
+        self.dedup_redirects = False
+        self.learn_redirects = False
+        self.near_duplicates = None
+        self.near_duplicate_distance = 3
+        self.url_pattern_max_requests = None
+        self.url_pattern_unproductive_after = None
+        self.adaptive_priority = False
+        self.adaptive_priority_weight = 10
+        self.crawl_order = "priority"
+        self.max_depth = None
+        self.start_requests_low_water = 1000
         self.start_urls: list[str] = []
         self.name = "test_cache_spider"
         self._log_counter = _LogCounterStub()
@@ -247,6 +339,9 @@ class MockSpider:
     async def on_start(self, resuming: bool = False) -> None:
         pass
 
+    def configure_pipeline(self):
+        return []
+
     async def on_close(self) -> None:
         pass
 
@@ -268,7 +363,6 @@ class MockSpider:
 
 
 class TestDevelopmentModeIntegration:
-
     @pytest.mark.anyio
     async def test_first_run_fetches_and_caches(self):
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -317,3 +411,126 @@ class TestDevelopmentModeIntegration:
         sm.add("default", MockSession())
         engine = CrawlerEngine(spider, sm)
         assert engine._cache_manager is None
+
+
+class ConditionalSession(MockSession):
+    """Answers 304 when the request revalidates the current ETag."""
+
+    def __init__(self, etag: str | None = '"v1"', body: bytes = b"<html>page</html>"):
+        super().__init__()
+        self.etag = etag
+        self.body = body
+        self.sent_headers: list[dict] = []
+
+    async def fetch(self, url: str, **kwargs):
+        self.fetch_count += 1
+        headers = kwargs.get("headers") or {}
+        self.sent_headers.append(headers)
+        if self.etag and headers.get("If-None-Match") == self.etag:
+            return _make_response(url=url, body=b"", status=304)
+        response = _make_response(url=url, body=self.body)
+        if self.etag:
+            response.headers["etag"] = self.etag
+        return response
+
+
+class TestIncrementalRecrawl:
+    async def _crawl(self, tmpdir: str, session: MockSession, http: bool = True, **settings) -> CrawlerEngine:
+        spider = MockSpider(cache_dir="unused")
+        spider.development_mode = False
+        spider.recrawl_cache_dir = tmpdir
+        for name, value in settings.items():
+            setattr(spider, name, value)
+        sm = SessionManager()
+        sm.add("default", session)
+        sm.is_http_session = lambda session_id: http  # type: ignore[method-assign]
+        engine = CrawlerEngine(spider, sm)
+        await engine.crawl()
+        return engine
+
+    @pytest.mark.anyio
+    async def test_not_modified_pages_are_served_from_the_cache(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            first = await self._crawl(tmpdir, ConditionalSession())
+            assert first.stats.recrawl_revalidations == 0
+
+            session = ConditionalSession()
+            engine = await self._crawl(tmpdir, session)
+
+            assert session.sent_headers == [{"If-None-Match": '"v1"'}]
+            assert engine.stats.recrawl_revalidations == 1
+            assert engine.stats.recrawl_not_modified == 1
+            assert engine.stats.recrawl_bytes_saved == len(b"<html>page</html>")
+            assert engine.stats.response_status_count == {"status_304": 1}
+            # The callback still gets the page
+            assert engine.stats.items_scraped == 1
+
+    @pytest.mark.anyio
+    async def test_skip_unchanged(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            await self._crawl(tmpdir, ConditionalSession())
+            engine = await self._crawl(tmpdir, ConditionalSession(), recrawl_skip_unchanged=True)
+
+            assert engine.stats.recrawl_not_modified == 1
+            assert engine.stats.items_scraped == 0
+
+    @pytest.mark.anyio
+    async def test_changed_pages_replace_the_cached_ones(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            await self._crawl(tmpdir, ConditionalSession())
+            await self._crawl(tmpdir, ConditionalSession(etag='"v2"', body=b"<html>new</html>"))
+
+            session = ConditionalSession(etag='"v2"')
+            engine = await self._crawl(tmpdir, session)
+
+            assert session.sent_headers == [{"If-None-Match": '"v2"'}]
+            assert engine.stats.recrawl_bytes_saved == len(b"<html>new</html>")
+
+    @pytest.mark.anyio
+    async def test_unchanged_bodies_without_validators(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            await self._crawl(tmpdir, ConditionalSession(etag=None))
+
+            session = ConditionalSession(etag=None)
+            engine = await self._crawl(tmpdir, session, recrawl_skip_unchanged=True)
+
+            assert session.sent_headers == [{}]
+            assert engine.stats.recrawl_revalidations == 0
+            assert engine.stats.recrawl_unchanged == 1
+            assert engine.stats.items_scraped == 0
+
+    @pytest.mark.anyio
+    async def test_lost_cache_entries_are_fetched_again(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            await self._crawl(tmpdir, ConditionalSession())
+
+            class EvictingSession(ConditionalSession):
+                async def fetch(self, url: str, **kwargs):
+                    response = await super().fetch(url, **kwargs)
+                    if response.status == 304:
+                        # The cached body disappears between reading its validators and the 304
+                        for path in Path(tmpdir).rglob("*"):
+                            if path.is_file():
+                                path.unlink()
+                    return response
+
+            session = EvictingSession()
+            engine = await self._crawl(tmpdir, session)
+
+            assert session.sent_headers == [{"If-None-Match": '"v1"'}, {}]
+            assert engine.stats.recrawl_not_modified == 0
+            assert engine.stats.response_status_count == {"status_304": 1, "status_200": 1}
+            # Only the full page reaches the callback
+            assert engine.stats.items_scraped == 1
+
+    @pytest.mark.anyio
+    async def test_browser_sessions_are_not_revalidated(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            await self._crawl(tmpdir, ConditionalSession(), http=False)
+
+            session = ConditionalSession()
+            engine = await self._crawl(tmpdir, session, http=False)
+
+            assert session.sent_headers == [{}]
+            assert engine.stats.recrawl_revalidations == 0
+            assert engine.stats.items_scraped == 1
@@ -339,3 +339,88 @@ class TestCheckpointManagerEdgeCases:
         assert restored.dont_filter is True
         assert restored.meta == {"item_id": 123, "page": 5}
         assert restored._session_kwargs == {"proxy": "http://proxy:8080"}
+
+
+class TestCheckpointJournal:
+    """Test the append-only journal kept next to the base checkpoint."""
+
+    @pytest.fixture
+    def temp_dir(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            yield Path(tmpdir)
+
+    @pytest.mark.asyncio
+    async def test_append_requires_base_checkpoint(self, temp_dir: Path):
+        manager = CheckpointManager(temp_dir / "crawl")
+
+        assert manager.needs_compaction is True
+        with pytest.raises(RuntimeError):
+            await manager.append([("complete", 0, None)])
+
+    @pytest.mark.asyncio
+    async def test_load_returns_journal_events(self, temp_dir: Path):
+        manager = CheckpointManager(temp_dir / "crawl")
+        await manager.save(CheckpointData(requests=[Request("https://example.com/1")], counters=[0]))
+        assert manager.needs_compaction is False
+
+        await manager.append([("enqueue", 1, Request("https://example.com/2"))])
+        await manager.append([("complete", 0, None)])
+
+        loaded = await CheckpointManager(temp_dir / "crawl").load()
+
+        assert loaded is not None
+        assert [(kind, counter) for kind, counter, _ in loaded.journal] == [("enqueue", 1), ("complete", 0)]
+        assert loaded.journal[0][2].url == "https://example.com/2"
+
+    @pytest.mark.asyncio
+    async def test_new_base_starts_new_journal(self, temp_dir: Path):
+        manager = CheckpointManager(temp_dir / "crawl")
+        await manager.save(CheckpointData())
+        await manager.append([("complete", 0, None)])
+
+        await manager.save(CheckpointData())
+        loaded = await manager.load()
+
+        assert loaded is not None
+        assert loaded.journal == []
+
+    @pytest.mark.asyncio
+    async def test_incomplete_write_is_dropped_and_overwritten(self, temp_dir: Path):
+        manager = CheckpointManager(temp_dir / "crawl")
+        await manager.save(CheckpointData())
+        await manager.append([("complete", 0, None)])
+
+        journal_path = temp_dir / "crawl" / "checkpoint.journal"
+        with open(journal_path, "ab") as f:
+            f.write(b"\xff\x00\x00\x00partial")
+
+        resumed = CheckpointManager(temp_dir / "crawl")
+        loaded = await resumed.load()
+        assert loaded is not None
+        assert loaded.journal == [("complete", 0, None)]
+
+        await resumed.append([("complete", 1, None)])
+        loaded = await CheckpointManager(temp_dir / "crawl").load()
+        assert loaded is not None
+        assert loaded.journal == [("complete", 0, None), ("complete", 1, None)]
+
+    @pytest.mark.asyncio
+    async def test_compaction_once_journal_outgrows_base(self, temp_dir: Path, monkeypatch):
+        monkeypatch.setattr(CheckpointManager, "MIN_COMPACTION_SIZE", 0)
+        manager = CheckpointManager(temp_dir / "crawl")
+        await manager.save(CheckpointData())
+
+        await manager.append([("enqueue", i, Request(f"https://example.com/{i}")) for i in range(10)])
+
+        assert manager.needs_compaction is True
+
+    @pytest.mark.asyncio
+    async def test_cleanup_removes_journal(self, temp_dir: Path):
+        manager = CheckpointManager(temp_dir / "crawl")
+        await manager.save(CheckpointData())
+        await manager.append([("complete", 0, None)])
+
+        await manager.cleanup()
+
+        assert not (temp_dir / "crawl" / "checkpoint.journal").exists()
+        assert manager.needs_compaction is True
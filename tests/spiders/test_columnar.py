@@ -0,0 +1,126 @@
+"""Tests for the Arrow and Parquet export of scraped items."""
+
+from datetime import date
+
+import msgspec
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from scrapling.spiders.result import ItemList  # noqa: E402
+from scrapling.spiders.pipeline import ItemPipeline  # noqa: E402
+from scrapling.spiders.columnar import ParquetSink, dictionary_columns, infer_schema, to_table  # noqa: E402
+
+
+class Product(msgspec.Struct):
+    name: str
+    price: float
+    added: date
+
+
+def _products(count: int) -> list[dict]:
+    return [
+        {
+            "name": f"Product {i}",
+            "price": i * 1.5,
+            "stock": i,
+            "category": ["shoes", "shirts", "hats"][i % 3],
+            "tags": ["new", "sale"] if i % 2 else ["new"],
+        }
+        for i in range(count)
+    ]
+
+
+class TestSchema:
+    def test_infers_types(self):
+        schema = infer_schema(_products(10))
+
+        assert schema.names == ["name", "price", "stock", "category", "tags"]
+        assert schema.field("price").type == pa.float64()
+        assert schema.field("stock").type == pa.int64()
+        assert schema.field("tags").type == pa.list_(pa.string())
+
+    def test_mixed_and_empty_columns_are_text(self):
+        schema = infer_schema([{"value": 1, "empty": None}, {"value": "one"}])
+
+        assert schema.field("value").type == pa.string()
+        assert schema.field("empty").type == pa.string()
+
+    def test_dictionary_columns(self):
+        items = _products(30)
+
+        assert dictionary_columns(items, infer_schema(items)) == ["category"]
+
+    def test_values_that_dont_fit_the_schema(self):
+        table = to_table([{"count": 1, "label": "a"}, {"count": "many", "label": {"nested": True}}], schema_sample=1)
+
+        assert table.column("count").to_pylist() == [1, None]
+        assert table.column("label").to_pylist() == ["a", '{"nested":true}']
+
+    def test_keys_after_the_sample_are_left_out(self):
+        table = ItemList([{"a": 1}, {"a": 2, "b": 3}]).to_arrow(schema_sample=1)
+
+        assert table.column_names == ["a"]
+        assert table.num_rows == 2
+
+
+class TestParquet:
+    def test_to_parquet(self, tmp_path):
+        items = ItemList(_products(100))
+        path = tmp_path / "items.parquet"
+
+        items.to_parquet(path, row_group_size=30, compression="snappy")
+
+        metadata = pq.ParquetFile(path).metadata
+        assert metadata.num_row_groups == 4
+        assert metadata.row_group(0).column(0).compression == "SNAPPY"
+        assert pq.read_table(path).to_pylist() == list(items)
+        # The categories repeat, the names don't
+        encodings = {
+            metadata.row_group(0).column(i).path_in_schema: metadata.row_group(0).column(i).encodings for i in range(5)
+        }
+        assert "RLE_DICTIONARY" in encodings["category"]
+        assert "RLE_DICTIONARY" not in encodings["name"]
+
+    def test_typed_items(self, tmp_path):
+        items = ItemList([Product(name="Hat", price=9.5, added=date(2024, 1, 2))])
+
+        items.to_parquet(tmp_path / "items.parquet")
+
+        table = pq.read_table(tmp_path / "items.parquet")
+        assert table.schema.field("added").type == pa.date32()
+        assert table.to_pylist() == [{"name": "Hat", "price": 9.5, "added": date(2024, 1, 2)}]
+
+    def test_empty_list(self, tmp_path):
+        ItemList().to_parquet(tmp_path / "items.parquet")
+
+        assert pq.read_table(tmp_path / "items.parquet").num_rows == 0
+
+    def test_invalid_sizes(self, tmp_path):
+        with pytest.raises(ValueError):
+            ParquetSink(tmp_path / "items.parquet", row_group_size=0)
+
+    def test_sink_write_all(self, tmp_path):
+        sink = ParquetSink(tmp_path / "items.parquet", row_group_size=25)
+
+        sink.write_all(_products(30))
+
+        assert sink.items_written == 30
+        assert pq.read_table(tmp_path / "items.parquet").to_pylist() == _products(30)
+
+    @pytest.mark.asyncio
+    async def test_sink_writes_row_groups_during_the_crawl(self, tmp_path):
+        sink = ParquetSink(tmp_path / "items.parquet", schema_sample=10, row_group_size=25)
+
+        async def collect(item: dict) -> None:
+            pass
+
+        async with ItemPipeline([sink], collect, batch_size=10) as pipeline:
+            for item in _products(60):
+                await pipeline.put(item)
+
+        assert sink.items_written == 60
+        parquet = pq.ParquetFile(tmp_path / "items.parquet")
+        assert [parquet.metadata.row_group(i).num_rows for i in range(parquet.num_row_groups)] == [25, 25, 10]
+        assert parquet.read().to_pylist() == _products(60)
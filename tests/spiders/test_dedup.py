@@ -0,0 +1,194 @@
+"""Tests for the deduplication backends of the scheduler."""
+
+import pickle
+import hashlib
+
+import pytest
+
+from scrapling.spiders.request import Request
+from scrapling.spiders.scheduler import Scheduler
+from scrapling.spiders.checkpoint import CheckpointData
+from scrapling.spiders.dedup import (
+    BloomSeenSet,
+    CompactSeenSet,
+    DiskSeenSet,
+    DiskSeenSetReference,
+    create_seen_set,
+)
+
+
+def _fingerprint(i: int) -> bytes:
+    return hashlib.sha1(str(i).encode()).digest()
+
+
+@pytest.fixture(params=["compact", "bloom", "disk"])
+def seen_set(request, tmp_path):
+    seen = create_seen_set(request.param, tmp_path)
+    yield seen
+    seen.close()
+
+
+class TestSeenSets:
+    """Behavior shared by every backend."""
+
+    def test_add_and_contains(self, seen_set):
+        for i in range(100):
+            seen_set.add(_fingerprint(i))
+
+        assert len(seen_set) == 100
+        assert all(_fingerprint(i) in seen_set for i in range(100))
+        assert _fingerprint(1000) not in seen_set
+
+    def test_duplicates_counted_once(self, seen_set):
+        seen_set.add(_fingerprint(1))
+        seen_set.add(_fingerprint(1))
+
+        assert len(seen_set) == 1
+
+
+class TestCreateSeenSet:
+    def test_memory_backend_is_a_set(self):
+        assert create_seen_set("memory") == set()
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            create_seen_set("redis")  # type: ignore[arg-type]
+
+
+class TestCompactSeenSet:
+    def test_grows_without_losing_fingerprints(self):
+        seen = CompactSeenSet(capacity=8)
+        for i in range(5000):
+            seen.add(_fingerprint(i))
+
+        assert len(seen) == 5000
+        assert all(_fingerprint(i) in seen for i in range(5000))
+        assert set(seen) == {_fingerprint(i) for i in range(5000)}
+
+    def test_all_zeros_fingerprint(self):
+        seen = CompactSeenSet()
+        assert bytes(20) not in seen
+
+        seen.add(bytes(20))
+        assert bytes(20) in seen
+        assert len(seen) == 1
+
+    def test_wrong_width_rejected(self):
+        with pytest.raises(ValueError):
+            CompactSeenSet().add(b"short")
+
+    def test_copy_is_independent(self):
+        seen = CompactSeenSet()
+        seen.add(_fingerprint(1))
+
+        copied = seen.copy()
+        copied.add(_fingerprint(2))
+
+        assert _fingerprint(2) not in seen
+        assert len(seen) == 1
+
+    def test_survives_pickling(self):
+        seen = CompactSeenSet()
+        seen.add(_fingerprint(1))
+
+        restored = pickle.loads(pickle.dumps(seen))
+
+        assert _fingerprint(1) in restored
+        assert len(restored) == 1
+
+
+class TestBloomSeenSet:
+    def test_invalid_error_rate(self):
+        with pytest.raises(ValueError):
+            BloomSeenSet(error_rate=0)
+
+    def test_scales_within_error_rate(self):
+        seen = BloomSeenSet(error_rate=0.01, initial_capacity=500)
+        for i in range(10_000):
+            seen.add(_fingerprint(i))
+
+        assert len(seen._filters) > 1
+        assert all(_fingerprint(i) in seen for i in range(10_000))
+        false_positives = sum(_fingerprint(i) in seen for i in range(10_000, 30_000))
+        assert false_positives / 20_000 <= 0.01
+
+    def test_copy_is_independent(self):
+        seen = BloomSeenSet()
+        seen.add(_fingerprint(1))
+
+        copied = seen.copy()
+        copied.add(_fingerprint(2))
+
+        assert _fingerprint(2) not in seen
+        assert len(seen) == 1
+
+
+class TestDiskSeenSet:
+    def test_reference_restores_fingerprints_up_to_it(self, tmp_path):
+        seen = DiskSeenSet(tmp_path)
+        seen.add(_fingerprint(1))
+
+        reference = pickle.loads(pickle.dumps(seen.copy()))
+        seen.add(_fingerprint(2))
+        seen.close(delete=False)
+
+        assert isinstance(reference, DiskSeenSetReference)
+        assert len(reference) == 1
+        restored = reference.copy()
+        assert _fingerprint(1) in restored
+        assert _fingerprint(2) not in restored
+        assert len(restored) == 1
+        restored.close()
+
+    def test_new_set_starts_empty(self, tmp_path):
+        seen = DiskSeenSet(tmp_path)
+        seen.add(_fingerprint(1))
+        seen.close(delete=False)
+
+        fresh = DiskSeenSet(tmp_path)
+        assert _fingerprint(1) not in fresh
+        fresh.close()
+
+    def test_close_removes_the_database(self, tmp_path):
+        seen = DiskSeenSet(tmp_path)
+        seen.add(_fingerprint(1))
+        assert _fingerprint(1) in seen
+
+        seen.close()
+        assert not (tmp_path / DiskSeenSet.SEEN_FILE).exists()
+
+    def test_temporary_directory(self):
+        seen = DiskSeenSet()
+        seen.add(_fingerprint(1))
+        len(seen)
+        directory = seen.path.parent
+
+        seen.close(delete=False)
+        assert not directory.exists()
+
+
+class TestSchedulerWithSeenSets:
+    @pytest.mark.asyncio
+    async def test_duplicates_filtered(self, seen_set):
+        scheduler = Scheduler(seen=seen_set)
+
+        assert await scheduler.enqueue(Request("https://example.com/1")) is True
+        assert await scheduler.enqueue(Request("https://example.com/1")) is False
+        assert len(scheduler) == 1
+
+    @pytest.mark.asyncio
+    async def test_checkpoint_roundtrip(self, seen_set):
+        scheduler = Scheduler(seen=seen_set)
+        await scheduler.enqueue(Request("https://example.com/1"))
+        await scheduler.enqueue(Request("https://example.com/2"))
+
+        requests, seen = scheduler.snapshot()
+        data = pickle.loads(pickle.dumps(CheckpointData(requests=requests, seen=seen)))
+        scheduler.close(delete=False)
+
+        restored = Scheduler(seen=create_seen_set("memory"))
+        restored.restore(data)
+
+        assert await restored.enqueue(Request("https://example.com/1")) is False
+        assert await restored.enqueue(Request("https://example.com/3")) is True
+        restored.close()
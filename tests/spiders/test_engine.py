@@ -2,13 +2,18 @@
 
 import tempfile
 from pathlib import Path
+from typing import Annotated
 
 import anyio
+import msgspec
+import orjson
 import pytest
 
 from scrapling.spiders.engine import CrawlerEngine, _dump
 from scrapling.spiders.request import Request
+from scrapling.spiders.scheduler import Scheduler
 from scrapling.spiders.robotstxt import RobotsTxtManager
+from scrapling.spiders.pipeline import ItemStage, JsonLinesSink
 from scrapling.spiders.session import SessionManager
 from scrapling.spiders.result import CrawlStats, ItemList
 from scrapling.spiders.checkpoint import CheckpointData
@@ -23,7 +28,9 @@ from scrapling.core._types import Any, Dict, Set, AsyncGenerator
 class MockResponse:
     """Minimal Response stand-in."""
 
-    def __init__(self, status: int = 200, body: bytes = b"ok", url: str = "https://example.com", encoding: str = "utf-8"):
+    def __init__(
+        self, status: int = 200, body: bytes = b"ok", url: str = "https://example.com", encoding: str = "utf-8"
+    ):
         self.status = status
         self.body = body
         self.url = url
@@ -78,6 +85,9 @@ class MockSpider:
         concurrent_requests_per_domain: int = 0,
         download_delay: float = 0.0,
         max_blocked_retries: int = 3,
+        max_memory_requests: int = 0,
+        scheduler_backend: str = "memory",
+        scheduler_path: str | None = None,
         autothrottle_enabled: bool = False,
         autothrottle_start_delay: float = 5.0,
         autothrottle_max_delay: float = 60.0,
@@ -87,16 +97,26 @@ class MockSpider:
         fp_include_kwargs: bool = False,
         fp_include_headers: bool = False,
         fp_keep_fragments: bool = False,
+        dedup_backend: str = "memory",
         is_blocked_fn=None,
         on_scraped_item_fn=None,
         retry_blocked_request_fn=None,
         robots_txt_obey: bool = False,
         start_urls: list[str] | None = None,
+        pipeline_stages: list | None = None,
+        keep_items: bool = True,
+        item_type: type | None = None,
+        item_batch_size: int = 100,
+        item_queue_size: int = 1000,
     ):
         self.concurrent_requests = concurrent_requests
         self.concurrent_requests_per_domain = concurrent_requests_per_domain
         self.download_delay = download_delay
         self.max_blocked_retries = max_blocked_retries
+        self.max_memory_requests = max_memory_requests
+        self.scheduler_backend = scheduler_backend
+        self.scheduler_path = scheduler_path
+        self.scheduler_lease_timeout = 600.0
         self.autothrottle_enabled = autothrottle_enabled
         self.autothrottle_start_delay = autothrottle_start_delay
         self.autothrottle_max_delay = autothrottle_max_delay
@@ -106,10 +126,31 @@ class MockSpider:
         self.fp_include_kwargs = fp_include_kwargs
         self.fp_include_headers = fp_include_headers
         self.fp_keep_fragments = fp_keep_fragments
+        self.dedup_backend = dedup_backend
+        self.dedup_error_rate = 0.001
+        self.parse_workers = 0
+        self.keep_items = keep_items
+        self.item_type = item_type
+        self.item_batch_size = item_batch_size
+        self.item_queue_size = item_queue_size
         self.name = "test_spider"
         self.robots_txt_obey = robots_txt_obey
         self.development_mode = False
         self.development_cache_dir = None
+        self.recrawl_cache_dir = None
+        self.recrawl_cache_compression = None
+        self.recrawl_skip_unchanged = False
+        self.dedup_redirects = False
+        self.learn_redirects = False
+        self.near_duplicates = None
+        self.near_duplicate_distance = 3
+        self.url_pattern_max_requests = None
+        self.url_pattern_unproductive_after = None
+        self.adaptive_priority = False
+        self.adaptive_priority_weight = 10
+        self.crawl_order = "priority"
+        self.max_depth = None
+        self.start_requests_low_water = 1000
         self.start_urls = start_urls or []
 
         # Tracking lists
@@ -124,6 +165,7 @@ class MockSpider:
         self._is_blocked_fn = is_blocked_fn
         self._on_scraped_item_fn = on_scraped_item_fn
         self._retry_blocked_request_fn = retry_blocked_request_fn
+        self._pipeline_stages = pipeline_stages or []
 
         # Log counter stub
         self._log_counter = _LogCounterStub()
@@ -134,6 +176,9 @@ class MockSpider:
     async def on_start(self, resuming: bool = False) -> None:
         self.on_start_calls.append({"resuming": resuming})
 
+    def configure_pipeline(self) -> list:
+        return list(self._pipeline_stages)
+
     async def on_close(self) -> None:
         self.on_close_calls += 1
 
@@ -223,10 +268,10 @@ class TestCrawlerEngineInit:
             engine = _make_engine(crawldir=tmpdir)
             assert engine._checkpoint_system_enabled is True
 
-    def test_global_limiter_uses_concurrent_requests(self):
-        spider = MockSpider(concurrent_requests=8)
+    def test_scheduler_uses_per_domain_limit(self):
+        spider = MockSpider(concurrent_requests_per_domain=3)
         engine = _make_engine(spider=spider)
-        assert engine._global_limiter.total_tokens == 8
+        assert engine.scheduler._domain_slots == 3
 
     def test_allowed_domains_from_spider(self):
         spider = MockSpider(allowed_domains={"example.com", "test.org"})
@@ -274,41 +319,38 @@ class TestIsDomainAllowed:
         assert engine._is_domain_allowed(Request("https://b.org/")) is True
         assert engine._is_domain_allowed(Request("https://c.net/")) is False
 
+    def test_parent_domain_not_matched(self):
+        spider = MockSpider(allowed_domains={"shop.example.com"})
+        engine = _make_engine(spider=spider)
+
+        assert engine._is_domain_allowed(Request("https://a.shop.example.com/")) is True
+        assert engine._is_domain_allowed(Request("https://example.com/")) is False
+        assert engine._is_domain_allowed(Request("https://com/")) is False
+
 
 # ---------------------------------------------------------------------------
-# Tests: _rate_limiter
+# Tests: _dispatch_delay
 # ---------------------------------------------------------------------------
 
 
-class TestRateLimiter:
-    def test_returns_global_limiter_when_per_domain_disabled(self):
-        engine = _make_engine()  # concurrent_requests_per_domain=0
-        limiter = engine._rate_limiter("example.com")
-        assert limiter is engine._global_limiter
-
-    def test_returns_per_domain_limiter_when_enabled(self):
-        spider = MockSpider(concurrent_requests_per_domain=2)
+class TestDispatchDelay:
+    def test_uses_download_delay(self):
+        spider = MockSpider(download_delay=1.5)
         engine = _make_engine(spider=spider)
+        assert engine._dispatch_delay("example.com") == 1.5
 
-        limiter = engine._rate_limiter("example.com")
-        assert limiter is not engine._global_limiter
-        assert limiter.total_tokens == 2
-
-    def test_same_domain_returns_same_limiter(self):
-        spider = MockSpider(concurrent_requests_per_domain=2)
+    def test_uses_robots_delay_once_known(self):
+        spider = MockSpider(download_delay=0.5, robots_txt_obey=True)
         engine = _make_engine(spider=spider)
+        engine._domain_delays["example.com"] = 2.0
 
-        l1 = engine._rate_limiter("example.com")
-        l2 = engine._rate_limiter("example.com")
-        assert l1 is l2
+        assert engine._dispatch_delay("example.com") == 2.0
+        assert engine._dispatch_delay("other.com") == 0.5
 
-    def test_different_domains_get_different_limiters(self):
-        spider = MockSpider(concurrent_requests_per_domain=2)
+    def test_uses_autothrottle_delay(self):
+        spider = MockSpider(autothrottle_enabled=True, autothrottle_start_delay=3.0)
         engine = _make_engine(spider=spider)
-
-        l1 = engine._rate_limiter("a.com")
-        l2 = engine._rate_limiter("b.com")
-        assert l1 is not l2
+        assert engine._dispatch_delay("example.com") == 3.0
 
 
 # ---------------------------------------------------------------------------
@@ -869,6 +911,145 @@ class TestStreaming:
         assert len(engine.items) == 0
 
 
+# ---------------------------------------------------------------------------
+# Tests: event-driven crawl loop
+# ---------------------------------------------------------------------------
+
+
+class SlowSession(MockSession):
+    """Session that takes a while to respond and records when each fetch started and ended."""
+
+    def __init__(self, delay: float):
+        super().__init__("slow")
+        self._delay = delay
+        self.timeline: list[tuple[float, float]] = []
+
+    async def fetch(self, url: str, **kwargs):
+        started_at = anyio.current_time()
+        await anyio.sleep(self._delay)
+        self.timeline.append((started_at, anyio.current_time()))
+        return MockResponse(url=url)
+
+
+class TestEventDrivenLoop:
+    @pytest.mark.asyncio
+    async def test_loop_does_not_poll_while_tasks_are_running(self):
+        spider = MockSpider(concurrent_requests=1)
+
+        async def start_requests() -> AsyncGenerator[Request, None]:
+            for i in range(3):
+                yield Request(f"https://example.com/{i}", sid="default")
+
+        spider.start_requests = start_requests  # type: ignore[assignment]
+        engine = _make_engine(spider=spider, session=SlowSession(0.1))
+
+        waits = 0
+        original_wait = engine._wait_for_wakeup
+
+        async def counting_wait():
+            nonlocal waits
+            waits += 1
+            await original_wait()
+
+        engine._wait_for_wakeup = counting_wait  # type: ignore[method-assign]
+        stats = await engine.crawl()
+
+        assert stats.requests_count == 3
+        # One wait per finished task instead of dozens of 10 ms polling rounds
+        assert waits <= 6
+
+    @pytest.mark.asyncio
+    async def test_freed_slot_is_filled_right_away(self):
+        spider = MockSpider(concurrent_requests=1)
+
+        async def start_requests() -> AsyncGenerator[Request, None]:
+            for i in range(5):
+                yield Request(f"https://example.com/{i}", sid="default")
+
+        spider.start_requests = start_requests  # type: ignore[assignment]
+        session = SlowSession(0.02)
+        engine = _make_engine(spider=spider, session=session)
+
+        await engine.crawl()
+
+        gaps = [session.timeline[i + 1][0] - session.timeline[i][1] for i in range(len(session.timeline) - 1)]
+        assert len(gaps) == 4
+        assert max(gaps) < 0.01
+
+    @pytest.mark.asyncio
+    async def test_pause_request_wakes_the_loop(self):
+        engine = _make_engine()
+        engine._wakeup = anyio.Event()
+
+        async def pause_later():
+            await anyio.sleep(0.01)
+            engine.request_pause()
+
+        with anyio.fail_after(1):
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(pause_later)
+                await engine._wait_for_wakeup()
+
+        assert engine._pause_requested is True
+
+    @pytest.mark.asyncio
+    async def test_wait_times_out_when_checkpoint_is_due(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            engine = _make_engine(crawldir=tmpdir, interval=0.05)
+            engine._wakeup = anyio.Event()
+            engine._last_checkpoint_time = anyio.current_time()
+
+            with anyio.fail_after(1):
+                await engine._wait_for_wakeup()
+
+            assert engine._is_checkpoint_time()
+
+
+class TestPerDomainScheduling:
+    @pytest.mark.asyncio
+    async def test_throttled_domain_does_not_starve_others(self):
+        """A domain with a long delay only holds one slot, so the fast domain is crawled meanwhile."""
+        spider = MockSpider(concurrent_requests=2, download_delay=0.0)
+
+        async def start_requests() -> AsyncGenerator[Request, None]:
+            for i in range(3):
+                yield Request(f"https://slow.com/{i}", sid="default")
+            for i in range(6):
+                yield Request(f"https://fast.com/{i}", sid="default")
+
+        spider.start_requests = start_requests  # type: ignore[assignment]
+        session = MockSession()
+        engine = _make_engine(spider=spider, session=session)
+        engine.scheduler._delay_for = lambda domain: 0.3 if domain == "slow.com" else 0.0
+
+        with anyio.fail_after(5):
+            stats = await engine.crawl()
+
+        assert stats.requests_count == 9
+        fetched = [call["url"] for call in session.fetch_calls]
+        # Every fast.com page is fetched before the slow domain's delay lets its second page through
+        assert fetched.index("https://slow.com/1") > max(fetched.index(f"https://fast.com/{i}") for i in range(6))
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_refunds_the_delay(self):
+        spider = MockSpider(download_delay=10.0)
+        engine = _make_engine(spider=spider)
+
+        class _Cache:
+            async def get(self, fingerprint):
+                return MockResponse()
+
+        engine._cache_manager = _Cache()  # type: ignore[assignment]
+        await engine.scheduler.enqueue(Request("https://example.com/1", sid="default"))
+        await engine.scheduler.enqueue(Request("https://example.com/2", sid="default"))
+
+        request = await engine.scheduler.dequeue()
+        assert engine.scheduler.has_ready is False
+
+        await engine._process_request(request)
+        assert engine.scheduler.has_ready is True
+
+
 # ---------------------------------------------------------------------------
 # Tests: pause during crawl
 # ---------------------------------------------------------------------------
@@ -932,6 +1113,769 @@ class TestPauseDuringCrawl:
         assert engine.paused is False
 
 
+# ---------------------------------------------------------------------------
+# Tests: disk spill-over of the frontier
+# ---------------------------------------------------------------------------
+
+
+class TestSpillOver:
+    @staticmethod
+    def _spider(pages: int, **kwargs) -> MockSpider:
+        spider = MockSpider(concurrent_requests=1, max_memory_requests=2, **kwargs)
+
+        async def start_requests() -> AsyncGenerator[Request, None]:
+            for i in range(pages):
+                yield Request(f"https://example.com/{i}", sid="default")
+
+        spider.start_requests = start_requests  # type: ignore[assignment]
+        return spider
+
+    @pytest.mark.asyncio
+    async def test_crawls_every_spilled_request(self):
+        session = MockSession()
+        engine = _make_engine(spider=self._spider(20), session=session)
+
+        stats = await engine.crawl()
+
+        assert stats.requests_count == 20
+        assert len(engine.items) == 20
+        assert engine.scheduler._frontier is None
+
+    @pytest.mark.asyncio
+    async def test_pause_and_resume_keep_spilled_requests(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            first_session = MockSession()
+            spider = self._spider(10)
+            engine = _make_engine(spider=spider, session=first_session, crawldir=tmpdir)
+
+            async def parse_and_pause(response) -> AsyncGenerator:
+                engine.request_pause()
+                yield {"url": str(response)}
+
+            spider.parse = parse_and_pause  # type: ignore[assignment]
+            await engine.crawl()
+            assert engine.paused is True
+            assert (Path(tmpdir) / "frontier.db").exists()
+
+            second_session = MockSession()
+            resumed = _make_engine(spider=self._spider(10), session=second_session, crawldir=tmpdir)
+            stats = await resumed.crawl()
+
+            fetched = [call["url"] for call in first_session.fetch_calls + second_session.fetch_calls]
+            assert sorted(fetched) == sorted(f"https://example.com/{i}" for i in range(10))
+            # Callbacks of the requests loaded from disk point back to the spider
+            assert len(resumed.items) == stats.requests_count == 9
+            assert not (Path(tmpdir) / "frontier.db").exists()
+
+
+class TestJournalCheckpoints:
+    @pytest.mark.asyncio
+    async def test_second_pause_only_appends_to_journal(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fetched: list[str] = []
+
+            async def run(pause: bool) -> CrawlerEngine:
+                spider = MockSpider(concurrent_requests=1)
+
+                async def start_requests() -> AsyncGenerator[Request, None]:
+                    for i in range(6):
+                        yield Request(f"https://example.com/{i}", sid="default")
+
+                async def parse(response) -> AsyncGenerator:
+                    if pause:
+                        engine.request_pause()
+                    yield {"url": str(response)}
+
+                spider.start_requests = start_requests  # type: ignore[assignment]
+                spider.parse = parse  # type: ignore[assignment]
+                session = MockSession()
+                engine = _make_engine(spider=spider, session=session, crawldir=tmpdir, interval=0)
+                await engine.crawl()
+                fetched.extend(call["url"] for call in session.fetch_calls)
+                return engine
+
+            assert (await run(pause=True)).paused is True
+            base = (Path(tmpdir) / "checkpoint.pkl").read_bytes()
+
+            assert (await run(pause=True)).paused is True
+            # The second checkpoint only appended the completed request to the journal
+            assert (Path(tmpdir) / "checkpoint.pkl").read_bytes() == base
+
+            assert (await run(pause=False)).paused is False
+            assert sorted(fetched) == [f"https://example.com/{i}" for i in range(6)]
+            assert not (Path(tmpdir) / "checkpoint.journal").exists()
+
+
+class RedirectSession(MockSession):
+    """Session that answers like a website redirecting to https and dropping `utm_source`."""
+
+    async def fetch(self, url: str, **kwargs):
+        self.fetch_calls.append({"url": url, **kwargs})
+        final = url.replace("http://", "https://").replace("?utm_source=mail", "")
+        return MockResponse(status=200, body=b"ok", url=final)
+
+
+def _redirect_spider(urls: list[str], **attributes: Any) -> MockSpider:
+    spider = MockSpider(concurrent_requests=1)
+
+    async def start_requests() -> AsyncGenerator[Request, None]:
+        for url in urls:
+            yield Request(url, sid="default")
+
+    spider.start_requests = start_requests  # type: ignore[assignment]
+    for name, value in attributes.items():
+        setattr(spider, name, value)
+    return spider
+
+
+class TestRedirects:
+    @pytest.mark.asyncio
+    async def test_redirects_are_counted(self):
+        spider = _redirect_spider(["http://example.com/a", "https://example.com/b"])
+        engine = _make_engine(spider=spider, session=RedirectSession())
+
+        stats = await engine.crawl()
+
+        assert stats.redirects_followed == 1
+        assert stats.items_scraped == 2
+
+    @pytest.mark.asyncio
+    async def test_callbacks_skipped_for_final_urls_already_seen(self):
+        urls = ["https://example.com/a", "http://example.com/a", "https://example.com/a?utm_source=mail"]
+        spider = _redirect_spider([*urls, "https://example.com/b"], dedup_redirects=True)
+        engine = _make_engine(spider=spider, session=RedirectSession())
+
+        stats = await engine.crawl()
+
+        assert stats.redirects_followed == 2
+        assert stats.redirect_duplicates == 2
+        assert [item["url"] for item in engine.items] == ["https://example.com/a", "https://example.com/b"]
+
+    @pytest.mark.asyncio
+    async def test_final_urls_are_marked_as_seen(self):
+        spider = _redirect_spider(["http://example.com/a"], dedup_redirects=True)
+
+        async def parse(response) -> AsyncGenerator:
+            yield {"url": str(response)}
+            yield Request("https://example.com/a", sid="default")
+
+        spider.parse = parse  # type: ignore[assignment]
+        session = RedirectSession()
+        engine = _make_engine(spider=spider, session=session)
+
+        await engine.crawl()
+
+        # The link to the final URL was dropped as a duplicate instead of being fetched again
+        assert [call["url"] for call in session.fetch_calls] == ["http://example.com/a"]
+        assert engine.stats.items_scraped == 1
+
+    @pytest.mark.asyncio
+    async def test_learned_redirects_rewrite_requests(self):
+        urls = [f"http://example.com/products/{i}?utm_source=mail" for i in range(2)]
+        spider = _redirect_spider(urls, learn_redirects=True)
+        session = RedirectSession()
+        engine = _make_engine(spider=spider, session=session)
+        engine._redirect_rules.min_hits = 2  # type: ignore[union-attr]
+
+        # The rest are found once the first two redirects were learned
+        async def parse(response) -> AsyncGenerator:
+            yield {"url": str(response)}
+            if response.url.endswith("/1"):
+                for i in range(6, 10):
+                    yield Request(f"http://example.com/products/{i}?utm_source=mail", sid="default")
+
+        spider.parse = parse  # type: ignore[assignment]
+        stats = await engine.crawl()
+
+        assert stats.redirects_rewritten == 4
+        assert [call["url"] for call in session.fetch_calls][-4:] == [
+            f"https://example.com/products/{i}" for i in range(6, 10)
+        ]
+
+
+def _listing(title: str, products: range) -> bytes:
+    items = "".join(f"<li>Product {i} is a comfortable shoe in size {i % 12}</li>" for i in products)
+    return f"<html><body><h1>{title}</h1><ul>{items}</ul></body></html>".encode()
+
+
+class PageSession(MockSession):
+    """Session that answers with real HTML responses."""
+
+    def __init__(self, pages: Dict[str, bytes]):
+        super().__init__("pages")
+        self._pages = pages
+
+    async def fetch(self, url: str, **kwargs):
+        from scrapling.engines.toolbelt.custom import Response
+
+        self.fetch_calls.append({"url": url, **kwargs})
+        return Response(
+            url=url,
+            content=self._pages[url],
+            status=200,
+            reason="OK",
+            cookies={},
+            headers={"content-type": "text/html"},
+            request_headers={},
+        )
+
+
+class TestNearDuplicates:
+    PAGES = {
+        "https://example.com/shoes": _listing("Shoes", range(100)),
+        # The same listing with another sort order in its URL, and one product title changed
+        "https://example.com/shoes?sort=asc": _listing("Shoes", range(100)).replace(b"Product 7 ", b"Product seven "),
+        "https://example.com/hats": _listing("Hats", range(300, 400)).replace(b"shoe", b"hat"),
+    }
+
+    async def _crawl(self, action: str | None) -> tuple[CrawlerEngine, PageSession]:
+        spider = _redirect_spider(list(self.PAGES), near_duplicates=action, near_duplicate_distance=6)
+
+        async def parse(response) -> AsyncGenerator:
+            yield {"url": response.url}
+            if not response.url.endswith("/next"):
+                yield Request(f"{response.url}/next", sid="default")
+
+        spider.parse = parse  # type: ignore[assignment]
+        next_pages = {
+            f"{url}/next": _listing("Next", range((i + 1) * 1000, (i + 1) * 1000 + 100))
+            for i, url in enumerate(self.PAGES)
+        }
+        session = PageSession({**self.PAGES, **next_pages})
+        engine = _make_engine(spider=spider, session=session)
+        await engine.crawl()
+        return engine, session
+
+    @pytest.mark.asyncio
+    async def test_disabled_by_default(self):
+        engine, _ = await self._crawl(None)
+
+        assert engine.stats.near_duplicates == 0
+        assert engine.stats.items_scraped == 6
+
+    @pytest.mark.asyncio
+    async def test_skip(self):
+        engine, session = await self._crawl("skip")
+
+        assert engine.stats.near_duplicates == 1
+        assert "https://example.com/shoes?sort=asc" not in {item["url"] for item in engine.items}
+        assert "https://example.com/shoes?sort=asc/next" not in {call["url"] for call in session.fetch_calls}
+
+    @pytest.mark.asyncio
+    async def test_no_follow_keeps_the_items(self):
+        engine, session = await self._crawl("no_follow")
+
+        assert engine.stats.near_duplicates == 1
+        assert engine.stats.near_duplicate_requests_dropped == 1
+        assert "https://example.com/shoes?sort=asc" in {item["url"] for item in engine.items}
+        assert "https://example.com/shoes?sort=asc/next" not in {call["url"] for call in session.fetch_calls}
+
+    def test_unknown_action(self):
+        spider = MockSpider()
+        spider.near_duplicates = "drop"  # type: ignore[assignment]
+        with pytest.raises(ValueError):
+            _make_engine(spider=spider)
+
+
+class TestUrlPatterns:
+    """An endless calendar next to a few product pages."""
+
+    async def _crawl(self, **attributes: Any) -> tuple[CrawlerEngine, MockSession]:
+        spider = _redirect_spider(["https://example.com/calendar/1", "https://example.com/products/1"], **attributes)
+
+        async def parse(response) -> AsyncGenerator:
+            section, number = response.url.rsplit("/", 2)[-2:]
+            if section == "products":
+                yield {"url": response.url}
+                if int(number) < 3:
+                    yield Request(f"https://example.com/products/{int(number) + 1}", sid="default")
+            else:
+                yield Request(f"https://example.com/calendar/{int(number) + 1}", sid="default")
+
+        spider.parse = parse  # type: ignore[assignment]
+        session = MockSession()
+        engine = _make_engine(spider=spider, session=session)
+        await engine.crawl()
+        return engine, session
+
+    @pytest.mark.asyncio
+    async def test_budget_blocks_the_pattern(self):
+        engine, session = await self._crawl(url_pattern_max_requests=5)
+
+        calendar = [call["url"] for call in session.fetch_calls if "/calendar/" in call["url"]]
+        # The start request and the 5 queued ones
+        assert len(calendar) == 6
+        assert engine.stats.url_pattern_requests_blocked == 1
+        assert engine.stats.items_scraped == 3
+        report = engine.stats.url_patterns["example.com/calendar/{n}"]
+        assert report["status"] == "blocked"
+        assert report["requests"] == 5
+        assert report["items_per_fetch"] == 0.0
+        assert "example.com/products/{n}" not in engine.stats.url_patterns
+
+    @pytest.mark.asyncio
+    async def test_unproductive_pattern_is_queued_last(self):
+        engine, session = await self._crawl(url_pattern_max_requests=10, url_pattern_unproductive_after=1)
+
+        urls = [call["url"] for call in session.fetch_calls]
+        assert engine.stats.url_pattern_requests_throttled > 0
+        assert engine.stats.url_patterns["example.com/calendar/{n}"]["throttled"] > 0
+        # Every product page was fetched before the calendar went on
+        assert urls.index("https://example.com/products/3") < urls.index("https://example.com/calendar/3")
+
+    @pytest.mark.asyncio
+    async def test_disabled_by_default(self):
+        spider = MockSpider()
+        engine = _make_engine(spider=spider)
+
+        await engine.crawl()
+
+        assert engine._url_patterns is None
+        assert engine.stats.url_patterns == {}
+
+
+class TestAdaptivePriority:
+    """A website with endless tag pages next to a few categories of products."""
+
+    async def _crawl(self, adaptive: bool) -> tuple[CrawlerEngine, list[str]]:
+        spider = _redirect_spider(
+            ["https://example.com/tags/1", "https://example.com/category/1"], adaptive_priority=adaptive
+        )
+
+        async def parse_product(response) -> AsyncGenerator:
+            yield {"url": response.url}
+
+        async def parse(response) -> AsyncGenerator:
+            section, number = response.url.rsplit("/", 2)[-2:]
+            if section == "tags":
+                for tag in (2 * int(number), 2 * int(number) + 1):
+                    if tag < 64:
+                        yield Request(f"https://example.com/tags/{tag}", sid="default")
+            else:
+                for product in range(3):
+                    yield Request(
+                        f"https://example.com/products/{number}-{product}", sid="default", callback=parse_product
+                    )
+                if int(number) < 4:
+                    yield Request(f"https://example.com/category/{int(number) + 1}", sid="default")
+
+        spider.parse = parse  # type: ignore[assignment]
+        session = MockSession()
+        engine = _make_engine(spider=spider, session=session)
+        await engine.crawl()
+        return engine, [call["url"] for call in session.fetch_calls]
+
+    @pytest.mark.asyncio
+    async def test_item_pages_are_fetched_first(self):
+        engine, urls = await self._crawl(adaptive=True)
+        _, static_urls = await self._crawl(adaptive=False)
+
+        # The same pages are crawled, only in another order
+        assert sorted(urls) == sorted(static_urls)
+        assert engine.stats.items_scraped == 12
+        last_product = max(i for i, url in enumerate(urls) if "/products/" in url)
+        static_last_product = max(i for i, url in enumerate(static_urls) if "/products/" in url)
+        assert last_product < static_last_product
+        assert last_product < len(urls) // 2
+        assert next(iter(engine.stats.yield_scores)).startswith("parse_product example.com/products/")
+
+    @pytest.mark.asyncio
+    async def test_disabled_by_default(self):
+        engine = _make_engine()
+
+        await engine.crawl()
+
+        assert engine._prioritizer is None
+        assert engine.stats.yield_scores == {}
+
+
+class TestDepth:
+    """A website whose pages each link to two deeper pages."""
+
+    async def _crawl(self, **attributes: Any) -> tuple[CrawlerEngine, list[str]]:
+        spider = _redirect_spider(["https://example.com/n"], **attributes)
+
+        async def parse(response) -> AsyncGenerator:
+            yield {"url": response.url}
+            if len(response.url) < len("https://example.com/n") + 3:
+                yield Request(f"{response.url}0", sid="default")
+                yield Request(f"{response.url}1", sid="default")
+
+        spider.parse = parse  # type: ignore[assignment]
+        session = MockSession()
+        engine = _make_engine(spider=spider, session=session)
+        await engine.crawl()
+        return engine, [call["url"].rsplit("/", 1)[-1] for call in session.fetch_calls]
+
+    @pytest.mark.asyncio
+    async def test_depth_stats(self):
+        engine, _ = await self._crawl()
+
+        assert engine.stats.depth_requests_count == {"depth_0": 1, "depth_1": 2, "depth_2": 4, "depth_3": 8}
+        assert engine.stats.depth_limited_count == 0
+
+    @pytest.mark.asyncio
+    async def test_max_depth(self):
+        engine, urls = await self._crawl(max_depth=1)
+
+        assert urls == ["n", "n0", "n1"]
+        assert engine.stats.depth_limited_count == 4
+        assert engine.stats.to_dict()["depth_requests_count"] == {"depth_0": 1, "depth_1": 2}
+
+    @pytest.mark.asyncio
+    async def test_bfs(self):
+        _, urls = await self._crawl(crawl_order="bfs", max_depth=2)
+
+        assert urls == ["n", "n0", "n1", "n00", "n01", "n10", "n11"]
+
+    @pytest.mark.asyncio
+    async def test_dfs(self):
+        _, urls = await self._crawl(crawl_order="dfs", max_depth=2)
+
+        assert urls == ["n", "n0", "n00", "n01", "n1", "n10", "n11"]
+
+    def test_invalid_settings(self):
+        with pytest.raises(ValueError):
+            _make_engine(spider=_redirect_spider([], crawl_order="random"))
+        with pytest.raises(ValueError):
+            _make_engine(spider=_redirect_spider([], max_depth=-1))
+
+
+class TestLazyStartRequests:
+    @staticmethod
+    def _spider(pages: int, events: list[str], **attributes: Any) -> MockSpider:
+        spider = MockSpider(concurrent_requests=1)
+
+        async def start_requests() -> AsyncGenerator[Request, None]:
+            for i in range(pages):
+                events.append(f"seed {i}")
+                yield Request(f"https://example.com/{i}", sid="default")
+
+        async def parse(response) -> AsyncGenerator:
+            events.append(f"parse {response.url.rsplit('/', 1)[-1]}")
+            yield {"url": response.url}
+
+        spider.start_requests = start_requests  # type: ignore[assignment]
+        spider.parse = parse  # type: ignore[assignment]
+        for name, value in attributes.items():
+            setattr(spider, name, value)
+        return spider
+
+    @pytest.mark.asyncio
+    async def test_crawling_starts_before_all_start_requests_are_queued(self):
+        events: list[str] = []
+        engine = _make_engine(spider=self._spider(6, events, start_requests_low_water=2))
+
+        stats = await engine.crawl()
+
+        assert stats.requests_count == 6
+        assert events.index("parse 0") < events.index("seed 5")
+        assert engine._start_requests is None
+
+    @pytest.mark.asyncio
+    async def test_without_low_water_all_start_requests_are_queued_first(self):
+        events: list[str] = []
+        engine = _make_engine(spider=self._spider(6, events, start_requests_low_water=None))
+
+        await engine.crawl()
+
+        assert events[:6] == [f"seed {i}" for i in range(6)]
+
+    @pytest.mark.asyncio
+    async def test_queue_is_counted_once_per_batch(self):
+        counted = []
+
+        class CountingScheduler(Scheduler):
+            def __len__(self) -> int:
+                counted.append(True)
+                return super().__len__()
+
+        engine = _make_engine(spider=self._spider(250, [], start_requests_low_water=100))
+        engine.scheduler = CountingScheduler()
+        engine._start_requests = engine.spider.start_requests()
+
+        await engine._feed_start_requests()
+
+        assert engine._start_requests_consumed == 100
+        assert len(counted) == 2
+
+    @pytest.mark.asyncio
+    async def test_resume_continues_after_the_consumed_start_requests(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            events: list[str] = []
+            spider = self._spider(6, events, start_requests_low_water=1)
+            engine = _make_engine(spider=spider, crawldir=tmpdir, interval=0)
+
+            async def parse_and_pause(response) -> AsyncGenerator:
+                engine.request_pause()
+                yield {"url": response.url}
+
+            spider.parse = parse_and_pause  # type: ignore[assignment]
+            await engine.crawl()
+            assert engine.paused is True
+            consumed = engine._start_requests_consumed
+            assert 0 < consumed < 6
+
+            session = MockSession()
+            resumed = _make_engine(
+                spider=self._spider(6, [], start_requests_low_water=1), session=session, crawldir=tmpdir
+            )
+            stats = await resumed.crawl()
+
+            # The requests queued before the pause come from the checkpoint, the rest from start_requests()
+            assert stats.requests_count == 6 - 1
+            assert sorted(call["url"] for call in session.fetch_calls) == [
+                f"https://example.com/{i}" for i in range(1, 6)
+            ]
+            assert resumed._start_requests_consumed is None
+
+
+class TestYieldedLists:
+    @pytest.mark.asyncio
+    async def test_lists_of_requests_are_queued_at_once(self):
+        spider = _redirect_spider(["https://example.com/"], allowed_domains={"example.com"})
+
+        async def parse(response) -> AsyncGenerator:
+            if response.url == "https://example.com/":
+                yield [
+                    Request("https://example.com/1", sid="default"),
+                    Request("https://example.com/2", sid="default"),
+                    Request("https://example.com/1", sid="default"),
+                    Request("https://other.com/", sid="default"),
+                    {"not": "a request"},
+                ]
+            yield {"url": response.url}
+
+        spider.parse = parse  # type: ignore[assignment]
+        session = MockSession()
+        engine = _make_engine(spider=spider, session=session)
+        stats = await engine.crawl()
+
+        assert [call["url"] for call in session.fetch_calls] == [
+            "https://example.com/",
+            "https://example.com/1",
+            "https://example.com/2",
+        ]
+        assert stats.offsite_requests_count == 1
+        assert stats.depth_requests_count == {"depth_0": 1, "depth_1": 2}
+        assert stats.items_scraped == 3
+
+
+class TestDedupBackends:
+    @pytest.mark.asyncio
+    async def test_disk_backend_pause_and_resume(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            spider = TestSpillOver._spider(5, dedup_backend="disk")
+            engine = _make_engine(spider=spider, crawldir=tmpdir)
+
+            async def parse_and_pause(response) -> AsyncGenerator:
+                engine.request_pause()
+                # Already seen before the checkpoint, so it's dropped after resuming too
+                yield Request("https://example.com/0", sid="default")
+
+            spider.parse = parse_and_pause  # type: ignore[assignment]
+            await engine.crawl()
+            assert (Path(tmpdir) / "seen.db").exists()
+
+            session = MockSession()
+            resumed = _make_engine(spider=TestSpillOver._spider(5), session=session, crawldir=tmpdir)
+            await resumed.crawl()
+
+            assert sorted(call["url"] for call in session.fetch_calls) == [
+                f"https://example.com/{i}" for i in range(1, 5)
+            ]
+            assert not (Path(tmpdir) / "seen.db").exists()
+
+
+class TestSharedSchedulerBackend:
+    @staticmethod
+    def _spider(pages: int, path: str) -> MockSpider:
+        spider = MockSpider(concurrent_requests=2, scheduler_backend="sqlite", scheduler_path=path)
+
+        async def start_requests() -> AsyncGenerator[Request, None]:
+            for i in range(pages):
+                yield Request(f"https://example.com/{i}", sid="default")
+
+        spider.start_requests = start_requests  # type: ignore[assignment]
+        return spider
+
+    def test_requires_a_path(self):
+        with pytest.raises(ValueError, match="scheduler_path"):
+            _make_engine(spider=MockSpider(scheduler_backend="sqlite"))
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError, match="Unknown scheduler backend"):
+            _make_engine(spider=MockSpider(scheduler_backend="redis"))
+
+    @pytest.mark.asyncio
+    async def test_crawls_through_the_database(self, tmp_path):
+        path = str(tmp_path / "frontier.db")
+        session = MockSession()
+        engine = _make_engine(spider=self._spider(5, path), session=session)
+
+        stats = await engine.crawl()
+
+        assert stats.requests_count == 5
+        assert len(engine.items) == 5
+        assert (tmp_path / "frontier.db").exists()
+
+    @pytest.mark.asyncio
+    async def test_stopped_crawl_resumes_from_the_database(self, tmp_path):
+        path = str(tmp_path / "frontier.db")
+        first_session = MockSession()
+        spider = self._spider(6, path)
+        spider.concurrent_requests = 1
+        engine = _make_engine(spider=spider, session=first_session)
+
+        async def parse_and_stop(response) -> AsyncGenerator:
+            engine.request_pause()
+            yield {"url": str(response)}
+
+        spider.parse = parse_and_stop  # type: ignore[assignment]
+        await engine.crawl()
+        assert len(first_session.fetch_calls) == 1
+
+        second_session = MockSession()
+        await _make_engine(spider=self._spider(6, path), session=second_session).crawl()
+
+        fetched = [call["url"] for call in first_session.fetch_calls + second_session.fetch_calls]
+        assert sorted(fetched) == [f"https://example.com/{i}" for i in range(6)]
+
+
+class EvenPagesStage(ItemStage):
+    """Drops the items of odd pages and records the batches it saw."""
+
+    def __init__(self):
+        self.batches: list[list[dict]] = []
+        self.closed = False
+
+    async def process(self, items: list[dict]) -> list[dict]:
+        self.batches.append(items)
+        return [item for item in items if int(item["url"].rsplit("/", 1)[1]) % 2 == 0]
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class TestItemPipeline:
+    @staticmethod
+    def _spider(pages: int, **kwargs) -> MockSpider:
+        spider = MockSpider(concurrent_requests=4, **kwargs)
+
+        async def start_requests() -> AsyncGenerator[Request, None]:
+            for i in range(pages):
+                yield Request(f"https://example.com/{i}", sid="default")
+
+        spider.start_requests = start_requests  # type: ignore[assignment]
+        return spider
+
+    @pytest.mark.asyncio
+    async def test_items_go_through_the_stages(self):
+        stage = EvenPagesStage()
+        engine = _make_engine(spider=self._spider(10, pipeline_stages=[stage]))
+
+        stats = await engine.crawl()
+
+        assert sorted(item["url"] for item in engine.items) == [f"https://example.com/{i}" for i in range(0, 10, 2)]
+        assert stats.items_scraped == 5
+        assert stats.items_dropped == 5
+        assert sum(len(batch) for batch in stage.batches) == 10
+        assert stage.closed
+
+    @pytest.mark.asyncio
+    async def test_items_not_kept_in_memory(self, tmp_path):
+        sink = JsonLinesSink(tmp_path / "items.jsonl")
+        engine = _make_engine(spider=self._spider(10, pipeline_stages=[sink], keep_items=False))
+
+        stats = await engine.crawl()
+
+        assert len(engine.items) == 0
+        assert stats.items_scraped == 10
+        lines = (tmp_path / "items.jsonl").read_bytes().splitlines()
+        assert sorted(orjson.loads(line)["url"] for line in lines) == sorted(
+            f"https://example.com/{i}" for i in range(10)
+        )
+
+    @pytest.mark.asyncio
+    async def test_stream_receives_the_stages_output(self):
+        engine = _make_engine(spider=self._spider(6, pipeline_stages=[EvenPagesStage()]))
+
+        items = [item async for item in engine]
+
+        assert sorted(item["url"] for item in items) == [f"https://example.com/{i}" for i in range(0, 6, 2)]
+
+    @pytest.mark.asyncio
+    async def test_paused_crawl_flushes_the_pipeline(self, tmp_path):
+        spider = self._spider(6, pipeline_stages=[JsonLinesSink(tmp_path / "items.jsonl")], keep_items=False)
+        spider.concurrent_requests = 1
+        engine = _make_engine(spider=spider, crawldir=str(tmp_path / "crawl"))
+
+        async def parse_and_pause(response) -> AsyncGenerator:
+            engine.request_pause()
+            yield {"url": str(response)}
+
+        spider.parse = parse_and_pause  # type: ignore[assignment]
+        await engine.crawl()
+
+        assert engine.paused
+        assert len((tmp_path / "items.jsonl").read_bytes().splitlines()) == 1
+
+
+class Product(msgspec.Struct):
+    url: str
+    price: Annotated[float, msgspec.Meta(ge=0)]
+
+
+class TestTypedItems:
+    @staticmethod
+    def _spider(results: list, **kwargs) -> MockSpider:
+        spider = MockSpider(item_type=Product, **kwargs)
+
+        async def parse(response) -> AsyncGenerator:
+            for result in results:
+                yield result
+
+        spider.parse = parse  # type: ignore[assignment]
+        return spider
+
+    @pytest.mark.asyncio
+    async def test_dicts_are_validated_into_the_item_type(self):
+        engine = _make_engine(spider=self._spider([{"url": "https://example.com", "price": "1"}, {"url": "x"}]))
+
+        stats = await engine.crawl()
+
+        # Only exact types are converted, so the string price is invalid too
+        assert list(engine.items) == []
+        assert stats.items_dropped == 2
+
+        engine = _make_engine(spider=self._spider([{"url": "https://example.com", "price": 1}, {"price": -1}]))
+        stats = await engine.crawl()
+
+        assert list(engine.items) == [Product(url="https://example.com", price=1.0)]
+        assert stats.items_scraped == 1
+        assert stats.items_dropped == 1
+
+    @pytest.mark.asyncio
+    async def test_typed_items_pass_through(self):
+        spider = self._spider([Product(url="https://example.com", price=2.5)])
+        engine = _make_engine(spider=spider)
+
+        await engine.crawl()
+
+        assert list(engine.items) == [Product(url="https://example.com", price=2.5)]
+        assert spider.scraped_items == [Product(url="https://example.com", price=2.5)]
+
+    @pytest.mark.asyncio
+    async def test_structs_without_an_item_type(self):
+        spider = self._spider([Product(url="https://example.com", price=2.5)])
+        spider.item_type = None
+        engine = _make_engine(spider=spider)
+
+        await engine.crawl()
+
+        assert list(engine.items) == [Product(url="https://example.com", price=2.5)]
+
+
 # ---------------------------------------------------------------------------
 # Tests: _prefetch_robots_txt
 # ---------------------------------------------------------------------------
@@ -163,6 +163,54 @@ class TestXMLFeedSpider:
         assert items == []
         assert any("Failed to parse XML feed" in message for message in records)
 
+    @pytest.mark.asyncio
+    async def test_large_feed_is_streamed(self):
+        body = (
+            b"<rss><channel>"
+            + b"".join(b"<item><title>Post %d</title></item>" % i for i in range(5000))
+            + b"</channel></rss>"
+        )
+
+        class S(XMLFeedSpider):
+            name = "s"
+
+            async def parse_node(self, response, node):
+                # Every node is taken out of the document, so nothing parsed before it is kept around
+                yield {"title": node.findtext("title"), "detached": node.getparent() is None}
+
+        for feed in (body, gzip.compress(body)):
+            items = await _collect(S().parse(_make_response(feed)))
+            assert [item["title"] for item in items] == [f"Post {i}" for i in range(5000)]
+            assert all(item["detached"] for item in items)
+
+    @pytest.mark.asyncio
+    async def test_nodes_before_a_syntax_error_are_kept(self):
+        body = RSS_XML.replace(b"</channel>", b"<item><title>Broken</item></channel>")
+        spider = _RSSSpider()
+        records = []
+
+        class Capture(logging.Handler):
+            def emit(self, record):
+                records.append(record.getMessage())
+
+        spider.logger.addHandler(Capture())
+        items = await _collect(spider.parse(_make_response(body)))
+
+        assert [item["title"] for item in items] == ["First Post", "Second Post"]
+        assert any("Failed to parse XML feed" in message for message in records)
+
+    @pytest.mark.asyncio
+    async def test_nested_nodes_keep_their_outer_node_whole(self):
+        class S(XMLFeedSpider):
+            name = "s"
+
+            async def parse_node(self, response, node):
+                yield {"title": node.findtext("title"), "children": len(node.findall("item"))}
+
+        body = b"<rss><item><title>Outer</title><item><title>Inner</title></item></item></rss>"
+        items = await _collect(S().parse(_make_response(body)))
+        assert items == [{"title": "Inner", "children": 0}, {"title": "Outer", "children": 1}]
+
     @pytest.mark.asyncio
     async def test_requests_yielded_from_parse_node_flow_through(self):
         class S(XMLFeedSpider):
@@ -241,6 +289,18 @@ class TestCSVFeedSpider:
         rows = await _collect(_PriceSpider().parse(_make_response(body)))
         assert len(rows) == 1 and rows[0]["price"] == "10"
 
+    @pytest.mark.asyncio
+    async def test_large_feed_is_read_as_it_is_decoded(self):
+        # Multi-byte characters and quoted line breaks end up split between the decompressed chunks
+        rows = [f'"Café\nNo. {i}",{i}\r\n' for i in range(10000)]
+        body = ("title,price\r\n" + "".join(rows)).encode("utf-8")
+
+        for feed in (body, gzip.compress(body)):
+            parsed = await _collect(_PriceSpider().parse(_make_response(feed)))
+            assert len(parsed) == 10000
+            assert parsed[-1] == {"title": "Café\nNo. 9999", "price": "9999"}
+            assert all(row["title"] == f"Café\nNo. {i}" for i, row in enumerate(parsed))
+
     @pytest.mark.asyncio
     async def test_parse_row_not_overridden_raises(self):
         class S(CSVFeedSpider):
@@ -249,6 +309,18 @@ class TestCSVFeedSpider:
         with pytest.raises(NotImplementedError, match="parse_row"):
             await _collect(S().parse(_make_response(CSV_BODY)))
 
+    @pytest.mark.asyncio
+    async def test_os_errors_of_parse_row_are_not_swallowed(self):
+        class S(CSVFeedSpider):
+            name = "s"
+
+            async def parse_row(self, response, row):
+                raise FileNotFoundError(row["title"])
+                yield
+
+        with pytest.raises(FileNotFoundError, match="First"):
+            await _collect(S().parse(_make_response(CSV_BODY)))
+
     @pytest.mark.asyncio
     async def test_requests_yielded_from_parse_row_flow_through(self):
         class S(CSVFeedSpider):
@@ -71,6 +71,17 @@ class SlowSpider:
         self.concurrent_requests_per_domain = 0
         self.download_delay = 0.0
         self.max_blocked_retries = 3
+        self.max_memory_requests = 0
+        self.scheduler_backend = "memory"
+        self.scheduler_path = None
+        self.scheduler_lease_timeout = 600.0
+        self.dedup_backend = "memory"
+        self.dedup_error_rate = 0.001
+        self.parse_workers = 0
+        self.keep_items = True
+        self.item_type = None
+        self.item_batch_size = 100
+        self.item_queue_size = 1000
         self.autothrottle_enabled = False
         self.autothrottle_start_delay = 5.0
         self.autothrottle_max_delay = 60.0
@@ -83,6 +94,20 @@ class SlowSpider:
         self.robots_txt_obey = False
         self.development_mode = False
         self.development_cache_dir = None
+        self.recrawl_cache_dir = None
+        self.recrawl_cache_compression = None
+        self.recrawl_skip_unchanged = False
+        self.dedup_redirects = False
+        self.learn_redirects = False
+        self.near_duplicates = None
+        self.near_duplicate_distance = 3
+        self.url_pattern_max_requests = None
+        self.url_pattern_unproductive_after = None
+        self.adaptive_priority = False
+        self.adaptive_priority_weight = 10
+        self.crawl_order = "priority"
+        self.max_depth = None
+        self.start_requests_low_water = 1000
         self.start_urls = []
         self.name = "slow_spider"
         self._log_counter = _LogCounterStub()
@@ -96,6 +121,9 @@ class SlowSpider:
     async def on_start(self, resuming=False):
         self.on_start_calls.append({"resuming": resuming})
 
+    def configure_pipeline(self):
+        return []
+
     async def on_close(self):
         self.on_close_calls += 1
 
@@ -0,0 +1,55 @@
+"""Tests for the `Paginator` helper."""
+
+import pytest
+
+from scrapling.spiders import Paginator, Request
+
+
+def _page(page: int) -> Request:
+    return Request(f"https://example.com/items?page={page}", meta={"page": page})
+
+
+def _pages(requests: list[Request]) -> list[int]:
+    return [request.meta["page"] for request in requests]
+
+
+class TestPaginator:
+    def test_invalid_ahead(self):
+        with pytest.raises(ValueError):
+            Paginator(ahead=0)
+
+    def test_one_page_at_a_time_by_default(self):
+        paginator = Paginator()
+
+        assert _pages(paginator.start("items", _page)) == [1]
+        assert _pages(paginator.follow("items", 1, True, _page)) == [2]
+        assert paginator.follow("items", 2, False, _page) == []
+
+    def test_keeps_pages_requested_ahead(self):
+        paginator = Paginator(ahead=3)
+
+        assert _pages(paginator.start("items", _page)) == [1, 2, 3]
+        # Page 2 coming back before page 1 requests only what's not requested yet
+        assert _pages(paginator.follow("items", 2, True, _page)) == [4, 5]
+        assert paginator.follow("items", 1, True, _page) == []
+        assert _pages(paginator.follow("items", 3, True, _page)) == [6]
+
+    def test_stops_at_the_first_empty_page(self):
+        paginator = Paginator(ahead=4)
+        paginator.start("items", _page)
+
+        assert paginator.follow("items", 3, False, _page) == []
+        # Pages before the end that come back later don't request anything past it
+        assert paginator.follow("items", 1, True, _page) == []
+        assert paginator.follow("items", 4, False, _page) == []
+        assert paginator.is_finished("items", 4)
+        assert not paginator.is_finished("items", 3)
+
+    def test_listings_are_independent(self):
+        paginator = Paginator(ahead=2)
+
+        assert _pages(paginator.start("shoes", _page, first_page=0)) == [0, 1]
+        assert _pages(paginator.start("hats", _page)) == [1, 2]
+        paginator.follow("shoes", 0, False, _page)
+
+        assert _pages(paginator.follow("hats", 1, True, _page)) == [3]
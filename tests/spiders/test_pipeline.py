@@ -0,0 +1,214 @@
+"""Tests for the item pipeline and its file sinks."""
+
+import csv
+import gzip
+from xml.etree import ElementTree  # nosec B405 - only used to read back files these tests just wrote
+
+import anyio
+import msgspec
+import orjson
+import pytest
+
+from scrapling.spiders.pipeline import CsvSink, ItemPipeline, ItemStage, JsonLinesSink, XmlSink
+
+
+class Product(msgspec.Struct):
+    name: str
+    price: float
+
+
+class RecordingStage(ItemStage):
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.batches: list[list[dict]] = []
+        self.opened = self.closed = False
+
+    async def open(self) -> None:
+        self.opened = True
+
+    async def process(self, items: list[dict]) -> list[dict]:
+        await anyio.sleep(self.delay)
+        self.batches.append(items)
+        return [{**item, "seen": True} for item in items]
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class FailingStage(ItemStage):
+    async def process(self, items: list[dict]) -> list[dict]:
+        raise RuntimeError("broken stage")
+
+
+async def _run(stages, items, **kwargs) -> tuple[ItemPipeline, list[dict]]:
+    output: list[dict] = []
+
+    async def collect(item: dict) -> None:
+        output.append(item)
+
+    async with ItemPipeline(stages, collect, **kwargs) as pipeline:
+        for item in items:
+            await pipeline.put(item)
+    return pipeline, output
+
+
+class TestItemPipeline:
+    def test_invalid_sizes(self):
+        async def collect(item):
+            pass
+
+        with pytest.raises(ValueError):
+            ItemPipeline([], collect, batch_size=0)
+        with pytest.raises(ValueError):
+            ItemPipeline([], collect, queue_size=-1)
+
+    @pytest.mark.asyncio
+    async def test_stages_run_in_order_and_keep_item_order(self):
+        first, second = RecordingStage(), RecordingStage()
+        items = [{"n": i} for i in range(50)]
+
+        _, output = await _run([first, second], items, batch_size=8)
+
+        assert output == [{"n": i, "seen": True} for i in range(50)]
+        assert first.opened and first.closed and second.closed
+        assert all(len(batch) <= 8 for batch in first.batches)
+        # The second stage receives what the first one returned
+        assert all(item["seen"] for batch in second.batches for item in batch)
+
+    @pytest.mark.asyncio
+    async def test_batches_grow_when_a_stage_falls_behind(self):
+        stage = RecordingStage(delay=0.01)
+
+        await _run([stage], [{"n": i} for i in range(40)], batch_size=10, queue_size=100)
+
+        assert max(len(batch) for batch in stage.batches) == 10
+        assert len(stage.batches) < 40
+
+    @pytest.mark.asyncio
+    async def test_put_waits_while_the_queues_are_full(self):
+        release = anyio.Event()
+
+        class BlockedStage(ItemStage):
+            async def process(self, items: list[dict]) -> list[dict]:
+                await release.wait()
+                return items
+
+        output: list[dict] = []
+
+        async def collect(item: dict) -> None:
+            output.append(item)
+
+        sent = 0
+        async with ItemPipeline([BlockedStage()], collect, batch_size=1, queue_size=2) as pipeline:
+            with anyio.move_on_after(0.2):
+                for i in range(20):
+                    await pipeline.put({"n": i})
+                    sent += 1
+            # One batch in the stage and a full queue in front of it
+            assert sent == 3
+            release.set()
+            for i in range(sent, 20):
+                await pipeline.put({"n": i})
+
+        assert output == [{"n": i} for i in range(20)]
+
+    @pytest.mark.asyncio
+    async def test_failed_batches_are_dropped(self):
+        pipeline, output = await _run([FailingStage()], [{"n": i} for i in range(5)])
+
+        assert output == []
+        assert pipeline.dropped == 5
+
+
+class TestFileSinks:
+    @pytest.mark.asyncio
+    async def test_jsonl(self, tmp_path):
+        items = [{"n": i, "tags": ["a", "b"]} for i in range(5)]
+
+        await _run([JsonLinesSink(tmp_path / "items.jsonl")], items)
+
+        lines = (tmp_path / "items.jsonl").read_bytes().splitlines()
+        assert [orjson.loads(line) for line in lines] == items
+
+    @pytest.mark.asyncio
+    async def test_typed_items(self, tmp_path):
+        items = [Product(name="Hat", price=9.5), Product(name="Shoe", price=20.0)]
+
+        await _run([JsonLinesSink(tmp_path / "items.jsonl"), CsvSink(tmp_path / "items.csv")], items)
+
+        lines = (tmp_path / "items.jsonl").read_bytes().splitlines()
+        assert [msgspec.json.decode(line, type=Product) for line in lines] == items
+        assert (tmp_path / "items.csv").read_text().splitlines() == ["name,price", "Hat,9.5", "Shoe,20.0"]
+
+    @pytest.mark.asyncio
+    async def test_rotation_by_items(self, tmp_path):
+        sink = JsonLinesSink(tmp_path / "items.jsonl", max_items=4)
+
+        await _run([sink], [{"n": i} for i in range(10)])
+
+        assert [file.name for file in sink.files] == ["items-00000.jsonl", "items-00001.jsonl", "items-00002.jsonl"]
+        assert [len(file.read_bytes().splitlines()) for file in sink.files] == [4, 4, 2]
+
+    @pytest.mark.asyncio
+    async def test_rotation_by_bytes_with_placeholder(self, tmp_path):
+        sink = JsonLinesSink(tmp_path / "part-{index}.jsonl", max_bytes=20)
+
+        await _run([sink], [{"n": i} for i in range(4)])
+
+        # Every `{"n":0}` line is 8 bytes, so a file is full after 3 of them
+        assert [file.name for file in sink.files] == ["part-0.jsonl", "part-1.jsonl"]
+        assert sink.items_written == 4
+
+    @pytest.mark.asyncio
+    async def test_gzip(self, tmp_path):
+        sink = JsonLinesSink(tmp_path / "items.jsonl", compression="gzip")
+
+        await _run([sink], [{"n": i} for i in range(3)])
+
+        assert sink.files == [tmp_path / "items.jsonl.gz"]
+        assert gzip.decompress(sink.files[0].read_bytes()).splitlines() == [b'{"n":0}', b'{"n":1}', b'{"n":2}']
+
+    @pytest.mark.asyncio
+    async def test_zstd(self, tmp_path):
+        zstandard = pytest.importorskip("zstandard")
+        sink = JsonLinesSink(tmp_path / "items.jsonl", compression="zstd")
+
+        await _run([sink], [{"n": 1}])
+
+        assert sink.files == [tmp_path / "items.jsonl.zst"]
+        assert zstandard.ZstdDecompressor().decompressobj().decompress(sink.files[0].read_bytes()) == b'{"n":1}\n'
+
+    def test_invalid_options(self, tmp_path):
+        with pytest.raises(ValueError):
+            JsonLinesSink(tmp_path / "items.jsonl", compression="brotli")  # type: ignore[arg-type]
+        with pytest.raises(ValueError):
+            JsonLinesSink(tmp_path / "items.jsonl", max_items=-1)
+
+    @pytest.mark.asyncio
+    async def test_csv_header_in_every_file(self, tmp_path):
+        sink = CsvSink(tmp_path / "items.csv", max_items=2)
+
+        await _run([sink], [{"name": f"item {i}", "data": {"n": i}} for i in range(3)])
+
+        rows = [list(csv.reader(file.open(encoding="utf-8"))) for file in sink.files]
+        assert rows[0] == [["name", "data"], ["item 0", '{"n":0}'], ["item 1", '{"n":1}']]
+        assert rows[1] == [["name", "data"], ["item 2", '{"n":2}']]
+
+    @pytest.mark.asyncio
+    async def test_csv_fields(self, tmp_path):
+        await _run([CsvSink(tmp_path / "items.csv", fields=["b"], delimiter=";")], [{"a": 1, "b": 2}])
+
+        assert (tmp_path / "items.csv").read_text().splitlines() == ["b", "2"]
+
+    @pytest.mark.asyncio
+    async def test_xml_files_are_complete(self, tmp_path):
+        sink = XmlSink(tmp_path / "items.xml", root_tag="products", item_tag="product", max_items=2)
+
+        await _run([sink], [{"name": f"item {i}", "bad key": i} for i in range(3)])
+
+        roots = [ElementTree.parse(file).getroot() for file in sink.files]  # nosec B314
+        assert [root.tag for root in roots] == ["products", "products"]
+        assert [len(root) for root in roots] == [2, 1]
+        element = roots[1][0]
+        assert element.find("name").text == "item 2"
+        assert element.find("bad_key").get("name") == "bad key"
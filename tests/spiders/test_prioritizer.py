@@ -0,0 +1,72 @@
+"""Tests for learning which kinds of pages lead to items."""
+
+import pytest
+
+from scrapling.spiders.request import Request
+from scrapling.spiders.prioritizer import YieldPrioritizer, callback_name
+
+PRODUCT = ("parse_product", "example.com/products/{n}")
+LISTING = ("parse", "example.com/category/{n}")
+TAG = ("parse", "example.com/tags/{n}")
+
+
+class TestCallbackName:
+    def test_names(self):
+        async def parse_product(response):
+            yield None
+
+        assert callback_name(Request("https://example.com")) == "parse"
+        assert callback_name(Request("https://example.com", callback=parse_product)) == "parse_product"
+
+
+class TestYieldPrioritizer:
+    def test_invalid_settings(self):
+        with pytest.raises(ValueError):
+            YieldPrioritizer(weight=0)
+        with pytest.raises(ValueError):
+            YieldPrioritizer(discount=1.0)
+        with pytest.raises(ValueError):
+            YieldPrioritizer(window=0)
+
+    def test_nothing_learned_yet(self):
+        prioritizer = YieldPrioritizer()
+
+        assert prioritizer.value(PRODUCT) == 0.0
+        assert prioritizer.boost(PRODUCT) == 0
+
+    def test_item_pages_and_the_pages_leading_to_them(self):
+        prioritizer = YieldPrioritizer(weight=10, discount=0.5)
+        prioritizer.record(PRODUCT, items=2, lead_value=0.0)
+        prioritizer.record(LISTING, items=0, lead_value=prioritizer.value(PRODUCT))
+        prioritizer.record(TAG, items=0, lead_value=0.0)
+
+        assert prioritizer.value(LISTING) == 1.0
+        assert prioritizer.boost(PRODUCT) == 10
+        assert prioritizer.boost(LISTING) == 5
+        assert prioritizer.boost(TAG) == 0
+        assert list(prioritizer.report()) == [
+            "parse_product example.com/products/{n}",
+            "parse example.com/category/{n}",
+            "parse example.com/tags/{n}",
+        ]
+
+    def test_unknown_pages_are_optimistic(self):
+        prioritizer = YieldPrioritizer()
+        prioritizer.record(PRODUCT, items=1, lead_value=0.0)
+        prioritizer.record(TAG, items=0, lead_value=0.0)
+
+        assert prioritizer.boost(("parse", "example.com/blog/{n}")) == 10
+        # Named pages in a directory known to be worthless are valued like it
+        assert prioritizer.boost(("parse", "example.com/tags/shoes")) == 0
+
+    def test_values_follow_the_latest_pages(self):
+        prioritizer = YieldPrioritizer(window=2)
+        for _ in range(3):
+            prioritizer.record(PRODUCT, items=4, lead_value=0.0)
+        prioritizer.record(LISTING, items=1, lead_value=0.0)
+        for _ in range(3):
+            prioritizer.record(PRODUCT, items=0, lead_value=0.0)
+
+        assert prioritizer.value(PRODUCT) == 0.5
+        # The best kind of page is found again once the former one got worse
+        assert prioritizer.boost(LISTING) == 10
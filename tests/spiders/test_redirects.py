@@ -0,0 +1,110 @@
+"""Tests for learning and rewriting the redirects of a website."""
+
+import pytest
+
+from scrapling.spiders.redirects import RedirectRules
+
+
+def _learn(rules: RedirectRules, pairs: list[tuple[str, str]]) -> RedirectRules:
+    for url, final_url in pairs:
+        rules.learn(url, final_url)
+    return rules
+
+
+class TestRedirectRules:
+    def test_invalid_min_hits(self):
+        with pytest.raises(ValueError):
+            RedirectRules(min_hits=0)
+
+    def test_rule_applies_after_enough_hits(self):
+        rules = RedirectRules(min_hits=2)
+
+        rules.learn("http://example.com/products/1", "https://example.com/products/1")
+        assert rules.rewrite("http://example.com/products/9") == "http://example.com/products/9"
+
+        rules.learn("http://example.com/products/2", "https://example.com/products/2")
+        assert rules.rewrite("http://example.com/products/9") == "https://example.com/products/9"
+        assert len(rules) == 1
+
+    def test_rules_are_per_pattern(self):
+        rules = _learn(RedirectRules(min_hits=1), [("http://example.com/products/1", "https://example.com/products/1")])
+
+        assert rules.rewrite("http://example.com/search?q=1") == "http://example.com/search?q=1"
+        assert rules.rewrite("http://other.com/products/1") == "http://other.com/products/1"
+
+    @pytest.mark.parametrize(
+        "url, final_url, new_url, expected",
+        [
+            (
+                "https://example.com/a/1",
+                "https://www.example.com/a/1",
+                "https://example.com/a/2",
+                "https://www.example.com/a/2",
+            ),
+            (
+                "https://example.com/a/1",
+                "https://example.com/a/1/",
+                "https://example.com/a/2",
+                "https://example.com/a/2/",
+            ),
+            (
+                "https://example.com/a/1/",
+                "https://example.com/a/1",
+                "https://example.com/a/2/",
+                "https://example.com/a/2",
+            ),
+            (
+                "https://example.com/a/1?id=1&utm_source=x",
+                "https://example.com/a/1?id=1",
+                "https://example.com/a/2?utm_source=y&id=2",
+                "https://example.com/a/2?id=2",
+            ),
+        ],
+    )
+    def test_rewrites(self, url, final_url, new_url, expected):
+        rules = _learn(RedirectRules(min_hits=1), [(url, final_url)])
+
+        assert rules.rewrite(new_url) == expected
+
+    def test_redirects_no_rule_explains_are_ignored(self):
+        rules = _learn(
+            RedirectRules(min_hits=1),
+            [
+                ("https://example.com/p/1", "https://example.com/product/shoes"),
+                ("https://example.com/p/2", "https://cdn.example.org/p/2"),
+            ],
+        )
+
+        assert len(rules) == 0
+
+    def test_disagreeing_redirects_disable_the_rule(self):
+        rules = _learn(
+            RedirectRules(min_hits=1),
+            [
+                ("https://example.com/a/1", "https://example.com/a/1/"),
+                ("https://example.com/a/2", "https://www.example.com/a/2"),
+            ],
+        )
+
+        assert rules.rewrite("https://example.com/a/3") == "https://example.com/a/3"
+
+    def test_parameter_kept_elsewhere_disables_the_rule(self):
+        rules = _learn(
+            RedirectRules(min_hits=1),
+            [
+                ("https://example.com/a/1?page=2", "https://example.com/a/1"),
+                ("https://example.com/a/2?page=2&ref=x", "https://example.com/a/2?page=2"),
+            ],
+        )
+
+        assert rules.rewrite("https://example.com/a/3?page=3") == "https://example.com/a/3?page=3"
+
+    def test_url_that_wasnt_redirected_disables_the_rule(self):
+        rules = _learn(RedirectRules(min_hits=1), [("https://example.com/a/1", "https://example.com/a/1/")])
+
+        # Already in the rule's form, so it says nothing against it
+        rules.learn("https://example.com/a/2/", "https://example.com/a/2/")
+        assert rules.rewrite("https://example.com/a/3") == "https://example.com/a/3/"
+
+        rules.learn("https://example.com/a/4", "https://example.com/a/4")
+        assert rules.rewrite("https://example.com/a/3") == "https://example.com/a/3"
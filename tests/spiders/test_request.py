@@ -4,7 +4,7 @@ import pickle
 
 import pytest
 
-from scrapling.spiders.request import Request
+from scrapling.spiders.request import Request, update_fingerprints
 from scrapling.core._types import Any, Dict, AsyncGenerator
 
 
@@ -22,6 +22,7 @@ class TestRequestCreation:
         assert request.dont_filter is False
         assert request.meta == {}
         assert request._retry_count == 0
+        assert request.depth == 0
         assert request._session_kwargs == {}
 
     def test_request_with_all_parameters(self):
@@ -93,6 +94,20 @@ class TestRequestProperties:
         r2 = Request("https://example.com", data={"key": "value"})
         assert r1.update_fingerprint() == r2.update_fingerprint()
 
+    def test_batch_fingerprints_match(self):
+        """Test fingerprinting a batch gives every request the fingerprint it gets on its own."""
+        batch = [
+            Request("https://example.com/?b=2&a=1"),
+            Request("https://example.com/?a=1&b=2", sid="other"),
+            Request("https://example.com/?b=2&a=1", method="POST"),
+        ]
+        update_fingerprints(batch, keep_fragments=True)
+
+        for request in batch:
+            assert request._fp == Request(request.url, sid=request.sid, **request._session_kwargs).update_fingerprint(
+                keep_fragments=True
+            )
+
     def test_fingerprint_different_urls(self):
         """Test different URLs produce different fingerprints."""
         r1 = Request("https://example.com/page1")
@@ -151,6 +166,7 @@ class TestRequestCopy:
             _retry_count=1,
             proxy="http://proxy:8080",
         )
+        original.depth = 3
 
         copied = original.copy()
 
@@ -162,6 +178,7 @@ class TestRequestCopy:
         assert copied.dont_filter == original.dont_filter
         assert copied.meta == original.meta
         assert copied._retry_count == original._retry_count
+        assert copied.depth == original.depth
         assert copied._session_kwargs == original._session_kwargs
 
         # Check they are different objects
@@ -343,6 +360,18 @@ class TestRequestPickling:
             "headers": {"User-Agent": "test"},
         }
 
+    def test_pickle_keeps_depth(self):
+        """Test the depth survives pickling, and requests pickled before it existed are start requests."""
+        restored = pickle.loads(pickle.dumps(Request("https://example.com", depth=4)))
+        assert restored.depth == 4
+
+        legacy = Request("https://example.com")
+        state = legacy.__getstate__()
+        del state["depth"]
+        unpickled = Request.__new__(Request)
+        unpickled.__setstate__(state)
+        assert unpickled.depth == 0
+
 
 class TestRequestRestoreCallback:
     """Test callback restoration from spider."""
@@ -6,6 +6,7 @@ import tempfile
 from pathlib import Path
 from xml.etree import ElementTree  # nosec B405 - only used to read back files these tests just wrote
 
+import msgspec
 import pytest
 
 from scrapling.spiders.result import ItemList, CrawlStats, CrawlResult
@@ -280,6 +281,63 @@ class TestItemList:
             assert json.loads(lines[0])["line"] == 1
             assert json.loads(lines[1])["line"] == 2
 
+    def test_to_msgpack(self, tmp_path):
+        """Test to_msgpack writes an array of all the items."""
+        items = ItemList([{"line": 1}, {"line": 2}])
+
+        items.to_msgpack(tmp_path / "output.msgpack")
+
+        assert msgspec.msgpack.decode((tmp_path / "output.msgpack").read_bytes()) == [{"line": 1}, {"line": 2}]
+
+
+class Quote(msgspec.Struct):
+    text: str
+    author: str
+    tags: list[str] = []
+
+
+class TestTypedItemList:
+    """Test exporting typed items."""
+
+    @staticmethod
+    def _items() -> ItemList:
+        return ItemList([Quote("First", "A", ["x", "y"]), {"text": "Second", "author": "B", "extra": 1}])
+
+    def test_to_json(self, tmp_path):
+        self._items().to_json(tmp_path / "output.json")
+
+        assert json.loads((tmp_path / "output.json").read_text()) == [
+            {"text": "First", "author": "A", "tags": ["x", "y"]},
+            {"text": "Second", "author": "B", "extra": 1},
+        ]
+
+    def test_to_jsonl(self, tmp_path):
+        self._items().to_jsonl(tmp_path / "output.jsonl")
+
+        lines = (tmp_path / "output.jsonl").read_text().splitlines()
+        assert json.loads(lines[0]) == {"text": "First", "author": "A", "tags": ["x", "y"]}
+
+    def test_to_csv(self, tmp_path):
+        self._items().to_csv(tmp_path / "output.csv")
+
+        with open(tmp_path / "output.csv", newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        assert rows[0] == {"text": "First", "author": "A", "tags": '["x","y"]', "extra": ""}
+        assert rows[1]["extra"] == "1"
+
+    def test_to_xml(self, tmp_path):
+        self._items().to_xml(tmp_path / "output.xml")
+
+        first = _read_xml(tmp_path / "output.xml")[0]
+        assert [child.tag for child in first] == ["text", "author", "tags"]
+        assert first.find("tags").text == '["x","y"]'
+
+    def test_to_msgpack_decodes_back_into_the_type(self, tmp_path):
+        ItemList([Quote("First", "A")]).to_msgpack(tmp_path / "output.msgpack")
+
+        data = (tmp_path / "output.msgpack").read_bytes()
+        assert msgspec.msgpack.decode(data, type=list[Quote]) == [Quote("First", "A")]
+
 
 class TestCrawlStats:
     """Test CrawlStats dataclass."""
@@ -390,6 +448,62 @@ class TestCrawlStats:
         assert stats.custom_stats["my_metric"] == 42
         assert stats.to_dict()["custom_stats"]["my_metric"] == 42
 
+    def test_merge(self):
+        """Test merging the stats of crawls that ran side by side."""
+        first = CrawlStats(requests_count=3, concurrent_requests=4, start_time=10.0, end_time=20.0)
+        first.increment_status(200)
+        first.increment_response_bytes("a.com", 100)
+        first.custom_stats.update({"pages": 2, "label": "first"})
+        second = CrawlStats(requests_count=5, concurrent_requests=4, start_time=12.0, end_time=25.0)
+        second.increment_status(200)
+        second.increment_status(404)
+        second.increment_response_bytes("b.com", 50)
+        second.custom_stats.update({"pages": 3, "label": "second"})
+
+        merged = CrawlStats.merge([first, second])
+
+        assert merged.requests_count == 8
+        assert merged.concurrent_requests == 8
+        assert merged.elapsed_seconds == 15.0
+        assert merged.response_bytes == 150
+        assert merged.response_status_count == {"status_200": 2, "status_404": 1}
+        assert merged.domains_response_bytes == {"a.com": 100, "b.com": 50}
+        assert merged.custom_stats == {"pages": 5, "label": "second"}
+        assert CrawlStats.merge([]) == CrawlStats()
+
+    def test_merge_url_patterns(self):
+        """Test the URL pattern reports of side-by-side crawls are summed by template."""
+
+        def report(status: str, requests: int, fetched: int, items: int) -> dict:
+            return {
+                "status": status,
+                "requests": requests,
+                "blocked": int(status == "blocked"),
+                "throttled": int(status == "throttled"),
+                "fetched": fetched,
+                "items": items,
+                "items_per_fetch": items / fetched,
+            }
+
+        first = CrawlStats(url_patterns={"a.com/cal/{n}": report("throttled", 4, 4, 0)})
+        second = CrawlStats(
+            url_patterns={"a.com/cal/{n}": report("blocked", 6, 5, 1), "b.com/{hex}": report("throttled", 1, 2, 1)}
+        )
+
+        merged = CrawlStats.merge([first, second])
+
+        assert merged.url_patterns["a.com/cal/{n}"] == {
+            "status": "blocked",
+            "requests": 10,
+            "blocked": 1,
+            "throttled": 1,
+            "fetched": 9,
+            "items": 1,
+            "items_per_fetch": 0.11,
+        }
+        assert merged.url_patterns["b.com/{hex}"] == report("throttled", 1, 2, 1)
+        assert first.url_patterns["a.com/cal/{n}"]["requests"] == 4
+
 
 class TestCrawlResult:
     """Test CrawlResult dataclass."""
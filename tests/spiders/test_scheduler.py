@@ -90,6 +90,78 @@ class TestSchedulerEnqueue:
         assert len(scheduler) == 2
 
 
+class TestSchedulerEnqueueMany:
+    """Test enqueueing a batch of requests at once."""
+
+    @staticmethod
+    def _batch() -> list[Request]:
+        return [
+            Request("https://example.com/b?y=2&x=1"),
+            Request("https://example.com/a", priority=1),
+            Request("https://example.com/b?x=1&y=2"),  # Same page as the first one
+            Request("https://example.com/c"),
+            Request("https://other.com/a"),
+            Request("https://example.com/c", dont_filter=True),
+        ]
+
+    @staticmethod
+    async def _drain(scheduler: Scheduler) -> list[str]:
+        urls = []
+        while not scheduler.is_empty:
+            request = await scheduler.dequeue()
+            scheduler.complete(request)
+            urls.append(request.url)
+        return urls
+
+    @pytest.mark.asyncio
+    async def test_same_as_enqueueing_one_by_one(self):
+        """Test a batch is deduplicated and dispatched in the same order as the same requests queued one by one."""
+        one_by_one, batched = Scheduler(), Scheduler()
+        for scheduler in (one_by_one, batched):
+            await scheduler.enqueue(Request("https://example.com/z"))
+        for request in self._batch():
+            await one_by_one.enqueue(request)
+
+        assert await batched.enqueue_many(self._batch()) == 5
+        assert len(batched) == len(one_by_one) == 6
+        assert await self._drain(batched) == await self._drain(one_by_one)
+
+    @pytest.mark.asyncio
+    async def test_filters_requests_seen_before(self):
+        """Test requests enqueued before the batch are duplicates, and an empty batch is fine."""
+        calls = []
+        scheduler = Scheduler(on_enqueue=lambda: calls.append(1))
+        await scheduler.enqueue(Request("https://example.com/a"))
+
+        assert await scheduler.enqueue_many([Request("https://example.com/a"), Request("https://example.com/d")]) == 1
+        assert await scheduler.enqueue_many([]) == 0
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_with_memory_limit(self, tmp_path):
+        """Test a batch bigger than the memory limit spills over to disk."""
+        scheduler = Scheduler(max_memory_requests=2, spill_dir=tmp_path, journal=True)
+
+        assert await scheduler.enqueue_many(self._batch()) == 5
+        assert len(scheduler.drain_journal()) == 5
+        assert (await self._drain(scheduler))[0] == "https://example.com/a"
+        scheduler.close()
+
+
+class TestSchedulerEnqueueNotification:
+    """Test the enqueue callback the engine uses to wake up."""
+
+    @pytest.mark.asyncio
+    async def test_callback_called_for_accepted_requests_only(self):
+        calls = []
+        scheduler = Scheduler(on_enqueue=lambda: calls.append(1))
+
+        await scheduler.enqueue(Request("https://example.com", sid="s1"))
+        await scheduler.enqueue(Request("https://example.com", sid="s1"))  # Duplicate
+
+        assert len(calls) == 1
+
+
 class TestSchedulerDequeue:
     """Test Scheduler dequeue functionality."""
 
@@ -463,3 +535,368 @@ class TestSchedulerInFlight:
             fetchable.add((await restored.dequeue()).url)
 
         assert fetchable == {"https://example.com/A", "https://example.com/B"}
+
+
+class TestSchedulerPerDomain:
+    """Test the per-domain queues, slots, and delays."""
+
+    @pytest.mark.asyncio
+    async def test_domain_slots_limit_dispatch(self):
+        scheduler = Scheduler(domain_slots=1)
+        await scheduler.enqueue(Request("https://a.com/1"))
+        await scheduler.enqueue(Request("https://a.com/2"))
+        await scheduler.enqueue(Request("https://b.com/1"))
+
+        first = await scheduler.dequeue()
+        second = await scheduler.dequeue()
+        assert {first.domain, second.domain} == {"a.com", "b.com"}
+
+        # The remaining a.com request waits for the running one to complete
+        assert scheduler.has_ready is False
+        assert scheduler.next_ready_in() is None
+        assert len(scheduler) == 1
+
+        scheduler.complete(first if first.domain == "a.com" else second)
+        assert scheduler.has_ready is True
+        assert (await scheduler.dequeue()).url == "https://a.com/2"
+
+    @pytest.mark.asyncio
+    async def test_delayed_domain_does_not_block_others(self):
+        scheduler = Scheduler(delay_for=lambda domain: 10.0 if domain == "slow.com" else 0.0)
+        await scheduler.enqueue(Request("https://slow.com/1", priority=5))
+        await scheduler.enqueue(Request("https://slow.com/2", priority=5))
+        for i in range(3):
+            await scheduler.enqueue(Request(f"https://fast.com/{i}"))
+
+        assert (await scheduler.dequeue()).url == "https://slow.com/1"
+        # slow.com has a higher priority but must wait for its delay, so fast.com is served meanwhile
+        urls = [(await scheduler.dequeue()).url for _ in range(3)]
+        assert urls == ["https://fast.com/0", "https://fast.com/1", "https://fast.com/2"]
+
+        assert scheduler.has_ready is False
+        assert 9 < scheduler.next_ready_in() <= 10
+
+    @pytest.mark.asyncio
+    async def test_dequeue_waits_for_delay(self):
+        scheduler = Scheduler(delay_for=lambda domain: 0.05)
+        await scheduler.enqueue(Request("https://a.com/1"))
+        await scheduler.enqueue(Request("https://a.com/2"))
+
+        await scheduler.dequeue()
+        assert scheduler.has_ready is False
+        assert (await scheduler.dequeue()).url == "https://a.com/2"
+
+    @pytest.mark.asyncio
+    async def test_domains_served_fairly(self):
+        scheduler = Scheduler()
+        for i in range(3):
+            await scheduler.enqueue(Request(f"https://a.com/{i}"))
+        for i in range(3):
+            await scheduler.enqueue(Request(f"https://b.com/{i}"))
+
+        domains = [(await scheduler.dequeue()).domain for _ in range(6)]
+        assert domains == ["a.com", "b.com", "a.com", "b.com", "a.com", "b.com"]
+
+    @pytest.mark.asyncio
+    async def test_priority_kept_within_domain(self):
+        scheduler = Scheduler(domain_slots=1)
+        await scheduler.enqueue(Request("https://a.com/low", priority=1))
+        await scheduler.enqueue(Request("https://a.com/high", priority=10))
+
+        request = await scheduler.dequeue()
+        assert request.url == "https://a.com/high"
+        scheduler.complete(request)
+        assert (await scheduler.dequeue()).url == "https://a.com/low"
+
+    @pytest.mark.asyncio
+    async def test_cancel_delay(self):
+        scheduler = Scheduler(delay_for=lambda domain: 10.0)
+        await scheduler.enqueue(Request("https://a.com/1"))
+        await scheduler.enqueue(Request("https://a.com/2"))
+
+        request = await scheduler.dequeue()
+        assert scheduler.has_ready is False
+
+        scheduler.cancel_delay(request)
+        assert scheduler.has_ready is True
+
+    @pytest.mark.asyncio
+    async def test_delay_domain(self):
+        scheduler = Scheduler()
+        await scheduler.enqueue(Request("https://a.com/1"))
+
+        scheduler.delay_domain("a.com", 10.0)
+        assert scheduler.has_ready is False
+        assert 9 < scheduler.next_ready_in() <= 10
+
+    @pytest.mark.asyncio
+    async def test_idle_domains_are_forgotten(self):
+        scheduler = Scheduler()
+        await scheduler.enqueue(Request("https://a.com/1"))
+
+        scheduler.complete(await scheduler.dequeue())
+        assert scheduler._domains == {}
+
+    @pytest.mark.asyncio
+    async def test_dequeue_raises_when_nothing_can_be_dispatched(self):
+        scheduler = Scheduler(domain_slots=1)
+        await scheduler.enqueue(Request("https://a.com/1"))
+        await scheduler.enqueue(Request("https://a.com/2"))
+        await scheduler.dequeue()
+
+        with pytest.raises(RuntimeError):
+            await scheduler.dequeue()
+
+
+class TestSchedulerCrawlOrder:
+    """Test the order of the requests of the same priority."""
+
+    @staticmethod
+    async def _order(scheduler: Scheduler) -> list[str]:
+        urls = []
+        while not scheduler.is_empty:
+            request = await scheduler.dequeue()
+            scheduler.complete(request)
+            urls.append(request.url.rsplit("/", 1)[-1])
+        return urls
+
+    @staticmethod
+    async def _fill(scheduler: Scheduler) -> None:
+        for name, depth in (("a", 1), ("b", 2), ("c", 0), ("d", 2), ("e", 1)):
+            await scheduler.enqueue(Request(f"https://example.com/{name}", depth=depth))
+        await scheduler.enqueue(Request("https://example.com/urgent", depth=5, priority=1))
+
+    def test_unknown_order_rejected(self):
+        with pytest.raises(ValueError):
+            Scheduler(crawl_order="random")  # type: ignore[arg-type]
+
+    @pytest.mark.asyncio
+    async def test_priority_is_fifo(self):
+        scheduler = Scheduler()
+        await self._fill(scheduler)
+
+        assert await self._order(scheduler) == ["urgent", "a", "b", "c", "d", "e"]
+
+    @pytest.mark.asyncio
+    async def test_bfs(self):
+        scheduler = Scheduler(crawl_order="bfs")
+        await self._fill(scheduler)
+
+        assert await self._order(scheduler) == ["urgent", "c", "a", "e", "b", "d"]
+
+    @pytest.mark.asyncio
+    async def test_dfs(self):
+        scheduler = Scheduler(crawl_order="dfs")
+        await self._fill(scheduler)
+
+        assert await self._order(scheduler) == ["urgent", "b", "d", "a", "e", "c"]
+
+    @pytest.mark.asyncio
+    async def test_order_kept_across_disk(self):
+        bounded = Scheduler(crawl_order="dfs", max_memory_requests=2)
+        await self._fill(bounded)
+
+        assert await self._order(bounded) == ["urgent", "b", "d", "a", "e", "c"]
+        bounded.close()
+
+    @pytest.mark.asyncio
+    async def test_order_kept_on_restore(self):
+        requests = [Request(f"https://example.com/{depth}", depth=depth) for depth in (1, 3, 0, 2)]
+        scheduler = Scheduler(crawl_order="dfs")
+        scheduler.restore(CheckpointData(requests=requests, seen=set()))
+
+        assert await self._order(scheduler) == ["3", "2", "1", "0"]
+
+
+class TestSchedulerSpillOver:
+    """Test the disk spill-over of the requests that don't fit in memory."""
+
+    @staticmethod
+    async def _drain(scheduler: Scheduler) -> list[str]:
+        urls = []
+        while not scheduler.is_empty:
+            request = await scheduler.dequeue()
+            scheduler.complete(request)
+            urls.append(request.url)
+        return urls
+
+    def test_negative_limit_rejected(self):
+        with pytest.raises(ValueError):
+            Scheduler(max_memory_requests=-1)
+
+    @pytest.mark.asyncio
+    async def test_memory_window_is_bounded(self):
+        scheduler = Scheduler(max_memory_requests=5)
+        for i in range(50):
+            await scheduler.enqueue(Request(f"https://example.com/{i}"))
+
+        assert len(scheduler) == 50
+        assert scheduler._size == 5
+        scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_priority_order_kept_across_disk(self):
+        """Requests come back in the same order as without a memory limit."""
+        priorities = [i % 7 for i in range(40)]
+        bounded = Scheduler(max_memory_requests=4)
+        unbounded = Scheduler()
+        for i, priority in enumerate(priorities):
+            await bounded.enqueue(Request(f"https://example.com/{i}", priority=priority))
+            await unbounded.enqueue(Request(f"https://example.com/{i}", priority=priority))
+
+        assert await self._drain(bounded) == await self._drain(unbounded)
+        bounded.close()
+
+    @pytest.mark.asyncio
+    async def test_better_request_evicts_the_worst(self):
+        scheduler = Scheduler(max_memory_requests=2)
+        await scheduler.enqueue(Request("https://example.com/low", priority=1))
+        await scheduler.enqueue(Request("https://example.com/mid", priority=5))
+        await scheduler.enqueue(Request("https://example.com/high", priority=10))
+
+        assert {item[2].url for item in scheduler._pending.values()} == {
+            "https://example.com/mid",
+            "https://example.com/high",
+        }
+        assert await self._drain(scheduler) == [
+            "https://example.com/high",
+            "https://example.com/mid",
+            "https://example.com/low",
+        ]
+        scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_loaded_requests_are_passed_to_on_load(self):
+        loaded = []
+        scheduler = Scheduler(max_memory_requests=2, on_load=loaded.append)
+        for i in range(6):
+            await scheduler.enqueue(Request(f"https://example.com/{i}"))
+
+        await self._drain(scheduler)
+        assert sorted(request.url for request in loaded) == [f"https://example.com/{i}" for i in range(2, 6)]
+        scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_checkpoint_resume_with_disk_requests(self, tmp_path):
+        """The checkpoint and the disk frontier restore every pending request exactly once."""
+        scheduler = Scheduler(max_memory_requests=3, spill_dir=tmp_path)
+        for i in range(10):
+            await scheduler.enqueue(Request(f"https://example.com/{i}"))
+
+        done = await scheduler.dequeue()
+        scheduler.complete(done)
+        in_flight = await scheduler.dequeue()
+
+        requests, seen = scheduler.snapshot()
+        data = CheckpointData(requests=requests, seen=seen, frontier_generation=scheduler.snapshot_generation)
+        scheduler.checkpointed()
+
+        # Progress after the checkpoint is lost when resuming from it
+        scheduler.complete(in_flight)
+        await self._drain(scheduler)
+        await scheduler.enqueue(Request("https://example.com/new"))
+        scheduler.close(delete=False)
+
+        restored = Scheduler(max_memory_requests=3, spill_dir=tmp_path)
+        restored.restore(data)
+        assert len(restored) == 9
+        assert sorted(await self._drain(restored)) == sorted(f"https://example.com/{i}" for i in range(1, 10))
+        restored.close()
+
+    @pytest.mark.asyncio
+    async def test_close_removes_the_frontier(self, tmp_path):
+        scheduler = Scheduler(max_memory_requests=1, spill_dir=tmp_path)
+        for i in range(3):
+            await scheduler.enqueue(Request(f"https://example.com/{i}"))
+
+        assert (tmp_path / "frontier.db").exists()
+        scheduler.close()
+        assert not (tmp_path / "frontier.db").exists()
+
+
+class TestSchedulerJournal:
+    """Test the events recorded for journal checkpoints and their replay."""
+
+    @pytest.mark.asyncio
+    async def test_records_enqueue_and_complete(self):
+        scheduler = Scheduler(journal=True)
+        await scheduler.enqueue(Request("https://example.com/1"))
+        await scheduler.enqueue(Request("https://example.com/1"))  # Duplicate, not recorded
+
+        request = await scheduler.dequeue()
+        scheduler.complete(request)
+
+        events = scheduler.drain_journal()
+        assert [(kind, counter) for kind, counter, _ in events] == [("enqueue", 0), ("complete", 0)]
+        assert scheduler.drain_journal() == []
+
+    @pytest.mark.asyncio
+    async def test_base_checkpoint_drops_recorded_events(self):
+        scheduler = Scheduler(journal=True)
+        await scheduler.enqueue(Request("https://example.com/1"))
+
+        data = scheduler.checkpoint_data()
+
+        assert data.counters == [0]
+        assert scheduler.drain_journal() == []
+
+    @pytest.mark.asyncio
+    async def test_restore_replays_journal(self):
+        scheduler = Scheduler(journal=True)
+        await scheduler.enqueue(Request("https://example.com/1"))
+        await scheduler.enqueue(Request("https://example.com/2"))
+        data = scheduler.checkpoint_data()
+
+        done = await scheduler.dequeue()
+        scheduler.complete(done)
+        await scheduler.enqueue(Request("https://example.com/3"))
+        data.journal = scheduler.drain_journal()
+
+        restored = Scheduler()
+        restored.restore(data)
+
+        assert len(restored) == 2
+        assert await restored.enqueue(Request("https://example.com/3")) is False
+        urls = []
+        while not restored.is_empty:
+            urls.append((await restored.dequeue()).url)
+        assert urls == ["https://example.com/2", "https://example.com/3"]
+
+    @pytest.mark.asyncio
+    async def test_marked_requests_survive_the_journal(self):
+        scheduler = Scheduler(journal=True)
+        data = scheduler.checkpoint_data()
+
+        assert scheduler.mark_seen(Request("https://example.com/final")) is False
+        assert scheduler.mark_seen(Request("https://example.com/final")) is True
+        assert len(scheduler) == 0
+        data.journal = scheduler.drain_journal()
+
+        restored = Scheduler()
+        restored.restore(data)
+        assert await restored.enqueue(Request("https://example.com/final")) is False
+
+    @pytest.mark.asyncio
+    async def test_restore_discards_completed_disk_requests(self, tmp_path):
+        """Requests loaded back from disk and completed after the base checkpoint aren't crawled again."""
+        scheduler = Scheduler(max_memory_requests=2, spill_dir=tmp_path, journal=True)
+        for i in range(6):
+            await scheduler.enqueue(Request(f"https://example.com/{i}"))
+        data = scheduler.checkpoint_data()
+
+        completed = []
+        for _ in range(4):
+            request = await scheduler.dequeue()
+            scheduler.complete(request)
+            completed.append(request.url)
+        data.journal = scheduler.drain_journal()
+        scheduler.close(delete=False)
+
+        restored = Scheduler(max_memory_requests=2, spill_dir=tmp_path)
+        restored.restore(data)
+
+        urls = []
+        while not restored.is_empty:
+            urls.append((await restored.dequeue()).url)
+        assert sorted(urls + completed) == sorted(f"https://example.com/{i}" for i in range(6))
+        restored.close()
@@ -0,0 +1,223 @@
+"""Tests for crawling with several domain-sharded worker processes."""
+
+import os
+import time
+import logging
+from queue import Queue
+
+import anyio
+import pytest
+
+from scrapling.spiders.spider import Spider
+from scrapling.spiders.request import Request
+from scrapling.spiders.session import SessionManager
+from scrapling.spiders.scheduler import Scheduler
+from scrapling.spiders.sharding import ShardedCrawl, ShardRouter, shard_for
+from scrapling.engines.toolbelt.custom import Response
+from scrapling.core._types import Any, Dict, AsyncGenerator
+
+DOMAINS = [f"site{i}.com" for i in range(6)]
+
+
+class SitesSession:
+    """Session that serves numbered pages, each linking to the next one and to the first page of the next site."""
+
+    def __init__(self):
+        self._is_alive = False
+
+    async def __aenter__(self):
+        self._is_alive = True
+        return self
+
+    async def __aexit__(self, *args):
+        self._is_alive = False
+
+    async def fetch(self, url: str, **kwargs):
+        page = int(url.rsplit("/", 1)[1])
+        return Response(
+            url=url,
+            content=f"<html><h1>{page}</h1></html>",
+            status=200,
+            reason="OK",
+            cookies={},
+            headers={},
+            request_headers={},
+        )
+
+
+# The spiders are defined at module level so the worker processes can import them
+
+
+class SitesSpider(Spider):
+    name = "sites_spider"
+    start_urls = [f"https://{DOMAINS[0]}/0"]
+    logging_level = logging.ERROR
+
+    def __init__(self, pages: int = 4, pause_after: int = 0, **kwargs):
+        self.pages = pages
+        self.pause_after = pause_after
+        self.scraped = 0
+        super().__init__(**kwargs)
+
+    def configure_sessions(self, manager: SessionManager) -> None:
+        manager.add("default", SitesSession())
+
+    async def parse(self, response) -> AsyncGenerator[Dict[str, Any] | Request | None, None]:
+        domain = response.url.split("/")[2]
+        page = int(response.url.rsplit("/", 1)[1])
+        yield {"domain": domain, "page": page, "pid": os.getpid()}
+
+        self.scraped += 1
+        if self.pause_after and self.scraped == self.pause_after:
+            self.pause()
+
+        if page + 1 < self.pages:
+            yield Request(f"https://{domain}/{page + 1}")
+        if page == 0:
+            position = DOMAINS.index(domain)
+            if position + 1 < len(DOMAINS):
+                yield Request(f"https://{DOMAINS[position + 1]}/0")
+
+
+class SlowSession(SitesSession):
+    async def fetch(self, url: str, **kwargs):
+        await anyio.sleep(60)
+        return await super().fetch(url, **kwargs)
+
+
+class FailingSpider(SitesSpider):
+    """The second worker fails on start, while the first one is stuck on a slow request."""
+
+    name = "failing_spider"
+
+    def configure_sessions(self, manager: SessionManager) -> None:
+        manager.add("default", SlowSession())
+
+    async def on_start(self, resuming: bool = False) -> None:
+        if self._engine.scheduler._shard == 1:
+            raise RuntimeError("Worker failed on start")
+
+
+class TestShardFor:
+    def test_is_stable_and_in_range(self):
+        shards = [shard_for(domain, 3) for domain in DOMAINS]
+
+        assert shards == [shard_for(domain, 3) for domain in DOMAINS]
+        assert all(0 <= shard < 3 for shard in shards)
+
+    def test_needs_two_workers(self):
+        with pytest.raises(ValueError):
+            ShardedCrawl(SitesSpider(), 1)
+
+
+def _router(shard: int = 0, inboxes: list[Queue] | None = None) -> tuple[ShardRouter, Scheduler, list[Queue]]:
+    scheduler = Scheduler()
+    inboxes = inboxes if inboxes is not None else [Queue(), Queue()]
+    router = ShardRouter(
+        scheduler,
+        shard,
+        inboxes,
+        Queue(),
+        on_load=lambda request: None,
+        on_wake=lambda: None,
+        on_pause=lambda: None,
+        on_force_stop=lambda: None,
+    )
+    return router, scheduler, inboxes
+
+
+def _owned_by(shard: int) -> Request:
+    domain = next(domain for domain in DOMAINS if shard_for(domain, 2) == shard)
+    return Request(f"https://{domain}/0")
+
+
+class TestShardRouter:
+    def test_mark_seen_is_sent_to_the_owner(self):
+        router, scheduler, inboxes = _router(shard=0)
+        local, foreign = _owned_by(0), _owned_by(1)
+
+        assert router.mark_seen(local) is False
+        assert router.mark_seen(local) is True
+        assert router.mark_seen(foreign) is False
+        assert router.mark_seen(foreign) is False
+
+        assert len(scheduler.snapshot()[1]) == 1
+        assert [kind for kind, _ in (inboxes[1].get_nowait(), inboxes[1].get_nowait())] == ["seen", "seen"]
+        assert inboxes[0].empty()
+
+    @pytest.mark.asyncio
+    async def test_forwarded_requests_count_until_their_owner_dequeues_them(self):
+        sender, _, inboxes = _router(shard=0)
+        receiver, receiver_scheduler, _ = _router(shard=1, inboxes=inboxes)
+        local, foreign = _owned_by(0), _owned_by(1)
+
+        # Only the owner knows if a request is a duplicate
+        assert await sender.enqueue(foreign) is None
+        assert await sender.enqueue_many([local, foreign.copy()]) == 1
+        assert len(sender) == 3
+
+        kind, routed = inboxes[1].get_nowait()
+        assert kind == "request" and routed._routed_from == 0
+        await receiver_scheduler.enqueue(routed)
+        await receiver.dequeue()
+
+        assert inboxes[0].get_nowait() == ("forwarded_done", None)
+        assert routed._routed_from is None
+
+
+class TestShardedCrawl:
+    def test_domains_are_crawled_by_their_worker(self):
+        result = SitesSpider().start(workers=2)
+
+        assert not result.paused
+        assert len(result.items) == len(DOMAINS) * 4
+        assert result.stats.items_scraped == len(DOMAINS) * 4
+        assert result.stats.requests_count == len(DOMAINS) * 4
+        assert result.stats.response_status_count == {"status_200": len(DOMAINS) * 4}
+        assert {(item["domain"], item["page"]) for item in result.items} == {
+            (domain, page) for domain in DOMAINS for page in range(4)
+        }
+
+        pids = {}
+        for item in result.items:
+            pids.setdefault(item["domain"], set()).add(item["pid"])
+        # Every domain is crawled by a single worker, and the workers aren't the main process
+        assert all(len(domain_pids) == 1 for domain_pids in pids.values())
+        assert os.getpid() not in set().union(*pids.values())
+        # Domains that hash to different shards are crawled by different workers
+        for first in DOMAINS:
+            for second in DOMAINS:
+                if shard_for(first, 2) != shard_for(second, 2):
+                    assert pids[first] != pids[second]
+
+    def test_pause_and_resume(self, tmp_path):
+        crawldir = tmp_path / "crawl"
+
+        first = SitesSpider(pause_after=3, crawldir=crawldir).start(workers=2)
+        assert first.paused
+        assert (crawldir / "shard-0").exists()
+
+        second = SitesSpider(crawldir=crawldir).start(workers=2)
+        assert not second.paused
+
+        crawled = {(item["domain"], item["page"]) for item in [*first.items, *second.items]}
+        assert crawled == {(domain, page) for domain in DOMAINS for page in range(4)}
+        assert not (crawldir / ShardedCrawl.ROUTED_FILE).exists()
+
+    def test_failed_worker_stops_the_others(self):
+        started = time.monotonic()
+
+        with pytest.raises(RuntimeError, match="Worker failed on start"):
+            FailingSpider().start(workers=2)
+        # The slow request of the other worker is cancelled instead of awaited
+        assert time.monotonic() - started < 30
+
+    def test_resume_needs_the_same_workers(self, tmp_path):
+        crawldir = tmp_path / "crawl"
+        crawldir.mkdir()
+        crawl = ShardedCrawl(SitesSpider(), 2, crawldir)
+        crawl._leftovers.append(Request("https://site0.com/1"))
+        crawl._save_routed(paused=True)
+
+        with pytest.raises(ValueError):
+            ShardedCrawl(SitesSpider(), 3, crawldir).run()
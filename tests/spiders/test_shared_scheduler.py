@@ -0,0 +1,257 @@
+"""Tests for the SharedScheduler, including other crawl processes simulated with local processes."""
+
+import os
+import time
+import pickle
+import multiprocessing
+
+import anyio
+import pytest
+
+from scrapling.spiders.request import Request
+from scrapling.spiders.scheduler import Scheduler
+from scrapling.spiders.checkpoint import CheckpointData
+from scrapling.spiders.dedup import BloomSeenSet, CompactSeenSet, DiskSeenSet
+from scrapling.spiders.shared_scheduler import SharedScheduler
+
+
+def _lease_and_crash(path: str) -> None:
+    """A crawl process that leases a request and dies before completing it."""
+
+    async def run() -> None:
+        scheduler = SharedScheduler(path, lease_timeout=0.5)
+        await scheduler.dequeue()
+        os._exit(1)
+
+    anyio.run(run)
+
+
+def _drain(path: str, results) -> None:
+    """A crawl process that processes requests until the frontier is empty."""
+
+    async def run() -> None:
+        scheduler = SharedScheduler(path)
+        while not scheduler.is_empty:
+            if not scheduler.has_ready:
+                await anyio.sleep(0.01)
+                continue
+            request = await scheduler.dequeue()
+            results.put(request.url)
+            scheduler.complete(request)
+        scheduler.close()
+
+    anyio.run(run)
+
+
+def _run_process(target, *args) -> multiprocessing.Process:
+    process = multiprocessing.get_context("spawn").Process(target=target, args=args)
+    process.start()
+    return process
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "frontier.db")
+
+
+class TestSharedScheduler:
+    def test_invalid_lease_timeout(self, path):
+        with pytest.raises(ValueError):
+            SharedScheduler(path, lease_timeout=0)
+
+    @pytest.mark.asyncio
+    async def test_deduplicates_across_processes(self, path):
+        first, second = SharedScheduler(path), SharedScheduler(path)
+
+        assert await first.enqueue(Request("https://example.com/1")) is True
+        assert await second.enqueue(Request("https://example.com/1")) is False
+        assert await second.enqueue(Request("https://example.com/1", dont_filter=True)) is True
+        assert len(first) == len(second) == 2
+        first.close()
+        second.close()
+
+    @pytest.mark.asyncio
+    async def test_enqueue_many(self, path):
+        first, second = SharedScheduler(path), SharedScheduler(path)
+        await first.enqueue(Request("https://example.com/1"))
+
+        batch = [Request(f"https://example.com/{i}") for i in (1, 2, 2, 3)]
+        assert await second.enqueue_many(batch) == 2
+        assert len(first) == 3
+        first.close()
+        second.close()
+
+    @pytest.mark.asyncio
+    async def test_mark_seen_is_shared(self, path):
+        first, second = SharedScheduler(path), SharedScheduler(path)
+
+        assert first.mark_seen(Request("https://example.com/final")) is False
+        assert second.mark_seen(Request("https://example.com/final")) is True
+        assert await second.enqueue(Request("https://example.com/final")) is False
+        assert len(first) == 0
+        first.close()
+        second.close()
+
+    @pytest.mark.asyncio
+    async def test_priority_then_fifo_order(self, path):
+        scheduler = SharedScheduler(path)
+        await scheduler.enqueue(Request("https://example.com/low", priority=0))
+        await scheduler.enqueue(Request("https://a.com/high", priority=5))
+        await scheduler.enqueue(Request("https://b.com/low", priority=0))
+
+        urls = [(await scheduler.dequeue()).url for _ in range(3)]
+
+        assert urls == ["https://a.com/high", "https://example.com/low", "https://b.com/low"]
+        scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_depth_first_order(self, path):
+        scheduler = SharedScheduler(path, crawl_order="dfs")
+        await scheduler.enqueue(Request("https://example.com/shallow", depth=1))
+        await scheduler.enqueue(Request("https://a.com/deep", depth=3))
+        await scheduler.enqueue(Request("https://b.com/start"))
+
+        urls = [(await scheduler.dequeue()).url for _ in range(3)]
+
+        assert urls == ["https://a.com/deep", "https://example.com/shallow", "https://b.com/start"]
+        scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_leased_requests_are_exclusive(self, path):
+        first, second = SharedScheduler(path), SharedScheduler(path)
+        await first.enqueue(Request("https://example.com/1"))
+
+        request = await first.dequeue()
+
+        assert second.has_ready is False
+        assert second.is_empty is False
+        first.complete(request)
+        assert second.is_empty is True
+        first.close()
+        second.close()
+
+    @pytest.mark.asyncio
+    async def test_has_ready_does_not_lease(self, path):
+        first, second = SharedScheduler(path), SharedScheduler(path)
+        await first.enqueue(Request("https://example.com/1"))
+
+        assert first.has_ready is True
+
+        assert second.lease().url == "https://example.com/1"
+        assert first.has_ready is False
+        assert first.lease() is None
+        first.close()
+        second.close()
+
+    @pytest.mark.asyncio
+    async def test_leases_are_renewed_while_held(self, path):
+        first, second = SharedScheduler(path, lease_timeout=0.2), SharedScheduler(path)
+        await first.enqueue(Request("https://example.com/1"))
+        request = await first.dequeue()
+
+        # Without dequeuing anything else, the lease outlives its timeout
+        time.sleep(0.5)
+
+        assert second.lease() is None
+        first.complete(request)
+        first.close()
+        second.close()
+
+    @pytest.mark.asyncio
+    async def test_close_gives_leases_back(self, path):
+        first, second = SharedScheduler(path), SharedScheduler(path)
+        await first.enqueue(Request("https://example.com/1"))
+        await first.dequeue()
+
+        first.close()
+
+        assert (await second.dequeue()).url == "https://example.com/1"
+        second.close()
+
+    @pytest.mark.asyncio
+    async def test_domain_slots_are_per_process(self, path):
+        scheduler = SharedScheduler(path, domain_slots=1)
+        other = SharedScheduler(path)
+        await scheduler.enqueue(Request("https://example.com/1"))
+        await scheduler.enqueue(Request("https://example.com/2"))
+
+        request = await scheduler.dequeue()
+
+        assert scheduler.has_ready is False
+        assert other.has_ready is True
+        other.close()
+        scheduler.complete(request)
+        assert scheduler.has_ready is True
+        scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_snapshot_and_restore(self, path, tmp_path):
+        scheduler = Scheduler()
+        await scheduler.enqueue(Request("https://example.com/1", priority=1))
+        await scheduler.enqueue(Request("https://example.com/2"))
+        data = pickle.loads(pickle.dumps(scheduler.checkpoint_data()))
+
+        shared = SharedScheduler(path)
+        shared.restore(data)
+
+        assert len(shared) == 2
+        assert await shared.enqueue(Request("https://example.com/1")) is False
+        requests, seen = shared.snapshot()
+        assert [request.url for request in requests] == ["https://example.com/1", "https://example.com/2"]
+        assert isinstance(CheckpointData(requests=requests, seen=seen).seen, set)
+        assert len(seen) == 2
+        shared.close()
+
+    @pytest.mark.asyncio
+    async def test_restore_from_other_seen_sets(self, tmp_path):
+        for seen in (CompactSeenSet(), DiskSeenSet(tmp_path / "seen")):
+            scheduler = Scheduler(seen=seen)
+            await scheduler.enqueue(Request("https://example.com/1"))
+            await scheduler.enqueue(Request("https://example.com/2"))
+
+            shared = SharedScheduler(tmp_path / f"{type(seen).__name__}.db")
+            shared.restore(scheduler.checkpoint_data())
+
+            assert len(shared.snapshot()[1]) == 2
+            shared.close()
+            seen.close()
+
+    def test_restore_from_a_bloom_filter(self, path):
+        shared = SharedScheduler(path)
+
+        with pytest.raises(ValueError, match="BloomSeenSet"):
+            shared.restore(CheckpointData(requests=[], seen=BloomSeenSet()))
+        shared.close()
+
+
+class TestSharedSchedulerProcesses:
+    @pytest.mark.asyncio
+    async def test_reclaims_leases_of_a_crashed_process(self, path):
+        scheduler = SharedScheduler(path)
+        await scheduler.enqueue(Request("https://example.com/1"))
+
+        process = _run_process(_lease_and_crash, path)
+        process.join(timeout=60)
+        assert process.exitcode == 1
+
+        # Leased by the crashed process, until its lease expires
+        assert scheduler.has_ready is False
+        time.sleep(0.6)
+        assert (await scheduler.dequeue()).url == "https://example.com/1"
+        scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_processes_share_the_frontier(self, path):
+        scheduler = SharedScheduler(path)
+        for i in range(200):
+            await scheduler.enqueue(Request(f"https://example.com/{i}"))
+        scheduler.close()
+
+        results = multiprocessing.get_context("spawn").Queue()
+        processes = [_run_process(_drain, path, results) for _ in range(3)]
+        urls = [results.get(timeout=60) for _ in range(200)]
+        for process in processes:
+            process.join(timeout=60)
+
+        # Every request is processed exactly once
+        assert sorted(urls) == sorted(f"https://example.com/{i}" for i in range(200))
@@ -165,6 +165,47 @@ class TestParsing:
         assert [r async for r in spider.parse_collection(response)] == []
 
 
+class TestPagesAhead:
+    @pytest.mark.asyncio
+    async def test_first_pages_are_requested_together(self):
+        class S(ExampleStoreSpider):
+            pages_ahead = 3
+
+        spider = S()
+        requests = [r async for r in spider.start_requests()]
+        assert [r.meta["page"] for r in requests] == [1, 2, 3]
+
+        response = _make_response(
+            "https://example.com/collections.json?page=1&limit=250", COLLECTIONS_PAGE, {"page": 1}
+        )
+        results = [r async for r in spider.parse(response)]
+        assert [(r.meta.get("handle"), r.meta["page"]) for r in results] == [
+            ("lipsticks", 1),
+            ("lipsticks", 2),
+            ("lipsticks", 3),
+            (None, 4),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_no_pages_requested_past_an_empty_one(self):
+        class S(ExampleStoreSpider):
+            pages_ahead = 3
+
+        spider = S()
+        meta = {"handle": "lipsticks"}
+        spider.paginator.start("lipsticks", spider._products_page("lipsticks"))
+
+        def page(number: int, payload: Dict[str, Any]) -> Response:
+            url = f"https://example.com/collections/lipsticks/products.json?page={number}&limit=250"
+            return _make_response(url, payload, {**meta, "page": number})
+
+        # Page 2 is the end, while page 3 was already requested and page 1 is still on its way
+        assert [r async for r in spider.parse_collection(page(2, {"products": []}))] == []
+        assert [r async for r in spider.parse_collection(page(3, {"products": []}))] == []
+        results = [r async for r in spider.parse_collection(page(1, PRODUCTS_PAGE))]
+        assert len(results) == 3 and not any(isinstance(r, Request) for r in results)
+
+
 class TestItemProcessing:
     def test_variant_expansion_and_fields(self):
         spider = ExampleStoreSpider()
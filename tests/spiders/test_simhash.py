@@ -0,0 +1,66 @@
+"""Tests for the SimHash fingerprints of near-duplicate pages."""
+
+import pytest
+from lxml import html
+
+from scrapling.spiders.simhash import NearDuplicateIndex, page_simhash, simhash, text_simhash
+
+ARTICLE = " ".join(f"Sentence number {i} of the article talks about topic {i % 7}." for i in range(200))
+
+
+class TestSimHash:
+    def test_is_deterministic_and_64_bits(self):
+        assert simhash(["a", "b", "c"]) == simhash(["c", "b", "a"])
+        assert 0 <= text_simhash(ARTICLE) < 2**64
+        assert simhash([]) == 0
+
+    def test_similar_texts_are_close_and_different_ones_far(self):
+        base = text_simhash(ARTICLE)
+        similar = text_simhash(ARTICLE.replace("number 42 of", "number forty-two of"))
+        different = text_simhash(" ".join(f"Unrelated words {i} about cooking recipes and pasta." for i in range(200)))
+
+        assert (base ^ similar).bit_count() <= 3
+        assert (base ^ different).bit_count() > 10
+
+    def test_no_words(self):
+        assert text_simhash("  ... !!! ") is None
+
+    def test_page_ignores_scripts_and_styles(self):
+        page = f"<html><head><style>p {{ color: red }}</style></head><body><p>{ARTICLE}</p></body></html>"
+        tracked = page.replace("<body>", "<body><script>var session = 'a8f3e9c1d2b7';</script>")
+
+        assert page_simhash(html.fromstring(page)) == page_simhash(html.fromstring(tracked))
+
+    def test_page_keeps_the_words_used_by_scripts(self):
+        page = "<html><body><script>price</script><p>total price</p></body></html>"
+
+        assert page_simhash(html.fromstring(page)) == text_simhash("total price")
+
+    def test_page_keeps_adjacent_elements_apart(self):
+        page = "<html><body><table><tr><td>total</td><td>price</td></tr></table></body></html>"
+
+        assert page_simhash(html.fromstring(page)) == text_simhash("total price")
+
+
+class TestNearDuplicateIndex:
+    def test_invalid_distance(self):
+        with pytest.raises(ValueError):
+            NearDuplicateIndex(max_distance=64)
+
+    def test_finds_fingerprints_within_the_distance(self):
+        index = NearDuplicateIndex(max_distance=3)
+        fingerprint = 0x0123456789ABCDEF
+
+        assert index.add(fingerprint) is False
+        # Three bits away, spread over different blocks, and four bits away
+        assert index.find(fingerprint ^ (1 << 0 | 1 << 30 | 1 << 63)) == fingerprint
+        assert index.find(fingerprint ^ 0b1111) is None
+        assert index.add(fingerprint ^ 1) is True
+        assert len(index) == 1
+
+    def test_exact_matches_only(self):
+        index = NearDuplicateIndex(max_distance=0)
+        index.add(42)
+
+        assert index.find(42) == 42
+        assert index.find(43) is None
@@ -2,13 +2,14 @@
 
 import gzip
 import pickle
+from datetime import datetime, timezone
 
 import pytest
 
 from scrapling.engines.toolbelt.custom import Response
 from scrapling.spiders.links import LinkExtractor
 from scrapling.spiders.request import Request
-from scrapling.spiders.templates.sitemap import SitemapSpider
+from scrapling.spiders.templates.sitemap import SitemapSpider, _parse_lastmod
 from scrapling.spiders.templates import CrawlRule
 from scrapling.core._types import AsyncGenerator
 
@@ -50,6 +51,7 @@ INDEX_XML = b"""<?xml version="1.0" encoding="UTF-8"?>
 </sitemapindex>
 """
 
+
 def _make_response(body: bytes, url: str = "https://example.com/sitemap.xml", headers: dict | None = None) -> Response:
     resp = Response(
         url=url,
@@ -243,3 +245,217 @@ class TestSitemapSpiderPickle:
         fresh = S()
         restored._restore_callback(fresh)
         assert restored.callback == fresh.parse_post
+
+
+def _page_response(request: Request) -> Response:
+    resp = _make_response(b"<html><h1>page</h1></html>", url=request.url)
+    resp.request = request
+    resp.meta = dict(request.meta)
+    return resp
+
+
+async def _crawl_pages(requests: list) -> list:
+    """Run the callbacks of the requests `_parse_sitemap` yielded, as the engine would once they're fetched."""
+    results = []
+    for request in requests:
+        results.extend(await _collect(request.callback(_page_response(request))))
+    return results
+
+
+class TestSitemapLastmod:
+    def test_entries_keep_the_sitemap_hints(self):
+        class S(SitemapSpider):
+            name = "s"
+            sitemap_urls = ["https://example.com/sitemap.xml"]
+
+        entries = S()._sm_body(URLSET_XML).entries
+
+        assert [entry.loc for entry in entries] == [
+            "https://example.com/posts/1",
+            "https://example.com/posts/2",
+            "https://example.com/about",
+        ]
+        assert entries[0].lastmod == datetime(2026, 1, 15, tzinfo=timezone.utc).timestamp()
+        assert entries[0].changefreq == "daily"
+        assert entries[0].priority == 0.8
+        assert entries[2].lastmod is None and entries[2].priority is None
+
+    def test_lastmod_formats(self):
+        noon = datetime(2026, 1, 15, 12, 0, tzinfo=timezone.utc).timestamp()
+
+        assert _parse_lastmod("2026-01-15T12:00:00Z") == noon
+        assert _parse_lastmod("2026-01-15T12:00Z") == noon
+        assert _parse_lastmod("2026-01-15T12:00:00.123Z") == noon + 0.123
+        assert _parse_lastmod("2026-01-15T14:00:00+02:00") == noon
+        assert _parse_lastmod("2026-01-15T10:30-01:30") == noon
+        assert _parse_lastmod(" 2026-01-15T12:00:00 ") == noon
+        assert _parse_lastmod("2026-01") == datetime(2026, 1, 1, tzinfo=timezone.utc).timestamp()
+        assert _parse_lastmod("2026-13-01") is None
+        assert _parse_lastmod("yesterday") is None
+
+    @pytest.mark.asyncio
+    async def test_only_changed_urls_are_scheduled_again(self, tmp_path):
+        class S(SitemapSpider):
+            name = "s"
+            sitemap_urls = ["https://example.com/sitemap.xml"]
+            sitemap_lastmod_store = str(tmp_path / "lastmod.db")
+
+            async def parse(self, response):
+                yield {"url": response.url}
+
+        spider = S()
+        first = await _collect(spider._parse_sitemap(_make_response(URLSET_XML)))
+        assert len(first) == 3
+        assert len(await _crawl_pages(first)) == 3
+        await spider.on_close()
+
+        spider = S()
+        second = await _collect(spider._parse_sitemap(_make_response(URLSET_XML)))
+        # The page without `<lastmod>` or `<changefreq>` may have changed, so it's crawled every time
+        assert [r.url for r in second] == ["https://example.com/about"]
+
+        updated = URLSET_XML.replace(b"2026-02-20", b"2026-03-01T08:00:00+02:00")
+        third = await _collect(spider._parse_sitemap(_make_response(updated)))
+        assert [r.url for r in third] == ["https://example.com/posts/2", "https://example.com/about"]
+        await spider.on_close()
+
+    @pytest.mark.asyncio
+    async def test_failed_pages_are_crawled_again(self, tmp_path):
+        class S(SitemapSpider):
+            name = "s"
+            sitemap_urls = ["https://example.com/sitemap.xml"]
+            sitemap_lastmod_store = str(tmp_path / "lastmod.db")
+
+            async def parse(self, response):
+                raise ValueError("broken page")
+                yield
+
+        spider = S()
+        requests = await _collect(spider._parse_sitemap(_make_response(URLSET_XML)))
+        with pytest.raises(ValueError):
+            await _crawl_pages(requests[:1])
+
+        again = await _collect(spider._parse_sitemap(_make_response(URLSET_XML)))
+        assert len(again) == 3
+        await spider.on_close()
+
+    @pytest.mark.asyncio
+    async def test_changefreq_without_lastmod(self, tmp_path):
+        body = URLSET_XML.replace(
+            b"<loc>https://example.com/about</loc>",
+            b"<loc>https://example.com/about</loc><changefreq>weekly</changefreq>",
+        )
+
+        class S(SitemapSpider):
+            name = "s"
+            sitemap_urls = ["https://example.com/sitemap.xml"]
+            sitemap_lastmod_store = str(tmp_path / "lastmod.db")
+
+            async def parse(self, response):
+                yield {"url": response.url}
+
+        spider = S()
+        await _crawl_pages(await _collect(spider._parse_sitemap(_make_response(body))))
+
+        assert await _collect(spider._parse_sitemap(_make_response(body))) == []
+        await spider.on_close()
+
+    @pytest.mark.asyncio
+    async def test_rule_callbacks_survive_pickling(self, tmp_path):
+        class S(SitemapSpider):
+            name = "s"
+            sitemap_urls = ["https://example.com/sitemap.xml"]
+            sitemap_lastmod_store = str(tmp_path / "lastmod.db")
+
+            def rules(self):
+                return [CrawlRule(LinkExtractor(allow=r"/posts/"), callback=self.parse_post)]
+
+            async def parse_post(self, response):
+                yield {"post": response.url}
+
+        spider = S()
+        request = (await _collect(spider._parse_sitemap(_make_response(URLSET_XML))))[0]
+        restored = pickle.loads(pickle.dumps(request))
+        restored._restore_callback(spider)
+
+        assert await _crawl_pages([restored]) == [{"post": "https://example.com/posts/1"}]
+        assert len(spider._get_lastmod_store()) == 1
+        await spider.on_close()
+
+    @pytest.mark.asyncio
+    async def test_sitemap_priority(self):
+        class S(SitemapSpider):
+            name = "s"
+            sitemap_urls = ["https://example.com/sitemap.xml"]
+            sitemap_use_priority = True
+
+            def rules(self):
+                return [
+                    CrawlRule(LinkExtractor(allow=r"/posts/2"), priority=7),
+                    CrawlRule(LinkExtractor(allow=r"/")),
+                ]
+
+        out = await _collect(S()._parse_sitemap(_make_response(URLSET_XML)))
+
+        # 0.8 maps to 3, the rule's priority wins over the sitemap's, and entries without one keep the default
+        assert [r.priority for r in out] == [3, 7, 0]
+
+
+class TestStreamingSitemap:
+    def _spider(self) -> SitemapSpider:
+        class S(SitemapSpider):
+            name = "s"
+            sitemap_urls = ["https://example.com/sitemap.xml"]
+
+        return S()
+
+    def test_entries_before_a_syntax_error_are_kept(self):
+        body = URLSET_XML.replace(b"</urlset>", b"<url><loc>https://example.com/broken</loc></ur")
+
+        urls = self._spider()._sm_body(body).urls
+
+        assert urls == ["https://example.com/posts/1", "https://example.com/posts/2", "https://example.com/about"]
+
+    def test_large_gzipped_sitemap(self):
+        count = 20_000
+        body = gzip.compress(
+            b'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            + b"".join(b"<url><loc>https://example.com/p/%d</loc></url>" % i for i in range(count))
+            + b"</urlset>"
+        )
+        spider = self._spider()
+
+        parsed = spider._iter_sitemap(body)
+        first = next(parsed)
+
+        assert first.loc == "https://example.com/p/0"
+        assert sum(1 for _ in parsed) == count - 1
+
+    def test_multi_member_gzip(self):
+        xml = URLSET_XML
+        body = gzip.compress(xml[:200]) + gzip.compress(xml[200:])
+
+        assert len(self._spider()._sm_body(body).urls) == 3
+
+    def test_gzip_bomb_is_capped(self, monkeypatch):
+        from scrapling.spiders.templates import _utils
+
+        monkeypatch.setattr(_utils, "_GUNZIP_MAX_SIZE", 100)
+
+        assert self._spider()._sm_body(gzip.compress(URLSET_XML)).urls == []
+
+    def test_truncated_gzip(self):
+        body = gzip.compress(URLSET_XML)[:-20]
+
+        urls = self._spider()._sm_body(body).urls
+
+        # What was decompressed before the end is still used
+        assert (
+            urls
+            == ["https://example.com/posts/1", "https://example.com/posts/2", "https://example.com/about"][: len(urls)]
+        )
+
+    def test_unknown_root(self):
+        body = b"<feed><entry><loc>https://example.com/a</loc></entry></feed>"
+
+        assert self._spider()._sm_body(body).urls == []
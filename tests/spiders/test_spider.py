@@ -1,9 +1,15 @@
 """Tests for the Spider class and related components."""
 
+import os
+import time
+import pickle
+import signal
 import logging
 import tempfile
+import threading
 from pathlib import Path
 
+import anyio
 import pytest
 
 from scrapling.spiders.spider import Spider, SessionConfigurationError, LogCounterHandler, BLOCKED_CODES
@@ -243,6 +249,20 @@ class TestSpiderInit:
         assert "ConcreteSpider" in repr_str
         assert "test_spider" in repr_str
 
+    def test_spider_pickles_without_process_state(self):
+        """Test a pickled spider keeps its attributes and gets fresh logging and sessions."""
+        spider = ConcreteSpider()
+        spider.custom_state = {"pages": 3}
+
+        restored = pickle.loads(pickle.dumps(spider))
+
+        assert restored.custom_state == {"pages": 3}
+        assert restored.logger.name == "scrapling.spiders.test_spider"
+        assert isinstance(restored._log_counter, LogCounterHandler)
+        assert restored._log_counter is not spider._log_counter
+        assert len(restored._session_manager) == 0
+        assert restored._engine is None
+
 
 class TestSpiderClassAttributes:
     """Test Spider class attribute defaults."""
@@ -263,6 +283,65 @@ class TestSpiderClassAttributes:
         """Test default max_blocked_retries is 3."""
         assert ConcreteSpider.max_blocked_retries == 3
 
+    def test_default_max_memory_requests(self):
+        """Test default max_memory_requests is 0 (no disk spill-over)."""
+        assert ConcreteSpider.max_memory_requests == 0
+
+    def test_default_scheduler_backend(self):
+        """Test default scheduler_backend is the in-memory scheduler."""
+        assert ConcreteSpider.scheduler_backend == "memory"
+        assert ConcreteSpider.scheduler_path is None
+
+    def test_default_parse_workers(self):
+        """Test default parse_workers is 0 (callbacks run in the crawl's process)."""
+        assert ConcreteSpider.parse_workers == 0
+
+    def test_default_item_pipeline(self):
+        """Test items are kept in memory with no pipeline stages by default."""
+        assert ConcreteSpider.keep_items is True
+        assert ConcreteSpider.item_type is None
+        assert ConcreteSpider.item_batch_size == 100
+        assert ConcreteSpider.item_queue_size == 1000
+        assert ConcreteSpider().configure_pipeline() == []
+
+    def test_default_recrawl_cache(self):
+        """Test the recrawl cache is disabled by default."""
+        assert ConcreteSpider.recrawl_cache_dir is None
+        assert ConcreteSpider.recrawl_skip_unchanged is False
+
+    def test_default_redirect_handling(self):
+        """Test redirected responses are neither deduplicated nor learned from by default."""
+        assert ConcreteSpider.dedup_redirects is False
+        assert ConcreteSpider.learn_redirects is False
+
+    def test_default_near_duplicates(self):
+        """Test near-duplicate pages aren't looked for by default."""
+        assert ConcreteSpider.near_duplicates is None
+        assert ConcreteSpider.near_duplicate_distance == 3
+
+    def test_default_url_patterns(self):
+        """Test URL patterns have no budget and are never throttled by default."""
+        assert ConcreteSpider.url_pattern_max_requests is None
+        assert ConcreteSpider.url_pattern_unproductive_after is None
+
+    def test_default_adaptive_priority(self):
+        """Test priorities aren't learned by default."""
+        assert ConcreteSpider.adaptive_priority is False
+        assert ConcreteSpider.adaptive_priority_weight == 10
+
+    def test_default_crawl_order(self):
+        """Test requests of the same priority are dispatched in the order they were found, at any depth."""
+        assert ConcreteSpider.crawl_order == "priority"
+        assert ConcreteSpider.max_depth is None
+
+    def test_default_start_requests_low_water(self):
+        """Test start requests are consumed lazily, while the frontier holds less than 1000 requests."""
+        assert ConcreteSpider.start_requests_low_water == 1000
+
+    def test_default_dedup_backend(self):
+        """Test default dedup_backend is the in-memory set."""
+        assert ConcreteSpider.dedup_backend == "memory"
+
     def test_default_logging_level(self):
         """Test default logging level is DEBUG."""
         assert ConcreteSpider.logging_level == logging.DEBUG
@@ -542,9 +621,7 @@ class TestSpiderLogging:
             spider = FileLogSpider()
 
             # Should have a file handler
-            file_handlers = [
-                h for h in spider.logger.handlers if isinstance(h, logging.FileHandler)
-            ]
+            file_handlers = [h for h in spider.logger.handlers if isinstance(h, logging.FileHandler)]
             assert len(file_handlers) == 1
 
             # Clean up
@@ -558,6 +635,57 @@ class TestSpiderLogging:
         assert spider.logger.propagate is False
 
 
+class HangingSession:
+    """Session whose requests never complete."""
+
+    def __init__(self):
+        self._is_alive = False
+
+    async def __aenter__(self):
+        self._is_alive = True
+        return self
+
+    async def __aexit__(self, *args):
+        self._is_alive = False
+
+    async def fetch(self, url: str, **kwargs):
+        await anyio.sleep(3600)
+
+
+class HangingSpider(Spider):
+    name = "hanging"
+    start_urls = ["https://example.com"]
+    logging_level = logging.ERROR
+
+    def configure_sessions(self, manager: SessionManager) -> None:
+        manager.add("default", HangingSession())
+
+    async def parse(self, response) -> AsyncGenerator[Dict[str, Any] | Request | None, None]:
+        yield None
+
+
+class TestSpiderSignals:
+    """Test the SIGINT handling of a running crawl."""
+
+    def test_second_sigint_stops_a_crawl_waiting_on_requests(self):
+        """Test that Ctrl+C twice stops the crawl while its requests are in flight."""
+
+        def interrupt() -> None:
+            for _ in range(2):
+                time.sleep(0.5)
+                os.kill(os.getpid(), signal.SIGINT)
+
+        spider = HangingSpider()
+        sender = threading.Thread(target=interrupt)
+        started = time.monotonic()
+        sender.start()
+        result = spider.start()
+        sender.join()
+
+        assert time.monotonic() - started < 5
+        assert result.stats.requests_count == 0
+
+
 class TestSessionConfigurationError:
     """Test SessionConfigurationError exception."""
 
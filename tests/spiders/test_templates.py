@@ -187,6 +187,20 @@ class TestCrawlSpider:
         for req in out:
             assert req._session_kwargs["headers"]["referer"] == "https://example.com/"
 
+    @pytest.mark.asyncio
+    async def test_followed_requests_are_one_level_deeper(self):
+        class S(CrawlSpider):
+            name = "s"
+            start_urls = ["https://example.com/"]
+
+            def rules(self):
+                return [CrawlRule(LinkExtractor(allow=r"/posts/"))]
+
+        response = _make_response()
+        response.request.depth = 2  # type: ignore[union-attr]
+        out = await _collect(S().parse(response))
+        assert out and all(req.depth == 3 for req in out)
+
 
 class TestCrawlSpiderPickle:
     """Verify Request produced by CrawlSpider survives pickle round-trip with bound-method callbacks."""
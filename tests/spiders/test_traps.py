@@ -0,0 +1,76 @@
+"""Tests for the URL patterns that spot crawler traps."""
+
+import pytest
+
+from scrapling.spiders.traps import UrlPatterns, url_template
+
+
+class TestUrlTemplate:
+    def test_numbers_and_query_values(self):
+        assert (
+            url_template("https://Example.com/events/2024/05?view=week&sort=asc")
+            == "example.com/events/{n}/{n}?sort&view"
+        )
+        assert (
+            url_template("http://example.com/events/1999/12?sort=desc&view=day")
+            == "example.com/events/{n}/{n}?sort&view"
+        )
+        assert url_template("https://example.com/page-2/") == "example.com/page-{n}/"
+
+    def test_hex_ids_and_session_paths(self):
+        assert url_template("https://example.com/u/123e4567-e89b-12d3-a456-426614174000") == "example.com/u/{hex}"
+        assert url_template("https://example.com/item/0f3a9c2b77d1;jsessionid=AB12") == "example.com/item/{hex}"
+        # Words made of hex letters only aren't ids
+        assert url_template("https://example.com/deadbeef/about") == "example.com/deadbeef/about"
+
+    def test_different_pages_keep_different_templates(self):
+        assert url_template("https://example.com/products/shoes") != url_template("https://example.com/products/hats")
+        assert url_template("https://example.com/list?page=2") != url_template("https://example.com/list?sort=asc")
+
+
+class TestUrlPatterns:
+    def test_invalid_limits(self):
+        with pytest.raises(ValueError):
+            UrlPatterns(max_requests=0)
+        with pytest.raises(ValueError):
+            UrlPatterns(unproductive_after=0)
+
+    def test_budget(self):
+        patterns = UrlPatterns(max_requests=2)
+        for _ in range(2):
+            assert patterns.is_over_budget("example.com/cal/{n}") is False
+            patterns.record_request("example.com/cal/{n}")
+
+        assert patterns.is_over_budget("example.com/cal/{n}") is True
+        assert patterns.is_over_budget("example.com/items/{n}") is False
+        assert patterns.report() == {
+            "example.com/cal/{n}": {
+                "status": "blocked",
+                "requests": 2,
+                "blocked": 1,
+                "throttled": 0,
+                "fetched": 0,
+                "items": 0,
+                "items_per_fetch": 0.0,
+            }
+        }
+
+    def test_unproductive(self):
+        patterns = UrlPatterns(unproductive_after=2)
+        patterns.record_fetch("example.com/cal/{n}", items=0, leads=0)
+        assert patterns.is_unproductive("example.com/cal/{n}") is False
+        patterns.record_fetch("example.com/cal/{n}", items=0, leads=0)
+        assert patterns.is_unproductive("example.com/cal/{n}") is True
+
+        # One page yielding something is enough to bring the pattern back
+        patterns.record_fetch("example.com/cal/{n}", items=0, leads=1)
+        assert patterns.is_unproductive("example.com/cal/{n}") is False
+
+    def test_report_only_has_flagged_patterns(self):
+        patterns = UrlPatterns(max_requests=10, unproductive_after=1)
+        patterns.record_fetch("example.com/items/{n}", items=3, leads=0)
+        patterns.record_request("example.com/items/{n}")
+        patterns.record_request("example.com/cal/{n}", throttled=True)
+
+        assert list(patterns.report()) == ["example.com/cal/{n}"]
+        assert patterns.report()["example.com/cal/{n}"]["status"] == "throttled"
@@ -0,0 +1,154 @@
+"""Tests for running spider callbacks in worker processes."""
+
+import os
+import pickle
+import logging
+
+import pytest
+
+from scrapling.spiders.spider import Spider
+from scrapling.spiders.request import Request
+from scrapling.spiders.session import SessionManager
+from scrapling.spiders.workers import CallbackWorkerPool, _rebuild_response, _response_payload
+from scrapling.engines.toolbelt.custom import Response, deferred_parsing
+from scrapling.core._types import Any, Dict, AsyncGenerator
+
+
+class HTMLSession:
+    """Session that serves numbered pages, each linking to the next one."""
+
+    def __init__(self):
+        self._is_alive = False
+
+    async def __aenter__(self):
+        self._is_alive = True
+        return self
+
+    async def __aexit__(self, *args):
+        self._is_alive = False
+
+    async def fetch(self, url: str, **kwargs):
+        page = int(url.rsplit("/", 1)[1])
+        body = f'<html><body><h1>Page {page}</h1><a href="/{page + 1}">next</a></body></html>'
+        response = Response(url=url, content=body, status=200, reason="OK", cookies={}, headers={}, request_headers={})
+        _fetched.append(response)
+        return response
+
+
+# The responses created in the crawl's process
+_fetched: list[Response] = []
+
+
+# The spiders are defined at module level so the worker processes can import them
+
+
+class PagesSpider(Spider):
+    name = "pages_spider"
+    start_urls = ["https://example.com/0"]
+    parse_workers = 2
+    logging_level = logging.ERROR
+
+    def __init__(self, last_page: int = 5, **kwargs):
+        self.last_page = last_page
+        super().__init__(**kwargs)
+
+    def configure_sessions(self, manager: SessionManager) -> None:
+        manager.add("default", HTMLSession())
+
+    async def parse(self, response) -> AsyncGenerator[Dict[str, Any] | Request | None, None]:
+        for part in range(3):
+            yield {"page": response.css("h1::text").get(), "part": part, "pid": os.getpid()}
+        next_page = int(response.url.rsplit("/", 1)[1]) + 1
+        if next_page <= self.last_page:
+            yield response.follow(f"/{next_page}", callback=self.parse_next)
+
+    async def parse_next(self, response) -> AsyncGenerator[Dict[str, Any] | Request | None, None]:
+        async for result in self.parse(response):
+            yield result
+
+
+class FailingSpider(PagesSpider):
+    name = "failing_spider"
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.errors: list[tuple[str, Exception]] = []
+
+    async def parse(self, response) -> AsyncGenerator[Dict[str, Any] | Request | None, None]:
+        yield {"page": response.css("h1::text").get()}
+        self.logger.error("About to fail")
+        raise ValueError("broken page")
+
+    async def on_error(self, request: Request, error: Exception) -> None:
+        self.errors.append((request.url, error))
+
+    async def on_scraped_item(self, item: Dict[str, Any]) -> Dict[str, Any] | None:
+        return item if item["page"] != "Page 0" else None
+
+
+class TestCallbackWorkerPool:
+    def test_invalid_workers(self):
+        with pytest.raises(ValueError):
+            CallbackWorkerPool(PagesSpider(), 0)
+
+    def test_callbacks_run_in_workers(self):
+        spider = PagesSpider(last_page=5)
+        result = spider.start()
+
+        assert len(result.items) == 18
+        assert result.stats.items_scraped == 18
+        assert {item["page"] for item in result.items} == {f"Page {i}" for i in range(6)}
+        assert all(item["pid"] != os.getpid() for item in result.items)
+        # Each callback's results arrive in the order it yielded them
+        for page in range(6):
+            parts = [item["part"] for item in result.items if item["page"] == f"Page {page}"]
+            assert parts == [0, 1, 2]
+
+    def test_errors_reach_on_error(self):
+        spider = FailingSpider(last_page=0)
+        result = spider.start()
+
+        # The item yielded before the error still goes through `on_scraped_item` in the crawl's process
+        assert result.stats.items_dropped == 1
+        assert len(spider.errors) == 1
+        url, error = spider.errors[0]
+        assert url == "https://example.com/0"
+        assert isinstance(error, ValueError)
+        assert str(error) == "broken page"
+        # The worker's log messages are counted in the crawl's stats
+        assert result.stats.log_levels_counter["error"] >= 2
+
+    def test_pages_are_only_parsed_in_workers(self):
+        _fetched.clear()
+        PagesSpider(last_page=2).start()
+
+        assert len(_fetched) == 3
+        assert all(response._unparsed is not None for response in _fetched)
+
+    def test_responses_keep_their_history_and_captured_xhr(self):
+        def page(url: str, body: str = "") -> Response:
+            return Response(url=url, content=body, status=200, reason="OK", cookies={}, headers={}, request_headers={})
+
+        response = page("https://example.com/final", "<p>Final</p>")
+        response.history = [page("https://example.com/start")]
+        response.captured_xhr = [page("https://example.com/api", '{"ok": true}')]
+
+        payload = pickle.loads(pickle.dumps(_response_payload(Request("https://example.com/start"), response)))
+        rebuilt = _rebuild_response(payload)
+
+        assert rebuilt.css("p::text").get() == "Final"
+        assert [redirect.url for redirect in rebuilt.history] == ["https://example.com/start"]
+        assert [xhr.body for xhr in rebuilt.captured_xhr] == [b'{"ok": true}']
+
+
+class TestDeferredParsing:
+    def test_page_is_parsed_on_first_use(self):
+        page = {"content": "<html><body><p>Hi</p></body></html>", "status": 200, "reason": "OK"}
+        with deferred_parsing():
+            response = Response(url="https://example.com", cookies={}, headers={}, request_headers={}, **page)
+        outside = Response(url="https://example.com", cookies={}, headers={}, request_headers={}, **page)
+
+        assert response._unparsed is not None and outside._unparsed is None
+        assert response.css("p::text").get() == outside.css("p::text").get() == "Hi"
+        assert response._unparsed is None
+        assert response.body == outside.body